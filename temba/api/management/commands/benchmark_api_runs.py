@@ -0,0 +1,119 @@
+import time
+
+from rest_framework.renderers import JSONRenderer
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.db.models import Prefetch
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from temba.api.v2.hydrators import FlowRunHydrator
+from temba.api.v2.serializers import FlowRunReadSerializer
+from temba.contacts.models import Contact, ContactURN
+from temba.flows.models import Flow, FlowRun, FlowStart
+from temba.utils import json
+from temba.utils.uuid import uuid4
+
+
+def serialize_page(org, flow, limit: int) -> list:
+    """
+    The previous approach of prefetching related objects onto run instances and serializing those
+    """
+    runs = (
+        FlowRun.objects.filter(flow=flow)
+        .order_by("-modified_on", "-id")
+        .prefetch_related(
+            Prefetch("flow", queryset=Flow.objects.only("uuid", "name", "base_language")),
+            Prefetch("contact", queryset=Contact.objects.only("uuid", "name", "language")),
+            Prefetch("contact__urns", ContactURN.objects.order_by("-priority", "id")),
+            Prefetch("start", queryset=FlowStart.objects.only("uuid")),
+        )[:limit]
+    )
+    return FlowRunReadSerializer(runs, many=True, context={"org": org}).data
+
+
+def hydrate_page(org, flow, limit: int) -> list:
+    hydrator = FlowRunHydrator(org, using="default")
+    rows = FlowRun.objects.filter(flow=flow).order_by("-modified_on", "-id").values(*hydrator.fields)[:limit]
+    return hydrator.hydrate(list(rows))
+
+
+class Command(BaseCommand):  # pragma: no cover
+    help = "Benchmarks building a page of the runs API endpoint for runs with long paths"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--flow", type=str, required=True, help="UUID of a flow to create the test runs in")
+        parser.add_argument("--runs", type=int, default=250, help="Number of runs in the page")
+        parser.add_argument("--path-length", type=int, default=500, help="Number of steps in each run's path")
+        parser.add_argument("--repeat", type=int, default=10, help="Number of times to repeat each page")
+
+    def handle(self, *args, flow: str, runs: int, path_length: int, repeat: int, **options):
+        flow = Flow.objects.get(uuid=flow, is_active=True)
+        contacts = list(flow.org.contacts.filter(is_active=True)[:runs])
+        assert contacts, "flow's workspace must have at least one contact"
+
+        # everything is created in a transaction which is rolled back at the end
+        with transaction.atomic():
+            self._create_runs(flow, contacts, runs, path_length)
+
+            run_bytes = sum(len(json.dumps(r.path)) + len(json.dumps(r.results)) for r in flow.runs.all()[:runs])
+            self.stdout.write(f"created {runs} runs with {path_length} steps ({run_bytes / 1024:.0f} KiB of JSON)")
+
+            renderer = JSONRenderer()
+            expected = json.loads(renderer.render(serialize_page(flow.org, flow, runs)))
+            actual = json.loads(renderer.render(hydrate_page(flow.org, flow, runs)))
+            assert expected == actual, "results differ"
+
+            self.stdout.write("")
+            self.stdout.write("Approach    | Time (ms)  | Queries")
+            self.stdout.write("------------|------------|--------")
+
+            self._time("serializer", lambda: serialize_page(flow.org, flow, runs), repeat)
+            self._time("hydrator", lambda: hydrate_page(flow.org, flow, runs), repeat)
+
+            transaction.set_rollback(True)
+
+    def _create_runs(self, flow, contacts: list, num_runs: int, path_length: int):
+        now = timezone.now()
+        runs = []
+
+        for r in range(num_runs):
+            # timestamps written by the engine are UTC with nanosecond precision
+            arrived_on = now.strftime("%Y-%m-%dT%H:%M:%S.%f123Z")
+            path = [
+                {"uuid": str(uuid4()), "node_uuid": str(uuid4()), "arrived_on": arrived_on} for s in range(path_length)
+            ]
+            results = {
+                f"result_{s}": {
+                    "name": f"Result {s}",
+                    "value": "yes",
+                    "category": "Yes",
+                    "node_uuid": path[s]["node_uuid"],
+                    "input": "yes",
+                    "created_on": arrived_on,
+                }
+                for s in range(0, path_length, 10)
+            }
+            runs.append(
+                FlowRun(
+                    org=flow.org,
+                    flow=flow,
+                    contact=contacts[r % len(contacts)],
+                    status=FlowRun.STATUS_COMPLETED,
+                    path=path,
+                    results=results,
+                    exited_on=now,
+                )
+            )
+
+        FlowRun.objects.bulk_create(runs)
+
+    def _time(self, label: str, fetch, repeat: int):
+        start = time.perf_counter()
+        with CaptureQueriesContext(connection) as queries:
+            for _ in range(repeat):
+                fetch()
+        per_page = (time.perf_counter() - start) * 1000 / repeat
+
+        self.stdout.write(f"{label:<11} | {per_page:10.1f} | {len(queries) // repeat:7}")
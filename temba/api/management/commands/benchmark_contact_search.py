@@ -0,0 +1,109 @@
+import time
+
+from elasticsearch import Elasticsearch
+from elasticsearch_dsl import Q, Search
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from temba.api.v2.elasticsearch.usecases import CONTACTS_INDEX, SORT_FIELDS, SOURCE_FIELDS
+from temba.contacts.search import elastic, parse_query
+from temba.orgs.models import Org
+
+# Elasticsearch's default index.max_result_window, past which from/size searches are rejected
+MAX_RESULT_WINDOW = 10_000
+
+
+def query_contact_ids_by_scroll(client, org, query: str) -> list:
+    """
+    The previous approach of scrolling through every hit of the query and reading the id from its source
+    """
+    parsed = parse_query(org, query)
+    search = Search(index=CONTACTS_INDEX).source(include=["id"]).params(routing=org.id).using(client)
+    return [int(r.id) for r in search.query(parsed.elastic_query).scan()]
+
+
+class Command(BaseCommand):  # pragma: no cover
+    help = (
+        "Benchmarks deep paging through the contacts of a workspace in Elasticsearch with from/size against "
+        "search_after within a point in time. Best run against a workspace with millions of contacts."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--org", type=int, required=True, help="ID of the workspace to page through")
+        parser.add_argument("--page-size", type=int, default=50, help="Number of contacts in each page")
+        parser.add_argument(
+            "--depths",
+            type=str,
+            default="0,1000,9950,100000,1000000,4999950",
+            help="Comma separated offsets of the pages to fetch",
+        )
+        parser.add_argument("--repeat", type=int, default=5, help="Number of times to repeat each page")
+        parser.add_argument("--query", type=str, default="", help="Contact query to fetch all ids of, if any")
+
+    def handle(self, *args, org: int, page_size: int, depths: str, repeat: int, query: str, **options):
+        org = Org.objects.get(id=org, is_active=True)
+        client = Elasticsearch(settings.ELASTICSEARCH_URL, timeout=120)
+
+        qs = Q("bool", must=[Q("match", org_id=org.id)])
+        by_from = Search(using=client, index=CONTACTS_INDEX).query(qs).source(includes=list(SOURCE_FIELDS))
+        by_from = by_from.sort(*SORT_FIELDS)
+        by_after = Search(using=client).query(qs).source(includes=list(SOURCE_FIELDS)).sort(*SORT_FIELDS)
+
+        self.stdout.write(f"paging through the contacts of '{org.name}' {page_size} at a time...")
+        self.stdout.write("")
+        self.stdout.write("Page from  | from/size (ms) | search_after (ms)")
+        self.stdout.write("-----------|----------------|------------------")
+
+        pit_id = elastic.open_point_in_time(client, CONTACTS_INDEX)
+        try:
+            # cursors are positioned by walking the point in time in large pages which only fetch sort values
+            walker = by_after.source(False)
+            position, after = 0, None
+
+            for depth in sorted(int(d) for d in depths.split(",")):
+                while position < depth:
+                    size = min(settings.ELASTICSEARCH_SCAN_PAGE_SIZE, depth - position)
+                    response, pit_id = elastic.search_after(walker, pit_id, after, size)
+                    if not response.hits:
+                        break
+
+                    position += len(response.hits)
+                    after = list(response.hits[-1].meta.sort)
+
+                if position < depth:
+                    self.stdout.write(f"workspace only has {position} contacts")
+                    break
+
+                if depth + page_size <= MAX_RESULT_WINDOW:
+                    page = by_from[depth : depth + page_size]
+                    from_ms = f"{self._time(lambda: page.execute(ignore_cache=True), repeat):14.1f}"
+                else:
+                    from_ms = f"{'rejected':>14}"
+
+                after_ms = self._time(lambda: elastic.search_after(by_after, pit_id, after, page_size), repeat)
+
+                self.stdout.write(f"{depth:10} | {from_ms} | {after_ms:17.1f}")
+        finally:
+            elastic.close_point_in_time(client, pit_id)
+
+        if query:
+            self.stdout.write("")
+            self.stdout.write("All ids of query       | Contacts | Time (ms)")
+            self.stdout.write("-----------------------|----------|----------")
+
+            self._time_ids("scroll (source id)", lambda: query_contact_ids_by_scroll(client, org, query))
+            self._time_ids("search_after (sort)", lambda: elastic.query_contact_ids(org, query))
+
+    def _time(self, fetch, repeat: int) -> float:
+        start = time.perf_counter()
+        for _ in range(repeat):
+            fetch()
+        return (time.perf_counter() - start) * 1000 / repeat
+
+    def _time_ids(self, label: str, fetch):
+        start = time.perf_counter()
+        ids = fetch()
+        elapsed = (time.perf_counter() - start) * 1000
+
+        self.stdout.write(f"{label:<22} | {len(ids):8} | {elapsed:9.0f}")
@@ -0,0 +1,74 @@
+import random
+import time
+from unittest.mock import patch
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from temba import mailroom
+from temba.api.v2.internals.contacts.services import ContactBulkUpsertService
+from temba.contacts.models import ContactField
+from temba.orgs.models import Org
+
+
+class Command(BaseCommand):  # pragma: no cover
+    help = (
+        "Benchmarks bulk contact upserts against one contact per call. Contacts are really created and modified by "
+        "mailroom so only run this against a test workspace."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--org", type=int, required=True, help="ID of the workspace to upsert contacts in")
+        parser.add_argument("--contacts", type=int, default=10_000, help="Number of contacts in the batch")
+        parser.add_argument("--baseline", type=int, default=200, help="Number of contacts to upsert one per call")
+
+    def handle(self, *args, org: int, contacts: int, baseline: int, **options):
+        org = Org.objects.get(id=org, is_active=True)
+        user = org.get_admins().first()
+        field = ContactField.get_or_create(org, user, "benchmark_upsert", "Benchmark Upsert")
+
+        # random URN prefix so every run creates new contacts
+        prefix = f"55119{random.randint(0, 9999):04d}"
+        urns = [f"whatsapp:{prefix}{n:05d}" for n in range(contacts + baseline)]
+        batch, singles = urns[:contacts], urns[contacts:]
+
+        self.stdout.write(f"upserting {contacts} contacts in one batch and {baseline} one per call...")
+        self.stdout.write("")
+        self.stdout.write("Pass                   | Contacts | Time (s) | Per contact (ms) | Queries | Mailroom calls")
+        self.stdout.write("-----------------------|----------|----------|------------------|---------|---------------")
+
+        def specs(urns, value):
+            return [{"urns": [u], "fields": {field.key: value(n)}} for n, u in enumerate(urns)]
+
+        def upsert_bulk(specs):
+            return ContactBulkUpsertService.upsert(org, user, specs)
+
+        def upsert_singly(specs):
+            return [ContactBulkUpsertService.upsert(org, user, [s])[0] for s in specs]
+
+        self._time("create (one per call)", upsert_singly, specs(singles, lambda n: "new"))
+        self._time("create (bulk)", upsert_bulk, specs(batch, lambda n: "new"))
+        self._time("same change (one/call)", upsert_singly, specs(singles, lambda n: "shared"))
+        self._time("same change (bulk)", upsert_bulk, specs(batch, lambda n: "shared"))
+        self._time("own change (bulk)", upsert_bulk, specs(batch, lambda n: f"own {n}"))
+        self._time("no change (bulk)", upsert_bulk, specs(batch, lambda n: f"own {n}"))
+
+    def _time(self, label: str, upsert, specs: list):
+        client = mailroom.get_client()
+
+        with CaptureQueriesContext(connection) as queries, patch.object(
+            client, "_request", wraps=client._request
+        ) as mock_request:
+            start = time.perf_counter()
+            results = upsert(specs)
+            elapsed = time.perf_counter() - start
+
+        errors = [r for r in results if r["status"] == ContactBulkUpsertService.STATUS_ERROR]
+        assert not errors, f"upsert failed: {errors[0]}"
+
+        per_contact = elapsed * 1000 / len(specs)
+        self.stdout.write(
+            f"{label:<22} | {len(specs):8} | {elapsed:8.1f} | {per_contact:16.2f} | {len(queries):7} | "
+            f"{mock_request.call_count:14}"
+        )
@@ -9,14 +9,18 @@ from django.conf import settings
 from django.contrib.auth.models import Group, User
 from django.db import models
 from django.db.models import Q
+from django.db.models.signals import post_delete, post_save
 from django.utils import timezone
 from django.utils.translation import ugettext_lazy as _
 
 from temba.orgs.models import Org, OrgRole
+from temba.utils import on_transaction_commit
 from temba.utils.cache import get_cacheable_attr
 from temba.utils.models import JSONAsTextField
 from temba.utils.uuid import uuid4
 
+from .versions import RESOURCE_MODELS, ResourceVersions
+
 logger = logging.getLogger(__name__)
 
 
@@ -303,3 +307,23 @@ def api_token(user):
 
 
 User.api_token = property(api_token)
+
+
+def _resource_version_bumper(resource: str, get_org_id):
+    def bump(sender, instance, raw=False, **kwargs):
+        if raw:  # pragma: no cover
+            return
+
+        org_id = get_org_id(instance)
+        if org_id:
+            on_transaction_commit(lambda: ResourceVersions.bump(org_id, resource))
+
+    return bump
+
+
+# bump the version of a resource on commit whenever any of its models are saved or deleted
+for resource, model_org_ids in RESOURCE_MODELS.items():
+    for model, get_org_id in model_org_ids.items():
+        bumper = _resource_version_bumper(resource, get_org_id)
+        post_save.connect(bumper, sender=model, weak=False, dispatch_uid=f"api_version_save:{resource}:{model}")
+        post_delete.connect(bumper, sender=model, weak=False, dispatch_uid=f"api_version_delete:{resource}:{model}")
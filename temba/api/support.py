@@ -1,5 +1,7 @@
 import logging
+import math
 
+from django_redis import get_redis_connection
 from rest_framework import exceptions, status
 from rest_framework.authentication import BasicAuthentication, SessionAuthentication, TokenAuthentication
 from rest_framework.exceptions import APIException
@@ -84,15 +86,112 @@ class APISessionAuthentication(SessionAuthentication):
 
 class OrgUserRateThrottle(ScopedRateThrottle):
     """
-    Throttle class which rate limits a user in an org
+    Throttle class which rate limits a user in an org.
+
+    Rather than keeping a list of request timestamps in the cache like DRF's throttles, this keeps a single theoretical
+    arrival time per key in redis which is checked and advanced by a Lua script (GCRA), so each request costs one
+    atomic call whatever the rate.
+
+    GCRA allows the burst plus one request per interval in any window, so the interval is stretched to make room for
+    the burst and no period ever sees more requests than the rate, as with DRF's sliding window. The fraction of the
+    rate which can be spent at once is set per scope by API_THROTTLE_BURST_RATIOS, but orgs can override the rate and
+    burst of each scope with the api_throttles config key, e.g.
+
+        {"v2.broadcasts": {"rate": "72000/hour", "burst": 500}}
     """
 
+    # KEYS[1] holds the theoretical arrival time in milliseconds, ARGV[1] is the emission interval in milliseconds,
+    # ARGV[2] is the burst and ARGV[3] is the cost of the request. Returns allowed, remaining, retry after (ms) and
+    # reset (ms).
+    GCRA_SCRIPT = """
+redis.replicate_commands()
+local interval = tonumber(ARGV[1])
+local tolerance = interval * tonumber(ARGV[2])
+local time = redis.call("TIME")
+local now = tonumber(time[1]) * 1000 + math.floor(tonumber(time[2]) / 1000)
+local tat = math.max(tonumber(redis.call("GET", KEYS[1]) or now), now)
+local new_tat = tat + interval * tonumber(ARGV[3])
+
+if new_tat - tolerance > now then
+    return {0, 0, new_tat - tolerance - now, tat - now}
+end
+
+redis.call("SET", KEYS[1], new_tat, "PX", new_tat - now)
+return {1, math.floor((tolerance - (new_tat - now)) / interval), 0, new_tat - now}
+"""
+
+    _script = None
+
     def allow_request(self, request, view):
         # any request not using a token (e.g. editor, explorer) isn't subject to throttling
         if request.user.is_authenticated and not request.user.using_token:
             return True
 
-        return super().allow_request(request, view)
+        self.scope = getattr(view, self.scope_attr, None)
+        if not self.scope:
+            return True
+
+        self.rate, burst = self.get_org_rate(request)
+        self.num_requests, self.duration = self.parse_rate(self.rate)
+        if self.rate is None:
+            return True
+
+        if not burst:
+            ratio = settings.API_THROTTLE_BURST_RATIOS.get(self.scope, settings.API_THROTTLE_DEFAULT_BURST_RATIO)
+            burst = math.ceil(self.num_requests * ratio)
+        burst = max(1, min(burst, self.num_requests))
+
+        # some requests (e.g. streams) cost more than one, but never more than the burst so they can always happen
+        cost = min(view.get_throttle_cost(request), burst) if hasattr(view, "get_throttle_cost") else 1
+
+        # the burst and one request per interval can happen within a period, so together they can't exceed the rate
+        interval = math.ceil(self.duration * 1000 / (self.num_requests - burst + 1))
+        allowed, remaining, retry_after, reset = self.get_script()(
+            keys=[self.get_cache_key(request, view)], args=[interval, burst, cost]
+        )
+
+        self.retry_after = retry_after / 1000
+        request.throttle_headers = {
+            "X-RateLimit-Limit": str(self.num_requests),
+            "X-RateLimit-Remaining": str(remaining),
+            "X-RateLimit-Reset": str(math.ceil(reset / 1000)),
+        }
+        return bool(allowed)
+
+    def wait(self):
+        return self.retry_after
+
+    def get_org_rate(self, request) -> tuple:
+        """
+        Gets the rate and burst for the current scope, which may be overridden by the org
+        """
+        rate, burst = self.THROTTLE_RATES.get(self.scope), None
+
+        org = request.user.get_org() if request.user.is_authenticated else None
+        if org:
+            override = (org.config or {}).get("api_throttles", {})
+            override = override.get(self.scope) if isinstance(override, dict) else override
+            if override:
+                try:
+                    return self._parse_override(override, rate)
+                except (AttributeError, IndexError, KeyError, TypeError, ValueError):
+                    # a bad override shouldn't break every request, so fall back to the default for the scope
+                    logger.error(f"invalid API throttle override for org #{org.id} and scope {self.scope}: {override}")
+
+        return rate, burst
+
+    def _parse_override(self, override: dict, default_rate) -> tuple:
+        rate, burst = override.get("rate", default_rate), override.get("burst")
+
+        if rate is not None:
+            num_requests, duration = self.parse_rate(rate)
+            if num_requests < 1:
+                raise ValueError("rate must allow at least one request")
+
+        if burst is not None and (isinstance(burst, bool) or not isinstance(burst, int) or burst < 1):
+            raise ValueError("burst must be a positive integer")
+
+        return rate, burst
 
     def get_cache_key(self, request, view):
         ident = None
@@ -102,6 +201,12 @@ class OrgUserRateThrottle(ScopedRateThrottle):
 
         return self.cache_format % {"scope": self.scope, "ident": ident or self.get_ident(request)}
 
+    @classmethod
+    def get_script(cls):
+        if cls._script is None:
+            cls._script = get_redis_connection().register_script(cls.GCRA_SCRIPT)
+        return cls._script
+
 
 class DocumentationRenderer(BrowsableAPIRenderer):
     """
@@ -146,6 +251,15 @@ class InvalidQueryError(APIException):
     status_code = status.HTTP_400_BAD_REQUEST
 
 
+class NotModified(Exception):
+    """
+    Raised to answer a conditional request for a resource which hasn't changed with the given response
+    """
+
+    def __init__(self, response):
+        self.response = response
+
+
 def temba_exception_handler(exc, context):
     """
     Custom exception handler which prevents responding to API requests that error with an HTML error page
@@ -1,4 +1,7 @@
-from unittest.mock import Mock, patch
+from unittest.mock import Mock, call, patch
+from urllib.parse import unquote
+
+from elasticsearch import NotFoundError
 
 from django.test import override_settings
 
@@ -7,6 +10,8 @@ from temba.api.v2.elasticsearch.usecases import (
     URNS_SCHEME,
     BuildContactNumberQueryUseCase,
     SearchContactsElasticUseCase,
+    decode_cursor,
+    encode_cursor,
     get_pagination_links,
 )
 from temba.tests import TembaTest
@@ -113,6 +118,8 @@ class SearchContactsElasticUseCaseTest(TembaTest):
 
         mock_search = mock_search_cls.return_value
         mock_search.query.return_value = mock_search
+        mock_search.source.return_value = mock_search
+        mock_search.sort.return_value = mock_search
         mock_search.__getitem__.return_value = mock_search
         mock_search.execute.return_value = mock_response
 
@@ -131,6 +138,10 @@ class SearchContactsElasticUseCaseTest(TembaTest):
         self.assertIn("next", result["pagination"]["links"])
         self.assertIn("previous", result["pagination"]["links"])
         mock_search_cls.assert_called_once_with(using=self.client, index="contacts")
+        mock_search.source.assert_called_once_with(
+            includes=["id", "uuid", "name", "org_id", "urns", "groups", "created_on", "modified_on", "last_seen_on"]
+        )
+        mock_search.sort.assert_called_once_with("_score", "id")
 
     def test_execute_rejects_invalid_pagination(self):
         with self.assertRaises(ValueError):
@@ -146,6 +157,8 @@ class SearchContactsElasticUseCaseTest(TembaTest):
 
         mock_search = mock_search_cls.return_value
         mock_search.query.return_value = mock_search
+        mock_search.source.return_value = mock_search
+        mock_search.sort.return_value = mock_search
         mock_search.__getitem__.return_value = mock_search
         mock_search.execute.return_value = mock_response
 
@@ -163,6 +176,8 @@ class SearchContactsElasticUseCaseTest(TembaTest):
 
         mock_search = mock_search_cls.return_value
         mock_search.query.return_value = mock_search
+        mock_search.source.return_value = mock_search
+        mock_search.sort.return_value = mock_search
         mock_search.__getitem__.return_value = mock_search
         mock_search.execute.return_value = mock_response
 
@@ -180,6 +195,8 @@ class SearchContactsElasticUseCaseTest(TembaTest):
 
         mock_search = mock_search_cls.return_value
         mock_search.query.return_value = mock_search
+        mock_search.source.return_value = mock_search
+        mock_search.sort.return_value = mock_search
         mock_search.__getitem__.return_value = mock_search
         mock_search.execute.return_value = mock_response
 
@@ -199,6 +216,8 @@ class SearchContactsElasticUseCaseTest(TembaTest):
 
         mock_search = mock_search_cls.return_value
         mock_search.query.return_value = mock_search
+        mock_search.source.return_value = mock_search
+        mock_search.sort.return_value = mock_search
         mock_search.__getitem__.return_value = mock_search
         mock_search.execute.return_value = mock_response
 
@@ -207,6 +226,129 @@ class SearchContactsElasticUseCaseTest(TembaTest):
 
         mock_elasticsearch_cls.assert_called_once_with("https://es.test:9200", timeout=15)
 
+    def _mock_hit(self, sort, **source):
+        hit = Mock()
+        hit.to_dict.return_value = source
+        hit.meta.sort = sort
+        return hit
+
+    def _mock_cursor_search(self, mock_search_cls, hits, pit_id="pit2"):
+        mock_response = Mock()
+        mock_response.__iter__ = Mock(return_value=iter(hits))
+        mock_response.hits = hits
+        mock_response.to_dict.return_value = {"pit_id": pit_id}
+
+        mock_search = mock_search_cls.return_value
+        mock_search.query.return_value = mock_search
+        mock_search.source.return_value = mock_search
+        mock_search.sort.return_value = mock_search
+        mock_search.extra.return_value = mock_search
+        mock_search.execute.return_value = mock_response
+        return mock_search
+
+    @override_settings(ELASTICSEARCH_MAX_PAGE_FROM=1000)
+    @patch("temba.api.v2.elasticsearch.usecases.Search")
+    def test_execute_deep_page_links_next_by_cursor(self, mock_search_cls):
+        mock_response = Mock()
+        mock_response.__iter__ = Mock(return_value=iter([self._mock_hit([1.5, 123], name="John")]))
+        mock_response.hits.total.value = 5000
+
+        mock_search = mock_search_cls.return_value
+        mock_search.query.return_value = mock_search
+        mock_search.source.return_value = mock_search
+        mock_search.sort.return_value = mock_search
+        mock_search.__getitem__.return_value = mock_search
+        mock_search.execute.return_value = mock_response
+
+        # pages before the threshold are still linked by number
+        result = self.usecase.execute(org_id=1, name="John", page_number=98, page_size=10, base_url="https://test/c")
+        self.assertEqual("https://test/c?page_number=99&page_size=10", result["pagination"]["links"]["next"])
+
+        mock_response.__iter__ = Mock(return_value=iter([self._mock_hit([1.5, 123], name="John")]))
+
+        result = self.usecase.execute(
+            org_id=1, name="John", page_number=100, page_size=10, base_url="https://test/c?page_number=100"
+        )
+        links = result["pagination"]["links"]
+
+        self.assertEqual("https://test/c?page_number=99&page_size=10", links["previous"])
+        self.assertTrue(links["next"].startswith("https://test/c?cursor="))
+        self.assertNotIn("page_number", links["next"])
+
+        cursor = links["next"].split("cursor=")[1].split("&")[0]
+        self.assertEqual(
+            {"pit": None, "after": [1.5, 123], "page": 101, "total_pages": 500}, decode_cursor(unquote(cursor))
+        )
+
+    @patch("temba.api.v2.elasticsearch.usecases.Search")
+    def test_execute_with_cursor(self, mock_search_cls):
+        self.client.open_point_in_time.return_value = {"id": "pit1"}
+        hits = [self._mock_hit([1.0, 5], name="A"), self._mock_hit([1.0, 6], name="B"), self._mock_hit([1.0, 7])]
+        mock_search = self._mock_cursor_search(mock_search_cls, hits)
+
+        cursor = encode_cursor({"pit": None, "after": [1.0, 4], "page": 101, "total_pages": 500})
+        result = self.usecase.execute(org_id=1, name="John", page_size=2, base_url="https://test/c", cursor=cursor)
+
+        self.assertEqual([{"name": "A"}, {"name": "B"}], result["results"])
+        self.assertEqual(101, result["pagination"]["page_number"])
+        self.assertEqual(500, result["pagination"]["total_pages"])
+        self.assertNotIn("previous", result["pagination"]["links"])
+
+        # first page by cursor opens a point in time on the index, searches within it and fetches an extra hit
+        self.client.open_point_in_time.assert_called_once_with(index="contacts", keep_alive="1m")
+        mock_search_cls.assert_called_once_with(using=self.client)
+        mock_search.extra.assert_any_call(size=3, pit={"id": "pit1", "keep_alive": "1m"}, track_total_hits=False)
+        mock_search.extra.assert_any_call(search_after=[1.0, 4])
+
+        # next page resumes within the same point in time after the last hit returned
+        next_cursor = result["pagination"]["links"]["next"].split("cursor=")[1].split("&")[0]
+        self.assertEqual(
+            {"pit": "pit2", "after": [1.0, 6], "page": 102, "total_pages": 500}, decode_cursor(unquote(next_cursor))
+        )
+        self.client.close_point_in_time.assert_not_called()
+
+    @patch("temba.api.v2.elasticsearch.usecases.Search")
+    def test_execute_with_cursor_last_page(self, mock_search_cls):
+        self._mock_cursor_search(mock_search_cls, [self._mock_hit([1.0, 9], name="Z")], pit_id="pit3")
+
+        cursor = encode_cursor({"pit": "pit2", "after": [1.0, 6], "page": 102, "total_pages": 101})
+        result = self.usecase.execute(org_id=1, name="John", page_size=2, cursor=cursor)
+
+        self.assertEqual([{"name": "Z"}], result["results"])
+        self.assertEqual({}, result["pagination"]["links"])
+        self.assertEqual(102, result["pagination"]["total_pages"])
+
+        self.client.open_point_in_time.assert_not_called()
+        self.client.close_point_in_time.assert_called_once_with(body={"id": "pit3"})
+
+    @patch("temba.api.v2.elasticsearch.usecases.Search")
+    def test_execute_with_expired_cursor(self, mock_search_cls):
+        self.client.open_point_in_time.return_value = {"id": "pit4"}
+        hits = [self._mock_hit([1.0, 7], name="C"), self._mock_hit([1.0, 8], name="D"), self._mock_hit([1.0, 9])]
+        mock_search = self._mock_cursor_search(mock_search_cls, hits, pit_id="pit4")
+        response = mock_search.execute.return_value
+        mock_search.execute.side_effect = [NotFoundError(404, "search_context_missing_exception"), response]
+
+        # a point in time which expired between pages is replaced, resuming from the same sort values
+        cursor = encode_cursor({"pit": "pit2", "after": [1.0, 6], "page": 102})
+        result = self.usecase.execute(org_id=1, name="John", page_size=2, cursor=cursor)
+
+        self.assertEqual([{"name": "C"}, {"name": "D"}], result["results"])
+        self.client.open_point_in_time.assert_called_once_with(index="contacts", keep_alive="1m")
+        mock_search.extra.assert_any_call(size=3, pit={"id": "pit2", "keep_alive": "1m"}, track_total_hits=False)
+        mock_search.extra.assert_any_call(size=3, pit={"id": "pit4", "keep_alive": "1m"}, track_total_hits=False)
+        self.assertEqual(2, mock_search.extra.call_args_list.count(call(search_after=[1.0, 6])))
+
+        next_cursor = result["pagination"]["links"]["next"].split("cursor=")[1].split("&")[0]
+        self.assertEqual("pit4", decode_cursor(unquote(next_cursor))["pit"])
+
+    def test_execute_with_invalid_cursor(self):
+        for cursor in ("xyz", encode_cursor({"after": 5, "page": 3}), encode_cursor({"after": [5], "page": 1})):
+            with self.assertRaisesMessage(ValueError, "Invalid cursor"):
+                self.usecase.execute(org_id=1, name="John", cursor=cursor)
+
+        self.client.search.assert_not_called()
+
     def test_build_filters_org_id_only(self):
         filters = self.usecase._build_filters(org_id=42, name=None, number=None)
 
@@ -1,25 +1,59 @@
+import base64
+import json
 from math import ceil
 from urllib.parse import parse_qsl, urlencode, urlparse, urlunparse
 
-from elasticsearch import Elasticsearch
+from elasticsearch import Elasticsearch, NotFoundError
 from elasticsearch_dsl import Q, Search
 
 from django.conf import settings
 
+from temba.contacts.search.elastic import close_point_in_time, open_point_in_time, search_after
 from temba.utils.whatsapp.ninth_digit import get_number_search_terms
 
 URNS_PATH = "urns.path"
 URNS_SCHEME = "urns.scheme"
 CONTACTS_INDEX = "contacts"
 
+# the fields of contact documents that are returned, i.e. those shown by ContactsElasticSerializer
+SOURCE_FIELDS = ("id", "uuid", "name", "org_id", "urns", "groups", "created_on", "modified_on", "last_seen_on")
 
-def _append_query_params(base_url, **params):
+# id breaks ties between equally scored contacts so that search_after cursors have a total order to resume from
+SORT_FIELDS = ("_score", "id")
+
+
+def _append_query_params(base_url, *, remove=(), **params):
     parsed = urlparse(base_url)
     query = dict(parse_qsl(parsed.query, keep_blank_values=True))
+    for key in remove:
+        query.pop(key, None)
     query.update({key: str(value) for key, value in params.items()})
     return urlunparse(parsed._replace(query=urlencode(query)))
 
 
+def encode_cursor(state: dict) -> str:
+    return base64.urlsafe_b64encode(json.dumps(state, separators=(",", ":")).encode()).decode()
+
+
+def decode_cursor(cursor: str) -> dict:
+    try:
+        state = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        if not isinstance(state["after"], list) or int(state["page"]) < 2:
+            raise ValueError()
+        return {
+            "pit": state.get("pit") or None,
+            "after": state["after"],
+            "page": int(state["page"]),
+            "total_pages": int(state.get("total_pages", 0)),
+        }
+    except (ValueError, TypeError, KeyError):
+        raise ValueError("Invalid cursor")
+
+
+def get_cursor_link(base_url, state: dict, page_size):
+    return _append_query_params(base_url, remove=("page_number",), cursor=encode_cursor(state), page_size=page_size)
+
+
 def get_pagination_links(base_url, page_number, total_pages, page_size):
     links = {}
     if page_number < total_pages:
@@ -78,39 +112,113 @@ class BuildContactNumberQueryUseCase:
 
 
 class SearchContactsElasticUseCase:
+    """
+    Searches the contacts of an org by name and/or number.
+
+    Shallow pages are fetched by number with from/size, which Elasticsearch can only do by collecting and discarding
+    every hit before the page. Past ELASTICSEARCH_MAX_PAGE_FROM the next link is a cursor instead, which resumes after
+    the sort values of the last hit within a point in time, so deep pages cost the same as the first.
+    """
+
     def __init__(self, client=None, number_query_usecase=None):
         self._client = client
         self._number_query_usecase = number_query_usecase or BuildContactNumberQueryUseCase()
 
-    def execute(self, org_id, name=None, number=None, page_number=1, page_size=10, base_url=""):
+    def execute(self, org_id, name=None, number=None, page_number=1, page_size=10, base_url="", cursor=None):
         if page_size < 1:
             raise ValueError("page_size must be at least 1")
         if page_number < 1:
             raise ValueError("page_number must be at least 1")
 
+        state = decode_cursor(cursor) if cursor else None
+
         client = self._client or self._create_client()
         filters = self._build_filters(org_id, name, number)
         qs = Q("bool", must=filters)
 
+        if state:
+            return self._execute_after(client, qs, state, page_size, base_url)
+
         from_index = (page_number - 1) * page_size
-        search = Search(using=client, index=CONTACTS_INDEX).query(qs)
+        search = self._build_search(Search(using=client, index=CONTACTS_INDEX), qs)
         search = search[from_index : from_index + page_size]
         response = search.execute()
 
-        results = [hit.to_dict() for hit in response]
+        hits = list(response)
+        results = [hit.to_dict() for hit in hits]
         total_results = response.hits.total.value
         total_pages = ceil(total_results / page_size)
 
+        links = get_pagination_links(base_url, page_number, total_pages, page_size)
+
+        # deep pages are linked by cursor, positioned after the last hit of this page
+        if "next" in links and from_index + page_size >= settings.ELASTICSEARCH_MAX_PAGE_FROM:
+            next_state = {
+                "pit": None,
+                "after": list(hits[-1].meta.sort),
+                "page": page_number + 1,
+                "total_pages": total_pages,
+            }
+            links["next"] = get_cursor_link(base_url, next_state, page_size)
+
         return {
             "results": results,
             "pagination": {
                 "page_number": page_number,
                 "page_size": page_size,
                 "total_pages": total_pages,
-                "links": get_pagination_links(base_url, page_number, total_pages, page_size),
+                "links": links,
+            },
+        }
+
+    def _execute_after(self, client, qs, state: dict, page_size: int, base_url: str):
+        """
+        Executes the page of a cursor, opening the point in time that the following pages will share if this is the
+        first page fetched by cursor. Cursor pages only link forward.
+        """
+        pit_id = state["pit"] or open_point_in_time(client, CONTACTS_INDEX)
+        search = self._build_search(Search(using=client), qs)
+
+        # fetch an extra hit to know whether there's a next page without counting every match
+        try:
+            response, pit_id = search_after(search, pit_id, state["after"], page_size + 1)
+        except NotFoundError:
+            if not state["pit"]:
+                raise
+
+            # the point in time has expired, but the sort values of the cursor are still a valid position in a new one
+            pit_id = open_point_in_time(client, CONTACTS_INDEX)
+            response, pit_id = search_after(search, pit_id, state["after"], page_size + 1)
+
+        hits = list(response)[:page_size]
+        has_next = len(response.hits) > page_size
+        page_number = state["page"]
+
+        links = {}
+        if has_next:
+            next_state = {
+                "pit": pit_id,
+                "after": list(hits[-1].meta.sort),
+                "page": page_number + 1,
+                "total_pages": state["total_pages"],
+            }
+            links["next"] = get_cursor_link(base_url, next_state, page_size)
+        else:
+            close_point_in_time(client, pit_id)
+
+        return {
+            "results": [hit.to_dict() for hit in hits],
+            "pagination": {
+                "page_number": page_number,
+                "page_size": page_size,
+                "total_pages": max(state["total_pages"], page_number),
+                "links": links,
             },
         }
 
+    def _build_search(self, search, qs):
+        return search.query(qs).source(includes=list(SOURCE_FIELDS)).sort(*SORT_FIELDS)
+
     def _build_filters(self, org_id, name, number):
         filters = [Q("match", org_id=org_id)]
         if name:
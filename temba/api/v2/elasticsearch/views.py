@@ -60,14 +60,18 @@ class ContactsElasticSearchEndpoint(APIView):
                     status=status.HTTP_400_BAD_REQUEST,
                 )
 
-            data = SearchContactsElasticUseCase().execute(
-                org_id=project.org.id,
-                name=name,
-                number=number,
-                page_number=page_number,
-                page_size=page_size,
-                base_url=request.build_absolute_uri(),
-            )
+            try:
+                data = SearchContactsElasticUseCase().execute(
+                    org_id=project.org.id,
+                    name=name,
+                    number=number,
+                    page_number=page_number,
+                    page_size=page_size,
+                    base_url=request.build_absolute_uri(),
+                    cursor=params.get("cursor"),
+                )
+            except ValueError as e:
+                return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
             return Response(data, status=status.HTTP_200_OK)
 
         queryset = Contact.objects.filter(org=project.org).order_by("-modified_on")[:10]
@@ -107,5 +111,10 @@ class ContactsElasticSearchEndpoint(APIView):
                     "required": False,
                     "help": "Return the number of the page, ex: page_number=1",
                 },
+                {
+                    "name": "cursor",
+                    "required": False,
+                    "help": "Return the page after a cursor, as given by the next link of deep pages",
+                },
             ],
         }
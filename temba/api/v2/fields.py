@@ -2,8 +2,9 @@ import regex
 from rest_framework import relations, serializers
 
 from django.contrib.auth.models import User
-from django.core.exceptions import ValidationError as DjangoValidationError
-from django.db.models import Q
+from django.core.exceptions import FieldDoesNotExist, ValidationError as DjangoValidationError
+from django.db.models import F, Q
+from django.db.models.functions import Lower
 
 from temba.campaigns.models import Campaign, CampaignEvent
 from temba.channels.models import Channel
@@ -187,6 +188,15 @@ class TembaModelField(serializers.RelatedField):
 
             return super().run_validation(data)
 
+        def to_internal_value(self, data):
+            if isinstance(data, str) or not hasattr(data, "__iter__"):
+                self.fail("not_a_list", input_type=type(data).__name__)
+            if not self.allow_empty and len(data) == 0:
+                self.fail("empty")
+
+            # resolve all the values together rather than one at a time
+            return self.child_relation.to_internal_values(list(data))
+
     @classmethod
     def many_init(cls, *args, **kwargs):
         """
@@ -209,27 +219,74 @@ class TembaModelField(serializers.RelatedField):
         return manager.filter(**kwargs)
 
     def get_object(self, value):
-        query = Q()
+        return self.get_objects([value]).get(value)
+
+    def get_objects(self, values: list) -> dict:
+        """
+        Looks up the given values with one query per lookup field, returning a dict of values to the objects found
+        """
+        found = {}
+
         for lookup_field in self.lookup_fields:
             ignore_case = lookup_field in self.ignore_case_for_fields
-            lookup = "%s__%s" % (lookup_field, "iexact" if ignore_case else "exact")
-            query |= Q(**{lookup: value})
 
-        return self.get_queryset().filter(query).first()
+            values_by_key = {}
+            for value in values:
+                if value not in found:
+                    key = self._get_lookup_key(lookup_field, value, ignore_case)
+                    if key is not None:
+                        values_by_key.setdefault(key, []).append(value)
+
+            if not values_by_key:
+                continue
+
+            lookup_value = Lower(lookup_field) if ignore_case else F(lookup_field)
+            matches = (
+                self.get_queryset()
+                .annotate(lookup_value=lookup_value)
+                .filter(lookup_value__in=list(values_by_key.keys()))
+                .order_by("id")  # so that like first(), the oldest of any duplicates wins
+            )
+
+            for obj in matches:
+                for value in values_by_key.get(obj.lookup_value, ()):
+                    found.setdefault(value, obj)
+
+        return found
+
+    def _get_lookup_key(self, lookup_field: str, value, ignore_case: bool):
+        """
+        Converts a submitted value to how it will be returned by a lookup on the given field, or None if it can't match
+        """
+        if ignore_case:
+            return str(value).lower()
+
+        try:
+            return self.model._meta.get_field(lookup_field).to_python(value)
+        except FieldDoesNotExist:  # a lookup across a relationship
+            return value
+        except DjangoValidationError:
+            return None
 
     def to_representation(self, obj):
         return {"uuid": str(obj.uuid), "name": obj.name}
 
     def to_internal_value(self, data):
-        if not (isinstance(data, str) or isinstance(data, int)):
-            raise serializers.ValidationError("Must be a string or integer")
+        return self.to_internal_values([data])[0]
 
-        obj = self.get_object(data)
+    def to_internal_values(self, data: list) -> list:
+        for value in data:
+            if not (isinstance(value, str) or isinstance(value, int)):
+                raise serializers.ValidationError("Must be a string or integer")
 
-        if self.require_exists and not obj:
-            raise serializers.ValidationError("No such object: %s" % data)
+        found = self.get_objects(data)
 
-        return obj
+        if self.require_exists:
+            missing = [v for v in dict.fromkeys(data) if v not in found]
+            if missing:
+                raise serializers.ValidationError(["No such object: %s" % v for v in missing])
+
+        return [found.get(v) for v in data]
 
 
 class CampaignField(TembaModelField):
@@ -269,16 +326,36 @@ class ContactField(TembaModelField):
     def get_queryset(self):
         return self.model.objects.filter(org=self.context["org"], is_active=True)
 
-    def get_object(self, value):
-        # try to normalize as URN but don't blow up if it's a UUID
-        try:
-            as_urn = URN.identity(URN.normalize(str(value)))
-        except ValueError:
-            as_urn = value
+    def get_objects(self, values: list) -> dict:
+        # try to normalize as URNs but don't blow up if they're UUIDs
+        identities = {}
+        for value in values:
+            try:
+                identities[value] = URN.identity(URN.normalize(str(value)))
+            except ValueError:
+                identities[value] = str(value)
+
+        contact_ids_by_identity = dict(
+            ContactURN.objects.filter(org=self.context["org"], identity__in=set(identities.values()))
+            .exclude(contact=None)
+            .values_list("identity", "contact_id")
+        )
+
+        contacts = self.get_queryset().filter(
+            Q(uuid__in={str(v) for v in values}) | Q(id__in=contact_ids_by_identity.values())
+        )
+        by_uuid, by_id = {}, {}
+        for contact in contacts:
+            by_uuid[str(contact.uuid)] = contact
+            by_id[contact.id] = contact
 
-        contact_ids_with_urn = list(ContactURN.objects.filter(identity=as_urn).values_list("contact_id", flat=True))
+        found = {}
+        for value in values:
+            contact = by_uuid.get(str(value)) or by_id.get(contact_ids_by_identity.get(identities[value]))
+            if contact:
+                found[value] = contact
 
-        return self.get_queryset().filter(Q(uuid=value) | Q(id__in=contact_ids_with_urn)).first()
+        return found
 
 
 class ContactFieldField(TembaModelField):
@@ -303,13 +380,15 @@ class ContactGroupField(TembaModelField):
         self.allow_dynamic = allow_dynamic
         super().__init__(**kwargs)
 
-    def to_internal_value(self, data):
-        obj = super().to_internal_value(data)
+    def to_internal_values(self, data: list) -> list:
+        objs = super().to_internal_values(data)
 
-        if not self.allow_dynamic and obj.is_dynamic:
-            raise serializers.ValidationError("Contact group must not be dynamic: %s" % data)
+        if not self.allow_dynamic:
+            for obj, value in zip(objs, data):
+                if obj.is_dynamic:
+                    raise serializers.ValidationError("Contact group must not be dynamic: %s" % value)
 
-        return obj
+        return objs
 
 
 class FlowField(TembaModelField):
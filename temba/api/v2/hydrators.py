@@ -0,0 +1,223 @@
+import iso8601
+import pytz
+import regex
+from rest_framework import serializers
+
+from temba.channels.models import Channel
+from temba.contacts.models import URN, Contact, ContactURN
+from temba.flows.models import Flow, FlowRun, FlowStart
+from temba.msgs.models import Attachment, Label, Msg
+
+from .serializers import FlowRunReadSerializer, MsgReadSerializer, format_datetime
+
+# engine timestamps are UTC with up to nanosecond precision, e.g. 2019-06-28T06:37:02.628152471Z
+ENGINE_DATETIME_REGEX = regex.compile(r"(\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2})(?:\.(\d{1,9}))?Z")
+
+_datetime_field = serializers.DateTimeField(default_timezone=pytz.UTC)
+
+
+def format_engine_datetime(value: str) -> str:
+    """
+    Reformats a datetime string from run JSON with microsecond accuracy, avoiding parsing it when it's already UTC
+    """
+    match = ENGINE_DATETIME_REGEX.fullmatch(value)
+    if match:
+        return f"{match[1]}.{(match[2] or '')[:6]:0<6}Z"
+
+    return format_datetime(iso8601.parse_date(value))
+
+
+class Hydrator:
+    """
+    Builds the API representations of a page of objects directly from values() rows, loading related objects with a
+    single narrow query per relationship rather than instantiating models for serializers.
+    """
+
+    fields = ()
+
+    def __init__(self, org, using: str):
+        self.org = org
+        self.using = using
+
+    def hydrate(self, rows: list) -> list:  # pragma: no cover
+        raise NotImplementedError()
+
+    def _load(self, model, ids: set, *fields) -> dict:
+        """
+        Loads the given fields of the objects with the given ids as a map of id to values tuple
+        """
+        if not ids:
+            return {}
+
+        objs = model.objects.using(self.using).filter(id__in=ids).values_list("id", *fields)
+        return {o[0]: o[1:] for o in objs}
+
+    @staticmethod
+    def _ids(rows: list, field: str) -> set:
+        return {r[field] for r in rows if r[field] is not None}
+
+    @staticmethod
+    def _datetime(value):
+        return _datetime_field.to_representation(value)
+
+
+class FlowRunHydrator(Hydrator):
+    """
+    Equivalent of FlowRunReadSerializer
+    """
+
+    fields = (
+        "id",
+        "uuid",
+        "flow_id",
+        "contact_id",
+        "start_id",
+        "responded",
+        "path",
+        "results",
+        "status",
+        "created_on",
+        "modified_on",
+        "exited_on",
+    )
+
+    def hydrate(self, rows: list) -> list:
+        contact_ids = self._ids(rows, "contact_id")
+        flows = self._load(Flow, self._ids(rows, "flow_id"), "uuid", "name")
+        contacts = self._load(Contact, contact_ids, "uuid", "name")
+        starts = self._load(FlowStart, self._ids(rows, "start_id"), "uuid")
+        urns = None if self.org.is_anon else self._load_primary_urns(contact_ids)
+
+        return [self._hydrate_run(r, flows, contacts, urns, starts) for r in rows]
+
+    def _load_primary_urns(self, contact_ids: set) -> dict:
+        if not contact_ids:
+            return {}
+
+        urns = (
+            ContactURN.objects.using(self.using)
+            .filter(contact_id__in=contact_ids)
+            .order_by("contact_id", "-priority", "id")
+            .distinct("contact_id")
+            .values_list("contact_id", "identity")
+        )
+        return dict(urns)
+
+    def _hydrate_run(self, row: dict, flows: dict, contacts: dict, urns: dict, starts: dict) -> dict:
+        flow_uuid, flow_name = flows[row["flow_id"]]
+        contact_uuid, contact_name = contacts[row["contact_id"]]
+
+        if urns is not None:
+            contact = {"uuid": str(contact_uuid), "urn": urns.get(row["contact_id"]), "name": contact_name}
+        else:
+            contact = {"uuid": str(contact_uuid), "name": contact_name}
+
+        start = starts.get(row["start_id"])
+
+        return {
+            "id": row["id"],
+            "uuid": str(row["uuid"]),
+            "flow": {"uuid": str(flow_uuid), "name": flow_name},
+            "contact": contact,
+            "start": {"uuid": str(start[0])} if start else None,
+            "responded": row["responded"],
+            "path": [
+                {
+                    "node": s[FlowRun.PATH_NODE_UUID],
+                    "time": format_engine_datetime(s[FlowRun.PATH_ARRIVED_ON]),
+                }
+                for s in row["path"]
+            ],
+            "values": {
+                k: {
+                    "value": r[FlowRun.RESULT_VALUE],
+                    "category": r.get(FlowRun.RESULT_CATEGORY),
+                    "node": r[FlowRun.RESULT_NODE_UUID],
+                    "time": format_engine_datetime(r[FlowRun.RESULT_CREATED_ON]),
+                    "input": r.get(FlowRun.RESULT_INPUT),
+                    "name": r.get(FlowRun.RESULT_NAME),
+                }
+                for k, r in row["results"].items()
+            },
+            "created_on": self._datetime(row["created_on"]),
+            "modified_on": self._datetime(row["modified_on"]),
+            "exited_on": self._datetime(row["exited_on"]),
+            "exit_type": FlowRunReadSerializer.EXIT_TYPES.get(row["status"]),
+        }
+
+
+class MsgHydrator(Hydrator):
+    """
+    Equivalent of MsgReadSerializer
+    """
+
+    fields = (
+        "id",
+        "broadcast_id",
+        "contact_id",
+        "contact_urn_id",
+        "channel_id",
+        "direction",
+        "msg_type",
+        "status",
+        "visibility",
+        "text",
+        "attachments",
+        "created_on",
+        "sent_on",
+        "modified_on",
+    )
+
+    def hydrate(self, rows: list) -> list:
+        contacts = self._load(Contact, self._ids(rows, "contact_id"), "uuid", "name")
+        channels = self._load(Channel, self._ids(rows, "channel_id"), "uuid", "name")
+        labels = self._load_labels({r["id"] for r in rows})
+
+        if self.org.is_anon:
+            urns = {}
+        else:
+            urns = self._load(ContactURN, self._ids(rows, "contact_urn_id"), "scheme", "path", "display")
+
+        return [self._hydrate_msg(r, contacts, urns, channels, labels) for r in rows]
+
+    def _load_labels(self, msg_ids: set) -> dict:
+        if not msg_ids:
+            return {}
+
+        msg_labels = (
+            Msg.labels.through.objects.using(self.using)
+            .filter(msg_id__in=msg_ids, label__label_type=Label.TYPE_LABEL)
+            .order_by("label_id")
+            .values_list("msg_id", "label__uuid", "label__name")
+        )
+
+        labels = {}
+        for msg_id, label_uuid, label_name in msg_labels:
+            labels.setdefault(msg_id, []).append({"uuid": str(label_uuid), "name": label_name})
+        return labels
+
+    def _hydrate_msg(self, row: dict, contacts: dict, urns: dict, channels: dict, labels: dict) -> dict:
+        contact_uuid, contact_name = contacts[row["contact_id"]]
+        urn = urns.get(row["contact_urn_id"])
+        channel = channels.get(row["channel_id"])
+        attachments = row["attachments"]
+
+        return {
+            "id": row["id"],
+            "broadcast": row["broadcast_id"],
+            "contact": {"uuid": str(contact_uuid), "name": contact_name},
+            "urn": URN.from_parts(urn[0], urn[1], display=urn[2]) if urn else None,
+            "channel": {"uuid": str(channel[0]), "name": channel[1]} if channel else None,
+            "direction": "in" if row["direction"] == Msg.DIRECTION_IN else "out",
+            "type": MsgReadSerializer.TYPES.get(row["msg_type"]),
+            "status": MsgReadSerializer.STATUSES.get(row["status"]),
+            "archived": row["visibility"] == Msg.VISIBILITY_ARCHIVED,
+            "visibility": MsgReadSerializer.VISIBILITIES.get(row["visibility"]),
+            "text": row["text"],
+            "labels": labels.get(row["id"], []),
+            "attachments": [a.as_json() for a in Attachment.parse_all(attachments)],
+            "created_on": self._datetime(row["created_on"]),
+            "sent_on": self._datetime(row["sent_on"]),
+            "modified_on": self._datetime(row["modified_on"]),
+            "media": attachments[0] if attachments else None,
+        }
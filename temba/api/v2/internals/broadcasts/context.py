@@ -1,5 +1,5 @@
 """
-Shared resolve logic for WhatsApp broadcast internal endpoints (Django sync + FastAPI bridge).
+Org and user resolution for the internal WhatsApp broadcasts endpoint (the FastAPI app resolves these from its caches).
 """
 
 from django.contrib.auth import get_user_model
@@ -1,5 +1,6 @@
 import logging
 
+import pycountry
 from rest_framework import serializers
 from sentry_sdk import capture_message
 
@@ -7,6 +8,7 @@ from django.conf import settings
 from django.contrib.auth import get_user_model
 from django.core.exceptions import ValidationError as DjangoValidationError
 
+from temba.api.v2 import fields
 from temba.api.v2.internals.helpers import get_object_or_404
 from temba.channels.models import Channel
 from temba.contacts.models import Contact, ContactField, ContactURN
@@ -164,6 +166,72 @@ class CleanContactFieldsSerializer(serializers.Serializer):
         return data
 
 
+class ContactBulkUpsertSerializer(serializers.Serializer):
+    contacts = serializers.ListField(
+        child=serializers.DictField(), min_length=1, max_length=settings.CONTACT_BULK_UPSERT_MAX_CONTACTS
+    )
+
+
+class ContactUpsertSerializer(serializers.Serializer):
+    """
+    Validates a single contact of a bulk upsert. Field and group lookups come from the context so they're loaded once
+    per batch.
+    """
+
+    uuid = serializers.UUIDField(required=False)
+    name = serializers.CharField(required=False, allow_null=True, allow_blank=True, trim_whitespace=False)
+    language = serializers.CharField(required=False, min_length=3, max_length=3, allow_null=True)
+    urns = fields.URNListField(required=False)
+    groups = serializers.ListField(child=serializers.UUIDField(), required=False)
+    fields = fields.LimitedDictField(required=False, child=serializers.CharField(allow_blank=True, allow_null=True))
+
+    def validate_name(self, value):
+        try:
+            return clean_contact_name(value)
+        except DjangoValidationError as e:
+            raise serializers.ValidationError(e.messages)
+
+    def validate_language(self, value):
+        if value and not pycountry.languages.get(alpha_3=value):
+            raise serializers.ValidationError("Not a valid ISO639-3 language code.")
+
+        return value
+
+    def validate_groups(self, value):
+        groups_by_uuid = self.context["groups_by_uuid"]
+        groups = []
+
+        for group_uuid in value:
+            group = groups_by_uuid.get(str(group_uuid))
+            if not group:
+                raise serializers.ValidationError(f"No such object: {group_uuid}")
+            if group.is_dynamic:
+                raise serializers.ValidationError(f"Contact group must not be query based: {group.name}")
+
+            groups.append(group)
+
+        return groups
+
+    def validate_fields(self, value):
+        fields_by_key = self.context["fields_by_key"]
+        values_by_field = {}
+
+        for field_key, field_val in value.items():
+            field_obj = fields_by_key.get(field_key)
+            if not field_obj:
+                raise serializers.ValidationError(f"Invalid contact field key: {field_key}")
+
+            values_by_field[field_obj] = field_val
+
+        return values_by_field
+
+    def validate(self, data):
+        if not data.get("uuid") and not data.get("urns"):
+            raise serializers.ValidationError("Either uuid or urns is required")
+
+        return data
+
+
 class ContactWithMessageSerializer(serializers.Serializer):
     contact_id = serializers.IntegerField()
     msg_text = serializers.CharField()
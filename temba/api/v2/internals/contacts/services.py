@@ -1,3 +1,4 @@
+import json
 from datetime import datetime
 from pathlib import Path
 
@@ -8,11 +9,16 @@ from django.conf import settings
 from django.contrib.auth import get_user_model
 from django.core.exceptions import ValidationError
 from django.core.files.temp import NamedTemporaryFile
+from django.db.models import Q
 from django.utils import timezone as dj_timezone
 from django.utils.text import slugify
 
-from temba.contacts.models import Contact, ContactField, ContactImport
+from temba import mailroom
+from temba.api.v2.internals.contacts.serializers import ContactUpsertSerializer
+from temba.contacts.models import URN, Contact, ContactField, ContactGroup, ContactImport, ContactURN
+from temba.mailroom import ContactSpec, modifiers
 from temba.msgs.models import Msg
+from temba.utils import chunk_list
 from temba.utils.export import TableExporter
 from temba.utils.text import decode_stream
 from temba.utils.uuid import uuid4
@@ -302,3 +308,252 @@ class CleanContactFieldsService:
             contact.modify(actor, mods)
 
         return len(contact_fields)
+
+
+class ContactBulkUpsertService:
+    """
+    Creates or updates a batch of contacts. Existing contacts are resolved by UUID or URN with a few queries for the
+    whole batch, each contact's changes are combined into one list of modifiers, and contacts with the same changes are
+    modified by a single mailroom call. Mailroom creates contacts one at a time so new contacts are created by
+    concurrent calls.
+    """
+
+    STATUS_CREATED = "created"
+    STATUS_UPDATED = "updated"
+    STATUS_UNCHANGED = "unchanged"
+    STATUS_ERROR = "error"
+
+    @classmethod
+    def upsert(cls, org, user, specs: list) -> list:
+        """
+        Upserts the given contact specs, returning a result for each in the same order
+        """
+        context = {
+            "org": org,
+            "fields_by_key": {f.key: f for f in ContactField.user_fields.active_for_org(org=org)},
+            "groups_by_uuid": cls._load_groups(org, specs),
+        }
+
+        results = [None] * len(specs)
+        valid = {}
+
+        for i, spec in enumerate(specs):
+            serializer = ContactUpsertSerializer(data=spec, context=context)
+            if serializer.is_valid():
+                valid[i] = serializer.validated_data
+            else:
+                results[i] = cls._error(serializer.errors)
+
+        contacts = cls._resolve(org, valid)
+        contact_ids = {c.id for c in contacts.values()}
+        current_urns = cls._load_urns(contact_ids)
+        current_groups = cls._load_static_groups(contact_ids)
+
+        upserted_by = {}
+        to_modify = {}
+        to_create = []
+
+        for i, data in valid.items():
+            contact = contacts.get(i)
+
+            if not contact:
+                if data.get("uuid"):
+                    results[i] = cls._error({"uuid": ["Contact not found"]})
+                else:
+                    to_create.append(i)
+                continue
+
+            if contact.id in upserted_by:
+                results[i] = cls._error(
+                    {"non_field_errors": [f"Contact already upserted by item {upserted_by[contact.id]}"]}
+                )
+                continue
+
+            upserted_by[contact.id] = i
+
+            if org.is_anon and data.get("urns"):
+                results[i] = cls._error({"urns": ["Updating URNs not allowed for anonymous organizations"]})
+            elif contact.status != Contact.STATUS_ACTIVE and data.get("groups"):
+                results[i] = cls._error({"groups": ["Non-active contacts can't be added to groups"]})
+            else:
+                mods = cls._get_mods(
+                    contact, data, current_urns.get(contact.id, []), current_groups.get(contact.id, {})
+                )
+                if mods:
+                    to_modify[i] = mods
+                else:
+                    results[i] = {"status": cls.STATUS_UNCHANGED, "uuid": contact.uuid}
+
+        cls._modify(user, contacts, to_modify, results)
+        cls._create(org, user, valid, to_create, results)
+
+        return results
+
+    @staticmethod
+    def _load_groups(org, specs: list) -> dict:
+        uuids = set()
+        for spec in specs:
+            groups = spec.get("groups") if isinstance(spec, dict) else None
+            if isinstance(groups, list):
+                uuids.update(g.lower() for g in groups if isinstance(g, str))
+
+        if not uuids:
+            return {}
+
+        groups = ContactGroup.user_groups.filter(org=org, uuid__in=uuids)
+        return {g.uuid: g for g in groups}
+
+    @staticmethod
+    def _resolve(org, valid: dict) -> dict:
+        """
+        Resolves the existing contacts of the given validated specs by UUID, or by their first URN which exists
+        """
+        uuids = {str(d["uuid"]) for d in valid.values() if d.get("uuid")}
+        identities = {URN.identity(u) for d in valid.values() if not d.get("uuid") for u in d.get("urns", [])}
+
+        contact_ids_by_identity = {}
+        if identities:
+            urns = ContactURN.objects.filter(org=org, identity__in=identities, contact__is_active=True)
+            contact_ids_by_identity = dict(urns.values_list("identity", "contact_id"))
+
+        if not uuids and not contact_ids_by_identity:
+            return {}
+
+        existing = org.contacts.filter(is_active=True).filter(
+            Q(uuid__in=uuids) | Q(id__in=contact_ids_by_identity.values())
+        )
+        by_uuid, by_id = {}, {}
+        for contact in existing:
+            by_uuid[contact.uuid] = contact
+            by_id[contact.id] = contact
+
+        contacts = {}
+        for i, data in valid.items():
+            if data.get("uuid"):
+                contact = by_uuid.get(str(data["uuid"]))
+            else:
+                ids = (contact_ids_by_identity.get(URN.identity(u)) for u in data.get("urns", []))
+                contact = next((by_id[c] for c in ids if c in by_id), None)
+
+            if contact:
+                contacts[i] = contact
+
+        return contacts
+
+    @staticmethod
+    def _load_urns(contact_ids: set) -> dict:
+        urns = {}
+        if contact_ids:
+            identities = (
+                ContactURN.objects.filter(contact_id__in=contact_ids)
+                .order_by("-priority", "id")
+                .values_list("contact_id", "identity")
+            )
+            for contact_id, identity in identities:
+                urns.setdefault(contact_id, []).append(identity)
+        return urns
+
+    @staticmethod
+    def _load_static_groups(contact_ids: set) -> dict:
+        groups = {}
+        if contact_ids:
+            memberships = ContactGroup.contacts.through.objects.filter(
+                contact_id__in=contact_ids,
+                contactgroup__group_type=ContactGroup.TYPE_USER_DEFINED,
+                contactgroup__query=None,
+                contactgroup__is_active=True,
+            ).values_list("contact_id", "contactgroup__uuid", "contactgroup__name")
+            for contact_id, group_uuid, group_name in memberships:
+                groups.setdefault(contact_id, {})[group_uuid] = group_name
+        return groups
+
+    @staticmethod
+    def _get_mods(contact, data: dict, current_urns: list, current_groups: dict) -> list:
+        """
+        Gets the modifiers needed to apply the given validated spec, leaving out anything that wouldn't change
+        """
+        mods = []
+
+        if "name" in data and data["name"] != contact.name:
+            mods.append(modifiers.Name(name=data["name"]))
+        if "language" in data and data["language"] != contact.language:
+            mods.append(modifiers.Language(language=data["language"]))
+
+        urns = data.get("urns")
+        if urns is not None and [URN.identity(u) for u in urns] != current_urns:
+            mods += contact.update_urns(urns)
+
+        values = data.get("fields") or {}
+        changed = {}
+        for field, value in values.items():
+            current = contact.get_field_json(field) or {}
+            if (value or None) != (current.get("text") or None):
+                changed[field] = value
+        if changed:
+            mods += contact.update_fields(values=changed)
+
+        groups = data.get("groups")
+        if groups is not None:
+            group_uuids = {g.uuid for g in groups}
+            to_remove = [modifiers.GroupRef(uuid=u, name=n) for u, n in current_groups.items() if u not in group_uuids]
+            to_add = [modifiers.GroupRef(uuid=g.uuid, name=g.name) for g in groups if g.uuid not in current_groups]
+
+            if to_remove:
+                mods.append(modifiers.Groups(groups=to_remove, modification="remove"))
+            if to_add:
+                mods.append(modifiers.Groups(groups=to_add, modification="add"))
+
+        return mods
+
+    @classmethod
+    def _modify(cls, user, contacts: dict, to_modify: dict, results: list):
+        # contacts with identical changes are modified together
+        batches = {}
+        for i, mods in to_modify.items():
+            key = json.dumps([m.as_def() for m in mods], sort_keys=True)
+            batches.setdefault(key, (mods, []))[1].append(i)
+
+        calls = []
+        for mods, indexes in batches.values():
+            for batch in chunk_list(indexes, settings.CONTACT_BULK_UPSERT_MODIFY_BATCH_SIZE):
+                calls.append((mods, batch))
+
+        def modify(call) -> dict:
+            mods, batch = call
+            try:
+                Contact.bulk_modify(user, [contacts[i] for i in batch], mods)
+            except mailroom.MailroomException as e:
+                return {i: cls._error(e.response) for i in batch}
+
+            return {i: {"status": cls.STATUS_UPDATED, "uuid": contacts[i].uuid} for i in batch}
+
+        for batch_results in mailroom.map_concurrently(modify, calls):
+            for i, result in batch_results.items():
+                results[i] = result
+
+    @classmethod
+    def _create(cls, org, user, valid: dict, to_create: list, results: list):
+        client = mailroom.get_client()
+
+        def create(i: int) -> dict:
+            data = valid[i]
+            spec = ContactSpec(
+                name=data.get("name"),
+                language=data.get("language"),
+                urns=data.get("urns", []),
+                fields={f.key: v for f, v in (data.get("fields") or {}).items()},
+                groups=[g.uuid for g in data.get("groups", [])],
+            )
+            try:
+                response = client.contact_create(org.id, user.id, spec)
+            except mailroom.MailroomException as e:
+                return cls._error(e.response)
+
+            return {"status": cls.STATUS_CREATED, "uuid": response["contact"]["uuid"]}
+
+        for i, result in zip(to_create, mailroom.map_concurrently(create, to_create)):
+            results[i] = result
+
+    @classmethod
+    def _error(cls, errors) -> dict:
+        return {"status": cls.STATUS_ERROR, "errors": errors}
@@ -27,7 +27,7 @@ from temba.api.v2.internals.helpers import get_object_or_404
 from temba.api.v2.internals.views import JWTAuthMockMixin
 from temba.api.v2.validators import LambdaURLValidator
 from temba.channels.models import Channel
-from temba.contacts.models import ContactField
+from temba.contacts.models import Contact, ContactField
 from temba.msgs.models import Msg
 from temba.tests import TembaTest
 from temba.tests.mailroom import mock_mailroom
@@ -3129,3 +3129,138 @@ class InternalContactGroupsViewAdditionalTests(TembaTest):
             )
         self.assertEqual(resp.status_code, 404)
         self.assertEqual(resp.json(), {"error": "User not found"})
+
+
+class ContactsBulkUpsertViewTest(JWTAuthMockMixin, TembaTest):
+    def setUp(self):
+        super().setUp()
+        self.url = "/api/v2/internals/contacts_bulk_upsert"
+        self.org.proj_uuid = uuid.uuid4()
+        self.org.save(update_fields=("proj_uuid",))
+        self.org2.proj_uuid = uuid.uuid4()
+        self.org2.save(update_fields=("proj_uuid",))
+        self.jwt_payload_patch = {"project_uuid": str(self.org.proj_uuid)}
+
+    def _mock_jwt_authenticate(self, request, *args, **kwargs):
+        result = super()._mock_jwt_authenticate(request, *args, **kwargs)
+        if getattr(self, "jwt_payload_patch", None):
+            request.jwt_payload.update(self.jwt_payload_patch)
+            request.project_uuid = request.jwt_payload.get("project_uuid")
+        return result
+
+    def post(self, data):
+        return self.client.post(self.url, data=data, content_type="application/json", **self.auth_headers)
+
+    def test_validation(self):
+        response = self.post({"contacts": [{"name": "Ann"}]})
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json(), {"error": "project_uuid is required"})
+
+        response = self.post({"project_uuid": str(self.org2.proj_uuid), "contacts": [{"name": "Ann"}]})
+        self.assertEqual(response.status_code, 403)
+        self.assertEqual(response.json(), {"error": "project_uuid does not match token"})
+
+        response = self.post({"project_uuid": str(self.org.proj_uuid), "contacts": []})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("contacts", response.json())
+
+    @mock_mailroom
+    @override_settings(INTERNAL_USER_EMAIL="super@user.com", MAILROOM_BATCH_WORKERS=1)
+    def test_upsert(self, mr_mocks):
+        User.objects.create_user("super@user.com", "super@user.com")
+        team = self.create_field("team", "Team")
+        customers = self.create_group("Customers", contacts=[])
+        ann = self.create_contact("Ann", urns=["whatsapp:5511999990001"])
+        bob = self.create_contact("Bob", urns=["whatsapp:5511999990002"])
+        cat = self.create_contact("Cat", urns=["whatsapp:5511999990003"])
+        self.set_contact_field(ann, "team", "A")
+
+        response = self.post(
+            {
+                "project_uuid": str(self.org.proj_uuid),
+                "contacts": [
+                    {"urns": ["whatsapp:5511999990001"], "fields": {"team": "B"}, "groups": [customers.uuid]},
+                    {"urns": ["whatsapp:5511999990002"], "fields": {"team": "B"}, "groups": [customers.uuid]},
+                    {"uuid": cat.uuid, "name": "Cat", "urns": ["whatsapp:5511999990003"]},
+                    {"urns": ["whatsapp:5511999990004"], "name": "Dan", "fields": {"team": "C"}},
+                    {"uuid": str(uuid.uuid4()), "name": "Nobody"},
+                    {"urns": ["whatsapp:5511999990005"], "fields": {"nope": "x"}},
+                    {"name": "Eve"},
+                    {"uuid": ann.uuid, "name": "Ann 2"},
+                ],
+            }
+        )
+
+        self.assertEqual(response.status_code, 200)
+
+        dan = Contact.objects.get(org=self.org, name="Dan")
+
+        self.assertEqual(
+            [
+                {"status": "updated", "uuid": ann.uuid},
+                {"status": "updated", "uuid": bob.uuid},
+                {"status": "unchanged", "uuid": cat.uuid},
+                {"status": "created", "uuid": dan.uuid},
+                {"status": "error", "errors": {"uuid": ["Contact not found"]}},
+                {"status": "error", "errors": {"fields": ["Invalid contact field key: nope"]}},
+                {"status": "error", "errors": {"non_field_errors": ["Either uuid or urns is required"]}},
+                {"status": "error", "errors": {"non_field_errors": ["Contact already upserted by item 0"]}},
+            ],
+            response.json()["results"],
+        )
+
+        # ann and bob had the same changes so were modified by a single call
+        self.assertEqual(1, len(mr_mocks.calls["contact_modify"]))
+        self.assertEqual([ann.id, bob.id], mr_mocks.calls["contact_modify"][0].args[2])
+        self.assertEqual(1, len(mr_mocks.calls["contact_create"]))
+
+        for contact in (ann, bob):
+            contact.refresh_from_db()
+            self.assertEqual("B", contact.get_field_serialized(team))
+            self.assertEqual({customers}, set(contact.user_groups.all()))
+
+        self.assertEqual("C", dan.get_field_serialized(team))
+        self.assertEqual(["whatsapp:5511999990004"], [u.identity for u in dan.urns.all()])
+
+        # upserting the same changes again doesn't modify anyone
+        response = self.post(
+            {
+                "project_uuid": str(self.org.proj_uuid),
+                "contacts": [{"uuid": ann.uuid, "fields": {"team": "B"}, "groups": [customers.uuid]}],
+            }
+        )
+
+        self.assertEqual([{"status": "unchanged", "uuid": ann.uuid}], response.json()["results"])
+        self.assertEqual(1, len(mr_mocks.calls["contact_modify"]))
+
+        # nor does membership of a released group whose members haven't been cleared yet
+        released = self.create_group("Released", contacts=[ann])
+        released.is_active = False
+        released.save(update_fields=("is_active",))
+
+        response = self.post(
+            {
+                "project_uuid": str(self.org.proj_uuid),
+                "contacts": [{"uuid": ann.uuid, "fields": {"team": "B"}, "groups": [customers.uuid]}],
+            }
+        )
+
+        self.assertEqual([{"status": "unchanged", "uuid": ann.uuid}], response.json()["results"])
+        self.assertEqual(1, len(mr_mocks.calls["contact_modify"]))
+
+        # mailroom errors only fail the contacts of that call
+        mr_mocks.error("boom")
+
+        response = self.post(
+            {
+                "project_uuid": str(self.org.proj_uuid),
+                "contacts": [
+                    {"uuid": ann.uuid, "name": "Annie"},
+                    {"urns": ["whatsapp:5511999990006"], "name": "Fay"},
+                ],
+            }
+        )
+
+        results = response.json()["results"]
+        self.assertEqual({"status": "error", "errors": {"error": "boom"}}, results[0])
+        self.assertEqual("created", results[1]["status"])
@@ -32,11 +32,16 @@ from temba.api.auth.billing import BillingFixedAccessTokenViewMixin
 from temba.api.auth.jwt import BaseJWTAuthentication, OptionalJWTAuthentication, RequiredJWTAuthentication
 from temba.api.v2.internals.contacts.serializers import (
     CleanContactFieldsSerializer,
+    ContactBulkUpsertSerializer,
     ContactWithMessagesListSerializer,
     InternalContactFieldsValuesSerializer,
     InternalContactSerializer,
 )
-from temba.api.v2.internals.contacts.services import CleanContactFieldsService, ContactImportDeduplicationService
+from temba.api.v2.internals.contacts.services import (
+    CleanContactFieldsService,
+    ContactBulkUpsertService,
+    ContactImportDeduplicationService,
+)
 from temba.api.v2.internals.helpers import get_object_or_404
 from temba.api.v2.internals.views import APIViewMixin
 from temba.api.v2.permissions import HasValidJWT, IsUserInOrg
@@ -862,3 +867,46 @@ class CleanContactsFieldsView(APIViewMixin, APIView):
             },
             status=status.HTTP_200_OK,
         )
+
+
+class ContactsBulkUpsertView(APIViewMixin, APIView):
+    """
+    Creates or updates up to CONTACT_BULK_UPSERT_MAX_CONTACTS contacts, matched by uuid or URN, returning a result for
+    each in the same order. Invalid contacts get an error result rather than failing the whole batch.
+    """
+
+    authentication_classes = [RequiredJWTAuthentication]
+    permission_classes = [HasValidJWT]
+
+    def post(self, request: Request):
+        project_uuid = request.data.get("project_uuid") or request.data.get("project")
+        token_project_uuid = getattr(request, "project_uuid", None)
+
+        if not project_uuid:
+            return Response({"error": "project_uuid is required"}, status=status.HTTP_400_BAD_REQUEST)
+
+        if token_project_uuid and str(token_project_uuid) != str(project_uuid):
+            return Response({"error": "project_uuid does not match token"}, status=status.HTTP_403_FORBIDDEN)
+
+        org = self.get_org_from_request(
+            request,
+            query_keys=(),
+            body_keys=("project_uuid", "project"),
+            missing_status=status.HTTP_400_BAD_REQUEST,
+            missing_error="project_uuid is required",
+            not_found_status=status.HTTP_404_NOT_FOUND,
+            not_found_error="Project not found",
+        )
+        if isinstance(org, Response):
+            return org
+
+        serializer = ContactBulkUpsertSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        user = CleanContactFieldsService._get_actor(org, jwt_payload=getattr(request, "jwt_payload", None))
+        if not user:
+            return Response({"error": "No user available to upsert contacts"}, status=status.HTTP_400_BAD_REQUEST)
+
+        results = ContactBulkUpsertService.upsert(org, user, serializer.validated_data["contacts"])
+
+        return Response({"results": results}, status=status.HTTP_200_OK)
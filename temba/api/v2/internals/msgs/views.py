@@ -1,4 +1,3 @@
-from rest_framework.pagination import LimitOffsetPagination
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.views import APIView
@@ -11,7 +10,7 @@ from temba.api.auth.jwt import JWTAuthMixinRequired
 from temba.api.support import InvalidQueryError
 from temba.api.v2.internals.msgs.serializers import InternalMsgReadSerializer, MsgStreamSerializer
 from temba.api.v2.internals.views import APIViewMixin
-from temba.api.v2.views_base import CreatedOnCursorPagination
+from temba.api.v2.views_base import CreatedOnCursorPagination, DefaultLimitOffsetPagination
 from temba.channels.models import Channel
 from temba.contacts.models import URN, Contact, ContactURN
 from temba.msgs.models import Label, Msg, SystemLabel
@@ -192,7 +191,7 @@ class MsgStreamView(APIViewMixin, APIView, JWTAuthMixinRequired):
         return Response({"ids": created_ids}, status=201)
 
 
-class FirstContactsPagination(LimitOffsetPagination):
+class FirstContactsPagination(DefaultLimitOffsetPagination):
     default_limit = 500
     max_limit = 1000
 
@@ -673,6 +673,14 @@ class ChannelReadSerializer(ReadSerializer):
             "network_type": obj.get_last_network_type(),
         }
 
+    def to_representation(self, instance):
+        data = super().to_representation(instance)
+
+        if self.context.get("include_counts"):
+            data["counts"] = instance.count_summary.as_json()
+
+        return data
+
     class Meta:
         model = Channel
         fields = ("uuid", "name", "address", "country", "device", "last_seen", "created_on")
@@ -1,7 +1,12 @@
+import hashlib
 import json
-from datetime import timezone
-from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
 
+from django_redis import get_redis_connection
+from redis.exceptions import LockNotOwnedError
+from rest_framework.utils.encoders import JSONEncoder
 from weni_datalake_sdk.clients.redshift.events import (
     get_events as dl_get_events,
     get_events_count_by_group as dl_get_events_count_by_group,
@@ -9,45 +14,59 @@ from weni_datalake_sdk.clients.redshift.events import (
     get_events_silver_count_by_group as dl_get_events_count_by_group_silver,
 )
 
+from django.conf import settings
 
-def _parse_event_values(events: Iterable[Dict[str, Any]]) -> List[Dict[str, Any]]:
-    processed: List[Dict[str, Any]] = []
+logger = logging.getLogger(__name__)
+
+# columns which the datalake returns as JSON encoded strings, all others are returned as they are
+JSON_COLUMNS = frozenset({"payload", "metadata", "value", "group_value"})
+
+CACHE_KEY = "datalake_events:%s:%s"
+LOCK_KEY = "datalake_events_lock:%s:%s"
+
+
+def _parse_event_date(value: Any) -> Any:
+    """
+    Normalizes epoch millis, as numbers or numeric strings, to ISO-8601 in UTC
+    """
+    if isinstance(value, str) and value.strip().isdigit():
+        value = float(value.strip())
+
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return datetime.fromtimestamp(value / 1000.0, tz=timezone.utc).isoformat().replace("+00:00", "Z")
+
+    return value
+
+
+def _parse_event(event: Dict[str, Any]) -> Dict[str, Any]:
+    parsed = dict(event)
+
+    for column in JSON_COLUMNS.intersection(event):
+        value = event[column]
+        if isinstance(value, str):
+            try:
+                parsed[column] = json.loads(value)
+            except ValueError:
+                pass
+
+    if "date" in parsed:
+        parsed["date"] = _parse_event_date(parsed["date"])
+
+    return parsed
+
+
+def _iter_event_values(events: Iterable[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
     for event in events:
         try:
-            processed_event: Dict[str, Any] = {}
-            for key, value in event.items():
-                if isinstance(value, str):
-                    try:
-                        processed_event[key] = json.loads(value)
-                    except (json.JSONDecodeError, TypeError):
-                        processed_event[key] = value
-                else:
-                    processed_event[key] = value
-            # Normalize numeric timestamps to ISO-8601 Z for "date" field
-            if "date" in processed_event:
-                date_val = processed_event["date"]
-                # Try to coerce ints (epoch millis) and numeric-looking strings
-                if isinstance(date_val, (int, float)):
-                    from datetime import datetime, timezone as _tz
-
-                    dt = datetime.fromtimestamp(float(date_val) / 1000.0, tz=_tz.utc)
-                    iso = dt.isoformat()
-                    processed_event["date"] = iso.replace("+00:00", "Z")
-                elif isinstance(date_val, str):
-                    # If string is digits only, treat as epoch millis
-                    stripped = date_val.strip()
-                    if stripped.isdigit():
-                        from datetime import datetime, timezone as _tz
-
-                        dt = datetime.fromtimestamp(float(stripped) / 1000.0, tz=_tz.utc)
-                        iso = dt.isoformat()
-                        processed_event["date"] = iso.replace("+00:00", "Z")
-            processed.append(processed_event)
+            yield _parse_event(event)
         except Exception as e:
-            # Log but don't skip the event - add it as-is
-            print(f"Warning: Error parsing event, adding as-is: {e}")
-            processed.append(event)
-    return processed
+            # don't skip the event, return it as-is
+            logger.warning(f"error parsing datalake event, returning as-is: {e}")
+            yield event
+
+
+def _parse_event_values(events: Iterable[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    return list(_iter_event_values(events))
 
 
 def _normalize_datetime_params(params: Dict[str, Any]) -> None:
@@ -105,15 +124,102 @@ def _fetch_by_flag(
     return std_fn(**base_params)
 
 
+def _get_cache_ttl(date_end) -> int:
+    """
+    Gets how long the results of a query can be cached, based on how long ago its date range ended
+    """
+    if not isinstance(date_end, datetime):
+        return settings.DATALAKE_EVENTS_CACHE_TTLS[0][1]
+
+    age = datetime.now(timezone.utc) - date_end
+    for max_age, ttl in settings.DATALAKE_EVENTS_CACHE_TTLS:
+        if age < max_age:
+            return ttl
+
+    return settings.DATALAKE_EVENTS_CACHE_DEFAULT_TTL
+
+
+def _fetch_cached(kind: str, params: Dict[str, Any], ttl: int, fetch: Callable[[], List[Dict[str, Any]]]):
+    """
+    Gets the results of a datalake query from the cache, or runs it and caches them. Identical queries which arrive
+    while one is running wait for its results rather than running their own.
+    """
+    normalized = json.dumps({k: v for k, v in params.items() if v is not None}, sort_keys=True)
+    digest = hashlib.sha1(normalized.encode()).hexdigest()
+    key = CACHE_KEY % (kind, digest)
+
+    r = get_redis_connection()
+    cached = r.get(key)
+    if cached is not None:
+        return json.loads(cached)
+
+    lock = r.lock(
+        LOCK_KEY % (kind, digest),
+        timeout=settings.DATALAKE_EVENTS_QUERY_TIMEOUT,
+        blocking_timeout=settings.DATALAKE_EVENTS_QUERY_TIMEOUT,
+    )
+    if not lock.acquire():
+        # the query in flight is taking too long, so run our own rather than keep waiting
+        return fetch()
+
+    try:
+        # the query may have been run by whoever held the lock before us
+        cached = r.get(key)
+        if cached is not None:
+            return json.loads(cached)
+
+        # results are returned as they would be from the cache so they're the same whether it's hit or not
+        encoded = json.dumps(fetch(), cls=JSONEncoder)
+        r.set(key, encoded, ex=ttl)
+        return json.loads(encoded)
+    finally:
+        try:
+            lock.release()
+        except LockNotOwnedError:
+            # our query outlasted the lock so it has already expired
+            pass
+
+
 def fetch_events_for_org(user, **filters) -> List[Dict[str, Any]]:
     base_params, silver, table = _prepare_datalake_params(user, filters)
-    events = _fetch_by_flag(base_params, silver, table, dl_get_events, dl_get_events_silver)
-    return _parse_event_values(events)
+
+    def fetch():
+        events = _fetch_by_flag(base_params, silver, table, dl_get_events, dl_get_events_silver)
+        return _parse_event_values(events)
+
+    params = {**base_params, "silver": silver, "table": table}
+    return _fetch_cached("events", params, _get_cache_ttl(filters.get("date_end")), fetch)
 
 
 def fetch_event_counts_for_org(user, **filters) -> List[Dict[str, Any]]:
     base_params, silver, table = _prepare_datalake_params(user, filters)
-    counts = _fetch_by_flag(
-        base_params, silver, table, dl_get_events_count_by_group, dl_get_events_count_by_group_silver
-    )
-    return _parse_event_values(counts)
+
+    def fetch():
+        counts = _fetch_by_flag(
+            base_params, silver, table, dl_get_events_count_by_group, dl_get_events_count_by_group_silver
+        )
+        return _parse_event_values(counts)
+
+    params = {**base_params, "silver": silver, "table": table}
+    return _fetch_cached("counts", params, _get_cache_ttl(filters.get("date_end")), fetch)
+
+
+def check_events_health(project: str) -> None:
+    """
+    Checks that events can be fetched for the given project, raising an exception if not. Results are shared by probes
+    for a short time so that frequent health checks don't each run their own query.
+    """
+    date_end = datetime.now(timezone.utc)
+    params = {
+        "project": project,
+        "date_start": date_end - timedelta(hours=24),
+        "date_end": date_end,
+        "limit": 1,
+    }
+    _normalize_datetime_params(params)
+
+    def fetch():
+        return _parse_event_values(dl_get_events(**params))
+
+    # the checked range moves every time so the cache key is just the project
+    _fetch_cached("health", {"project": project}, settings.DATALAKE_EVENTS_HEALTH_CHECK_TTL, fetch)
@@ -1,4 +1,5 @@
 import base64
+import threading
 import time
 import uuid
 from collections import OrderedDict
@@ -10,13 +11,16 @@ from urllib.parse import quote_plus
 
 import iso8601
 import pytz
+from django_redis import get_redis_connection
 from rest_framework import serializers
+from rest_framework.exceptions import NotFound
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
 from rest_framework.test import APIClient, APIRequestFactory
 
 from django.conf import settings
 from django.contrib.auth.models import AnonymousUser, Group, User
 from django.contrib.gis.geos import GEOSGeometry
-from django.core.cache import cache
 from django.core.exceptions import ValidationError
 from django.db import connection
 from django.test import Client, override_settings
@@ -39,7 +43,8 @@ from temba.api.v2.views import (
     TemplatesEndpoint,
     WhatsappFlowsEndpoint,
 )
-from temba.api.v2.views_base import BaseAPIView
+from temba.api.v2.views_base import BaseAPIView, DefaultLimitOffsetPagination
+from temba.api.versions import ResourceVersions
 from temba.archives.models import Archive
 from temba.campaigns.models import Campaign, CampaignEvent
 from temba.channels.models import Channel, ChannelEvent
@@ -71,9 +76,12 @@ from temba.wpp_flows.models import WhatsappFlow
 from temba.wpp_products.models import Catalog, Product
 
 from . import fields
+from .hydrators import FlowRunHydrator, MsgHydrator, format_engine_datetime
 from .serializers import (
     ContactReadSerializer,
     ExternalServicesReadSerializer,
+    FlowRunReadSerializer,
+    MsgReadSerializer,
     ProductReadSerializer,
     format_datetime,
     normalize_extra,
@@ -233,6 +241,61 @@ class APITest(APIJSONMixin, TembaTest):
         )
         self.assertContains(response, "Server Error. Site administrators have been notified.", status_code=500)
 
+    def test_serializer_fields_resolved_in_bulk(self):
+        contacts = Contact.objects.bulk_create(
+            [
+                Contact(org=self.org, name=f"Bulk {i}", created_by=self.admin, modified_by=self.admin)
+                for i in range(1000)
+            ]
+        )
+        ContactURN.objects.bulk_create(
+            [
+                ContactURN(
+                    org=self.org,
+                    contact=c,
+                    scheme="tel",
+                    path=f"+25078800{i:04d}",
+                    identity=f"tel:+25078800{i:04d}",
+                    priority=ContactURN.PRIORITY_HIGHEST,
+                )
+                for i, c in enumerate(contacts)
+            ]
+        )
+
+        # a 1,000 recipient payload, half by UUID and half by URN
+        field = fields.ContactField(source="test", many=True, max_items=1000)
+        field._context = {"org": self.org}
+        payload = [c.uuid if i % 2 else f"tel:+25078800{i:04d}" for i, c in enumerate(contacts)]
+
+        with self.assertNumQueries(2):
+            self.assertEqual(contacts, field.to_internal_value(payload))
+
+        # missing values are all reported, once each
+        payload = [contacts[0].uuid, "tel:+250788999999", contacts[1].uuid, "nope", "nope"]
+
+        with self.assertRaises(serializers.ValidationError) as e:
+            field.to_internal_value(payload)
+
+        self.assertEqual(["No such object: tel:+250788999999", "No such object: nope"], e.exception.detail)
+
+        # groups are looked up by UUID and then case-insensitive name, one query each
+        group1 = self.create_group("Customers")
+        group2 = self.create_group("Testers")
+
+        field = fields.ContactGroupField(source="test", many=True)
+        field._context = {"org": self.org}
+
+        with self.assertNumQueries(2):
+            self.assertEqual([group2, group1, group2], field.to_internal_value(["testers", group1.uuid, group2.uuid]))
+
+        # messages which don't exist are returned as None, including values that can't be message ids
+        msg = self.create_incoming_msg(self.joe, "Hi")
+        field = fields.MessageField(source="test", many=True)
+        field._context = {"org": self.org}
+
+        with self.assertNumQueries(1):
+            self.assertEqual([msg, None, None], field.to_internal_value([str(msg.id), 1234567, "abc"]))
+
     def test_serializer_fields(self):
         def assert_field(f, *, submissions: dict, representations: dict):
             f._context = {"org": self.org}  # noqa
@@ -503,7 +566,7 @@ class APITest(APIJSONMixin, TembaTest):
         self.assertEqual(response.status_code, 200)
 
         # simulate the admin user exceeding the rate limit for the v2 scope
-        cache.set(f"throttle_v2_{self.org.id}-{self.admin.id}", [time.time() for r in range(10000)])
+        get_redis_connection().set(f"throttle_v2_{self.org.id}-{self.admin.id}", int((time.time() + 3600) * 1000))
 
         # next request they make using a token will be rejected
         response = request_by_token(fields_url, token1.key)
@@ -536,6 +599,130 @@ class APITest(APIJSONMixin, TembaTest):
         response = request_by_basic_auth(contacts_url, self.admin.username, token2.key)
         self.assertResponseError(response, None, "Invalid token or email", status_code=403)
 
+    def test_throttling(self):
+        fields_url = reverse("api.v2.fields") + ".json"
+        token = APIToken.get_or_create(self.org, self.admin, Group.objects.get(name="Administrators"))
+
+        def request():
+            return self.client.get(fields_url, HTTP_AUTHORIZATION=f"Token {token.key}", HTTP_X_FORWARDED_HTTPS="https")
+
+        # by default a tenth of the hourly budget can be used at once
+        response = request()
+        self.assertEqual(200, response.status_code)
+        self.assertEqual("2500", response["X-RateLimit-Limit"])
+        self.assertEqual("249", response["X-RateLimit-Remaining"])
+        self.assertEqual("2", response["X-RateLimit-Reset"])
+
+        # orgs can override the rate and burst of a scope
+        self.org.config = {"api_throttles": {"v2": {"rate": "3/minute", "burst": 2}}}
+        self.org.save(update_fields=("config",))
+        get_redis_connection().delete(f"throttle_v2_{self.org.id}-{self.admin.id}")
+
+        response = request()
+        self.assertEqual(200, response.status_code)
+        self.assertEqual("3", response["X-RateLimit-Limit"])
+        self.assertEqual("1", response["X-RateLimit-Remaining"])
+        self.assertEqual("30", response["X-RateLimit-Reset"])
+
+        response = request()
+        self.assertEqual(200, response.status_code)
+        self.assertEqual("0", response["X-RateLimit-Remaining"])
+
+        # burst used up so next request has to wait for one interval
+        response = request()
+        self.assertEqual(429, response.status_code)
+        self.assertEqual("30", response["Retry-After"])
+        self.assertEqual("0", response["X-RateLimit-Remaining"])
+        self.assertEqual("60", response["X-RateLimit-Reset"])
+
+        # streams cost a fixed number of requests
+        with override_settings(API_STREAM_THROTTLE_COST=10):
+            response = self.client.get(
+                reverse("api.v2.runs") + ".json?stream=true",
+                HTTP_AUTHORIZATION=f"Token {token.key}",
+                HTTP_X_FORWARDED_HTTPS="https",
+            )
+            b"".join(response.streaming_content)
+
+        self.assertEqual(200, response.status_code)
+        self.assertEqual("2500", response["X-RateLimit-Limit"])
+        self.assertEqual("240", response["X-RateLimit-Remaining"])
+
+        # requests made with a session aren't throttled
+        self.login(self.admin)
+        response = self.client.get(fields_url, HTTP_X_FORWARDED_HTTPS="https")
+        self.assertEqual(200, response.status_code)
+        self.assertNotIn("X-RateLimit-Limit", response)
+
+    @patch("temba.api.support.logger")
+    def test_throttling_with_invalid_overrides(self, mock_logger):
+        fields_url = reverse("api.v2.fields") + ".json"
+        token = APIToken.get_or_create(self.org, self.admin, Group.objects.get(name="Administrators"))
+        r = get_redis_connection()
+
+        def request():
+            r.delete(f"throttle_v2_{self.org.id}-{self.admin.id}")
+            return self.client.get(fields_url, HTTP_AUTHORIZATION=f"Token {token.key}", HTTP_X_FORWARDED_HTTPS="https")
+
+        # bad overrides are logged and ignored rather than failing every request
+        for override in (
+            {"rate": "100"},
+            {"rate": "100/fortnightly"},
+            {"rate": "0/hour"},
+            {"rate": 100},
+            {"burst": "lots"},
+            {"burst": 0},
+            "1000/hour",
+        ):
+            mock_logger.reset_mock()
+            self.org.config = {"api_throttles": {"v2": override}}
+            self.org.save(update_fields=("config",))
+
+            response = request()
+            self.assertEqual(200, response.status_code, f"status mismatch for override {override}")
+            self.assertEqual("2500", response["X-RateLimit-Limit"])
+            self.assertEqual("249", response["X-RateLimit-Remaining"])
+            mock_logger.error.assert_called_once()
+
+        self.org.config = {"api_throttles": ["v2"]}
+        self.org.save(update_fields=("config",))
+        self.assertEqual(200, request().status_code)
+
+        # the default burst can be configured for each scope
+        self.org.config = {}
+        self.org.save(update_fields=("config",))
+
+        with override_settings(API_THROTTLE_BURST_RATIOS={"v2": 1.0}):
+            self.assertEqual("2499", request()["X-RateLimit-Remaining"])
+
+        with override_settings(API_THROTTLE_DEFAULT_BURST_RATIO=0.5):
+            self.assertEqual("1249", request()["X-RateLimit-Remaining"])
+
+    def test_throttling_caps_requests_per_period(self):
+        fields_url = reverse("api.v2.fields") + ".json"
+        token = APIToken.get_or_create(self.org, self.admin, Group.objects.get(name="Administrators"))
+
+        def request():
+            return self.client.get(fields_url, HTTP_AUTHORIZATION=f"Token {token.key}", HTTP_X_FORWARDED_HTTPS="https")
+
+        self.org.config = {"api_throttles": {"v2": {"rate": "10/hour", "burst": 5}}}
+        self.org.save(update_fields=("config",))
+
+        r = get_redis_connection()
+        key = f"throttle_v2_{self.org.id}-{self.admin.id}"
+
+        # simulate an hour a minute at a time by moving the theoretical arrival time back, making as many requests as
+        # are allowed each minute
+        allowed = 0
+        for minute in range(60):
+            while request().status_code == 200:
+                allowed += 1
+
+            r.decrby(key, 60_000)
+
+        # the burst is included in the hourly rate rather than being on top of it
+        self.assertEqual(10, allowed)
+
     @override_settings(JWT_PUBLIC_KEY="fake-public-key")
     @patch("temba.api.auth.jwt.jwt.decode")
     def test_optional_jwt_auth_sets_payload(self, mock_decode):
@@ -4953,6 +5140,275 @@ class APITest(APIJSONMixin, TembaTest):
             },
         )
 
+    def test_conditional_get(self):
+        url = reverse("api.v2.fields") + ".json"
+        self.login(self.admin)
+
+        def fetch(**headers):
+            return self.client.get(url, HTTP_X_FORWARDED_HTTPS="https", **headers)
+
+        self.create_field("nick_name", "Nick Name")
+
+        response = fetch()
+        self.assertEqual(200, response.status_code)
+        self.assertEqual("private, no-cache", response["Cache-Control"])
+        etag, last_modified = response["ETag"], response["Last-Modified"]
+
+        # client has the current version so nothing more than authentication needs to touch the database
+        with self.assertNumQueries(NUM_BASE_REQUEST_QUERIES):
+            response = fetch(HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(304, response.status_code)
+        self.assertEqual(etag, response["ETag"])
+        self.assertEqual(b"", response.content)
+
+        response = fetch(HTTP_IF_MODIFIED_SINCE=last_modified)
+        self.assertEqual(304, response.status_code)
+
+        # different query params are different representations
+        response = self.client.get(url + "?key=nick_name", HTTP_X_FORWARDED_HTTPS="https", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(200, response.status_code)
+        self.assertNotEqual(etag, response["ETag"])
+
+        # a change to a field bumps the version
+        self.create_field("registered", "Registered On", value_type=ContactField.TYPE_DATETIME)
+
+        response = fetch(HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(200, response.status_code)
+        self.assertEqual(2, len(response.json()["results"]))
+        self.assertNotEqual(etag, response["ETag"])
+
+        # as does an expired version, which picks up changes which weren't model saves
+        etag = response["ETag"]
+        get_redis_connection().delete(f"api_version:{self.org.id}:fields")
+
+        response = fetch(HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(200, response.status_code)
+
+        # versions are per org
+        self.create_field("other", "Other", org=self.org2)
+
+        response = fetch(HTTP_IF_NONE_MATCH=response["ETag"])
+        self.assertEqual(304, response.status_code)
+
+        # templates are mostly deactivated by trimming, which updates without saving but still bumps the version
+        tt = TemplateTranslation.get_or_create(
+            self.channel,
+            "hello",
+            "eng",
+            "US",
+            "Hi {{1}}",
+            1,
+            TemplateTranslation.STATUS_APPROVED,
+            "1234",
+            "foo_namespace",
+            "AUTHENTICATION",
+        )
+        templates_url = reverse("api.v2.templates") + ".json"
+
+        response = self.client.get(templates_url, HTTP_X_FORWARDED_HTTPS="https")
+        response = self.client.get(templates_url, HTTP_X_FORWARDED_HTTPS="https", HTTP_IF_NONE_MATCH=response["ETag"])
+        self.assertEqual(304, response.status_code)
+
+        TemplateTranslation.trim(self.channel, [])
+
+        response = self.client.get(templates_url, HTTP_X_FORWARDED_HTTPS="https", HTTP_IF_NONE_MATCH=response["ETag"])
+        self.assertEqual(200, response.status_code)
+
+        Template.trim(self.channel)
+        self.assertFalse(Template.objects.get(id=tt.template.id).is_active)
+
+        response = self.client.get(templates_url, HTTP_X_FORWARDED_HTTPS="https", HTTP_IF_NONE_MATCH=response["ETag"])
+        self.assertEqual(200, response.status_code)
+
+        # trimming which doesn't change anything doesn't bump it
+        TemplateTranslation.trim(self.channel, [])
+        Template.trim(self.channel)
+
+        response = self.client.get(templates_url, HTTP_X_FORWARDED_HTTPS="https", HTTP_IF_NONE_MATCH=response["ETag"])
+        self.assertEqual(304, response.status_code)
+
+        # endpoints without versioned resources don't have ETags
+        response = self.client.get(reverse("api.v2.contacts") + ".json", HTTP_X_FORWARDED_HTTPS="https")
+        self.assertEqual(200, response.status_code)
+        self.assertNotIn("ETag", response)
+
+        self.assertEqual({"hits": 3, "misses": 4, "ratio": 3 / 7}, ResourceVersions.get_stats()["FieldsEndpoint"])
+
+    def test_conditional_get_after_bulk_changes(self):
+        self.login(self.admin)
+
+        group = self.create_group("Reporters", contacts=[])
+        field = ContactField.get_or_create(
+            self.org, self.admin, "registered", "Registered On", value_type=ContactField.TYPE_DATETIME
+        )
+        flow = self.create_flow()
+        campaign = Campaign.create(self.org, self.admin, "Reminders", group)
+        CampaignEvent.create_flow_event(
+            self.org, self.admin, campaign, field, 6, CampaignEvent.UNIT_HOURS, flow, delivery_hour=12
+        )
+
+        url = reverse("api.v2.definitions") + f".json?flow={flow.uuid}"
+
+        def fetch(**headers):
+            return self.client.get(url, HTTP_X_FORWARDED_HTTPS="https", **headers)
+
+        response = fetch()
+        etag = response["ETag"]
+        self.assertEqual(1, len(response.json()["campaigns"]))
+        self.assertEqual(304, fetch(HTTP_IF_NONE_MATCH=etag).status_code)
+
+        # archiving updates the campaign and recreates its events with a bulk create, neither of which send post_save
+        Campaign.apply_action_archive(self.admin, Campaign.objects.filter(id=campaign.id))
+
+        response = fetch(HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(200, response.status_code)
+        self.assertNotEqual(etag, response["ETag"])
+        self.assertEqual([], response.json()["campaigns"])
+
+        etag = response["ETag"]
+        self.assertEqual(304, fetch(HTTP_IF_NONE_MATCH=etag).status_code)
+
+        # restored campaigns come back with the events recreated when they were archived
+        Campaign.apply_action_restore(self.admin, Campaign.objects.filter(id=campaign.id))
+
+        response = fetch(HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(200, response.status_code)
+        self.assertEqual(
+            [str(e.uuid) for e in campaign.get_events()],
+            [e["uuid"] for e in response.json()["campaigns"][0]["events"]],
+        )
+
+    @override_settings(API_STREAM_BATCH_SIZE=2)
+    def test_streaming(self):
+        def stream(endpoint, query=""):
+            response = self.client.get(reverse(endpoint) + ".json?stream=true" + query, HTTP_X_FORWARDED_HTTPS="https")
+            self.assertEqual(200, response.status_code)
+            self.assertEqual("application/x-ndjson", response["Content-Type"])
+
+            lines = [json.loads(line) for line in b"".join(response.streaming_content).decode().splitlines()]
+            return lines[:-1], lines[-1]
+
+        self.login(self.admin)
+
+        flow = self.get_flow("color_v13")
+        bob = self.create_contact("Bob", phone="+250788000001")
+        runs = [MockSessionWriter(c, flow).wait().save().session.runs.get() for c in (self.joe, self.frank, bob)]
+
+        msgs = [self.create_incoming_msg(self.joe, f"Msg {i}") for i in range(3)]
+
+        # results are the same as paging through the endpoint but all at once
+        results, trailer = stream("api.v2.runs")
+        self.assertEqual(self.fetchJSON(reverse("api.v2.runs")).json()["results"], results)
+        self.assertEqual([r.id for r in reversed(runs)], [r["id"] for r in results])
+        self.assertTrue(trailer["complete"])
+
+        results, trailer = stream("api.v2.messages", "&folder=incoming")
+        self.assertEqual([m.id for m in reversed(msgs)], [r["id"] for r in results])
+
+        results, trailer = stream("api.v2.contacts")
+        self.assertEqual(self.fetchJSON(reverse("api.v2.contacts")).json()["results"], results)
+
+        # filters still apply
+        results, trailer = stream("api.v2.runs", f"&contact={self.joe.uuid}")
+        self.assertEqual([runs[0].id], [r["id"] for r in results])
+
+        # a stream which hits the limit can be resumed from its trailer cursor
+        with override_settings(API_STREAM_MAX_RESULTS=2):
+            results, trailer = stream("api.v2.runs", "&reverse=true")
+            self.assertEqual([runs[0].id, runs[1].id], [r["id"] for r in results])
+            self.assertFalse(trailer["complete"])
+
+            results, trailer = stream("api.v2.runs", f"&reverse=true&resume={trailer['cursor']}")
+            self.assertEqual([runs[2].id], [r["id"] for r in results])
+            self.assertTrue(trailer["complete"])
+
+            # and resuming again later only returns what has been modified since
+            cursor = trailer["cursor"]
+            results, trailer = stream("api.v2.runs", f"&reverse=true&resume={cursor}")
+            self.assertEqual([], results)
+            self.assertEqual({"cursor": cursor, "complete": True}, trailer)
+
+            FlowRun.objects.filter(id=runs[1].id).update(modified_on=timezone.now())
+
+            results, trailer = stream("api.v2.runs", f"&reverse=true&resume={cursor}")
+            self.assertEqual([runs[1].id], [r["id"] for r in results])
+
+        # mixed orderings break ties in the direction of their own id term, across batches and resumes
+        self.create_contact("Ann", phone="+250788000002")
+        contacts = list(self.org.contacts.filter(is_active=True, status=Contact.STATUS_ACTIVE).order_by("id"))
+        self.org.contacts.filter(id__in=[c.id for c in contacts]).update(created_on=timezone.now())
+
+        results, trailer = stream("api.v2.contacts", "&order_by=-created_on")
+        self.assertEqual([c.id for c in contacts], [r["id"] for r in results])
+        self.assertEqual(self.fetchJSON(reverse("api.v2.contacts"), "order_by=-created_on").json()["results"], results)
+
+        with override_settings(API_STREAM_MAX_RESULTS=2):
+            results, trailer = stream("api.v2.contacts", "&order_by=-created_on")
+            self.assertEqual([contacts[0].id, contacts[1].id], [r["id"] for r in results])
+
+            results, trailer = stream("api.v2.contacts", f"&order_by=-created_on&resume={trailer['cursor']}")
+            self.assertEqual([contacts[2].id, contacts[3].id], [r["id"] for r in results])
+
+        response = self.fetchJSON(reverse("api.v2.runs"), "stream=true&resume=xyz")
+        self.assertResponseError(response, None, "Invalid stream cursor")
+
+        # endpoints which don't support streaming ignore it
+        response = self.fetchJSON(reverse("api.v2.fields"), "stream=true")
+        self.assertEqual(200, response.status_code)
+        self.assertIn("results", response.json())
+
+    def test_hydrators(self):
+        # engine timestamps are reformatted without parsing, anything else is parsed
+        self.assertEqual("2019-06-28T06:37:02.628152Z", format_engine_datetime("2019-06-28T06:37:02.628152471Z"))
+        self.assertEqual("2019-06-28T06:37:02.620000Z", format_engine_datetime("2019-06-28T06:37:02.62Z"))
+        self.assertEqual("2019-06-28T06:37:02.000000Z", format_engine_datetime("2019-06-28T06:37:02Z"))
+        self.assertEqual("2019-06-28T04:37:02.628152Z", format_engine_datetime("2019-06-28T06:37:02.628152+02:00"))
+
+        flow = self.get_flow("color_v13")
+        color_prompt, color_split = flow.get_definition()["nodes"][0], flow.get_definition()["nodes"][4]
+        start = FlowStart.create(flow, self.admin, contacts=[self.joe])
+        joe_msg = self.create_incoming_msg(self.joe, "it is blue")
+
+        (
+            MockSessionWriter(self.joe, flow, start=start)
+            .visit(color_prompt)
+            .visit(color_split)
+            .wait()
+            .resume(msg=joe_msg)
+            .set_result("Color", "blue", "Blue", "it is blue")
+            .complete()
+            .save()
+        )
+        MockSessionWriter(self.frank, flow).visit(color_prompt).wait().save()
+
+        self.create_outgoing_msg(self.frank, "Hi", attachments=["image/jpeg:https://example.com/test.jpg"])
+        self.create_outgoing_msg(self.joe, "Surveys!", msg_type="F", surveyor=True)
+        self.create_label("Spam").toggle_label([joe_msg], add=True)
+
+        def assert_hydrated(hydrator_class, serializer_class, queryset, num_queries):
+            objs = list(queryset.order_by("id"))
+            rows = list(queryset.order_by("id").values(*hydrator_class.fields))
+
+            with self.assertNumQueries(num_queries):
+                actual = hydrator_class(self.org, using="default").hydrate(rows)
+
+            expected = serializer_class(objs, many=True, context={"org": self.org}).data
+            self.assertEqual(json.loads(JSONRenderer().render(expected)), json.loads(JSONRenderer().render(actual)))
+
+        assert_hydrated(FlowRunHydrator, FlowRunReadSerializer, FlowRun.objects.filter(org=self.org), 4)
+        assert_hydrated(MsgHydrator, MsgReadSerializer, Msg.objects.filter(org=self.org), 4)
+
+        # anon orgs don't need URNs
+        with AnonymousOrg(self.org):
+            assert_hydrated(FlowRunHydrator, FlowRunReadSerializer, FlowRun.objects.filter(org=self.org), 3)
+            assert_hydrated(MsgHydrator, MsgReadSerializer, Msg.objects.filter(org=self.org), 3)
+
+        # nothing to load for an empty page
+        with self.assertNumQueries(0):
+            self.assertEqual([], FlowRunHydrator(self.org, using="default").hydrate([]))
+            self.assertEqual([], MsgHydrator(self.org, using="default").hydrate([]))
+
     def test_message_actions(self):
         url = reverse("api.v2.message_actions")
         self.assertEndpointAccess(url, fetch_returns=405)
@@ -7579,7 +8035,7 @@ class EventsGroupByCountEndpointTest(APIJSONMixin, TembaTest):
 
 
 class EventsHealthCheckEndpointTest(APITest):
-    @patch("temba.api.v2.views.dl_get_events")
+    @patch("temba.api.v2.services.events.dl_get_events")
     def test_health_check_success(self, mock_dl_get_events):
         """Test successful health check"""
         url = reverse("api.v2.events_healthcheck")
@@ -7606,7 +8062,7 @@ class EventsHealthCheckEndpointTest(APITest):
         self.assertTrue(call_kwargs["date_start"].endswith("Z"))
         self.assertTrue(call_kwargs["date_end"].endswith("Z"))
 
-    @patch("temba.api.v2.views.dl_get_events")
+    @patch("temba.api.v2.services.events.dl_get_events")
     def test_health_check_service_error(self, mock_dl_get_events):
         """Test health check when dl_get_events raises an exception"""
         url = reverse("api.v2.events_healthcheck")
@@ -7758,3 +8214,244 @@ class EventsServiceTest(APITest):
         self.assertEqual(results, [{"group_value": "foo", "count": 5}])
         # ensure standard not called when silver=true
         mock_dl_counts.assert_not_called()
+
+    @patch("temba.api.v2.services.events.dl_get_events")
+    def test_fetch_events_for_org_only_parses_json_columns(self, mock_dl_get_events):
+        self.org.proj_uuid = uuid.uuid4()
+        self.org.save()
+
+        mock_dl_get_events.return_value = [
+            {"key": "123", "value": "123", "metadata": "[1, 2]", "contact_urn": "true", "date": "1700000000000"},
+            {"key": "x", "value": "plain", "date": 1700000000000},
+            {"key": "y", "date": "2024-01-01T00:00:00Z"},
+        ]
+
+        from temba.api.v2.services.events import fetch_events_for_org
+
+        start_date = iso8601.parse_date("2024-01-01T00:00:00Z")
+        end_date = iso8601.parse_date("2024-01-31T23:59:59Z")
+
+        results = fetch_events_for_org(self.admin, date_start=start_date, date_end=end_date)
+
+        self.assertEqual(
+            [
+                {
+                    "key": "123",
+                    "value": 123,
+                    "metadata": [1, 2],
+                    "contact_urn": "true",
+                    "date": "2023-11-14T22:13:20Z",
+                },
+                {"key": "x", "value": "plain", "date": "2023-11-14T22:13:20Z"},
+                {"key": "y", "date": "2024-01-01T00:00:00Z"},
+            ],
+            results,
+        )
+
+    @patch("temba.api.v2.services.events.dl_get_events")
+    def test_fetch_events_for_org_caches_results(self, mock_dl_get_events):
+        self.org.proj_uuid = uuid.uuid4()
+        self.org.save()
+
+        mock_dl_get_events.return_value = [{"payload": '{"k": 1.5}', "date": "1700000000000"}]
+
+        from temba.api.v2.services.events import fetch_events_for_org
+
+        start_date = iso8601.parse_date("2024-01-01T00:00:00Z")
+        end_date = iso8601.parse_date("2024-01-31T23:59:59Z")
+
+        results1 = fetch_events_for_org(self.admin, date_start=start_date, date_end=end_date, event_name="x")
+        results2 = fetch_events_for_org(self.admin, event_name="x", date_end=end_date, date_start=start_date)
+
+        # identical filters only query the datalake once, and give identical results
+        self.assertEqual(1, mock_dl_get_events.call_count)
+        self.assertEqual([{"payload": {"k": 1.5}, "date": "2023-11-14T22:13:20Z"}], results1)
+        self.assertEqual(results1, results2)
+
+        # ranges which ended a while ago are cached for longer
+        r = get_redis_connection()
+        (key,) = r.keys("datalake_events:events:*")
+        self.assertEqual(3600, r.ttl(key))
+
+        fetch_events_for_org(self.admin, date_start=start_date, date_end=end_date, event_name="y")
+        self.assertEqual(2, mock_dl_get_events.call_count)
+
+        # whereas recent ones aren't cached for long
+        r.delete(*r.keys("datalake_events:events:*"))
+        fetch_events_for_org(self.admin, date_start=start_date, date_end=timezone.now())
+        (key,) = r.keys("datalake_events:events:*")
+        self.assertEqual(15, r.ttl(key))
+
+    @override_settings(DATALAKE_EVENTS_QUERY_TIMEOUT=1)
+    @patch("temba.api.v2.services.events.dl_get_events")
+    def test_fetch_events_for_org_single_flight(self, mock_dl_get_events):
+        self.org.proj_uuid = uuid.uuid4()
+        self.org.save()
+
+        mock_dl_get_events.return_value = [{"key": "fresh"}]
+
+        from temba.api.v2.services.events import fetch_events_for_org
+
+        # a user whose org doesn't need a query so the service can be called from another thread
+        user = SimpleNamespace(get_org=lambda: self.org)
+        start_date = iso8601.parse_date("2024-01-01T00:00:00Z")
+        end_date = iso8601.parse_date("2024-01-31T23:59:59Z")
+
+        r = get_redis_connection()
+
+        fetch_events_for_org(user, date_start=start_date, date_end=end_date)
+        (key,) = r.keys("datalake_events:events:*")
+        r.delete(key)
+        lock = r.lock(key.decode().replace("datalake_events:", "datalake_events_lock:"), timeout=10)
+
+        # while an identical query is in flight we wait for it, and use its results once it's done
+        lock.acquire()
+        results = []
+        waiter = threading.Thread(
+            target=lambda: results.append(fetch_events_for_org(user, date_start=start_date, date_end=end_date))
+        )
+        waiter.start()
+        time.sleep(0.2)
+        r.set(key, '[{"key": "in-flight"}]', ex=60)
+        lock.release()
+        waiter.join()
+
+        self.assertEqual([[{"key": "in-flight"}]], results)
+        self.assertEqual(1, mock_dl_get_events.call_count)
+
+        # but if it takes too long, we run our own query
+        r.delete(key)
+        lock.acquire()
+        self.assertEqual([{"key": "fresh"}], fetch_events_for_org(user, date_start=start_date, date_end=end_date))
+        self.assertEqual(2, mock_dl_get_events.call_count)
+        lock.release()
+
+    @override_settings(DATALAKE_EVENTS_QUERY_TIMEOUT=1)
+    @patch("temba.api.v2.services.events.dl_get_events")
+    def test_fetch_events_for_org_outlasting_lock(self, mock_dl_get_events):
+        self.org.proj_uuid = uuid.uuid4()
+        self.org.save()
+
+        def slow_get_events(**kwargs):
+            time.sleep(1.2)
+            return [{"key": "slow"}]
+
+        mock_dl_get_events.side_effect = slow_get_events
+
+        from temba.api.v2.services.events import fetch_events_for_org
+
+        start_date = iso8601.parse_date("2024-01-01T00:00:00Z")
+        end_date = iso8601.parse_date("2024-01-31T23:59:59Z")
+
+        # a query which takes longer than the lock timeout still returns and caches its results, without rerunning
+        results = fetch_events_for_org(self.admin, date_start=start_date, date_end=end_date)
+
+        self.assertEqual([{"key": "slow"}], results)
+        self.assertEqual(1, mock_dl_get_events.call_count)
+        self.assertEqual([], get_redis_connection().keys("datalake_events_lock:*"))
+
+        self.assertEqual(results, fetch_events_for_org(self.admin, date_start=start_date, date_end=end_date))
+        self.assertEqual(1, mock_dl_get_events.call_count)
+
+    @patch("temba.api.v2.services.events.dl_get_events")
+    def test_health_check_results_are_shared(self, mock_dl_get_events):
+        mock_dl_get_events.return_value = []
+        url = reverse("api.v2.events_healthcheck")
+
+        with patch.dict("os.environ", {"EVENTS_HEALTH_CHECK_PROJECT_UUID": "123e4567-e89b-12d3-a456-426614174000"}):
+            self.assertEqual(200, self.fetchJSON(url).status_code)
+            self.assertEqual(200, self.fetchJSON(url).status_code)
+
+        self.assertEqual(1, mock_dl_get_events.call_count)
+
+
+class DefaultLimitOffsetPaginationTest(TembaTest):
+    def setUp(self):
+        super().setUp()
+
+        self.contacts = [self.create_contact(f"Contact {i}", phone=f"+25078800{i:04d}") for i in range(7)]
+        self.factory = APIRequestFactory()
+
+    def paginate(self, queryset, **params):
+        paginator = DefaultLimitOffsetPagination()
+        page = paginator.paginate_queryset(queryset, Request(self.factory.get("/api/v2/things", params)))
+        return paginator, page, json.loads(JSONRenderer().render(paginator.get_paginated_response([]).data))
+
+    def test_counts(self):
+        contacts = Contact.objects.filter(org=self.org).order_by("-created_on")
+
+        paginator, page, data = self.paginate(contacts, limit=3)
+        self.assertEqual(7, data["count"])
+        self.assertEqual(self.contacts[6:3:-1], page)
+
+        # counts are cached so a new contact isn't counted straight away
+        self.create_contact("Bob", phone="+250788001234")
+
+        paginator, page, data = self.paginate(contacts, limit=3)
+        self.assertEqual(7, data["count"])
+
+        paginator, page, data = self.paginate(contacts, limit=3, count="exact")
+        self.assertEqual(8, data["count"])
+
+        # small estimates are replaced by exact counts
+        paginator, page, data = self.paginate(contacts, limit=3, count="estimated")
+        self.assertEqual(8, data["count"])
+
+        with patch("temba.api.v2.views_base.DefaultLimitOffsetPagination.get_estimated_count", return_value=5000):
+            paginator, page, data = self.paginate(contacts, limit=3, count="estimated")
+            self.assertEqual(5000, data["count"])
+
+        with self.assertNumQueries(1):
+            paginator, page, data = self.paginate(contacts, limit=3, count="none")
+
+        self.assertIsNone(data["count"])
+        self.assertIsNotNone(data["next"])
+
+    def test_next_links(self):
+        contacts = Contact.objects.filter(org=self.org).order_by("-created_on")
+
+        paginator, page, data = self.paginate(contacts, limit=3, offset=3)
+        self.assertEqual(self.contacts[3:0:-1], page)
+        self.assertEqual("http://testserver/api/v2/things?limit=3&offset=6", data["next"])
+        self.assertEqual("http://testserver/api/v2/things?limit=3", data["previous"])
+
+        paginator, page, data = self.paginate(contacts, limit=3, offset=6)
+        self.assertEqual([self.contacts[0]], page)
+        self.assertIsNone(data["next"])
+
+        # past the max offset, next links switch to cursors
+        with patch("temba.api.v2.views_base.DefaultLimitOffsetPagination.max_offset", 2):
+            paginator, page, data = self.paginate(contacts, limit=2, offset=2)
+            self.assertEqual(self.contacts[4:2:-1], page)
+            self.assertIn("cursor=", data["next"])
+            self.assertNotIn("offset=", data["next"])
+
+            cursor = data["next"].split("cursor=")[1]
+
+        paginator, page, data = self.paginate(contacts, limit=2, cursor=cursor)
+        self.assertEqual(self.contacts[2:0:-1], page)
+        self.assertIsNone(data["previous"])
+
+        paginator, page, data = self.paginate(contacts, limit=2, cursor=data["next"].split("cursor=")[1])
+        self.assertEqual([self.contacts[0]], page)
+        self.assertIsNone(data["next"])
+
+        with self.assertRaises(NotFound):
+            self.paginate(contacts, limit=2, cursor="xyz")
+
+        # nullable fields can't be used for cursors so deep pages stay on offsets
+        with patch("temba.api.v2.views_base.DefaultLimitOffsetPagination.max_offset", 2):
+            paginator, page, data = self.paginate(
+                Contact.objects.filter(org=self.org).order_by("name"), limit=2, offset=2
+            )
+            self.assertEqual("http://testserver/api/v2/things?limit=2&offset=4", data["next"])
+
+    def test_keyset_ordering(self):
+        get_ordering = DefaultLimitOffsetPagination.get_keyset_ordering
+
+        self.assertEqual(("-created_on", "-id"), get_ordering(Contact.objects.order_by("-created_on")))
+        self.assertEqual(("uuid", "id"), get_ordering(Contact.objects.order_by("uuid", "id")))
+        self.assertIsNone(get_ordering(Contact.objects.order_by("name")))
+        self.assertIsNone(get_ordering(Contact.objects.order_by("org__name")))
+        self.assertIsNone(get_ordering(Contact.objects.order_by("?")))
+        self.assertIsNone(get_ordering(Contact.objects.values("uuid").order_by("uuid")))
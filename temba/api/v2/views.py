@@ -1,6 +1,5 @@
 import itertools
 import os
-from datetime import timedelta
 from enum import Enum
 from types import SimpleNamespace
 
@@ -12,7 +11,6 @@ from rest_framework.response import Response
 from rest_framework.reverse import reverse
 from smartmin.views import SmartFormView, SmartTemplateView
 from weni_commons.kong import api_gateway_expose
-from weni_datalake_sdk.clients.redshift.events import get_events as dl_get_events
 
 from django import forms
 from django.contrib.auth import authenticate, login
@@ -21,7 +19,6 @@ from django.db import connection
 from django.db.models import Count, Prefetch, Q
 from django.http import HttpResponse, JsonResponse
 from django.shortcuts import get_object_or_404
-from django.utils import timezone
 from django.utils.translation import ugettext_lazy as _
 from django.views.decorators.csrf import csrf_exempt
 
@@ -43,7 +40,7 @@ from temba.api.v2.views_base import (
 )
 from temba.archives.models import Archive
 from temba.campaigns.models import Campaign, CampaignEvent
-from temba.channels.models import Channel, ChannelEvent
+from temba.channels.models import Channel, ChannelCount, ChannelEvent
 from temba.classifiers.models import Classifier
 from temba.contacts.models import URN, Contact, ContactField, ContactGroup, ContactGroupCount, ContactURN
 from temba.externals.models import ExternalService
@@ -60,6 +57,7 @@ from temba.wpp_products.models import Product
 
 from ..models import SSLPermission
 from ..support import InvalidQueryError
+from .hydrators import FlowRunHydrator, MsgHydrator
 from .serializers import (
     AdminBoundaryReadSerializer,
     ArchiveReadSerializer,
@@ -1544,6 +1542,7 @@ class ChannelsEndpoint(ListAPIMixin, BaseAPIView):
         * **network_type** - the type of network the device is connected to as reported by Android (string).
      * **last_seen** - the datetime when this channel was last seen (datetime).
      * **created_on** - the datetime when this channel was created (datetime).
+     * **counts** - the total message, IVR, log and error counts of the channel, only included if `counts=true`.
 
     Example:
 
@@ -1578,6 +1577,7 @@ class ChannelsEndpoint(ListAPIMixin, BaseAPIView):
     model = Channel
     serializer_class = ChannelReadSerializer
     pagination_class = CreatedOnCursorPagination
+    versioned_resources = ("channels",)
 
     def filter_queryset(self, queryset):
         params = self.request.query_params
@@ -1595,6 +1595,17 @@ class ChannelsEndpoint(ListAPIMixin, BaseAPIView):
 
         return queryset
 
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        context["include_counts"] = str_to_bool(self.request.query_params.get("counts", "false"))
+        return context
+
+    def prepare_for_serialization(self, object_list, using: str):
+        if str_to_bool(self.request.query_params.get("counts", "false")):
+            channel_counts = ChannelCount.get_summaries(object_list)
+            for channel in object_list:
+                channel.count_summary = channel_counts[channel]
+
     @classmethod
     def get_read_explorer(cls):
         return {
@@ -1609,6 +1620,7 @@ class ChannelsEndpoint(ListAPIMixin, BaseAPIView):
                     "help": "A channel UUID to filter by. ex: 09d23a05-47fe-11e4-bfe9-b8f6b119e9ab",
                 },
                 {"name": "address", "required": False, "help": "A channel address to filter by. ex: +250783530001"},
+                {"name": "counts", "required": False, "help": "Whether to include message and log counts"},
             ],
         }
 
@@ -1924,6 +1936,23 @@ class ContactsEndpoint(ListAPIMixin, WriteAPIMixin, DeleteAPIMixin, BaseAPIView)
             }]
         }
 
+    ## Streaming Contacts
+
+    To sync all of your contacts, pass `stream=true` to receive every matching contact as a line of NDJSON rather than
+    a page at a time. Streams accept the same filters and ordering, cost a fixed amount of your rate limit, and end
+    with a trailer line holding a cursor which can be passed back as `resume` to continue after the last contact, e.g.
+    if a stream is cut short or, with `reverse=true`, to later fetch what has been modified since.
+
+    Example:
+
+        GET /api/v2/contacts.json?stream=true&reverse=true&after=2024-01-01T00:00:00.000
+
+    Response is one contact per line followed by the trailer:
+
+        {"uuid": "09d23a05-47fe-11e4-bfe9-b8f6b119e9ab", ...}
+        {"uuid": "f1ea776e-b3d7-4f8b-8dba-cf5c1b0f4a11", ...}
+        {"cursor": "WyIyMDI0LTAxLTAyVDEwOjAwOjAwKzAwOjAwIiwgMTI0XQ==", "complete": true}
+
     ## Adding Contacts
 
     You can add a new contact to your account by sending a **POST** request to this URL with the following JSON data:
@@ -2011,6 +2040,7 @@ class ContactsEndpoint(ListAPIMixin, WriteAPIMixin, DeleteAPIMixin, BaseAPIView)
     write_serializer_class = ContactWriteSerializer
     write_with_transaction = False
     pagination_class = ContactsCursorPagination
+    streamable = True
     throttle_scope = "v2.contacts"
     lookup_params = {"uuid": "uuid", "urn": "urns__identity", "name": "name"}
 
@@ -2963,6 +2993,7 @@ class DefinitionsEndpoint(BaseAPIView):
     """
 
     permission = "orgs.org_api"
+    versioned_resources = ("flows", "campaigns", "triggers", "fields", "groups")
 
     class Depends(Enum):
         none = 0
@@ -3116,6 +3147,7 @@ class FieldsEndpoint(ListAPIMixin, WriteAPIMixin, BaseAPIView):
     serializer_class = ContactFieldReadSerializer
     write_serializer_class = ContactFieldWriteSerializer
     pagination_class = CreatedOnCursorPagination
+    versioned_resources = ("fields",)
     lookup_params = {"key": "key"}
 
     def derive_queryset(self):
@@ -3223,6 +3255,7 @@ class FlowsEndpoint(ListAPIMixin, BaseAPIView):
     model = Flow
     serializer_class = FlowReadSerializer
     pagination_class = CreatedOnCursorPagination
+    versioned_resources = ("flows",)
 
     FLOW_TYPES = {v: k for k, v in FlowReadSerializer.FLOW_TYPES.items()}
 
@@ -3566,6 +3599,7 @@ class GroupsEndpoint(ListAPIMixin, WriteAPIMixin, DeleteAPIMixin, BaseAPIView):
     serializer_class = ContactGroupReadSerializer
     write_serializer_class = ContactGroupWriteSerializer
     pagination_class = CreatedOnCursorPagination
+    versioned_resources = ("groups",)
     exclusive_params = ("uuid", "name")
 
     def filter_queryset(self, queryset):
@@ -3743,6 +3777,7 @@ class LabelsEndpoint(ListAPIMixin, WriteAPIMixin, DeleteAPIMixin, BaseAPIView):
     serializer_class = LabelReadSerializer
     write_serializer_class = LabelWriteSerializer
     pagination_class = CreatedOnCursorPagination
+    versioned_resources = ("labels",)
     exclusive_params = ("uuid", "name")
 
     def filter_queryset(self, queryset):
@@ -3887,6 +3922,23 @@ class MessagesEndpoint(ListAPIMixin, BaseAPIView):
             },
             ...
         }
+
+    ## Streaming Messages
+
+    To sync all of your messages, pass `stream=true` to receive every matching message as a line of NDJSON rather than
+    a page at a time. Streams accept the same filters and ordering, cost a fixed amount of your rate limit, and end
+    with a trailer line holding a cursor which can be passed back as `resume` to continue after the last message, e.g.
+    if a stream is cut short.
+
+    Example:
+
+        GET /api/v2/messages.json?stream=true&folder=incoming&after=2024-01-01T00:00:00.000
+
+    Response is one message per line followed by the trailer:
+
+        {"id": 4105427, ...}
+        {"id": 4105426, ...}
+        {"cursor": "WyIyMDI0LTAxLTAyVDEwOjAwOjAwKzAwOjAwIiwgNDEwNTQyNl0=", "complete": true}
     """
 
     class Pagination(CreatedOnCursorPagination):
@@ -3908,7 +3960,9 @@ class MessagesEndpoint(ListAPIMixin, BaseAPIView):
     permission = "msgs.msg_api"
     model = Msg
     serializer_class = MsgReadSerializer
+    hydrator_class = MsgHydrator
     pagination_class = Pagination
+    streamable = True
     exclusive_params = ("contact", "folder", "label", "broadcast")
     throttle_scope = "v2.messages"
 
@@ -3974,14 +4028,6 @@ class MessagesEndpoint(ListAPIMixin, BaseAPIView):
             else:
                 queryset = queryset.filter(pk=-1)
 
-        # use prefetch rather than select_related for foreign keys to avoid joins
-        queryset = queryset.prefetch_related(
-            Prefetch("contact", queryset=Contact.objects.only("uuid", "name")),
-            Prefetch("contact_urn", queryset=ContactURN.objects.only("scheme", "path", "display")),
-            Prefetch("channel", queryset=Channel.objects.only("uuid", "name")),
-            Prefetch("labels", queryset=Label.label_objects.only("uuid", "name").order_by("pk")),
-        )
-
         # incoming folder gets sorted by 'modified_on'
         if self.request.query_params.get("folder", "").lower() == "incoming":
             return self.filter_before_after(queryset, "modified_on")
@@ -4454,12 +4500,31 @@ class RunsEndpoint(ListAPIMixin, BaseAPIView):
             },
             ...
         }
+
+    ## Streaming Runs
+
+    To sync all of your runs, pass `stream=true` to receive every matching run as a line of NDJSON rather than a page
+    at a time. Streams accept the same filters and ordering, cost a fixed amount of your rate limit, and end with a
+    trailer line holding a cursor which can be passed back as `resume` to continue after the last run, e.g. if a stream
+    is cut short or, with `reverse=true`, to later fetch what has been modified since.
+
+    Example:
+
+        GET /api/v2/runs.json?stream=true&reverse=true&after=2024-01-01T00:00:00.000
+
+    Response is one run per line followed by the trailer:
+
+        {"id": 123, ...}
+        {"id": 124, ...}
+        {"cursor": "WyIyMDI0LTAxLTAyVDEwOjAwOjAwKzAwOjAwIiwgMTI0XQ==", "complete": true}
     """
 
     permission = "flows.flow_api"
     model = FlowRun
     serializer_class = FlowRunReadSerializer
+    hydrator_class = FlowRunHydrator
     pagination_class = ModifiedOnCursorPagination
+    streamable = True
     exclusive_params = ("contact", "flow")
     throttle_scope = "v2.runs"
 
@@ -4499,14 +4564,6 @@ class RunsEndpoint(ListAPIMixin, BaseAPIView):
         if str_to_bool(params.get("responded")):
             queryset = queryset.filter(responded=True)
 
-        # use prefetch rather than select_related for foreign keys to avoid joins
-        queryset = queryset.prefetch_related(
-            Prefetch("flow", queryset=Flow.objects.only("uuid", "name", "base_language")),
-            Prefetch("contact", queryset=Contact.objects.only("uuid", "name", "language")),
-            Prefetch("contact__urns", ContactURN.objects.order_by("-priority", "id")),
-            Prefetch("start", queryset=FlowStart.objects.only("uuid")),
-        )
-
         return self.filter_before_after(queryset, "modified_on")
 
     @classmethod
@@ -4798,6 +4855,7 @@ class TemplatesEndpoint(ListAPIMixin, BaseAPIView):
     model = Template
     serializer_class = TemplateReadSerializer
     pagination_class = ModifiedOnCursorPagination
+    versioned_resources = ("templates", "channels")
 
     def filter_queryset(self, queryset):
         params = self.request.query_params
@@ -5683,24 +5741,10 @@ class EventsHealthCheckEndpoint(views.APIView):
 
     def get(self, request, *args, **kwargs):
         try:
+            from temba.api.v2.services.events import check_events_health
+
             # Get project_id from environment variable (assumed to be valid UUID string)
-            project_id = os.environ.get("EVENTS_HEALTH_CHECK_PROJECT_UUID")
-
-            # Prepare minimal test parameters (last 24 hours, limit 1 for quick check)
-            date_end = timezone.now()
-            date_start = date_end - timedelta(hours=24)
-
-            # Format dates as UTC ISO strings with Z suffix
-            date_start_str = date_start.astimezone(timezone.utc).isoformat().replace("+00:00", "Z")
-            date_end_str = date_end.astimezone(timezone.utc).isoformat().replace("+00:00", "Z")
-
-            # Check if events are available for this project
-            dl_get_events(
-                project=project_id,
-                date_start=date_start_str,
-                date_end=date_end_str,
-                limit=1,
-            )
+            check_events_health(os.environ.get("EVENTS_HEALTH_CHECK_PROJECT_UUID"))
 
             # If we got here without exception, the service is working
             return Response(
@@ -1,16 +1,27 @@
+import base64
 import contextlib
+import hashlib
+import json
 from uuid import UUID
 
 import iso8601
+from django_redis import get_redis_connection
 from rest_framework import generics, mixins, status
+from rest_framework.exceptions import NotFound
 from rest_framework.pagination import CursorPagination, LimitOffsetPagination
 from rest_framework.response import Response
+from rest_framework.utils.encoders import JSONEncoder
+from rest_framework.utils.urls import remove_query_param, replace_query_param
 from weni_commons.auth import SessionTokenAuthentication
 
 from django.conf import settings
 from django.contrib.auth import get_user_model
-from django.core.exceptions import ValidationError
-from django.db import transaction
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.db import connections, transaction
+from django.db.models import Q, QuerySet
+from django.http import StreamingHttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
 
 from temba.api.auth.jwt import OptionalJWTAuthentication
 from temba.api.models import APIPermission, SSLPermission
@@ -19,8 +30,10 @@ from temba.api.support import (
     APISessionAuthentication,
     APITokenAuthentication,
     InvalidQueryError,
+    NotModified,
 )
 from temba.api.v2.permissions import HasValidJWT
+from temba.api.versions import ResourceVersions
 from temba.contacts.models import URN
 from temba.utils import str_to_bool
 from temba.utils.views import NonAtomicMixin
@@ -46,6 +59,44 @@ class BaseAPIView(NonAtomicMixin, generics.GenericAPIView):
     model_manager = "objects"
     lookup_params = {"uuid": "uuid"}
 
+    # kinds of resource (see temba.api.versions) whose versions determine whether a GET is unchanged
+    versioned_resources = ()
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+
+        self.etag, self.last_modified = None, None
+
+        # requests for docs, i.e. without a format, don't have an ETag
+        if request.method == "GET" and self.versioned_resources and kwargs.get("format"):
+            self.check_not_modified(request)
+
+    def check_not_modified(self, request):
+        """
+        Checks the versions of this endpoint's resources for the org, and if the client has the current representation
+        then answers with a 304 before anything is fetched from the database
+        """
+        org = self.get_org()
+        if not org:
+            return
+
+        versions = ResourceVersions.get(org.id, self.versioned_resources)
+        self.etag = ResourceVersions.get_etag(org.id, request.build_absolute_uri(), versions)
+        self.last_modified = max(versions) // 1000
+
+        not_modified = get_conditional_response(request, etag=self.etag, last_modified=self.last_modified)
+
+        ResourceVersions.record(type(self).__name__, hit=not_modified is not None)
+
+        if not_modified is not None:
+            raise NotModified(not_modified)
+
+    def handle_exception(self, exc):
+        if isinstance(exc, NotModified):
+            return exc.response
+
+        return super().handle_exception(exc)
+
     def perform_authentication(self, request):
         super().perform_authentication(request)
 
@@ -158,6 +209,20 @@ class BaseAPIView(NonAtomicMixin, generics.GenericAPIView):
 
         return None
 
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(request, response, *args, **kwargs)
+
+        # let clients see how much of their rate limit they have left
+        for header, value in getattr(request, "throttle_headers", {}).items():
+            response[header] = value
+
+        if getattr(self, "etag", None) and response.status_code in (200, 304):
+            response["ETag"] = self.etag
+            response["Last-Modified"] = http_date(self.last_modified)
+            response["Cache-Control"] = "private, no-cache"
+
+        return response
+
     def options(self, request, *args, **kwargs):
         """
         Disable the default behaviour of OPTIONS returning serializer fields since we typically have two serializers
@@ -250,6 +315,12 @@ class ListAPIMixin(mixins.ListModelMixin):
 
     exclusive_params = ()
 
+    # optional hydrator which builds results from values() rows instead of serializing model instances
+    hydrator_class = None
+
+    # whether the endpoint can stream all matching results as NDJSON with stream=true
+    streamable = False
+
     def get(self, request, *args, **kwargs):
         return self.list(request, *args, **kwargs)
 
@@ -259,9 +330,136 @@ class ListAPIMixin(mixins.ListModelMixin):
         if not kwargs.get("format", None):
             # if this is just a request to browse the endpoint docs, don't make a query
             return Response([])
+        elif self.is_stream_request(request):
+            return self.list_streamed()
+        elif self.hydrator_class:
+            return self.list_hydrated()
         else:
             return super().list(request, *args, **kwargs)
 
+    def list_hydrated(self):
+        queryset = self.filter_queryset(self.get_queryset())
+        hydrator = self.hydrator_class(self.get_org(), using=queryset.db)
+
+        page = self.paginate_queryset(queryset.values(*hydrator.fields))
+
+        return self.get_paginated_response(hydrator.hydrate(page))
+
+    def is_stream_request(self, request) -> bool:
+        return self.streamable and str_to_bool(request.query_params.get("stream"))
+
+    def get_throttle_cost(self, request) -> int:
+        # a stream replaces many page requests, so costs a fixed amount of the rate limit whatever its size
+        return settings.API_STREAM_THROTTLE_COST if self.is_stream_request(request) else 1
+
+    def list_streamed(self):
+        """
+        Streams all matching results as NDJSON, in the same order as pages, fetching them in keyset batches. The last
+        line is a trailer with a cursor which can be passed back as resume to continue after the last result.
+        """
+        queryset = self.filter_queryset(self.get_queryset())
+        ordering = self.paginator.get_ordering(self.request, queryset, self)
+
+        resume = self.request.query_params.get("resume")
+        if resume:
+            queryset = queryset.filter(self._decode_stream_cursor(resume, ordering))
+
+        queryset = queryset.order_by(*ordering)
+        max_results = settings.API_STREAM_MAX_RESULTS
+
+        def stream():
+            last, num_results = None, 0
+
+            for rows, results in self._iter_stream_batches(queryset, ordering, max_results):
+                for result in results:
+                    yield json.dumps(result, cls=JSONEncoder, separators=(",", ":")) + "\n"
+
+                last = rows[-1]
+                num_results += len(rows)
+
+            if last is not None:
+                cursor = self._encode_stream_cursor(*self._get_stream_position(last, ordering))
+            else:
+                cursor = resume or None
+
+            trailer = {"cursor": cursor, "complete": num_results < max_results}
+            yield json.dumps(trailer, separators=(",", ":")) + "\n"
+
+        return StreamingHttpResponse(stream(), content_type="application/x-ndjson")
+
+    def _iter_stream_batches(self, queryset, ordering: tuple, limit: int):
+        """
+        Iterates over the queryset in batches, yielding each batch of rows with its serialized results. Each batch is
+        its own query for the rows after the last one of the previous batch, so that memory use is bounded without
+        needing a server-side cursor.
+        """
+        batch_size = settings.API_STREAM_BATCH_SIZE
+
+        if self.hydrator_class:
+            hydrator = self.hydrator_class(self.get_org(), using=queryset.db)
+            queryset = queryset.values(*hydrator.fields)
+        else:
+            hydrator = None
+
+        remaining, after = limit, None
+
+        while remaining > 0:
+            size = min(batch_size, remaining)
+            batch = list((queryset.filter(after) if after else queryset)[:size])
+            if not batch:
+                break
+
+            if hydrator:
+                yield batch, hydrator.hydrate(batch)
+            else:
+                self.prepare_for_serialization(batch, using=queryset.db)
+
+                yield batch, self.get_serializer(batch, many=True).data
+
+            if len(batch) < size:
+                break
+
+            remaining -= len(batch)
+            after = self._get_stream_after(ordering, *self._get_stream_position(batch[-1], ordering))
+
+    @staticmethod
+    def _get_stream_position(row, ordering: tuple) -> tuple:
+        field = ordering[0].lstrip("-")
+        if isinstance(row, dict):
+            return row[field], row["id"]
+        return getattr(row, field), row.id
+
+    @staticmethod
+    def _get_stream_after(ordering: tuple, position, last_id: int) -> Q:
+        """
+        Builds a filter for the rows which come after the given position, using the direction of each ordering term
+        """
+        after = Q()
+        for i, (o, value) in enumerate(zip(ordering, (position, last_id))):
+            lookup = "lt" if o.startswith("-") else "gt"
+            condition = Q(**{f"{o.lstrip('-')}__{lookup}": value})
+            if i > 0:
+                condition &= Q(**{ordering[0].lstrip("-"): position})
+
+            after |= condition
+
+        return after
+
+    @staticmethod
+    def _encode_stream_cursor(position, last_id: int) -> str:
+        token = json.dumps([position.isoformat(), last_id])
+        return base64.urlsafe_b64encode(token.encode()).decode()
+
+    @classmethod
+    def _decode_stream_cursor(cls, cursor: str, ordering: tuple) -> Q:
+        try:
+            position, last_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+            position, last_id = iso8601.parse_date(position), int(last_id)
+        except Exception:
+            raise InvalidQueryError("Invalid stream cursor")
+
+        return cls._get_stream_after(ordering, position, last_id)
+
     def check_query(self, params):
         # check user hasn't provided values for more than one of any exclusive params
         if sum([(1 if params.get(p) else 0) for p in self.exclusive_params]) > 1:
@@ -442,7 +640,185 @@ class DefaultLimitOffsetPagination(LimitOffsetPagination):
     """
     Shared LimitOffset pagination with sensible defaults for internal endpoints.
     Uses `limit` and `offset` query params with default limit of 10 and max of 100.
+
+    On large orgs counting every match can be slower than fetching the page, so how `count` is calculated can be chosen
+    with the `count` param:
+
+     * cached - an exact count, cached for a short time per query (default)
+     * exact - an exact count
+     * estimated - the query planner's estimate, or an exact count if that estimate is small
+     * none - no count
+
+    Whether there's a next page is found by fetching one more row than the limit so never needs the count. Pages after
+    max_offset are linked to with a keyset cursor instead of an offset if the queryset is ordered by fields which allow
+    it, so deep pages don't have to scan every row before them.
     """
 
+    COUNT_CACHED = "cached"
+    COUNT_EXACT = "exact"
+    COUNT_ESTIMATED = "estimated"
+    COUNT_NONE = "none"
+
+    COUNT_CACHE_KEY = "api_count:%s"
+
     default_limit = 10
     max_limit = 100
+    max_offset = 1000
+    count_query_param = "count"
+    default_count = COUNT_CACHED
+    count_cache_ttl = 30
+    estimate_exact_below = 1000
+    cursor_query_param = "cursor"
+    invalid_cursor_message = "Invalid cursor"
+
+    def paginate_queryset(self, queryset, request, view=None):
+        if not isinstance(queryset, QuerySet):
+            self.cursor, self.ordering, self.has_next = None, None, None
+            return super().paginate_queryset(queryset, request, view)
+
+        self.request = request
+        self.limit = self.get_limit(request)
+        self.offset = self.get_offset(request)
+        self.cursor = request.query_params.get(self.cursor_query_param)
+        self.ordering = self.get_keyset_ordering(queryset)
+
+        if self.ordering:
+            queryset = queryset.order_by(*self.ordering)
+
+        count_mode = request.query_params.get(self.count_query_param, self.default_count)
+        self.count = self.get_count_for_mode(queryset, count_mode)
+
+        if self.cursor:
+            if not self.ordering:
+                raise NotFound(self.invalid_cursor_message)
+
+            queryset = queryset.filter(self.decode_cursor(self.cursor))
+            self.offset = 0
+
+        rows = list(queryset[self.offset : self.offset + self.limit + 1])
+
+        self.has_next = len(rows) > self.limit
+        self.page = rows[: self.limit]
+        return self.page
+
+    def get_count_for_mode(self, queryset, mode: str):
+        if mode == self.COUNT_NONE:
+            return None
+        elif mode == self.COUNT_EXACT:
+            return self.get_count(queryset)
+        elif mode == self.COUNT_ESTIMATED:
+            estimate = self.get_estimated_count(queryset)
+            return estimate if estimate >= self.estimate_exact_below else self.get_count(queryset)
+
+        # anything else gets a cached exact count, keyed by the SQL of the query
+        sql, params = queryset.query.sql_with_params()
+        signature = hashlib.sha1(f"{queryset.db}:{sql}:{params}".encode()).hexdigest()
+        key = self.COUNT_CACHE_KEY % signature
+
+        r = get_redis_connection()
+        count = r.get(key)
+        if count is None:
+            count = self.get_count(queryset)
+            r.set(key, count, ex=self.count_cache_ttl)
+
+        return int(count)
+
+    @staticmethod
+    def get_estimated_count(queryset) -> int:
+        """
+        Gets the planner's estimate of the number of rows the query will return
+        """
+        sql, params = queryset.query.sql_with_params()
+
+        with connections[queryset.db].cursor() as cursor:
+            cursor.execute(f"EXPLAIN (FORMAT JSON) {sql}", params)
+            plan = cursor.fetchone()[0]
+
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+
+        return int(plan[0]["Plan"]["Plan Rows"])
+
+    @staticmethod
+    def get_keyset_ordering(queryset):
+        """
+        Gets the ordering of the queryset with a unique tie-breaker, or None if it can't be used for keyset paging
+        """
+        query = queryset.query
+        ordering = list(query.order_by or (queryset.model._meta.ordering if query.default_ordering else ()))
+
+        if not ordering or not all(isinstance(o, str) and o != "?" and "__" not in o for o in ordering):
+            return None
+
+        names = [o.lstrip("-") for o in ordering]
+
+        # rows of grouped values are unique if ordered by all of their values
+        if queryset._fields:
+            return tuple(ordering) if query.group_by and set(queryset._fields) <= set(names) else None
+
+        # nulls are skipped by keyset comparisons so every model field must be non-nullable
+        for name in names:
+            if name not in query.annotations:
+                try:
+                    if queryset.model._meta.get_field(name).null:
+                        return None
+                except FieldDoesNotExist:
+                    if name != "pk":
+                        return None
+
+        if not {"id", "pk"} & set(names):
+            ordering.append("-id" if ordering[-1].startswith("-") else "id")
+
+        return tuple(ordering)
+
+    def get_next_link(self):
+        if self.has_next is None:
+            return super().get_next_link()
+        if not self.has_next:
+            return None
+
+        url = self.request.build_absolute_uri()
+        next_offset = self.offset + self.limit
+
+        if self.ordering and (self.cursor or next_offset > self.max_offset):
+            url = remove_query_param(url, self.offset_query_param)
+            return replace_query_param(url, self.cursor_query_param, self.encode_cursor(self.page[-1]))
+
+        return replace_query_param(url, self.offset_query_param, next_offset)
+
+    def get_previous_link(self):
+        # cursors only go forwards
+        if self.cursor:
+            return None
+
+        return super().get_previous_link()
+
+    def encode_cursor(self, row) -> str:
+        values = []
+        for o in self.ordering:
+            name = o.lstrip("-")
+            value = row[name] if isinstance(row, dict) else getattr(row, name)
+            values.append(value if value is None or isinstance(value, (bool, int, float, str)) else str(value))
+
+        return base64.urlsafe_b64encode(json.dumps(values, cls=JSONEncoder).encode()).decode()
+
+    def decode_cursor(self, cursor: str) -> Q:
+        """
+        Decodes a cursor into a filter for the rows which come after it in the ordering
+        """
+        try:
+            values = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+            assert isinstance(values, list) and len(values) == len(self.ordering) and None not in values
+        except Exception:
+            raise NotFound(self.invalid_cursor_message)
+
+        after = Q()
+        for i, (o, value) in enumerate(zip(self.ordering, values)):
+            lookup = "lt" if o.startswith("-") else "gt"
+            condition = Q(**{f"{o.lstrip('-')}__{lookup}": value})
+            for prev_o, prev_value in zip(self.ordering[:i], values[:i]):
+                condition &= Q(**{prev_o.lstrip("-"): prev_value})
+
+            after |= condition
+
+        return after
@@ -0,0 +1,119 @@
+import hashlib
+import time
+
+from django_redis import get_redis_connection
+
+from django.conf import settings
+
+from temba.utils import analytics
+
+# the models whose changes bump each versioned resource, and how to get the org of each
+RESOURCE_MODELS = {
+    "campaigns": {"campaigns.Campaign": lambda o: o.org_id, "campaigns.CampaignEvent": lambda o: o.campaign.org_id},
+    "channels": {"channels.Channel": lambda o: o.org_id},
+    "fields": {"contacts.ContactField": lambda o: o.org_id},
+    "flows": {
+        "flows.Flow": lambda o: o.org_id,
+        "flows.FlowRevision": lambda o: o.flow.org_id,
+        "flows.FlowLabel": lambda o: o.org_id,
+    },
+    "groups": {"contacts.ContactGroup": lambda o: o.org_id},
+    "labels": {"msgs.Label": lambda o: o.org_id},
+    "templates": {
+        "templates.Template": lambda o: o.org_id,
+        "templates.TemplateTranslation": lambda o: o.template.org_id,
+    },
+    "triggers": {"triggers.Trigger": lambda o: o.org_id},
+}
+
+
+class ResourceVersions:
+    """
+    Keeps a version per org and kind of API resource in Redis, which is bumped whenever an object of that kind is saved
+    or deleted. Versions are the time of the last change in milliseconds so they also serve as the last modified time.
+
+    Some things shown by these resources change without a model save, e.g. counts maintained by database triggers or
+    bulk updates, so versions expire after the resource's max age and are renewed. That bounds how long a client can be
+    told that something hasn't changed when it has.
+    """
+
+    KEY = "api_version:%d:%s"
+    STATS_KEY = "api_conditional_stats"
+
+    # bumps a version to now, but always past its current value so a change is never missed within the same ms
+    BUMP_SCRIPT = """
+local version = math.max(tonumber(redis.call("GET", KEYS[1]) or 0) + 1, tonumber(ARGV[1]))
+redis.call("SET", KEYS[1], version, "EX", tonumber(ARGV[2]))
+return version
+"""
+
+    _bump_script = None
+
+    @classmethod
+    def get(cls, org_id: int, resources: tuple) -> list:
+        """
+        Gets the current versions of the given resources, starting new ones where they have expired
+        """
+        r = get_redis_connection()
+        keys = [cls.KEY % (org_id, res) for res in resources]
+        versions = r.mget(keys)
+
+        missing = [i for i, v in enumerate(versions) if v is None]
+        if missing:
+            now = cls._now()
+            with r.pipeline() as pipe:
+                for i in missing:
+                    pipe.set(keys[i], now, ex=cls._max_age(resources[i]), nx=True)
+                    pipe.get(keys[i])
+                results = pipe.execute()
+
+            for i, version in zip(missing, results[1::2]):
+                versions[i] = version
+
+        return [int(v) for v in versions]
+
+    @classmethod
+    def bump(cls, org_id: int, resource: str):
+        if cls._bump_script is None:
+            cls._bump_script = get_redis_connection().register_script(cls.BUMP_SCRIPT)
+
+        cls._bump_script(keys=[cls.KEY % (org_id, resource)], args=[cls._now(), cls._max_age(resource)])
+
+    @classmethod
+    def get_etag(cls, org_id: int, path: str, versions: list) -> str:
+        digest = hashlib.sha1(f"{org_id}:{path}:{versions}".encode()).hexdigest()
+        return f'"{digest}"'
+
+    @classmethod
+    def record(cls, name: str, hit: bool):
+        """
+        Records whether a conditional request to the given endpoint could be answered as not modified
+        """
+        r = get_redis_connection()
+        with r.pipeline() as pipe:
+            pipe.hincrby(cls.STATS_KEY, f"{name}_hits", 1 if hit else 0)
+            pipe.hincrby(cls.STATS_KEY, f"{name}_misses", 0 if hit else 1)
+            hits, misses = pipe.execute()
+
+        analytics.gauge(f"temba.api_conditional.{name}_hit_ratio", hits / (hits + misses))
+
+    @classmethod
+    def get_stats(cls) -> dict:
+        """
+        Gets the hit ratios of conditional requests to each endpoint since the stats were last reset
+        """
+        counts = {k.decode(): int(v) for k, v in get_redis_connection().hgetall(cls.STATS_KEY).items()}
+        names = sorted({k.rsplit("_", 1)[0] for k in counts})
+        stats = {}
+        for name in names:
+            hits, misses = counts.get(f"{name}_hits", 0), counts.get(f"{name}_misses", 0)
+            stats[name] = {"hits": hits, "misses": misses, "ratio": hits / (hits + misses) if hits + misses else 0.0}
+        return stats
+
+    @staticmethod
+    def _max_age(resource: str) -> int:
+        return settings.API_RESOURCE_MAX_AGES.get(resource, settings.API_RESOURCE_DEFAULT_MAX_AGE)
+
+    @staticmethod
+    def _now() -> int:
+        return int(time.time() * 1000)
@@ -0,0 +1,44 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+
+from temba.campaigns.models import Campaign
+
+
+class Command(BaseCommand):  # pragma: no cover
+    help = "Benchmarks recreating and scheduling the events of a campaign one at a time vs for the whole campaign"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--campaign", type=str, required=True, help="UUID of a campaign with events")
+
+    def handle(self, *args, campaign: str, **options):
+        campaign = Campaign.objects.get(uuid=campaign, is_active=True)
+        num_events = campaign.get_events().count()
+        group_size = campaign.group.get_member_count()
+
+        assert num_events, "campaign must have at least one event"
+
+        self.stdout.write(f"campaign has {num_events} events on a group of {group_size} contacts")
+        self.stdout.write("")
+        self.stdout.write("Approach    | Time (ms)  | Queries | Tasks | Memberships scanned")
+        self.stdout.write("------------|------------|---------|-------|--------------------")
+
+        # everything is done in a transaction which is rolled back at the end, so no tasks are actually queued
+        with transaction.atomic():
+            self._time("per event", lambda: [e.recreate() for e in campaign.get_events()], num_events, group_size)
+            self._time("campaign", campaign.recreate_events, 1, group_size)
+
+            transaction.set_rollback(True)
+
+    def _time(self, label: str, recreate, num_tasks: int, group_size: int):
+        start = time.perf_counter()
+        with CaptureQueriesContext(connection) as queries:
+            recreate()
+        time_taken = (time.perf_counter() - start) * 1000
+
+        # each schedule task has mailroom walk the campaign's group once
+        scanned = num_tasks * group_size
+
+        self.stdout.write(f"{label:<11} | {time_taken:10.1f} | {len(queries):7} | {num_tasks:5} | {scanned:>19,}")
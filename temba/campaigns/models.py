@@ -1,12 +1,14 @@
+from django.conf import settings
 from django.db import models
-from django.db.models import Model
+from django.db.models import F, Model
 from django.utils import timezone
 from django.utils.text import format_lazy
 from django.utils.translation import ngettext, ugettext_lazy as _
 
 from temba import mailroom
+from temba.api.versions import ResourceVersions
 from temba.contacts.models import Contact, ContactField, ContactGroup
-from temba.flows.models import Flow
+from temba.flows.models import Flow, FlowStart
 from temba.msgs.models import Msg
 from temba.orgs.models import Org
 from temba.utils import json, on_transaction_commit
@@ -51,21 +53,65 @@ class Campaign(TembaModel):
 
         return name
 
-    def recreate_events(self):
+    def recreate_events(self) -> list:
         """
-        Recreates all the events in this campaign - called when something like the group changes.
+        Recreates all the events in this campaign - called when something like the group changes. Like
+        CampaignEvent.recreate but the events are all released and cloned together.
         """
+        events = list(self.get_events().select_related("flow"))
+        if not events:
+            return []
 
-        for event in self.get_events():
-            event.recreate()
+        # deactivate the existing events so that their fires are noops, and detach any associated flow starts
+        CampaignEvent.objects.filter(id__in=[e.id for e in events]).update(
+            is_active=False, modified_by=F("created_by"), modified_on=timezone.now()
+        )
+        FlowStart.objects.filter(campaign_event__in=events).update(campaign_event=None)
+
+        clones = []
+        for event in events:
+            flow = event.flow
+
+            # message events get new single message flows and their old ones are released
+            if event.event_type == CampaignEvent.TYPE_MESSAGE:
+                flow = Flow.create_single_message(self.org, event.created_by, event.message, event.flow.base_language)
+                event.flow.release(event.created_by)
+
+            clones.append(
+                CampaignEvent(
+                    campaign=self,
+                    relative_to_id=event.relative_to_id,
+                    offset=event.offset,
+                    unit=event.unit,
+                    event_type=event.event_type,
+                    message=event.message if event.event_type == CampaignEvent.TYPE_MESSAGE else None,
+                    flow=flow,
+                    delivery_hour=event.delivery_hour,
+                    start_mode=event.start_mode,
+                    created_by_id=event.created_by_id,
+                    modified_by_id=event.created_by_id,
+                )
+            )
+
+        # updates and bulk creates don't send post_save, so bump the API version of campaigns ourselves
+        org_id = self.org_id
+        on_transaction_commit(lambda: ResourceVersions.bump(org_id, "campaigns"))
+
+        return CampaignEvent.objects.bulk_create(clones)
 
     def schedule_events_async(self):
         """
-        Schedules all the events in this campaign - called when something like the group changes.
+        Schedules all the events in this campaign - called when something like the group changes. If mailroom supports
+        it, this is a single task for the whole campaign so that group membership is only walked once.
         """
 
-        for event in self.get_events():
-            event.schedule_async()
+        if settings.MAILROOM_SCHEDULE_CAMPAIGNS:
+            event_ids = list(self.get_events().values_list("id", flat=True))
+            if event_ids:
+                on_transaction_commit(lambda: mailroom.queue_schedule_campaign(self, event_ids))
+        else:
+            for event in self.get_events():
+                event.schedule_async()
 
     @classmethod
     def import_campaigns(cls, org, user, campaign_defs, same_site=False) -> list:
@@ -176,9 +222,17 @@ class Campaign(TembaModel):
 
         return imported
 
+    @classmethod
+    def _bump_api_versions(cls, org_ids):
+        # updates don't send post_save, so bump the API version of campaigns ourselves
+        for org_id in org_ids:
+            on_transaction_commit(lambda org_id=org_id: ResourceVersions.bump(org_id, "campaigns"))
+
     @classmethod
     def apply_action_archive(cls, user, campaigns):
+        org_ids = set(campaigns.values_list("org_id", flat=True))
         campaigns.update(is_archived=True, modified_by=user, modified_on=timezone.now())
+        cls._bump_api_versions(org_ids)
 
         # recreate events so existing event fires will be ignored
         for campaign in campaigns:
@@ -186,7 +240,9 @@ class Campaign(TembaModel):
 
     @classmethod
     def apply_action_restore(cls, user, campaigns):
+        org_ids = set(campaigns.values_list("org_id", flat=True))
         campaigns.update(is_archived=False, modified_by=user, modified_on=timezone.now())
+        cls._bump_api_versions(org_ids)
 
         for campaign in campaigns:
             # for any flow events, ensure flows are restored as well
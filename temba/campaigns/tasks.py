@@ -1,38 +1,104 @@
 import logging
+import time
 
 from django.conf import settings
+from django.db import connection
 from django.utils import timezone
-from django.utils.timesince import timesince
 
-from temba.campaigns.models import EventFire
-from temba.utils import chunk_list
+from temba.utils import analytics
 from temba.utils.celery import nonoverlapping_task
 
 logger = logging.getLogger(__name__)
 
-EVENT_FIRES_TO_TRIM = 100_000
+# unfired fires of events which have been deleted, oldest first
+TRIM_INACTIVE_SQL = """
+DELETE FROM campaigns_eventfire WHERE id IN (
+    SELECT f.id FROM campaigns_eventfire f
+    INNER JOIN campaigns_campaignevent e ON e.id = f.event_id
+    WHERE e.is_active = FALSE AND f.fired IS NULL
+    ORDER BY f.id
+    LIMIT %(limit)s
+)
+"""
+
+# fires which were fired before the retention period, walking the index on fired
+TRIM_FIRED_SQL = """
+DELETE FROM campaigns_eventfire WHERE id IN (
+    SELECT id FROM campaigns_eventfire
+    WHERE fired IS NOT NULL AND fired < %(before)s
+    ORDER BY fired
+    LIMIT %(limit)s
+)
+"""
+
+
+class BatchSizer:
+    """
+    Adjusts the size of delete batches so that each one holds its locks for roughly the target time
+    """
+
+    def __init__(self, initial: int, minimum: int, maximum: int, target: float):
+        self.size = initial
+        self.minimum = minimum
+        self.maximum = maximum
+        self.target = target
+
+    def record(self, duration: float):
+        if duration > self.target:
+            self.size = max(self.minimum, self.size // 2)
+        elif duration < self.target / 2:
+            self.size = min(self.maximum, self.size * 2)
+
+
+def trim_in_batches(sql: str, params: dict, sizer: BatchSizer, deadline: float) -> int:
+    """
+    Runs the given delete in batches until it deletes less than a full batch or the deadline passes
+    """
+    num_deleted = 0
+
+    while time.monotonic() < deadline:
+        limit = sizer.size
+        start = time.monotonic()
+
+        with connection.cursor() as cursor:
+            cursor.execute(sql, {**params, "limit": limit})
+            batch_deleted = cursor.rowcount
+
+        sizer.record(time.monotonic() - start)
+        num_deleted += batch_deleted
+
+        if batch_deleted < limit:
+            break
+
+    return num_deleted
 
 
 @nonoverlapping_task(track_started=True, name="trim_event_fires_task")
 def trim_event_fires_task():
     trim_before = timezone.now() - settings.RETENTION_PERIODS["eventfire"]
-    start = timezone.now()
+    start = time.monotonic()
+    deadline = start + settings.EVENT_FIRE_TRIM_TIME_BUDGET
 
-    # first look for unfired fires that belong to inactive events
-    trim_ids = list(
-        EventFire.objects.filter(fired=None, event__is_active=False).values_list("id", flat=True)[:EVENT_FIRES_TO_TRIM]
+    sizer = BatchSizer(
+        initial=settings.EVENT_FIRE_TRIM_BATCH_SIZE,
+        minimum=settings.EVENT_FIRE_TRIM_MIN_BATCH_SIZE,
+        maximum=settings.EVENT_FIRE_TRIM_MAX_BATCH_SIZE,
+        target=settings.EVENT_FIRE_TRIM_TARGET_LOCK_TIME,
     )
 
-    # if we have trimmed all of our unfired inactive fires, look for old fired ones
-    if len(trim_ids) < EVENT_FIRES_TO_TRIM:
-        trim_ids += list(
-            EventFire.objects.filter(fired__lt=trim_before)
-            .values_list("id", flat=True)
-            .order_by("fired")[: EVENT_FIRES_TO_TRIM - len(trim_ids)]
-        )
+    # first the unfired fires that belong to inactive events, then the old fired ones
+    num_inactive = trim_in_batches(TRIM_INACTIVE_SQL, {}, sizer, deadline)
+    num_fired = trim_in_batches(TRIM_FIRED_SQL, {"before": trim_before}, sizer, deadline)
+
+    num_deleted = num_inactive + num_fired
+    time_taken = time.monotonic() - start
+    rate = num_deleted / time_taken if time_taken else num_deleted
 
-    for batch in chunk_list(trim_ids, 100):
-        # use a bulk delete for performance reasons, nothing references EventFire
-        EventFire.objects.filter(id__in=batch).delete()
+    analytics.gauge("temba.event_fires_trimmed", num_deleted)
+    analytics.gauge("temba.event_fires_trim_rate", rate)
+    analytics.gauge("temba.event_fires_trim_batch_size", sizer.size)
 
-    logger.info(f"Deleted {len(trim_ids)} event fires in {timesince(start)}")
+    logger.info(
+        f"Deleted {num_deleted} event fires ({num_inactive} inactive, {num_fired} fired) in {time_taken:.3f}s "
+        f"({rate:.0f} rows/s, batch size {sizer.size})"
+    )
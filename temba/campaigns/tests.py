@@ -4,6 +4,7 @@ import pytz
 
 from django.conf import settings
 from django.core.exceptions import ValidationError
+from django.test.utils import override_settings
 from django.urls import reverse
 from django.utils import timezone
 
@@ -14,7 +15,7 @@ from temba.orgs.models import Org
 from temba.tests import CRUDLTestMixin, TembaTest, matchers, mock_mailroom
 
 from .models import Campaign, CampaignEvent, EventFire
-from .tasks import trim_event_fires_task
+from .tasks import BatchSizer, trim_event_fires_task
 
 
 class CampaignTest(TembaTest):
@@ -98,6 +99,42 @@ class CampaignTest(TembaTest):
         self.assertEqual(3, new_event2.offset)
         self.assertEqual({"base": "Hello"}, new_event2.message)
 
+        # message event gets a new flow and the old one is released
+        self.assertNotEqual(event2.flow, new_event2.flow)
+        event2.flow.refresh_from_db()
+        self.assertFalse(event2.flow.is_active)
+
+        # once mailroom supports it, all events are scheduled with a single task
+        mr_mocks.queued_batch_tasks.clear()
+
+        with override_settings(MAILROOM_SCHEDULE_CAMPAIGNS=True):
+            campaign.schedule_events_async()
+
+        self.assertEqual(
+            [
+                {
+                    "org_id": self.org.id,
+                    "type": "schedule_campaign",
+                    "queued_on": matchers.Datetime(),
+                    "task": {
+                        "campaign_event_ids": [new_event1.id, new_event2.id],
+                        "campaign_id": campaign.id,
+                        "org_id": self.org.id,
+                    },
+                },
+            ],
+            mr_mocks.queued_batch_tasks,
+        )
+
+        # recreating a campaign with no events is a noop
+        empty = Campaign.create(self.org, self.admin, "Empty", self.farmers)
+        self.assertEqual([], empty.recreate_events())
+
+        with override_settings(MAILROOM_SCHEDULE_CAMPAIGNS=True):
+            empty.schedule_events_async()
+
+        self.assertEqual(1, len(mr_mocks.queued_batch_tasks))
+
     def test_get_offset_display(self):
         campaign = Campaign.create(self.org, self.admin, Campaign.get_unique_name(self.org, "Reminders"), self.farmers)
         flow = self.create_flow()
@@ -263,13 +300,44 @@ class CampaignTest(TembaTest):
         EventFire.objects.create(event=second_event, contact=self.farmer1, scheduled=trim_date)
         second_event.release(self.admin)
 
-        # trim our events, one fired and one inactive onfired
-        trim_event_fires_task()
+        # and some more old fired ones
+        for _ in range(4):
+            EventFire.objects.create(event=event, contact=self.farmer2, scheduled=trim_date, fired=trim_date)
+
+        # trim our events, in batches of 2
+        with override_settings(EVENT_FIRE_TRIM_BATCH_SIZE=2, EVENT_FIRE_TRIM_MIN_BATCH_SIZE=2):
+            trim_event_fires_task()
 
         # should now have only one event, e2
         e = EventFire.objects.get()
         self.assertEqual(e.id, e2.id)
 
+        # nothing is deleted once the time budget is used up
+        EventFire.objects.create(event=event, contact=self.farmer1, scheduled=trim_date, fired=trim_date)
+
+        with override_settings(EVENT_FIRE_TRIM_TIME_BUDGET=0):
+            trim_event_fires_task()
+
+        self.assertEqual(2, EventFire.objects.count())
+
+    def test_trim_batch_sizer(self):
+        sizer = BatchSizer(initial=1000, minimum=100, maximum=4000, target=1.0)
+
+        sizer.record(0.2)  # fast batches grow
+        self.assertEqual(2000, sizer.size)
+        sizer.record(0.2)
+        sizer.record(0.2)
+        self.assertEqual(4000, sizer.size)
+
+        sizer.record(0.8)  # batches close to the target stay the same
+        self.assertEqual(4000, sizer.size)
+
+        sizer.record(3.0)  # slow batches shrink
+        self.assertEqual(2000, sizer.size)
+        for _ in range(5):
+            sizer.record(3.0)
+        self.assertEqual(100, sizer.size)
+
     @mock_mailroom
     def test_views(self, mr_mocks):
         current_year = timezone.now().year
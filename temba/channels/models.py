@@ -7,6 +7,7 @@ from xml.sax.saxutils import escape
 
 import phonenumbers
 from django_countries.fields import CountryField
+from django_redis import get_redis_connection
 from phonenumbers import NumberParseException
 from pyfcm import FCMNotification
 from smartmin.models import SmartModel
@@ -18,7 +19,7 @@ from django.contrib.auth.models import Group, User
 from django.contrib.postgres.fields import ArrayField
 from django.core.exceptions import ObjectDoesNotExist
 from django.db import models
-from django.db.models import Max, Q, Sum
+from django.db.models import Count, Max, Q, Sum
 from django.db.models.signals import pre_save
 from django.dispatch import receiver
 from django.template import Context, Engine, TemplateDoesNotExist
@@ -1070,6 +1071,9 @@ class ChannelCount(SquashableModel):
         (ERROR_LOG_TYPE, _("Error Log Record")),
     )
 
+    SUMMARY_CACHE_KEY = "channel_counts:%d"
+    SUMMARY_CACHE_TTL = 60 * 5
+
     channel = models.ForeignKey(Channel, on_delete=models.PROTECT, related_name="counts")
     count_type = models.CharField(choices=COUNT_TYPE_CHOICES, max_length=2)
     day = models.DateField(null=True)
@@ -1080,6 +1084,78 @@ class ChannelCount(SquashableModel):
         counts = cls.objects.filter(channel=channel, count_type=count_type, day=day).order_by("day", "count_type")
         return cls.sum(counts)
 
+    @classmethod
+    def get_summary(cls, channel):
+        """
+        Gets the count summary for a single channel
+        """
+        return cls.get_summaries([channel])[channel]
+
+    @classmethod
+    def get_summaries(cls, channels) -> dict:
+        """
+        Gets count summaries for all the given channels, using cached values where possible and fetching the rest
+        with one grouped query per table
+        """
+        channel_ids = [c.id for c in channels]
+        if not channel_ids:
+            return {}
+
+        r = get_redis_connection()
+        cached = r.mget([cls.SUMMARY_CACHE_KEY % c_id for c_id in channel_ids])
+        summaries = {c_id: json.loads(value) for c_id, value in zip(channel_ids, cached) if value}
+
+        missing = [c_id for c_id in channel_ids if c_id not in summaries]
+        if missing:
+            calculated = cls._calculate_summaries(missing)
+
+            with r.pipeline() as pipe:
+                for c_id, summary in calculated.items():
+                    pipe.set(cls.SUMMARY_CACHE_KEY % c_id, json.dumps(summary), ex=cls.SUMMARY_CACHE_TTL)
+                pipe.execute()
+
+            summaries.update(calculated)
+
+        return {c: ChannelCountSummary(summaries[c.id]) for c in channels}
+
+    @classmethod
+    def _calculate_summaries(cls, channel_ids) -> dict:
+        summaries = {c_id: {} for c_id in channel_ids}
+
+        counts = (
+            cls.objects.filter(channel_id__in=channel_ids)
+            .values("channel_id", "count_type")
+            .order_by("channel_id", "count_type")
+            .annotate(count_sum=Sum("count"))
+        )
+        for count in counts:
+            summaries[count["channel_id"]][count["count_type"]] = count["count_sum"] or 0
+
+        ivr_logs = (
+            ChannelLog.objects.filter(channel_id__in=channel_ids)
+            .exclude(connection=None)
+            .values("channel_id")
+            .order_by("channel_id")
+            .annotate(num_connections=Count("connection_id", distinct=True))
+        )
+        for ivr_log in ivr_logs:
+            summaries[ivr_log["channel_id"]][ChannelCountSummary.IVR_LOGS] = ivr_log["num_connections"]
+
+        return summaries
+
+    @classmethod
+    def clear_summaries(cls, channel_ids):
+        """
+        Clears the cached count summaries of the given channels
+        """
+        if channel_ids:
+            r = get_redis_connection()
+            r.delete(*[cls.SUMMARY_CACHE_KEY % c_id for c_id in channel_ids])
+
+    @classmethod
+    def post_squash(cls, distinct_sets):
+        cls.clear_summaries({s.channel_id for s in distinct_sets})
+
     @classmethod
     def get_squash_query(cls, distinct_set):
         if distinct_set.day:
@@ -1116,6 +1192,52 @@ class ChannelCount(SquashableModel):
         index_together = ["channel", "count_type", "day"]
 
 
+class ChannelCountSummary:
+    """
+    The total counts of each type for a channel, as returned by ChannelCount.get_summaries
+    """
+
+    IVR_LOGS = "ivr_logs"  # number of distinct connections with logs
+
+    def __init__(self, counts: dict):
+        self.counts = counts
+
+    def get(self, *count_types) -> int:
+        return sum(self.counts.get(t, 0) for t in count_types)
+
+    @property
+    def msg_count(self) -> int:
+        return self.get(ChannelCount.INCOMING_MSG_TYPE, ChannelCount.OUTGOING_MSG_TYPE)
+
+    @property
+    def ivr_count(self) -> int:
+        return self.get(ChannelCount.INCOMING_IVR_TYPE, ChannelCount.OUTGOING_IVR_TYPE)
+
+    @property
+    def log_count(self) -> int:
+        return self.get(ChannelCount.SUCCESS_LOG_TYPE, ChannelCount.ERROR_LOG_TYPE)
+
+    @property
+    def error_log_count(self) -> int:
+        return self.get(ChannelCount.ERROR_LOG_TYPE) + self.ivr_log_count
+
+    @property
+    def ivr_log_count(self) -> int:
+        return self.get(self.IVR_LOGS)
+
+    @property
+    def non_ivr_log_count(self) -> int:
+        return self.log_count - self.ivr_log_count
+
+    def as_json(self) -> dict:
+        return {
+            "messages": self.msg_count,
+            "ivr": self.ivr_count,
+            "logs": self.log_count,
+            "errors": self.error_log_count,
+        }
+
+
 class ChannelEvent(models.Model):
     """
     An event other than a message that occurs between a channel and a contact. Can be used to trigger flows etc.
@@ -1469,88 +1591,97 @@ class Alert(SmartModel):
                     last_alert = alert
                 last_alert.send_resolved()
 
+    @classmethod
+    def bulk_create_and_send(cls, channels, alert_type: str) -> list:
+        """
+        Creates and sends alerts of the given type for each of the given channels using a single insert
+        """
+        if not channels:
+            return []
+
+        user = get_alert_user()
+        alerts = cls.objects.bulk_create(
+            [cls(channel=ch, alert_type=alert_type, created_by=user, modified_by=user) for ch in channels]
+        )
+        for alert in alerts:
+            alert.send_alert()
+
+        return alerts
+
     @classmethod
     def check_alerts(cls):
+        now = timezone.now()
+
+        cls._check_disconnected_alerts(now)
+        cls._check_sms_alerts(now)
+
+    @classmethod
+    def _check_disconnected_alerts(cls, now):
         from temba.channels.types.android import AndroidType
-        from temba.msgs.models import Msg
 
-        thirty_minutes_ago = timezone.now() - timedelta(minutes=30)
+        thirty_minutes_ago = now - timedelta(minutes=30)
+        open_alerts = cls.objects.filter(alert_type=cls.TYPE_DISCONNECTED, ended_on=None)
+
+        # end any alerts where we've seen the channel since the alert went out
+        resolved = []
+        for alert in open_alerts.filter(channel__last_seen__gt=models.F("created_on")).select_related("channel"):
+            alert.ended_on = alert.channel.last_seen
+            resolved.append(alert)
 
-        # end any alerts that no longer seem valid
-        for alert in Alert.objects.filter(alert_type=cls.TYPE_DISCONNECTED, ended_on=None):
-            # if we've seen the channel since this alert went out, then clear the alert
-            if alert.channel.last_seen > alert.created_on:
-                alert.ended_on = alert.channel.last_seen
-                alert.save()
-                alert.send_resolved()
+        cls.objects.bulk_update(resolved, ["ended_on"])
+        for alert in resolved:
+            alert.send_resolved()
 
-        for channel in (
+        # alert on any active channels which haven't been seen recently and don't already have an open alert
+        disconnected = (
             Channel.objects.filter(channel_type=AndroidType.code, is_active=True)
             .exclude(org=None)
             .exclude(last_seen__gte=thirty_minutes_ago)
-        ):
-            # have we already sent an alert for this channel
-            if not Alert.objects.filter(channel=channel, alert_type=cls.TYPE_DISCONNECTED, ended_on=None):
-                cls.create_and_send(channel, cls.TYPE_DISCONNECTED)
-
-        day_ago = timezone.now() - timedelta(days=1)
-        six_hours_ago = timezone.now() - timedelta(hours=6)
+            .exclude(id__in=open_alerts.values("channel_id"))
+        )
+        cls.bulk_create_and_send(list(disconnected), cls.TYPE_DISCONNECTED)
 
-        # end any sms alerts that are open and no longer seem valid
-        for alert in Alert.objects.filter(alert_type=cls.TYPE_SMS, ended_on=None).distinct("channel_id"):
-            # are there still queued messages?
+    @classmethod
+    def _check_sms_alerts(cls, now):
+        from temba.msgs.models import Msg
 
-            if (
-                not Msg.objects.filter(
-                    status__in=["Q", "P"], channel_id=alert.channel_id, created_on__lte=thirty_minutes_ago
-                )
-                .exclude(created_on__lte=day_ago)
-                .exists()
-            ):
-                Alert.objects.filter(alert_type=cls.TYPE_SMS, ended_on=None, channel_id=alert.channel_id).update(
-                    ended_on=timezone.now()
-                )
+        thirty_minutes_ago = now - timedelta(minutes=30)
+        six_hours_ago = now - timedelta(hours=6)
+        day_ago = now - timedelta(days=1)
 
-        # now look for channels that have many unsent messages
-        queued_messages = (
-            Msg.objects.filter(status__in=["Q", "P"])
-            .order_by("channel", "created_on")
-            .exclude(created_on__gte=thirty_minutes_ago)
-            .exclude(created_on__lte=day_ago)
-            .exclude(channel=None)
-            .values("channel")
-            .annotate(latest_queued=Max("created_on"))
-        )
-        sent_messages = (
-            Msg.objects.filter(status__in=["S", "D"])
-            .exclude(created_on__lte=day_ago)
+        # calculate the latest queued and latest sent message for every channel in a single grouped query
+        watermarks = (
+            Msg.objects.filter(status__in=["Q", "P", "S", "D"], created_on__gt=day_ago)
             .exclude(channel=None)
-            .order_by("channel", "sent_on")
-            .values("channel")
-            .annotate(latest_sent=Max("sent_on"))
+            .order_by()
+            .values("channel_id")
+            .annotate(
+                latest_queued=Max("created_on", filter=Q(status__in=["Q", "P"], created_on__lt=thirty_minutes_ago)),
+                latest_sent=Max("sent_on", filter=Q(status__in=["S", "D"])),
+            )
+            .filter(latest_queued__isnull=False)
         )
+        queued = {w["channel_id"]: w["latest_sent"] for w in watermarks}
 
-        channels = dict()
-        for queued in queued_messages:
-            if queued["channel"]:
-                channels[queued["channel"]] = dict(queued=queued["latest_queued"], sent=None)
+        # end any sms alerts that are open for channels which no longer have queued messages
+        cls.objects.filter(alert_type=cls.TYPE_SMS, ended_on=None).exclude(channel_id__in=list(queued)).update(
+            ended_on=now
+        )
 
-        for sent in sent_messages:
-            existing = channels.get(sent["channel"], dict(queued=None))
-            existing["sent"] = sent["latest_sent"]
+        # look for channels that have queued messages but haven't sent any messages in the past six hours
+        stalled = [ch_id for ch_id, sent in queued.items() if not sent or sent < six_hours_ago]
+        if not stalled:
+            return
 
-        for channel_id, value in channels.items():
-            # we haven't sent any messages in the past six hours
-            if not value["sent"] or value["sent"] < six_hours_ago:
-                channel = Channel.objects.get(pk=channel_id)
+        # ignoring those which have had an alert of any kind in the past six hours
+        recently_alerted = cls.objects.filter(channel_id__in=stalled, created_on__gt=six_hours_ago).values(
+            "channel_id"
+        )
 
-                # never alert on channels that have no org
-                if channel.org is None:  # pragma: no cover
-                    continue
+        # never alert on channels that have no org
+        channels = Channel.objects.filter(id__in=stalled).exclude(org=None).exclude(id__in=recently_alerted)
 
-                # if we haven't sent an alert in the past six ours
-                if not Alert.objects.filter(channel=channel).filter(Q(created_on__gt=six_hours_ago)).exists():
-                    cls.create_and_send(channel, cls.TYPE_SMS)
+        cls.bulk_create_and_send(list(channels.order_by("id")), cls.TYPE_SMS)
 
     def send_alert(self):
         from .tasks import send_alert_task
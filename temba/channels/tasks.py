@@ -1,4 +1,5 @@
 import logging
+from collections import defaultdict
 from datetime import timedelta
 
 import pytz
@@ -11,7 +12,7 @@ from django.utils.timesince import timesince
 from celery import shared_task
 
 from temba.orgs.models import Org
-from temba.utils.analytics import track
+from temba.utils.analytics import TrackBuffer
 from temba.utils.celery import nonoverlapping_task
 
 from .models import Alert, Channel, ChannelCount, ChannelLog, SyncEvent
@@ -121,21 +122,37 @@ def track_org_channel_counts(now=None):
     now = now or timezone.now()
     yesterday = (now.astimezone(pytz.utc) - timedelta(days=1)).date()
 
-    stats = [
-        dict(key="temba.msg_incoming", count_type=ChannelCount.INCOMING_MSG_TYPE),
-        dict(key="temba.msg_outgoing", count_type=ChannelCount.OUTGOING_MSG_TYPE),
-        dict(key="temba.ivr_incoming", count_type=ChannelCount.INCOMING_IVR_TYPE),
-        dict(key="temba.ivr_outgoing", count_type=ChannelCount.OUTGOING_IVR_TYPE),
-    ]
-
-    # calculate each stat and track
-    for stat in stats:
-        org_counts = (
-            Org.objects.filter(
-                channels__counts__day=yesterday, channels__counts__count_type=stat["count_type"]
-            ).annotate(count=Sum("channels__counts__count"))
-        ).prefetch_related("administrators")
-
-        for org in org_counts:
-            if org.administrators.all():
-                track(org.administrators.all()[0], stat["key"], dict(count=org.count))
+    stats = {
+        ChannelCount.INCOMING_MSG_TYPE: "temba.msg_incoming",
+        ChannelCount.OUTGOING_MSG_TYPE: "temba.msg_outgoing",
+        ChannelCount.INCOMING_IVR_TYPE: "temba.ivr_incoming",
+        ChannelCount.OUTGOING_IVR_TYPE: "temba.ivr_outgoing",
+    }
+
+    # calculate all stats for all orgs in a single grouped query
+    org_counts = (
+        ChannelCount.objects.filter(day=yesterday, count_type__in=list(stats))
+        .exclude(channel__org=None)
+        .values("channel__org_id", "count_type")
+        .order_by("channel__org_id", "count_type")
+        .annotate(count=Sum("count"))
+    )
+    counts_by_stat = defaultdict(list)
+    for org_count in org_counts:
+        counts_by_stat[org_count["count_type"]].append((org_count["channel__org_id"], org_count["count"]))
+
+    # and resolve the first administrator of each of those orgs
+    org_ids = {c["channel__org_id"] for c in org_counts}
+    org_admins = (
+        Org.administrators.through.objects.filter(org_id__in=org_ids)
+        .order_by("org_id", "id")
+        .distinct("org_id")
+        .select_related("user")
+    )
+    admins_by_org = {a.org_id: a.user for a in org_admins}
+
+    with TrackBuffer() as buffer:
+        for count_type, key in stats.items():
+            for org_id, count in counts_by_stat[count_type]:
+                if org_id in admins_by_org:
+                    buffer.track(admins_by_org[org_id], key, dict(count=count))
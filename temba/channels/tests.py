@@ -1651,6 +1651,40 @@ class ChannelAlertTest(TembaTest):
 
         self.assertTrue(len(mail.outbox) == 0)
 
+    def test_bulk_disconnected_alerts(self):
+        self.channel.last_seen = timezone.now() - timedelta(minutes=40)
+        self.channel.save()
+
+        android2 = self.create_channel("A", "Android 2", "+250785551313")
+        android2.last_seen = timezone.now() - timedelta(hours=2)
+        android2.save()
+
+        android3 = self.create_channel("A", "Android 3", "+250785551414")
+        android3.last_seen = timezone.now()
+        android3.save()
+
+        check_channels_task()
+
+        # one open alert for each channel we haven't seen recently
+        self.assertEqual(
+            {self.channel, android2},
+            {a.channel for a in Alert.objects.filter(alert_type=Alert.TYPE_DISCONNECTED, ended_on=None)},
+        )
+
+        # checking again doesn't create more alerts
+        check_channels_task()
+        self.assertEqual(2, Alert.objects.filter(alert_type=Alert.TYPE_DISCONNECTED).count())
+
+        # one channel shows up again
+        android2.last_seen = timezone.now() + timedelta(minutes=5)
+        android2.save()
+
+        check_channels_task()
+
+        alert2 = Alert.objects.get(channel=android2)
+        self.assertEqual(android2.last_seen, alert2.ended_on)
+        self.assertIsNone(Alert.objects.get(channel=self.channel).ended_on)
+
 
 class ChannelSyncTest(TembaTest):
     @patch("temba.channels.models.Channel.trigger_sync")
@@ -1836,7 +1870,7 @@ class ChannelClaimTest(TembaTest):
         )
 
         # run again, nothing should change
-        with self.assertNumQueries(9):
+        with self.assertNumQueries(5):
             check_channels_task()
 
         self.assertEqual(2, Alert.objects.filter(channel=self.channel, ended_on=None).count())
@@ -1932,13 +1966,45 @@ class ChannelCountTest(TembaTest):
         msg.release()
         self.assertDailyCount(self.channel, 1, ChannelCount.OUTGOING_IVR_TYPE, msg.created_on.date())
 
-        with patch("temba.channels.tasks.track") as mock:
+        with patch("temba.utils.analytics.track_many") as mock:
             self.create_incoming_msg(contact, "Test Message")
 
-            with self.assertNumQueries(6):
+            with self.assertNumQueries(2):
                 track_org_channel_counts(now=timezone.now() + timedelta(days=1))
-                self.assertEqual(2, mock.call_count)
-                mock.assert_called_with(self.admin, "temba.ivr_outgoing", {"count": 1})
+
+            mock.assert_called_once_with(
+                [(self.admin, "temba.msg_incoming", {"count": 1}), (self.admin, "temba.ivr_outgoing", {"count": 1})]
+            )
+
+    def test_summaries(self):
+        channel2 = self.create_channel("EX", "External", "123456", schemes=["tel"])
+        contact = self.create_contact("Joe", phone="+250788111222")
+
+        self.create_incoming_msg(contact, "Hi")
+        msg = self.create_outgoing_msg(contact, "Hello")
+        ChannelLog.objects.create(channel=self.channel, msg=msg, description="Unable to send", is_error=True)
+
+        with self.assertNumQueries(2):
+            summaries = ChannelCount.get_summaries([self.channel, channel2])
+
+        self.assertEqual(2, summaries[self.channel].msg_count)
+        self.assertEqual(0, summaries[self.channel].ivr_count)
+        self.assertEqual(1, summaries[self.channel].log_count)
+        self.assertEqual(1, summaries[self.channel].error_log_count)
+        self.assertEqual(0, summaries[channel2].msg_count)
+        self.assertEqual({"messages": 2, "ivr": 0, "logs": 1, "errors": 1}, summaries[self.channel].as_json())
+
+        # summaries are now cached
+        self.create_incoming_msg(contact, "Hi again")
+
+        with self.assertNumQueries(0):
+            self.assertEqual(2, ChannelCount.get_summary(self.channel).msg_count)
+
+        # until our counts are squashed
+        squash_channelcounts()
+
+        self.assertEqual(3, ChannelCount.get_summary(self.channel).msg_count)
+        self.assertEqual(self.channel.get_msg_count(), ChannelCount.get_summary(self.channel).msg_count)
 
 
 class ChannelLogTest(TembaTest):
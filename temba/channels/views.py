@@ -908,8 +908,10 @@ class ChannelCRUDL(SmartCRUDL):
             if not channel.is_active:  # pragma: needs cover
                 raise Http404("No active channel with that id")
 
-            context["msg_count"] = channel.get_msg_count()
-            context["ivr_count"] = channel.get_ivr_count()
+            counts = ChannelCount.get_summary(channel)
+            context["msg_count"] = counts.msg_count
+            context["ivr_count"] = counts.ivr_count
+            context["error_log_count"] = counts.error_log_count
 
             # power source stats data
             source_stats = [
@@ -1397,7 +1399,8 @@ class ChannelCRUDL(SmartCRUDL):
 
     class List(OrgPermsMixin, SmartListView):
         title = _("Channels")
-        fields = ("name", "address", "last_seen")
+        fields = ("name", "address", "msg_count", "last_seen")
+        field_config = {"msg_count": {"label": _("Messages")}}
         search_fields = ("name", "address", "org__created_by__email")
 
         def lookup_field_link(self, context, field, obj):
@@ -1429,12 +1432,23 @@ class ChannelCRUDL(SmartCRUDL):
             else:
                 return super().pre_process(*args, **kwargs)
 
+        def get_context_data(self, **kwargs):
+            context = super().get_context_data(**kwargs)
+
+            # fetch counts for the whole page at once
+            self.channel_counts = ChannelCount.get_summaries(context["object_list"])
+
+            return context
+
         def get_name(self, obj):
             return obj.get_name()
 
         def get_address(self, obj):
             return obj.address if obj.address else _("Unknown")
 
+        def get_msg_count(self, obj):
+            return self.channel_counts[obj].msg_count
+
 
 class ChannelEventCRUDL(SmartCRUDL):
     model = ChannelEvent
@@ -1533,10 +1547,11 @@ class ChannelLogCRUDL(SmartCRUDL):
                     "msg", "msg__contact", "msg__contact_urn", "channel", "channel__org"
                 )
 
+                counts = ChannelCount.get_summary(self.channel)
                 if self.request.GET.get("errors"):
-                    patch_queryset_count(events, self.channel.get_error_log_count)
+                    patch_queryset_count(events, lambda: counts.error_log_count)
                 else:
-                    patch_queryset_count(events, self.channel.get_non_ivr_log_count)
+                    patch_queryset_count(events, lambda: counts.non_ivr_log_count)
 
             return events
 
@@ -23,10 +23,13 @@ from django.db import IntegrityError, models, transaction
 from django.db.models import Count, F, Max, Q, Sum, Value
 from django.db.models.functions import Concat
 from django.db.models.functions.text import Upper
+from django.db.models.signals import post_save
+from django.dispatch import receiver
 from django.utils import timezone
 from django.utils.translation import ugettext_lazy as _
 
 from temba import mailroom
+from temba.api.versions import ResourceVersions
 from temba.assets.models import register_asset_store
 from temba.channels.models import Channel, ChannelEvent
 from temba.locations.models import AdminBoundary
@@ -39,7 +42,7 @@ from temba.utils.text import decode_stream, unsnakify
 from temba.utils.urns import ParsedURN, parse_number, parse_urn
 from temba.utils.uuid import uuid4
 
-from .search import SearchException, elastic, parse_query
+from .search import SearchCache, SearchException, elastic, parse_query
 from .validators import CONTACT_NAME_MAX_LEN
 
 logger = logging.getLogger(__name__)
@@ -1923,10 +1926,17 @@ class ContactGroup(TembaModel, DependencyMixin):
             bc.groups.remove(self)
 
         # mark any triggers that operate only on this group as inactive
-        Trigger.objects.filter(is_active=True, groups=self).update(is_active=False, is_archived=True)
+        num_triggers = Trigger.objects.filter(is_active=True, groups=self).update(is_active=False, is_archived=True)
 
         # deactivate any campaigns that are based on this group
-        self.campaigns.filter(is_active=True).update(is_active=False, is_archived=True)
+        num_campaigns = self.campaigns.filter(is_active=True).update(is_active=False, is_archived=True)
+
+        # updates don't send post_save, so bump the API versions of triggers and campaigns ourselves
+        org_id = self.org_id
+        if num_triggers:
+            on_transaction_commit(lambda: ResourceVersions.bump(org_id, "triggers"))
+        if num_campaigns:
+            on_transaction_commit(lambda: ResourceVersions.bump(org_id, "campaigns"))
 
         # delete all counts for this group
         self.counts.all().delete()
@@ -1994,6 +2004,18 @@ class ContactGroup(TembaModel, DependencyMixin):
         verbose_name_plural = _("Groups")
 
 
+@receiver(post_save, sender=ContactField)
+@receiver(post_save, sender=ContactGroup)
+def invalidate_search_cache(sender, instance, **kwargs):
+    """
+    Queries are parsed in the context of an org's fields and groups, so any change to them invalidates cached searches
+    """
+    if kwargs["raw"]:  # pragma: no cover
+        return
+
+    on_transaction_commit(lambda: SearchCache.invalidate(instance.org))
+
+
 class ContactGroupCount(SquashableModel):
     """
     Maintains counts of contact groups. These are calculated via triggers on the database and squashed
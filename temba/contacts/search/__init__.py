@@ -1 +1,8 @@
-from .mailroom import ParsedQuery, SearchException, SearchResults, parse_query, search_contacts  # noqa
+from .mailroom import (  # noqa
+    ParsedQuery,
+    SearchCache,
+    SearchException,
+    SearchResults,
+    parse_query,
+    search_contacts,
+)
@@ -1,4 +1,4 @@
-from elasticsearch import Elasticsearch
+from elasticsearch import Elasticsearch, NotFoundError
 from elasticsearch_dsl import Search as es_Search
 
 from django.conf import settings
@@ -13,11 +13,62 @@ def query_contact_ids(org, query, *, group=None):
     Returns the contact ids for the given query
     """
     parsed = parse_query(org, query, group=group)
-    results = (
-        es_Search(index="contacts").source(include=["id"]).params(routing=org.id).using(ES).query(parsed.elastic_query)
+
+    # the query is parsed and built once and then paged through in id order, only fetching the sort values
+    search = es_Search(using=ES).source(False).sort("id").query(parsed.elastic_query)
+    page_size = settings.ELASTICSEARCH_SCAN_PAGE_SIZE
+
+    pit_id = open_point_in_time(ES, "contacts", routing=org.id)
+    contact_ids, after = [], None
+    try:
+        while True:
+            response, pit_id = search_after(search, pit_id, after, page_size)
+            hits = response.hits
+
+            contact_ids.extend(int(hit.meta.sort[0]) for hit in hits)
+
+            if len(hits) < page_size:
+                break
+
+            after = list(hits[-1].meta.sort)
+    finally:
+        close_point_in_time(ES, pit_id)
+
+    return contact_ids
+
+
+def open_point_in_time(client, index: str, *, routing=None) -> str:
+    """
+    Opens a point in time on the given index so that it can be paged through with search_after as it was now
+    """
+    params = {"keep_alive": settings.ELASTICSEARCH_PIT_KEEP_ALIVE}
+    if routing is not None:
+        params["routing"] = routing
+
+    return client.open_point_in_time(index=index, **params)["id"]
+
+
+def close_point_in_time(client, pit_id: str):
+    try:
+        client.close_point_in_time(body={"id": pit_id})
+    except NotFoundError:  # already expired
+        pass
+
+
+def search_after(search, pit_id: str, after, size: int):
+    """
+    Executes a page of the given sorted search within a point in time, starting after the given sort values. Returns
+    the response and the point in time id to use for the next page, as Elasticsearch may change it between requests.
+    The search must not have an index as that's given by the point in time.
+    """
+    search = search.extra(
+        size=size, pit={"id": pit_id, "keep_alive": settings.ELASTICSEARCH_PIT_KEEP_ALIVE}, track_total_hits=False
     )
+    if after:
+        search = search.extra(search_after=list(after))
 
-    return [int(r.id) for r in results.scan()]
+    response = search.execute()
+    return response, response.to_dict().get("pit_id", pit_id)
 
 
 def get_last_modified():
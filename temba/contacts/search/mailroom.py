@@ -1,9 +1,14 @@
+import hashlib
 from typing import NamedTuple
 
+from django_redis import get_redis_connection
+
+from django.conf import settings
 from django.utils.encoding import force_text
 from django.utils.translation import ugettext_lazy as _
 
 from temba import mailroom
+from temba.utils import analytics, json
 
 
 class SearchException(Exception):
@@ -60,14 +65,21 @@ def parse_query(org, query: str, *, parse_only: bool = False, group=None) -> Par
     """
     Parses the passed in query in the context of the org
     """
-    try:
-        group_uuid = group.uuid if group else None
+    group_uuid = group.uuid if group else None
+    cache = SearchCache(org, "parsed", settings.CONTACT_SEARCH_CACHE_PARSED_TTL, query, parse_only, str(group_uuid))
+
+    response = cache.get()
+    if response is None:
+        try:
+            response = mailroom.get_client().parse_query(
+                org.id, query, parse_only=parse_only, group_uuid=str(group_uuid)
+            )
+        except mailroom.MailroomException as e:
+            raise SearchException.from_mailroom_exception(e)
 
-        response = mailroom.get_client().parse_query(org.id, query, parse_only=parse_only, group_uuid=str(group_uuid))
-        return ParsedQuery(response["query"], response["elastic_query"], Metadata(**response.get("metadata", {})))
+        cache.set(response)
 
-    except mailroom.MailroomException as e:
-        raise SearchException.from_mailroom_exception(e)
+    return ParsedQuery(response["query"], response["elastic_query"], Metadata(**response.get("metadata", {})))
 
 
 class SearchResults(NamedTuple):
@@ -80,15 +92,102 @@ class SearchResults(NamedTuple):
 def search_contacts(
     org, query: str, *, group=None, sort: str = None, offset: int = None, exclude_ids=()
 ) -> SearchResults:
-    try:
-        group_uuid = group.uuid if group else None
-
-        response = mailroom.get_client().contact_search(
-            org.id, group_uuid=str(group_uuid), query=query, sort=sort, offset=offset, exclude_ids=exclude_ids
-        )
-        return SearchResults(
-            response["total"], response["query"], response["contact_ids"], Metadata(**response.get("metadata", {}))
-        )
-
-    except mailroom.MailroomException as e:
-        raise SearchException.from_mailroom_exception(e)
+    group_uuid = group.uuid if group else None
+    cache = SearchCache(
+        org,
+        "results",
+        settings.CONTACT_SEARCH_CACHE_RESULTS_TTL,
+        query,
+        str(group_uuid),
+        sort,
+        offset,
+        sorted(exclude_ids),
+    )
+
+    response = cache.get()
+    if response is None:
+        try:
+            response = mailroom.get_client().contact_search(
+                org.id, group_uuid=str(group_uuid), query=query, sort=sort, offset=offset, exclude_ids=exclude_ids
+            )
+        except mailroom.MailroomException as e:
+            raise SearchException.from_mailroom_exception(e)
+
+        cache.set(response)
+
+    return SearchResults(
+        response["total"], response["query"], response["contact_ids"], Metadata(**response.get("metadata", {}))
+    )
+
+
+class SearchCache:
+    """
+    Caches mailroom responses for a query in Redis. Each org has a version which is bumped whenever its fields or groups
+    change, and cached responses from an older version are treated as misses, so stale parses are never returned.
+    Search results are only cached briefly since they also depend on contact changes which don't bump the version.
+    """
+
+    CONFIG_KEY = "contact_search_cache"  # org config key to enable or disable caching for a single org
+
+    KEY = "contact_search:%s:%d:%s"
+    VERSION_KEY = "contact_search_version:%d"
+    STATS_KEY = "contact_search_cache_stats"
+
+    def __init__(self, org, kind: str, ttl: int, *args):
+        self.org = org
+        self.kind = kind
+        self.ttl = ttl
+        self.enabled = org.config.get(self.CONFIG_KEY, settings.CONTACT_SEARCH_CACHE)
+        self.key = self.KEY % (kind, org.id, hashlib.sha1(json.dumps(args).encode()).hexdigest())
+        self.version = None
+
+    def get(self):
+        if not self.enabled:
+            return None
+
+        cached, version = get_redis_connection().mget([self.key, self.VERSION_KEY % self.org.id])
+        self.version = int(version or 0)
+
+        response = None
+        if cached:
+            cached = json.loads(cached)
+            if cached["version"] == self.version:
+                response = cached["response"]
+
+        self._record(hit=response is not None)
+        return response
+
+    def set(self, response: dict):
+        if not self.enabled:
+            return
+
+        value = json.dumps({"version": self.version, "response": response})
+        get_redis_connection().set(self.key, value, ex=self.ttl)
+
+    def _record(self, hit: bool):
+        r = get_redis_connection()
+        with r.pipeline() as pipe:
+            pipe.hincrby(self.STATS_KEY, f"{self.kind}_hits", 1 if hit else 0)
+            pipe.hincrby(self.STATS_KEY, f"{self.kind}_misses", 0 if hit else 1)
+            hits, misses = pipe.execute()
+
+        analytics.gauge(f"temba.contact_search_cache.{self.kind}_hit_ratio", hits / (hits + misses))
+
+    @classmethod
+    def invalidate(cls, org):
+        """
+        Invalidates all cached parses and results for the given org
+        """
+        get_redis_connection().incr(cls.VERSION_KEY % org.id)
+
+    @classmethod
+    def get_stats(cls) -> dict:
+        """
+        Gets the hit ratios of each kind of cached response since the stats were last reset
+        """
+        counts = {k.decode(): int(v) for k, v in get_redis_connection().hgetall(cls.STATS_KEY).items()}
+        stats = {}
+        for kind in ("parsed", "results"):
+            hits, misses = counts.get(f"{kind}_hits", 0), counts.get(f"{kind}_misses", 0)
+            stats[kind] = {"hits": hits, "misses": misses, "ratio": hits / (hits + misses) if hits + misses else 0.0}
+        return stats
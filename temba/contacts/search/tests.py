@@ -1,7 +1,12 @@
+from unittest.mock import patch
+
+from django.test import override_settings
+
+from temba.contacts.models import ContactField
 from temba.mailroom import MailroomException
 from temba.tests import TembaTest, mock_mailroom
 
-from . import SearchException, elastic
+from . import SearchCache, SearchException, elastic, parse_query, search_contacts
 
 
 class SearchExceptionTest(TembaTest):
@@ -107,3 +112,102 @@ class TestElastic(TembaTest):
         with self.assertRaises(SearchException):
             mr_mocks.error("bad field <> error")
             elastic.query_contact_ids(self.org, "bad_field <> error")
+
+    @mock_mailroom
+    @override_settings(ELASTICSEARCH_SCAN_PAGE_SIZE=2)
+    def test_query_contact_ids(self, mr_mocks):
+        mr_mocks.parse_query("name ~ bob", elastic_query={"match": {"name": "bob"}})
+
+        with patch.object(elastic, "ES") as mock_es:
+            mock_es.open_point_in_time.return_value = {"id": "pit1"}
+            mock_es.search.side_effect = [
+                {"pit_id": "pit2", "hits": {"hits": [{"_id": "3", "sort": [3]}, {"_id": "5", "sort": [5]}]}},
+                {"pit_id": "pit3", "hits": {"hits": [{"_id": "8", "sort": [8]}]}},
+            ]
+
+            self.assertEqual([3, 5, 8], elastic.query_contact_ids(self.org, "name ~ bob"))
+
+        mock_es.open_point_in_time.assert_called_once_with(index="contacts", keep_alive="1m", routing=self.org.id)
+
+        # query is paged through by id, within the point in time and without fetching any sources
+        first, second = [call.kwargs for call in mock_es.search.call_args_list]
+        self.assertIsNone(first["index"])
+        self.assertEqual(
+            {
+                "query": {"match": {"name": "bob"}},
+                "sort": ["id"],
+                "_source": False,
+                "size": 2,
+                "pit": {"id": "pit1", "keep_alive": "1m"},
+                "track_total_hits": False,
+            },
+            first["body"],
+        )
+        self.assertEqual({"id": "pit2", "keep_alive": "1m"}, second["body"]["pit"])
+        self.assertEqual([5], second["body"]["search_after"])
+
+        mock_es.close_point_in_time.assert_called_once_with(body={"id": "pit3"})
+
+
+@override_settings(CONTACT_SEARCH_CACHE=True)
+class SearchCacheTest(TembaTest):
+    @mock_mailroom
+    def test_parse_query(self, mr_mocks):
+        parsed1 = parse_query(self.org, "age > 10")
+        parsed2 = parse_query(self.org, "age > 10")
+
+        self.assertEqual(parsed1, parsed2)
+        self.assertEqual(1, len(mr_mocks.calls["parse_query"]))
+
+        # different query or group is a different cache entry
+        parse_query(self.org, "age > 11")
+        parse_query(self.org, "age > 10", group=self.org.active_contacts_group)
+
+        self.assertEqual(3, len(mr_mocks.calls["parse_query"]))
+
+        # changing org fields invalidates cached parses
+        ContactField.get_or_create(self.org, self.admin, "gender", "Gender")
+        parse_query(self.org, "age > 10")
+
+        self.assertEqual(4, len(mr_mocks.calls["parse_query"]))
+
+        # errors aren't cached
+        mr_mocks.error("bad query")
+        with self.assertRaises(SearchException):
+            parse_query(self.org, "bad <> query")
+        parse_query(self.org, "bad <> query")
+
+        self.assertEqual(6, len(mr_mocks.calls["parse_query"]))
+
+        self.assertEqual({"hits": 1, "misses": 6, "ratio": 1 / 7}, SearchCache.get_stats()["parsed"])
+
+        # caching can be disabled for a single org
+        self.org.config[SearchCache.CONFIG_KEY] = False
+        parse_query(self.org, "age > 11")
+
+        self.assertEqual(7, len(mr_mocks.calls["parse_query"]))
+
+    @mock_mailroom
+    def test_search_contacts(self, mr_mocks):
+        contact = self.create_contact("Bob", phone="+1234567890")
+        mr_mocks.contact_search("bob", contacts=[contact])
+
+        results1 = search_contacts(self.org, "bob", sort="name")
+        results2 = search_contacts(self.org, "bob", sort="name")
+
+        self.assertEqual([contact.id], results2.contact_ids)
+        self.assertEqual(results1, results2)
+        self.assertEqual(1, len(mr_mocks.calls["contact_search"]))
+
+        # different sort, offset or exclusions are different cache entries
+        search_contacts(self.org, "bob", sort="-name")
+        search_contacts(self.org, "bob", sort="name", offset=50)
+        search_contacts(self.org, "bob", sort="name", exclude_ids=[contact.id])
+
+        self.assertEqual(4, len(mr_mocks.calls["contact_search"]))
+
+        self.create_group("Testers", contacts=[])
+        search_contacts(self.org, "bob", sort="name")
+
+        self.assertEqual(5, len(mr_mocks.calls["contact_search"]))
+        self.assertEqual({"hits": 1, "misses": 5, "ratio": 1 / 6}, SearchCache.get_stats()["results"])
@@ -0,0 +1,180 @@
+import logging
+import time
+from abc import ABC, abstractmethod
+
+import amqp
+from weni.eda.channels import Channel
+from weni.eda.django.consumers.signals import message_finished, message_started
+from weni.eda.messages import Message
+
+from django.conf import settings
+
+from temba.utils import analytics
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BATCH_SIZE = 200
+DEFAULT_FLUSH_INTERVAL_MS = 500
+
+
+class BatchEDAConsumer(ABC):
+    """
+    Base class for consumers which buffer messages and process them in batches. A batch is processed when it is full,
+    or when it has been waiting longer than the flush interval. Successful messages are acked together and failed ones
+    are rejected individually, so one bad message doesn't fail the whole batch.
+
+    Batch consumers should be registered with register_batch_consumers and run with a connection backend which calls
+    flush periodically, e.g. PyAMQPFlushConnectionBackend.
+    """
+
+    batch_size: int = None
+    flush_interval_ms: int = None
+
+    def __init__(self):
+        self.batch_size = self.batch_size or getattr(settings, "EDA_CONSUMER_BATCH_SIZE", DEFAULT_BATCH_SIZE)
+        self.flush_interval_ms = self.flush_interval_ms or getattr(
+            settings, "EDA_CONSUMER_FLUSH_INTERVAL_MS", DEFAULT_FLUSH_INTERVAL_MS
+        )
+
+        self.channel = None
+        self.siblings = [self]
+        self.pending = []
+        self.first_pending_on = None
+
+        self.num_processed = 0
+        self.num_failed = 0
+
+    @property
+    def flush_interval(self) -> float:
+        return self.flush_interval_ms / 1000
+
+    @property
+    def prefetch_count(self) -> int:
+        # let the broker deliver the next batch while we're processing this one
+        return self.batch_size * 2
+
+    def handle(self, message: amqp.Message):
+        self.channel = message.channel
+        self.pending.append(Message(body=message.body, delivery_tag=message.delivery_tag, channel=message.channel))
+
+        if len(self.pending) == 1:
+            self.first_pending_on = time.monotonic()
+
+        if len(self.pending) >= self.batch_size or self._oldest_pending_age() >= self.flush_interval:
+            self.flush()
+
+    def flush(self):
+        if not self.pending:
+            return
+
+        batch, self.pending = self.pending, []
+        lag = self._oldest_pending_age()
+        self.first_pending_on = None
+
+        start = time.monotonic()
+        message_started.send(sender=self)
+        try:
+            failures = self._process(batch)
+        finally:
+            message_finished.send(sender=self)
+
+        for message, error in failures.items():
+            logger.error("[%s] Message rejected: %s", self.__class__.__name__, error, exc_info=error)
+            message.reject()
+
+        self._ack([m for m in batch if m not in failures])
+
+        self._record_metrics(len(batch), len(failures), lag, time.monotonic() - start)
+
+    @abstractmethod
+    def consume_batch(self, messages: list) -> dict:
+        """
+        Processes a batch of messages, returning a dict of any messages which failed to the exception they raised
+        """
+
+    def _process(self, batch: list) -> dict:
+        try:
+            return self.consume_batch(batch) or {}
+        except Exception:
+            logger.warning("[%s] Batch failed, retrying messages individually", self.__class__.__name__, exc_info=True)
+
+        failures = {}
+        for message in batch:
+            try:
+                failures.update(self.consume_batch([message]) or {})
+            except Exception as e:
+                failures[message] = e
+        return failures
+
+    def _ack(self, messages: list):
+        """
+        Acks the given messages, using a single multiple ack for all those below any delivery tag still pending in a
+        sibling consumer on the same channel
+        """
+        if not messages:
+            return
+
+        sibling_tags = [m.delivery_tag for s in self.siblings if s is not self for m in s.pending]
+        floor = min(sibling_tags) if sibling_tags else None
+
+        tags = sorted(m.delivery_tag for m in messages)
+        below = [t for t in tags if floor is None or t < floor]
+        above = tags[len(below) :]
+
+        if below:
+            self.channel.basic_ack(below[-1], multiple=True)
+        for tag in above:
+            self.channel.basic_ack(tag)
+
+    def _oldest_pending_age(self) -> float:
+        return time.monotonic() - self.first_pending_on if self.first_pending_on else 0.0
+
+    def _record_metrics(self, num_messages: int, num_failed: int, lag: float, duration: float):
+        self.num_processed += num_messages
+        self.num_failed += num_failed
+
+        name = self.__class__.__name__
+        throughput = num_messages / duration if duration else num_messages
+
+        analytics.gauge(f"temba.eda.{name}.batch_size", num_messages)
+        analytics.gauge(f"temba.eda.{name}.failed", num_failed)
+        analytics.gauge(f"temba.eda.{name}.lag", lag)
+        analytics.gauge(f"temba.eda.{name}.throughput", throughput)
+
+        logger.info(
+            "[%s] Processed batch of %d messages (%d failed) in %.3fs, lag=%.3fs",
+            name,
+            num_messages,
+            num_failed,
+            duration,
+            lag,
+        )
+
+
+def wait_for_results(futures: dict) -> dict:
+    """
+    Waits for a dict of messages to futures, returning a dict of any messages whose futures failed to the exception
+    """
+    failures = {}
+    for message, future in futures.items():
+        try:
+            future.result()
+        except Exception as e:
+            failures[message] = e
+    return failures
+
+
+def register_batch_consumers(channel: Channel, consumers: dict) -> list:
+    """
+    Registers the given queue->consumer batch consumers on a channel, setting a per-consumer prefetch for each. Returns
+    the consumers so that the connection backend can flush them periodically.
+    """
+    batch_consumers = list(consumers.values())
+
+    for queue, consumer in consumers.items():
+        consumer.siblings = batch_consumers
+
+        channel.basic_qos(prefetch_size=0, prefetch_count=consumer.prefetch_count, a_global=False)
+        channel.basic_consume(queue, callback=consumer.handle)
+
+    return batch_consumers
@@ -14,10 +14,12 @@ def handle_default_consumers(channel: Channel) -> None:
     feature_handle_consumers(channel)
 
 
-def handle_template_consumers(channel: Channel) -> None:
-    template_handler_consumers(channel)
+def handle_template_consumers(channel: Channel) -> list:
+    return template_handler_consumers(channel)
 
 
-def handle_consumers(channel: Channel) -> None:  # pragma: no cover
+def handle_consumers(channel: Channel) -> list:  # pragma: no cover
     handle_default_consumers(channel)
-    handle_template_consumers(channel)
+
+    # batch consumers must be registered last so their prefetch settings don't apply to the default consumers
+    return handle_template_consumers(channel)
@@ -0,0 +1,78 @@
+import threading
+import time
+
+from django.core.management.base import BaseCommand
+
+from temba.event_driven.publisher.rabbitmq_publisher import ChannelPool, Message, PublishBuffer, RabbitmqPublisher
+
+
+class StandInChannel:
+    """
+    A stand-in for a broker channel with publisher confirms, which just sleeps for the given round trip latency
+    """
+
+    def __init__(self, latency: float):
+        self.latency = latency
+        self.is_open = True
+        self.connection = self
+        self.published = 0
+
+    def basic_publish(self, exchange, routing_key, body, properties=None):
+        time.sleep(self.latency)
+        self.published += 1
+
+    def process_data_events(self, time_limit=None):
+        pass
+
+    def close(self):
+        self.is_open = False
+
+
+class Command(BaseCommand):  # pragma: no cover
+    help = "Benchmarks broker publishing throughput against a local stand-in broker"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--messages", type=int, default=10_000, help="Number of messages to publish")
+        parser.add_argument("--threads", type=int, default=8, help="Number of concurrent publishing threads")
+        parser.add_argument("--pool-size", type=int, default=4, help="Size of the channel pool")
+        parser.add_argument("--latency", type=float, default=1.0, help="Broker confirm latency (milliseconds)")
+
+    def handle(self, *args, messages: int, threads: int, pool_size: int, latency: float, **options):
+        message = Message({"action": "create", "uuid": "1c1ce1a5-8df6-4d5b-8b4b-4a3e2d6f0a1b"}, "bench.topic", "")
+
+        def new_publisher():
+            return RabbitmqPublisher(ChannelPool(pool_size, connect=lambda: StandInChannel(latency / 1000)))
+
+        def run(label, target):
+            per_thread = messages // threads
+            workers = [threading.Thread(target=target, args=(per_thread,)) for _ in range(threads)]
+
+            start = time.perf_counter()
+            for w in workers:
+                w.start()
+            for w in workers:
+                w.join()
+            elapsed = time.perf_counter() - start
+
+            total = per_thread * threads
+            self.stdout.write(f"{label:<16} | {total:>8} msgs | {elapsed:8.3f}s | {total / elapsed:>10.0f} msgs/s")
+
+        publisher = new_publisher()
+
+        def sync_send(n):
+            for _ in range(n):
+                publisher.send_message(*message)
+
+        run("sync", sync_send)
+
+        buffer = PublishBuffer(new_publisher(), max_size=messages, batch_size=100, flush_interval=0.05)
+
+        def async_send(n):
+            for _ in range(n):
+                buffer.put(message)
+
+        run("async (enqueue)", async_send)
+
+        start = time.perf_counter()
+        buffer.flush()
+        self.stdout.write(f"async drained in {time.perf_counter() - start:.3f}s, {buffer.num_failed} failed")
@@ -1,33 +1,333 @@
+import atexit
 import json
-from time import sleep
-from typing import Dict
+import logging
+import os
+import queue
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Dict, Iterable, NamedTuple
 
-from pika import BasicProperties
-from pika.exceptions import StreamLostError
+from pika import BasicProperties, BlockingConnection, ConnectionParameters, PlainCredentials
 
 from django.conf import settings
 
-from temba.event_driven.connection.rabbitmq_connection import RabbitMQConnection
+logger = logging.getLogger(__name__)
 
+# number of channels each process may hold open to the broker
+DEFAULT_POOL_SIZE = 4
 
-class RabbitmqPublisher:  # pragma: no cover
-    def __init__(self) -> None:
-        self.rabbitmq_connection = RabbitMQConnection()
+# how long to wait for a free channel before giving up (seconds)
+DEFAULT_POOL_TIMEOUT = 5
 
-    def send_message(self, body: Dict, exchange: str, routing_key: str):
-        sended = False
-        while not sended:
+# idle connections don't send heartbeats so are recycled after this long, well within the broker's timeout (seconds)
+DEFAULT_MAX_IDLE = 30
+
+# how many times to retry a failed publish, and the base of the exponential backoff between retries (seconds)
+DEFAULT_MAX_RETRIES = 3
+DEFAULT_RETRY_BACKOFF = 0.2
+
+# the local buffer used for fire-and-forget publishing
+DEFAULT_BUFFER_SIZE = 10_000
+DEFAULT_BUFFER_TIMEOUT = 0.5
+DEFAULT_BATCH_SIZE = 100
+DEFAULT_FLUSH_INTERVAL = 0.1
+
+
+def _setting(name: str, default):
+    return getattr(settings, name, default)
+
+
+class PublishError(Exception):
+    """
+    Raised when messages can't be published to the broker after exhausting all retries
+    """
+
+
+class Message(NamedTuple):
+    body: Dict
+    exchange: str
+    routing_key: str
+
+
+def connect():  # pragma: no cover
+    """
+    Opens a new broker channel with publisher confirms enabled
+    """
+    connection = BlockingConnection(
+        ConnectionParameters(
+            host=settings.EDA_BROKER_HOST,
+            port=settings.EDA_BROKER_PORT,
+            credentials=PlainCredentials(username=settings.EDA_BROKER_USER, password=settings.EDA_BROKER_PASSWORD),
+            virtual_host=settings.EDA_VIRTUAL_HOST,
+        )
+    )
+    channel = connection.channel()
+    channel.confirm_delivery()
+    return channel
+
+
+class ChannelPool:
+    """
+    A thread-safe pool of broker channels. Channels which error are discarded and replaced on demand.
+
+    Blocking connections only service heartbeats when they're used, so the broker may drop one while it sits idle in
+    the pool without it looking closed. Idle channels are checked when they're taken from the pool, and any which are
+    stale are replaced there rather than failing the publish.
+    """
+
+    def __init__(self, size: int, connect=connect, max_idle: float = DEFAULT_MAX_IDLE):
+        self.size = size
+        self.connect = connect
+        self.max_idle = max_idle
+        self.idle = queue.LifoQueue()
+        self.num_open = 0
+        self.lock = threading.Lock()
+
+    @contextmanager
+    def channel(self, timeout: float):
+        channel = self._acquire(timeout)
+        try:
+            yield channel
+        except Exception:
+            self._discard(channel)
+            raise
+        else:
+            self.idle.put((channel, time.monotonic()))
+
+    def close(self):
+        while True:
             try:
-                self.rabbitmq_connection.channel.basic_publish(
-                    exchange=exchange,
-                    routing_key=routing_key,
-                    body=json.dumps(body),
-                    properties=BasicProperties(delivery_mode=2),
-                )
-                sended = True
-            except StreamLostError:
-                self.rabbitmq_connection.make_connection()
+                channel, idle_since = self.idle.get_nowait()
+            except queue.Empty:
+                break
+
+            self._discard(channel)
+
+    def _acquire(self, timeout: float):
+        while True:
+            try:
+                channel, idle_since = self.idle.get_nowait()
+            except queue.Empty:
+                channel, idle_since = self._open_or_wait(timeout)
+
+            if self._is_usable(channel, idle_since):
+                return channel
+
+            self._discard(channel)
+
+    def _is_usable(self, channel, idle_since) -> bool:
+        """
+        Checks a channel before it's used. Channels idle for too long are recycled, and others process any pending
+        events, which sends a heartbeat and picks up whether the broker has closed the connection.
+        """
+        if idle_since is not None:
+            if time.monotonic() - idle_since > self.max_idle:
+                return False
+
+            try:
+                channel.connection.process_data_events(time_limit=0)
             except Exception:
-                self.rabbitmq_connection.make_connection()
-            if not sended:
-                sleep(settings.EDA_WAIT_TIME_RETRY)
+                return False
+
+        return channel.is_open
+
+    def _open_or_wait(self, timeout: float):
+        with self.lock:
+            can_open = self.num_open < self.size
+            if can_open:
+                self.num_open += 1
+
+        if can_open:
+            try:
+                return self.connect(), None
+            except Exception:
+                with self.lock:
+                    self.num_open -= 1
+                raise
+
+        try:
+            return self.idle.get(timeout=timeout)
+        except queue.Empty:
+            raise PublishError("timed out waiting for a free broker channel")
+
+    def _discard(self, channel):
+        with self.lock:
+            self.num_open -= 1
+
+        try:
+            channel.connection.close()
+        except Exception:
+            pass
+
+
+class RabbitmqPublisher:
+    """
+    Publishes messages to the broker over a per-process pool of channels with publisher confirms. Messages can be
+    published synchronously with bounded retries, or handed off to a local buffer which is flushed in the background.
+    """
+
+    def __init__(self, pool: ChannelPool = None) -> None:
+        self.pool = pool or get_pool()
+        self.max_retries = _setting("EDA_PUBLISH_MAX_RETRIES", DEFAULT_MAX_RETRIES)
+        self.retry_backoff = _setting("EDA_PUBLISH_RETRY_BACKOFF", DEFAULT_RETRY_BACKOFF)
+        self.pool_timeout = _setting("EDA_PUBLISH_POOL_TIMEOUT", DEFAULT_POOL_TIMEOUT)
+
+    def send_message(self, body: Dict, exchange: str, routing_key: str):
+        """
+        Publishes a single message, blocking until the broker has confirmed it
+        """
+        self.send_messages([Message(body, exchange, routing_key)])
+
+    def send_messages(self, messages: Iterable[Message]):
+        """
+        Publishes a batch of messages on a single channel, blocking until the broker has confirmed all of them.
+        Messages already confirmed aren't republished when retrying.
+        """
+        pending = deque(messages)
+        attempt = 0
+
+        while pending:
+            try:
+                with self.pool.channel(self.pool_timeout) as channel:
+                    while pending:
+                        message = pending[0]
+                        channel.basic_publish(
+                            exchange=message.exchange,
+                            routing_key=message.routing_key,
+                            body=json.dumps(message.body),
+                            properties=BasicProperties(delivery_mode=2),
+                        )
+                        pending.popleft()
+            except Exception as e:
+                if attempt >= self.max_retries:
+                    raise PublishError(f"unable to publish {len(pending)} messages: {e}") from e
+
+                logger.warning(f"error publishing to broker, retrying: {e}")
+                time.sleep(self.retry_backoff * (2**attempt))
+                attempt += 1
+
+    def send_message_async(self, body: Dict, exchange: str, routing_key: str):
+        """
+        Hands off a message to be published in the background, only blocking the caller if the buffer is full
+        """
+        get_buffer().put(Message(body, exchange, routing_key))
+
+
+class PublishBuffer:
+    """
+    A bounded local buffer of messages which a background thread drains in batches. When the buffer is full, callers
+    publish their messages inline, which applies backpressure instead of dropping them.
+    """
+
+    def __init__(self, publisher: RabbitmqPublisher, max_size: int, batch_size: int, flush_interval: float):
+        self.publisher = publisher
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.put_timeout = _setting("EDA_PUBLISH_BUFFER_TIMEOUT", DEFAULT_BUFFER_TIMEOUT)
+        self.messages = queue.Queue(maxsize=max_size)
+        self.worker = None
+        self.lock = threading.Lock()
+
+        self.num_published = 0
+        self.num_failed = 0
+
+    def put(self, message: Message):
+        self._ensure_worker()
+
+        try:
+            self.messages.put(message, timeout=self.put_timeout)
+        except queue.Full:
+            logger.warning("broker publish buffer is full, publishing inline")
+            self.publisher.send_message(*message)
+
+    def flush(self):
+        """
+        Blocks until all buffered messages have been published or have failed
+        """
+        if self.worker:
+            self.messages.join()
+
+    def _ensure_worker(self):
+        if self.worker and self.worker.is_alive():
+            return
+
+        with self.lock:
+            if not (self.worker and self.worker.is_alive()):
+                self.worker = threading.Thread(target=self._run, name="rabbitmq-publisher", daemon=True)
+                self.worker.start()
+
+    def _run(self):
+        while True:
+            batch = [self.messages.get()]
+            deadline = time.monotonic() + self.flush_interval
+
+            while len(batch) < self.batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self.messages.get(timeout=remaining))
+                except queue.Empty:
+                    break
+
+            self._publish(batch)
+
+    def _publish(self, batch: list):
+        try:
+            self.publisher.send_messages(batch)
+            self.num_published += len(batch)
+        except Exception:
+            self.num_failed += len(batch)
+            logger.error(f"unable to publish {len(batch)} buffered messages to broker", exc_info=True)
+        finally:
+            for _ in batch:
+                self.messages.task_done()
+
+
+_pool = None
+_buffer = None
+_pid = None
+
+
+def _reset_if_forked():
+    """
+    Pools and buffers can't be shared across forked processes, so each process lazily creates its own
+    """
+    global _pool, _buffer, _pid
+
+    if _pid != os.getpid():
+        _pool, _buffer, _pid = None, None, os.getpid()
+
+
+def get_pool() -> ChannelPool:
+    global _pool
+
+    _reset_if_forked()
+    if _pool is None:
+        _pool = ChannelPool(
+            _setting("EDA_PUBLISH_POOL_SIZE", DEFAULT_POOL_SIZE),
+            max_idle=_setting("EDA_PUBLISH_MAX_IDLE", DEFAULT_MAX_IDLE),
+        )
+    return _pool
+
+
+def get_buffer() -> PublishBuffer:
+    global _buffer
+
+    _reset_if_forked()
+    if _buffer is None:
+        _buffer = PublishBuffer(
+            RabbitmqPublisher(),
+            max_size=_setting("EDA_PUBLISH_BUFFER_SIZE", DEFAULT_BUFFER_SIZE),
+            batch_size=_setting("EDA_PUBLISH_BATCH_SIZE", DEFAULT_BATCH_SIZE),
+            flush_interval=_setting("EDA_PUBLISH_FLUSH_INTERVAL", DEFAULT_FLUSH_INTERVAL),
+        )
+    return _buffer
+
+
+@atexit.register
+def _flush_on_exit():  # pragma: no cover
+    if _buffer and _pid == os.getpid():
+        _buffer.flush()
@@ -0,0 +1,124 @@
+from unittest.mock import MagicMock, patch
+
+from django.test import TestCase, override_settings
+
+from temba.event_driven.publisher.rabbitmq_publisher import (
+    ChannelPool,
+    Message,
+    PublishBuffer,
+    PublishError,
+    RabbitmqPublisher,
+)
+
+
+def mock_channel():
+    channel = MagicMock()
+    channel.is_open = True
+    return channel
+
+
+@override_settings(EDA_PUBLISH_RETRY_BACKOFF=0)
+class RabbitmqPublisherTest(TestCase):
+    def test_send_messages(self):
+        channel = mock_channel()
+        connect = MagicMock(return_value=channel)
+        publisher = RabbitmqPublisher(ChannelPool(2, connect=connect))
+
+        publisher.send_messages([Message({"id": 1}, "test.topic", ""), Message({"id": 2}, "test.topic", "")])
+        publisher.send_message({"id": 3}, "test.topic", "")
+
+        # all published over a single pooled channel
+        self.assertEqual(1, connect.call_count)
+        self.assertEqual(3, channel.basic_publish.call_count)
+        self.assertEqual('{"id": 3}', channel.basic_publish.call_args.kwargs["body"])
+
+    def test_send_messages_with_retries(self):
+        broken = mock_channel()
+        broken.basic_publish.side_effect = [None, Exception("nacked")]
+        working = mock_channel()
+        connect = MagicMock(side_effect=[broken, working])
+        publisher = RabbitmqPublisher(ChannelPool(2, connect=connect))
+
+        publisher.send_messages([Message({"id": 1}, "test.topic", ""), Message({"id": 2}, "test.topic", "")])
+
+        # broken channel discarded and only the unconfirmed message republished
+        broken.connection.close.assert_called_once()
+        self.assertEqual(1, working.basic_publish.call_count)
+        self.assertEqual('{"id": 2}', working.basic_publish.call_args.kwargs["body"])
+
+    @override_settings(EDA_PUBLISH_MAX_RETRIES=2)
+    def test_send_messages_gives_up(self):
+        connect = MagicMock(side_effect=Exception("connection refused"))
+        publisher = RabbitmqPublisher(ChannelPool(2, connect=connect))
+
+        with self.assertRaises(PublishError):
+            publisher.send_message({"id": 1}, "test.topic", "")
+
+        self.assertEqual(3, connect.call_count)
+
+    @override_settings(EDA_PUBLISH_MAX_RETRIES=0)
+    def test_stale_channels_are_replaced(self):
+        stale, fresh = mock_channel(), mock_channel()
+        connect = MagicMock(side_effect=[stale, fresh])
+        publisher = RabbitmqPublisher(ChannelPool(1, connect=connect))
+
+        publisher.send_message({"id": 1}, "test.topic", "")
+
+        # broker dropped the idle connection but the channel still looks open
+        stale.connection.process_data_events.side_effect = Exception("stream connection lost")
+
+        # it's replaced when taken from the pool, without using up a retry
+        publisher.send_message({"id": 2}, "test.topic", "")
+
+        stale.connection.close.assert_called_once()
+        self.assertEqual(1, stale.basic_publish.call_count)
+        self.assertEqual('{"id": 2}', fresh.basic_publish.call_args.kwargs["body"])
+
+    def test_idle_channels_are_recycled(self):
+        old, new = mock_channel(), mock_channel()
+        connect = MagicMock(side_effect=[old, new])
+        pool = ChannelPool(1, connect=connect, max_idle=30)
+        publisher = RabbitmqPublisher(pool)
+
+        with patch("temba.event_driven.publisher.rabbitmq_publisher.time.monotonic", return_value=1000):
+            publisher.send_message({"id": 1}, "test.topic", "")
+
+        # used again while still fresh, its pending events are processed to keep it alive
+        with patch("temba.event_driven.publisher.rabbitmq_publisher.time.monotonic", return_value=1020):
+            publisher.send_message({"id": 2}, "test.topic", "")
+
+        old.connection.process_data_events.assert_called_once_with(time_limit=0)
+        self.assertEqual(2, old.basic_publish.call_count)
+
+        # but once idle for longer than the max, it's closed and replaced
+        with patch("temba.event_driven.publisher.rabbitmq_publisher.time.monotonic", return_value=1060):
+            publisher.send_message({"id": 3}, "test.topic", "")
+
+        old.connection.close.assert_called_once()
+        self.assertEqual(1, new.basic_publish.call_count)
+        self.assertEqual(2, connect.call_count)
+
+    def test_buffer(self):
+        channel = mock_channel()
+        publisher = RabbitmqPublisher(ChannelPool(1, connect=MagicMock(return_value=channel)))
+        buffer = PublishBuffer(publisher, max_size=100, batch_size=10, flush_interval=0.01)
+
+        for i in range(25):
+            buffer.put(Message({"id": i}, "test.topic", ""))
+
+        buffer.flush()
+
+        self.assertEqual(25, buffer.num_published)
+        self.assertEqual(25, channel.basic_publish.call_count)
+
+    @patch("temba.event_driven.publisher.rabbitmq_publisher.logger")
+    def test_buffer_failures_are_isolated(self, mock_logger):
+        publisher = MagicMock()
+        publisher.send_messages.side_effect = PublishError("broker down")
+        buffer = PublishBuffer(publisher, max_size=100, batch_size=10, flush_interval=0.01)
+
+        buffer.put(Message({"id": 1}, "test.topic", ""))
+        buffer.flush()
+
+        self.assertEqual(1, buffer.num_failed)
+        mock_logger.error.assert_called_once()
@@ -0,0 +1,95 @@
+import json
+from unittest.mock import Mock, call
+
+from django.test import TestCase
+
+from temba.event_driven.consumers import BatchEDAConsumer, register_batch_consumers
+
+
+class RecordingConsumer(BatchEDAConsumer):
+    batch_size = 3
+    flush_interval_ms = 60_000
+
+    def __init__(self):
+        super().__init__()
+        self.batches = []
+
+    def consume_batch(self, messages: list) -> dict:
+        bodies = [m.json() for m in messages]
+        self.batches.append(bodies)
+
+        if any(b.get("explode") for b in bodies) and len(messages) > 1:
+            raise ValueError("boom")
+
+        return {m: ValueError("bad") for m, b in zip(messages, bodies) if b.get("bad") or b.get("explode")}
+
+
+class BatchEDAConsumerTest(TestCase):
+    def setUp(self):
+        self.channel = Mock()
+        self.next_tag = 1
+
+    def deliver(self, consumer, body: dict):
+        message = Mock(body=json.dumps(body).encode(), delivery_tag=self.next_tag, channel=self.channel)
+        self.next_tag += 1
+        consumer.handle(message)
+
+    def test_batches_and_acks_multiple(self):
+        consumer = RecordingConsumer()
+
+        self.deliver(consumer, {"id": 1})
+        self.deliver(consumer, {"id": 2})
+        self.channel.basic_ack.assert_not_called()
+
+        self.deliver(consumer, {"id": 3})
+
+        self.assertEqual([[{"id": 1}, {"id": 2}, {"id": 3}]], consumer.batches)
+        self.channel.basic_ack.assert_called_once_with(3, multiple=True)
+        self.assertEqual(3, consumer.num_processed)
+
+        # partial batches are processed on flush
+        self.deliver(consumer, {"id": 4})
+        consumer.flush()
+        self.channel.basic_ack.assert_called_with(4, multiple=True)
+
+    def test_failures_are_isolated(self):
+        consumer = RecordingConsumer()
+
+        self.deliver(consumer, {"id": 1})
+        self.deliver(consumer, {"id": 2, "bad": True})
+        self.deliver(consumer, {"id": 3})
+
+        self.channel.basic_reject.assert_called_once_with(2, requeue=False)
+        self.channel.basic_ack.assert_called_once_with(3, multiple=True)
+        self.assertEqual(1, consumer.num_failed)
+
+        # a batch which fails entirely is retried message by message
+        self.deliver(consumer, {"id": 4})
+        self.deliver(consumer, {"id": 5, "explode": True})
+        self.deliver(consumer, {"id": 6})
+
+        self.assertEqual(5, len(consumer.batches))
+        self.channel.basic_reject.assert_called_with(5, requeue=False)
+        self.channel.basic_ack.assert_called_with(6, multiple=True)
+
+    def test_acks_dont_cover_sibling_messages(self):
+        consumer1 = RecordingConsumer()
+        consumer2 = RecordingConsumer()
+        register_batch_consumers(Mock(), {"queue1": consumer1, "queue2": consumer2})
+
+        self.deliver(consumer1, {"id": 1})
+        self.deliver(consumer2, {"id": 2})
+        self.deliver(consumer1, {"id": 3})
+        self.deliver(consumer1, {"id": 4})
+
+        # tag 2 is still pending in consumer2 so only tag 1 is covered by the multiple ack
+        self.assertEqual([call(1, multiple=True), call(3), call(4)], self.channel.basic_ack.call_args_list)
+
+    def test_register(self):
+        channel = Mock()
+        consumer = RecordingConsumer()
+
+        self.assertEqual([consumer], register_batch_consumers(channel, {"queue1": consumer}))
+
+        channel.basic_qos.assert_called_once_with(prefetch_size=0, prefetch_count=6, a_global=False)
+        channel.basic_consume.assert_called_once_with("queue1", callback=consumer.handle)
@@ -1,6 +1,6 @@
 # isort:skip_file
 """
-FastAPI prototypes for benchmarking and optional dedicated processes.
+FastAPI apps run as optional dedicated processes (see the fastapi command in docker/start).
 
 Importing this package eagerly initializes Django so submodules can import
 ORM/serializers normally at the top of the file. ``django.setup()`` is
@@ -1,13 +1,26 @@
+from contextlib import asynccontextmanager
+from uuid import UUID
+
 from fastapi import APIRouter, Body, Depends, FastAPI, HTTPException, status as http_status
 from fastapi.responses import JSONResponse
-from rest_framework.request import Request
-from rest_framework.test import APIRequestFactory
+from pydantic import ValidationError
+from rest_framework import serializers
 
-from temba.api.v2.internals.broadcasts.context import resolve_org_and_user_internal_whatsapp
-from temba.api.v2.serializers import WhatsappBroadcastReadSerializer, WhatsappBroadcastWriteSerializer
+from temba.fastapi_app import cache
 from temba.fastapi_app.auth import verify_jwt
+from temba.fastapi_app.db import run_db, shutdown_executor
+from temba.fastapi_app.schemas import WhatsappBroadcastPayload, format_errors
+from temba.fastapi_app.services import create_whatsapp_broadcast
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    yield
 
-app = FastAPI(title="Temba WhatsApp broadcasts (prototype)", version="0")
+    shutdown_executor()
+
+
+app = FastAPI(title="Temba WhatsApp broadcasts", version="1", lifespan=lifespan)
 app_fastapi = APIRouter(prefix="/fastapi")
 
 
@@ -19,51 +32,83 @@ def health():
     return {"status": "ok"}
 
 
+def _error(status_code: int, msg: str):
+    raise HTTPException(status_code=status_code, detail={"error": msg})
+
+
+def _invalid(errors) -> JSONResponse:
+    if not isinstance(errors, dict):
+        errors = {"non_field_errors": errors}
+    return JSONResponse(content=errors, status_code=http_status.HTTP_400_BAD_REQUEST)
+
+
 @app_fastapi.post("/internal/whatsapp_broadcasts")
-def post_internal_whatsapp_broadcast(
+async def post_internal_whatsapp_broadcast(
     body: dict = Body(...),
     jwt_payload: dict = Depends(verify_jwt),
 ):
     """
-    POST mirrors Django InternalWhatsappBroadcastsEndpoint with DRF serializers.
+    POST accepts the same payloads as Django's InternalWhatsappBroadcastsEndpoint and returns the same responses.
 
-    Requires a valid Bearer JWT signed with settings.JWT_PUBLIC_KEY. Any auth failure
-    (missing/invalid/expired token or missing public key) returns 403 from verify_jwt.
+    Requires a valid Bearer JWT signed with settings.JWT_PUBLIC_KEY. Any auth failure (missing/invalid/expired token
+    or missing public key) returns 403 from verify_jwt.
+
+    Validation that doesn't need the database runs on the event loop, the org, user, channel and template come from
+    in-process caches, and only the creation of the broadcast and the lookup of its recipients run on the DB executor.
     """
-    factory = APIRequestFactory()
-    django_request = factory.post(
-        "/api/v2/internals/whatsapp_broadcasts",
-        body,
-        format="json",
-    )
-    drf_request = Request(django_request)
-    setattr(drf_request, "jwt_payload", jwt_payload)
-    project_uuid_from_jwt = jwt_payload.get("project_uuid") or jwt_payload.get("project")
-    if project_uuid_from_jwt:
-        setattr(drf_request, "project_uuid", project_uuid_from_jwt)
+    project_uuid = body.get("project") or jwt_payload.get("project_uuid") or jwt_payload.get("project")
+    if not project_uuid:
+        _error(http_status.HTTP_401_UNAUTHORIZED, "Project not provided")
 
     try:
-        org, user = resolve_org_and_user_internal_whatsapp(drf_request=drf_request, data=dict(body))
-    except ValueError as e:
-        msg = str(e)
-        status_code = (
-            http_status.HTTP_404_NOT_FOUND if msg == "Project not found" else http_status.HTTP_401_UNAUTHORIZED
-        )
-        raise HTTPException(status_code=status_code, detail={"error": msg})
-
-    serializer = WhatsappBroadcastWriteSerializer(
-        data=body,
-        context={"request": drf_request, "org": org, "user": user},
-    )
-    if serializer.is_valid():
-        broadcast = serializer.save()
-        read_serializer = WhatsappBroadcastReadSerializer(
-            instance=broadcast,
-            context={"request": drf_request, "org": org, "user": user},
-        )
-        return JSONResponse(content=dict(read_serializer.data), status_code=http_status.HTTP_201_CREATED)
-
-    return JSONResponse(content=serializer.errors, status_code=http_status.HTTP_400_BAD_REQUEST)
+        org = await cache.get_org(UUID(str(project_uuid)))
+    except ValueError:
+        org = None
+    if not org:
+        _error(http_status.HTTP_404_NOT_FOUND, "Project not found")
+
+    if jwt_payload:
+        email = jwt_payload.get("email") or jwt_payload.get("user_email") or body.get("user_email")
+    else:
+        email = body.get("user_email")
+    if not email:
+        _error(http_status.HTTP_401_UNAUTHORIZED, "User email not provided")
+
+    user = await cache.get_user(email)
+
+    try:
+        payload = WhatsappBroadcastPayload.model_validate(body)
+    except ValidationError as e:
+        return _invalid(format_errors(e))
+
+    channel = None
+    if payload.channel:
+        channel = await cache.get_channel(payload.channel)
+        if not channel:
+            return _invalid(["Channel not found"])
+        if channel.channel_type not in ("WAC", "WWC"):
+            return _invalid(["Invalid channel type"])
+
+    template = None
+    template_data = payload.msg.get("template")
+    if template_data is not None:
+        uuid, name = template_data.get("uuid"), template_data.get("name")
+
+        template = await cache.get_template(org, uuid=uuid, name=name)
+        if not template:
+            return _invalid(
+                [f"Template with UUID {uuid} not found." if uuid else f"Template with name {name} not found."]
+            )
+
+        if channel and not await cache.channel_has_template(channel, str(template.uuid)):
+            return _invalid([f"Template {template.uuid} not found in channel {channel.uuid}"])
+
+    try:
+        data = await run_db(create_whatsapp_broadcast, org, user, payload, channel=channel, template=template)
+    except serializers.ValidationError as e:
+        return _invalid(e.detail)
+
+    return JSONResponse(content=data, status_code=http_status.HTTP_201_CREATED)
 
 
 app.include_router(app_fastapi)
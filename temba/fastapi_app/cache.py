@@ -0,0 +1,135 @@
+"""
+In-process caches of the rarely changing objects that every broadcast submission needs to resolve.
+
+Cached objects are shared between requests and DB executor threads so must be treated as read-only. Only objects
+which were found are cached, so something created after a failed lookup is picked up on the next request.
+"""
+
+import asyncio
+import time
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+
+from temba.channels.models import Channel
+from temba.orgs.models import Org
+from temba.templates.models import Template, TemplateTranslation
+
+from .db import run_db
+
+User = get_user_model()
+
+
+class TTLCache:
+    """
+    A dict of values which expire after a fixed time, where concurrent loads of the same missing key share one lookup
+    """
+
+    def __init__(self, ttl: int, max_size: int = 10000):
+        self.ttl = ttl
+        self.max_size = max_size
+        self._values = {}
+        self._loading = {}
+
+    def get(self, key):
+        entry = self._values.get(key)
+        if entry and entry[1] > time.monotonic():
+            return entry[0]
+        return None
+
+    def set(self, key, value):
+        if len(self._values) >= self.max_size:
+            self._evict()
+        self._values[key] = (value, time.monotonic() + self.ttl)
+
+    def clear(self):
+        self._values.clear()
+
+    async def get_or_load(self, key, loader, *args):
+        """
+        Gets the value for the given key, calling the given blocking loader on the DB executor if it's not cached
+        """
+        value = self.get(key)
+        if value is not None:
+            return value
+
+        loading = self._loading.get(key)
+        if loading:
+            return await asyncio.shield(loading)
+
+        loading = asyncio.ensure_future(run_db(loader, *args))
+        self._loading[key] = loading
+        try:
+            value = await loading
+        finally:
+            del self._loading[key]
+
+        if value is not None:
+            self.set(key, value)
+        return value
+
+    def _evict(self):
+        now = time.monotonic()
+        self._values = {k: v for k, v in self._values.items() if v[1] > now}
+
+        # if nothing had expired, drop the oldest half
+        if len(self._values) >= self.max_size:
+            keep = sorted(self._values.items(), key=lambda i: i[1][1])[self.max_size // 2 :]
+            self._values = dict(keep)
+
+
+orgs = TTLCache(settings.FASTAPI_CACHE_TTL)
+users = TTLCache(settings.FASTAPI_CACHE_TTL)
+channels = TTLCache(settings.FASTAPI_CACHE_TTL)
+templates = TTLCache(settings.FASTAPI_CACHE_TTL)
+template_translations = TTLCache(settings.FASTAPI_CACHE_TTL)
+
+
+def clear_all():
+    for cache in (orgs, users, channels, templates, template_translations):
+        cache.clear()
+
+
+def _load_org(project_uuid):
+    return Org.objects.filter(proj_uuid=project_uuid).first()
+
+
+def _load_user(email: str):
+    return User.objects.get_or_create(email=email)[0]
+
+
+def _load_channel(uuid):
+    return Channel.objects.filter(uuid=uuid).first()
+
+
+def _load_template(org_id: int, uuid, name: str):
+    if uuid:
+        return Template.objects.filter(uuid=uuid).first()
+    return Template.objects.filter(name=name, org_id=org_id).first()
+
+
+def _load_template_translation(channel_id: int, template_uuid: str):
+    return TemplateTranslation.objects.filter(channel_id=channel_id, template__uuid=template_uuid).exists() or None
+
+
+async def get_org(project_uuid):
+    return await orgs.get_or_load(str(project_uuid), _load_org, project_uuid)
+
+
+async def get_user(email: str):
+    return await users.get_or_load(email, _load_user, email)
+
+
+async def get_channel(uuid):
+    return await channels.get_or_load(str(uuid), _load_channel, uuid)
+
+
+async def get_template(org, uuid=None, name=None):
+    return await templates.get_or_load((org.id, str(uuid) if uuid else None, name), _load_template, org.id, uuid, name)
+
+
+async def channel_has_template(channel, template_uuid: str) -> bool:
+    found = await template_translations.get_or_load(
+        (channel.id, template_uuid), _load_template_translation, channel.id, template_uuid
+    )
+    return bool(found)
@@ -0,0 +1,61 @@
+"""
+Runs blocking ORM work for the FastAPI app off the event loop.
+
+Each worker thread keeps its own database connection, so the number of workers bounds how many connections a single
+FastAPI process can hold open. Setting ``FASTAPI_DB_WORKERS`` to zero runs everything on asgiref's single thread
+sensitive executor instead, which is what tests use so that they share the test case's transaction.
+"""
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from asgiref.sync import sync_to_async
+
+from django.conf import settings
+from django.db import close_old_connections
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_executor() -> ThreadPoolExecutor:
+    global _executor
+
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(
+                    max_workers=settings.FASTAPI_DB_WORKERS, thread_name_prefix="fastapi-db"
+                )
+    return _executor
+
+
+def shutdown_executor():
+    global _executor
+
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=True)
+            _executor = None
+
+
+def _with_connection(fn):
+    def wrapper(*args, **kwargs):
+        # like the start and end of a Django request, drop connections which are broken or past CONN_MAX_AGE
+        close_old_connections()
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            close_old_connections()
+
+    return wrapper
+
+
+async def run_db(fn, *args, **kwargs):
+    """
+    Calls the given blocking function on the DB executor and waits for its result
+    """
+    if not settings.FASTAPI_DB_WORKERS:
+        return await sync_to_async(fn, thread_sensitive=True)(*args, **kwargs)
+
+    return await sync_to_async(_with_connection(fn), thread_sensitive=False, executor=get_executor())(*args, **kwargs)
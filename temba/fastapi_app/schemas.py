@@ -0,0 +1,109 @@
+"""
+Lightweight request models for the FastAPI ingestion endpoints.
+
+These only check what can be checked without the database, mirroring the rules of the DRF write serializers so that
+both endpoints reject the same payloads with the same messages. Anything which needs the org (URN normalization,
+recipient lookups, trigger flows) is left to the service which runs on the DB executor.
+"""
+
+from typing import Optional, Union
+from uuid import UUID
+
+from pydantic import BaseModel, ConfigDict, ValidationError, field_validator, model_validator
+
+MAX_RECIPIENTS = 1000
+
+WHATSAPP_BROADCAST_QUEUES = ("wpp_broadcast_batch", "template_batch", "template_notification_batch")
+
+
+class WhatsappBroadcastPayload(BaseModel):
+    model_config = ConfigDict(extra="ignore")
+
+    project: Optional[UUID] = None
+    user_email: Optional[str] = None
+    urns: list[str] = []
+    contacts: list[Union[str, int]] = []
+    groups: list[Union[str, int]] = []
+    msg: dict
+    channel: Optional[UUID] = None
+    queue: Optional[str] = None
+    name: Optional[str] = None
+    template_id: Optional[int] = None
+    trigger_flow_uuid: Optional[UUID] = None
+
+    @field_validator("urns", "contacts", mode="before")
+    @classmethod
+    def validate_size(cls, value):
+        if isinstance(value, list) and len(value) > MAX_RECIPIENTS:
+            raise ValueError("This field can only contain up to %d items." % MAX_RECIPIENTS)
+        return value
+
+    @field_validator("msg")
+    @classmethod
+    def validate_msg(cls, value):
+        if not (
+            value.get("text")
+            or value.get("attachments")
+            or value.get("template")
+            or value.get("action_type")
+            or value.get("carousel")
+        ):
+            raise ValueError("Must provide either text, attachments, template, action_type or carousel")
+        if "direct_send" in value and not isinstance(value["direct_send"], bool):
+            raise ValueError("direct_send must be a boolean")
+        if "ttl_seconds" in value:
+            if not isinstance(value["ttl_seconds"], int):
+                raise ValueError("ttl_seconds must be an integer")
+            if value["ttl_seconds"] < 0:
+                raise ValueError("ttl_seconds must be a non-negative integer")
+        if "direct_send_template_name" in value and not isinstance(value["direct_send_template_name"], str):
+            raise ValueError("direct_send_template_name must be a string")
+        return value
+
+    @field_validator("queue")
+    @classmethod
+    def validate_queue(cls, value):
+        # normalize queue for comparison
+        return value.lower() if value else None
+
+    @model_validator(mode="after")
+    def validate_all(self):
+        if not (self.urns or self.contacts or self.groups):
+            raise ValueError("Must provide either urns, contacts or groups")
+
+        template = self.msg.get("template")
+        if template is not None:
+            if not (template.get("uuid") or template.get("name")):
+                raise ValueError("Template UUID or Name are required.")
+            if template.get("name") and not self.channel:
+                raise ValueError("Channel is required to use template name")
+
+        if self.queue:
+            if self.queue not in WHATSAPP_BROADCAST_QUEUES:
+                raise ValueError(
+                    "Queue must be either wpp_broadcast_batch, template_batch or template_notification_batch"
+                )
+            if self.queue == "template_batch":
+                if not self.name:
+                    raise ValueError("Name is required for template_batch queue")
+                if not self.groups:
+                    raise ValueError("Groups are required for template_batch queue")
+                if self.contacts:
+                    raise ValueError("Contacts are not allowed for template_batch queue")
+
+        if self.trigger_flow_uuid and self.queue != "template_batch":
+            raise ValueError("trigger_flow_uuid is only allowed when queue is template_batch")
+
+        return self
+
+
+def format_errors(error: ValidationError) -> dict:
+    """
+    Converts pydantic validation errors to the same shape as DRF serializer errors
+    """
+    errors = {}
+    for e in error.errors():
+        field = e["loc"][0] if e["loc"] else "non_field_errors"
+        message = str(e["ctx"]["error"]) if "error" in e.get("ctx", {}) else e["msg"]
+        errors.setdefault(field, []).append(message)
+    return errors
@@ -0,0 +1,111 @@
+"""
+Blocking parts of WhatsApp broadcast ingestion which run on the DB executor.
+"""
+
+import pytz
+from rest_framework import serializers
+
+from django.db import transaction
+
+from temba import mailroom
+from temba.api.v2 import fields
+from temba.flows.models import Flow
+from temba.msgs.models import Broadcast
+from temba.triggers.usecases import create_catchall_trigger
+from temba.utils import on_transaction_commit
+
+from .schemas import MAX_RECIPIENTS, WhatsappBroadcastPayload
+
+
+class RecipientsSerializer(serializers.Serializer):
+    """
+    Resolves the recipients of a broadcast with the same fields as the API, which look up each list in bulk
+    """
+
+    urns = fields.URNListField(required=False, max_items=MAX_RECIPIENTS)
+    contacts = fields.ContactField(many=True, required=False, max_items=MAX_RECIPIENTS)
+    groups = fields.ContactGroupField(many=True, required=False)
+
+
+def create_whatsapp_broadcast(org, user, payload: WhatsappBroadcastPayload, *, channel=None, template=None) -> dict:
+    """
+    Creates and queues a WhatsApp broadcast from an already validated payload, whose channel and template have been
+    resolved by the caller, returning the same representation as WhatsappBroadcastReadSerializer.
+
+    Raises serializers.ValidationError if recipients or the trigger flow can't be resolved.
+    """
+    recipients = RecipientsSerializer(
+        data=payload.model_dump(include={"urns", "contacts", "groups"}, exclude_defaults=True), context={"org": org}
+    )
+    recipients.is_valid(raise_exception=True)
+
+    urns = recipients.validated_data.get("urns", [])
+    contacts = recipients.validated_data.get("contacts", [])
+    groups = recipients.validated_data.get("groups", [])
+
+    trigger_flow = None
+    if payload.trigger_flow_uuid:
+        trigger_flow = Flow.objects.filter(uuid=payload.trigger_flow_uuid, org=org, is_active=True).first()
+        if not trigger_flow:
+            raise serializers.ValidationError("Trigger flow not found for this workspace")
+
+        # catch-all triggers only allow message or voice flows
+        if trigger_flow.flow_type not in (Flow.TYPE_MESSAGE, Flow.TYPE_VOICE):
+            raise serializers.ValidationError("Trigger flow must be a messaging or voice flow")
+
+    msg = dict(payload.msg)
+    if template:
+        template_data = msg["template"]
+        msg["template"] = {
+            "name": template.name,
+            "uuid": str(template.uuid),
+            "variables": template_data.get("variables", []),
+            "locale": template_data.get("locale", None),
+            "is_carousel": template_data.get("is_carousel", False),
+            "carousel": template_data.get("carousel", []),
+        }
+        msg["template_id"] = template.id
+
+    # recipients are de-duplicated here as the broadcast's m2m relations will be
+    contacts = list({c.id: c for c in contacts if c}.values())
+    groups = list({g.id: g for g in groups if g}.values())
+
+    with transaction.atomic():
+        broadcast = Broadcast.create(
+            org,
+            user,
+            groups=groups,
+            contacts=contacts,
+            urns=urns,
+            template_state=Broadcast.TEMPLATE_STATE_UNEVALUATED,
+            msg=msg,
+            channel=channel,
+            broadcast_type=Broadcast.BROADCAST_TYPE_WHATSAPP,
+            queue=payload.queue,
+            name=payload.name,
+            template_id=msg.get("template_id"),
+            is_bulk_send=payload.queue == "template_batch",
+        )
+
+        # create optional catch-all trigger (uncaught message) for provided flow and groups
+        if trigger_flow and groups:
+            create_catchall_trigger(org=org, user=user, flow=trigger_flow, groups=groups)
+
+        # we already have the recipient ids so the task can be built without reading them back
+        on_transaction_commit(
+            lambda: mailroom.queue_whatsapp_broadcast(
+                broadcast, contact_ids=[c.id for c in contacts], group_ids=[g.id for g in groups]
+            )
+        )
+
+    return {
+        "id": broadcast.id,
+        "urns": None if org.is_anon else broadcast.raw_urns or [],
+        "contacts": [{"uuid": str(c.uuid), "name": c.name} for c in contacts],
+        "groups": [{"uuid": str(g.uuid), "name": g.name} for g in groups],
+        "text": broadcast.text,
+        "status": "queued",
+        "channel": broadcast.channel_id,
+        "metadata": broadcast.metadata,
+        "created_on": serializers.DateTimeField(default_timezone=pytz.UTC).to_representation(broadcast.created_on),
+    }
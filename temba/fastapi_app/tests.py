@@ -1,13 +1,25 @@
 import json
+import time
 import uuid
-from unittest.mock import patch
+from unittest.mock import MagicMock, patch
 
 import jwt as pyjwt
+from asgiref.sync import async_to_sync
 from fastapi import HTTPException
 from fastapi.testclient import TestClient
+from pydantic import ValidationError
+from rest_framework.renderers import JSONRenderer
 
+from django.test.utils import override_settings
+
+from temba.api.v2.serializers import WhatsappBroadcastReadSerializer
+from temba.fastapi_app import cache
 from temba.fastapi_app.auth import verify_jwt
 from temba.fastapi_app.broadcasts import app, post_internal_whatsapp_broadcast
+from temba.fastapi_app.schemas import WhatsappBroadcastPayload, format_errors
+from temba.msgs.models import Broadcast
+from temba.templates.models import TemplateTranslation
+from temba.tests import mock_mailroom
 from temba.tests.base import TembaTest
 
 
@@ -43,11 +55,12 @@ class TestHealthEndpoint(TembaTest):
         self.assertEqual(resp.json(), {"status": "ok"})
 
 
+@override_settings(FASTAPI_DB_WORKERS=0)
 class TestPostInternalWhatsappBroadcast(TembaTest):
     """
     Calls the FastAPI handler function directly to avoid the starlette TestClient threadpool
-    (which would force TransactionTestCase). All DB-dependent assertions run in the same
-    thread as the Django TestCase transaction.
+    (which would force TransactionTestCase). With no DB workers, ORM work runs on asgiref's
+    thread sensitive executor, i.e. in the same thread as the Django TestCase transaction.
     """
 
     def setUp(self):
@@ -56,9 +69,14 @@ class TestPostInternalWhatsappBroadcast(TembaTest):
             self.org.proj_uuid = uuid.uuid4()
             self.org.save(update_fields=("proj_uuid",))
 
+        cache.clear_all()
+
+    def post(self, body: dict, jwt_payload: dict):
+        return async_to_sync(post_internal_whatsapp_broadcast)(body=body, jwt_payload=jwt_payload)
+
     def test_project_not_provided_returns_401(self):
         with self.assertRaises(HTTPException) as ctx:
-            post_internal_whatsapp_broadcast(
+            self.post(
                 body={
                     "urns": ["whatsapp:5561912345678"],
                     "user_email": "user@example.com",
@@ -72,7 +90,7 @@ class TestPostInternalWhatsappBroadcast(TembaTest):
 
     def test_project_not_found_returns_404(self):
         with self.assertRaises(HTTPException) as ctx:
-            post_internal_whatsapp_broadcast(
+            self.post(
                 body={
                     "project": str(uuid.uuid4()),
                     "urns": ["whatsapp:5561912345678"],
@@ -87,7 +105,7 @@ class TestPostInternalWhatsappBroadcast(TembaTest):
 
     def test_user_email_missing_returns_401(self):
         with self.assertRaises(HTTPException) as ctx:
-            post_internal_whatsapp_broadcast(
+            self.post(
                 body={
                     "project": str(self.org.proj_uuid),
                     "urns": ["whatsapp:5561912345678"],
@@ -100,7 +118,7 @@ class TestPostInternalWhatsappBroadcast(TembaTest):
         self.assertEqual(ctx.exception.detail, {"error": "User email not provided"})
 
     def test_serializer_error_returns_400(self):
-        resp = post_internal_whatsapp_broadcast(
+        resp = self.post(
             body={
                 "project": str(self.org.proj_uuid),
                 "user_email": "user@example.com",
@@ -113,7 +131,7 @@ class TestPostInternalWhatsappBroadcast(TembaTest):
 
     def test_success_returns_201(self):
         contact = self.create_contact("Junior", urns=["whatsapp:5561912345678"])
-        resp = post_internal_whatsapp_broadcast(
+        resp = self.post(
             body={
                 "project": str(self.org.proj_uuid),
                 "user_email": "user@example.com",
@@ -132,7 +150,7 @@ class TestPostInternalWhatsappBroadcast(TembaTest):
 
     def test_jwt_payload_project_uuid_is_used(self):
         contact = self.create_contact("Junior", urns=["whatsapp:5561912345678"])
-        resp = post_internal_whatsapp_broadcast(
+        resp = self.post(
             body={
                 "contacts": [str(contact.uuid)],
                 "msg": {"text": "Hi"},
@@ -147,6 +165,233 @@ class TestPostInternalWhatsappBroadcast(TembaTest):
         self.assertEqual(status_code, 201)
         self.assertEqual(data["contacts"][0]["uuid"], str(contact.uuid))
 
+    @mock_mailroom
+    def test_response_and_task_match_django_endpoint(self, mr_mocks):
+        contact = self.create_contact("Junior", urns=["whatsapp:5561912345678"])
+        group = self.create_group("Customers", contacts=[contact])
+
+        resp = self.post(
+            body={
+                "project": str(self.org.proj_uuid),
+                "user_email": "user@example.com",
+                "urns": ["whatsapp:5561900000000"],
+                "contacts": [str(contact.uuid), "whatsapp:5561912345678"],
+                "groups": ["customers"],
+                "msg": {"text": "Hi"},
+                "queue": "WPP_BROADCAST_BATCH",
+            },
+            jwt_payload={},
+        )
+
+        status_code, data = _parse(resp)
+        self.assertEqual(status_code, 201)
+
+        broadcast = Broadcast.objects.get(id=data["id"])
+        self.assertEqual(Broadcast.BROADCAST_TYPE_WHATSAPP, broadcast.broadcast_type)
+        self.assertEqual({contact}, set(broadcast.contacts.all()))
+        self.assertEqual({group}, set(broadcast.groups.all()))
+
+        # like the Django endpoint, the queue is moved out of the returned metadata and into the mailroom task
+        expected = json.loads(
+            JSONRenderer().render(WhatsappBroadcastReadSerializer(instance=broadcast, context={"org": self.org}).data)
+        )
+        self.assertEqual("wpp_broadcast_batch", expected["metadata"].pop("queue"))
+        self.assertEqual(expected, data)
+
+        self.assertEqual(1, len(mr_mocks.queued_batch_tasks))
+        task = mr_mocks.queued_batch_tasks[0]["task"]
+        self.assertEqual("send_whatsapp_broadcast", mr_mocks.queued_batch_tasks[0]["type"])
+        self.assertEqual(["whatsapp:5561900000000"], task["urns"])
+        self.assertEqual([contact.id], task["contact_ids"])
+        self.assertEqual([group.id], task["group_ids"])
+        self.assertEqual("wpp_broadcast_batch", task["queue"])
+
+    def test_invalid_payload_returns_400(self):
+        def post(**kwargs):
+            return _parse(
+                self.post(
+                    body={"project": str(self.org.proj_uuid), "user_email": "user@example.com", **kwargs},
+                    jwt_payload={},
+                )
+            )
+
+        self.assertEqual(
+            (400, {"msg": ["Must provide either text, attachments, template, action_type or carousel"]}),
+            post(urns=["whatsapp:5561912345678"], msg={}),
+        )
+        self.assertEqual(
+            (400, {"non_field_errors": ["Must provide either urns, contacts or groups"]}),
+            post(msg={"text": "Hi"}),
+        )
+        self.assertEqual(
+            (400, {"contacts": [f"No such object: {self.org.proj_uuid}"]}),
+            post(contacts=[str(self.org.proj_uuid)], msg={"text": "Hi"}),
+        )
+        self.assertEqual(
+            (400, {"non_field_errors": ["Channel not found"]}),
+            post(urns=["whatsapp:5561912345678"], msg={"text": "Hi"}, channel=str(uuid.uuid4())),
+        )
+        self.assertEqual(
+            (400, {"non_field_errors": ["Invalid channel type"]}),
+            post(urns=["whatsapp:5561912345678"], msg={"text": "Hi"}, channel=str(self.channel.uuid)),
+        )
+        self.assertEqual(
+            (400, {"non_field_errors": ["Trigger flow not found for this workspace"]}),
+            post(
+                groups=[str(self.create_group("G", contacts=[]).uuid)],
+                msg={"text": "Hi"},
+                queue="template_batch",
+                name="Batch",
+                trigger_flow_uuid=str(uuid.uuid4()),
+            ),
+        )
+        self.assertFalse(Broadcast.objects.filter(broadcast_type=Broadcast.BROADCAST_TYPE_WHATSAPP).exists())
+
+    @mock_mailroom
+    def test_channel_and_template_are_cached(self, mr_mocks):
+        channel = self.create_channel("WAC", "WhatsApp Cloud", "1234")
+        translation = TemplateTranslation.get_or_create(
+            channel, "welcome", "eng", "US", "Hi {{1}}", 1, TemplateTranslation.STATUS_APPROVED, "id1", "ns", "UTILITY"
+        )
+        template = translation.template
+        contact = self.create_contact("Junior", urns=["whatsapp:5561912345678"])
+
+        body = {
+            "project": str(self.org.proj_uuid),
+            "user_email": "user@example.com",
+            "contacts": [str(contact.uuid)],
+            "channel": str(channel.uuid),
+            "msg": {"template": {"name": "welcome", "variables": ["Junior"]}},
+        }
+
+        status_code, data = _parse(self.post(body=body, jwt_payload={}))
+        self.assertEqual(status_code, 201)
+        self.assertEqual(channel.id, data["channel"])
+        self.assertEqual(template.id, data["metadata"]["template_id"])
+        self.assertEqual(
+            {
+                "name": "welcome",
+                "uuid": str(template.uuid),
+                "variables": ["Junior"],
+                "locale": None,
+                "is_carousel": False,
+                "carousel": [],
+            },
+            data["metadata"]["template"],
+        )
+        self.assertEqual(template.id, Broadcast.objects.get(id=data["id"]).template_id)
+
+        # the second submission only needs to look up its recipients and create the broadcast
+        with patch("temba.fastapi_app.cache._load_org") as mock_load_org, patch(
+            "temba.fastapi_app.cache._load_channel"
+        ) as mock_load_channel, patch("temba.fastapi_app.cache._load_template") as mock_load_template:
+            status_code, _ = _parse(self.post(body=body, jwt_payload={}))
+
+            self.assertEqual(status_code, 201)
+            mock_load_org.assert_not_called()
+            mock_load_channel.assert_not_called()
+            mock_load_template.assert_not_called()
+
+        self.assertEqual(2, len(mr_mocks.queued_batch_tasks))
+
+        # a template which isn't translated for the channel
+        other = TemplateTranslation.get_or_create(
+            self.create_channel("WAC", "Other", "5678"),
+            "goodbye",
+            "eng",
+            "US",
+            "Bye",
+            0,
+            TemplateTranslation.STATUS_APPROVED,
+            "id2",
+            "ns",
+            "UTILITY",
+        ).template
+        body["msg"] = {"template": {"uuid": str(other.uuid)}}
+        self.assertEqual(
+            (400, {"non_field_errors": [f"Template {other.uuid} not found in channel {channel.uuid}"]}),
+            _parse(self.post(body=body, jwt_payload={})),
+        )
+
+        body["msg"] = {"template": {"name": "unknown"}}
+        self.assertEqual(
+            (400, {"non_field_errors": ["Template with name unknown not found."]}),
+            _parse(self.post(body=body, jwt_payload={})),
+        )
+
+
+class TestWhatsappBroadcastPayload(TembaTest):
+    def assertInvalid(self, body: dict, errors: dict):
+        with self.assertRaises(ValidationError) as ctx:
+            WhatsappBroadcastPayload.model_validate(body)
+
+        self.assertEqual(errors, format_errors(ctx.exception))
+
+    def test_validation(self):
+        payload = WhatsappBroadcastPayload.model_validate(
+            {"urns": ["whatsapp:5561912345678"], "msg": {"text": "Hi"}, "queue": "Template_Notification_Batch"}
+        )
+        self.assertEqual("template_notification_batch", payload.queue)
+
+        self.assertInvalid({"urns": ["whatsapp:1"]}, {"msg": ["Field required"]})
+        self.assertInvalid(
+            {"urns": ["whatsapp:1"] * 1001, "msg": {"text": "Hi"}},
+            {"urns": ["This field can only contain up to 1000 items."]},
+        )
+        self.assertInvalid(
+            {"urns": ["whatsapp:1"], "msg": {"text": "Hi", "ttl_seconds": -1}},
+            {"msg": ["ttl_seconds must be a non-negative integer"]},
+        )
+        self.assertInvalid(
+            {"urns": ["whatsapp:1"], "msg": {"template": {"name": "welcome"}}},
+            {"non_field_errors": ["Channel is required to use template name"]},
+        )
+        self.assertInvalid(
+            {"urns": ["whatsapp:1"], "msg": {"text": "Hi"}, "queue": "other"},
+            {
+                "non_field_errors": [
+                    "Queue must be either wpp_broadcast_batch, template_batch or template_notification_batch"
+                ]
+            },
+        )
+        self.assertInvalid(
+            {"groups": ["Customers"], "msg": {"text": "Hi"}, "queue": "template_batch"},
+            {"non_field_errors": ["Name is required for template_batch queue"]},
+        )
+        self.assertInvalid(
+            {"urns": ["whatsapp:1"], "msg": {"text": "Hi"}, "trigger_flow_uuid": str(uuid.uuid4())},
+            {"non_field_errors": ["trigger_flow_uuid is only allowed when queue is template_batch"]},
+        )
+
+
+class TestTTLCache(TembaTest):
+    @override_settings(FASTAPI_DB_WORKERS=0)
+    def test_get_or_load(self):
+        loader = MagicMock(side_effect=lambda k: None if k == "missing" else k.upper())
+        ttl_cache = cache.TTLCache(ttl=60, max_size=4)
+
+        get = async_to_sync(ttl_cache.get_or_load)
+
+        self.assertEqual("A", get("a", loader, "a"))
+        self.assertEqual("A", get("a", loader, "a"))
+        self.assertEqual(1, loader.call_count)
+
+        # misses aren't cached
+        self.assertIsNone(get("missing", loader, "missing"))
+        self.assertIsNone(get("missing", loader, "missing"))
+        self.assertEqual(3, loader.call_count)
+
+        # filling the cache drops the oldest half
+        for key in ("b", "c", "d", "e"):
+            get(key, loader, key)
+
+        self.assertIsNone(ttl_cache.get("a"))
+        self.assertEqual("E", ttl_cache.get("e"))
+
+        # and values expire
+        with patch("temba.fastapi_app.cache.time.monotonic", return_value=time.monotonic() + 61):
+            self.assertIsNone(ttl_cache.get("e"))
+
 
 class TestVerifyJwt(TembaTest):
     """Auth dependency tested in isolation — no FastAPI/Starlette TestClient involved."""
@@ -56,7 +56,7 @@ def format_new_flows_data(new_flows):
 
 def publish_integrate_success(project_uuid, feature_version_uuid, feature_uuid, imported_data):  # pragma: no cover
     rabbitmq_publisher = RabbitmqPublisher()
-    rabbitmq_publisher.send_message(
+    rabbitmq_publisher.send_message_async(
         body=dict(
             project_uuid=str(project_uuid),
             feature_version_uuid=feature_version_uuid,
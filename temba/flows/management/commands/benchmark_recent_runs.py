@@ -0,0 +1,113 @@
+import time
+from collections import defaultdict
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+
+from temba.flows.models import Flow, FlowPathRecentRun, FlowRun
+from temba.utils import json
+from temba.utils.uuid import uuid4
+
+
+def fetch_with_runs(exit_uuids, to_uuid, limit):
+    """
+    The previous approach of loading each full run and walking its path and events in Python
+    """
+    recent = FlowPathRecentRun.objects.filter(from_uuid__in=exit_uuids, to_uuid=to_uuid).select_related("run")
+    results = []
+    for r in recent.order_by("-visited_on")[:limit]:
+        msg_events_by_step = defaultdict(list)
+        for e in r.run.get_msg_events():
+            msg_events_by_step[e["step_uuid"]].append(e)
+
+        before_step = False
+        for step in reversed(r.run.path):
+            if step["uuid"] == str(r.from_step_uuid):
+                before_step = True
+            if before_step and msg_events_by_step[step["uuid"]]:
+                results.append({"run_id": r.run_id, "text": msg_events_by_step[step["uuid"]][-1]["msg"]["text"]})
+                break
+    return results
+
+
+class Command(BaseCommand):  # pragma: no cover
+    help = "Benchmarks fetching the recent messages of a flow path segment whose runs have long paths"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--flow", type=str, required=True, help="UUID of a flow to create the test runs in")
+        parser.add_argument("--runs", type=int, default=FlowPathRecentRun.PRUNE_TO, help="Number of recent runs")
+        parser.add_argument("--path-length", type=int, default=500, help="Number of steps in each run's path")
+        parser.add_argument("--repeat", type=int, default=20, help="Number of times to repeat each fetch")
+
+    def handle(self, *args, flow: str, runs: int, path_length: int, repeat: int, **options):
+        flow = Flow.objects.get(uuid=flow, is_active=True)
+        contact = flow.org.contacts.filter(is_active=True).first()
+        assert contact, "flow's workspace must have at least one contact"
+
+        # everything is created in a transaction which is rolled back at the end
+        with transaction.atomic():
+            exit_uuid, to_uuid = str(uuid4()), str(uuid4())
+            self._create_runs(flow, contact, exit_uuid, to_uuid, runs, path_length)
+
+            run_bytes = sum(
+                len(json.dumps(r.path)) + len(json.dumps(r.events)) for r in flow.runs.filter(contact=contact)
+            )
+            self.stdout.write(f"created {runs} runs with {path_length} steps ({run_bytes / 1024:.0f} KiB of JSON)")
+
+            expected = fetch_with_runs([exit_uuid], to_uuid, runs)
+            actual = [
+                {"run_id": r["run_id"], "text": r["text"]}
+                for r in FlowPathRecentRun.get_recent([exit_uuid], to_uuid, runs)
+            ]
+            assert expected == actual, "results differ"
+
+            self._time("full runs", lambda: fetch_with_runs([exit_uuid], to_uuid, runs), repeat)
+            self._time("derived text", lambda: FlowPathRecentRun.get_recent([exit_uuid], to_uuid, runs), repeat)
+
+            transaction.set_rollback(True)
+
+    def _create_runs(self, flow, contact, exit_uuid: str, to_uuid: str, num_runs: int, path_length: int):
+        now = timezone.now()
+        recent_runs = []
+
+        for r in range(num_runs):
+            path, events = [], []
+            for s in range(path_length):
+                step_uuid = str(uuid4())
+                path.append({"uuid": step_uuid, "node_uuid": str(uuid4()), "arrived_on": now.isoformat()})
+
+                # a message sent every other step, with the last one before the segment being the one we want
+                if s % 2 == 0:
+                    events.append(
+                        {
+                            "type": "msg_created",
+                            "created_on": now.isoformat(),
+                            "step_uuid": step_uuid,
+                            "msg": {"uuid": str(uuid4()), "text": f"Run {r} step {s}"},
+                        }
+                    )
+
+            run = FlowRun.objects.create(
+                org=flow.org, flow=flow, contact=contact, status=FlowRun.STATUS_COMPLETED, path=path, events=events
+            )
+            recent_runs.append(
+                FlowPathRecentRun(
+                    from_uuid=exit_uuid,
+                    from_step_uuid=path[-2]["uuid"],
+                    to_uuid=to_uuid,
+                    to_step_uuid=path[-1]["uuid"],
+                    run=run,
+                    visited_on=now,
+                )
+            )
+
+        FlowPathRecentRun.objects.bulk_create(recent_runs)
+
+    def _time(self, label: str, fetch, repeat: int):
+        start = time.perf_counter()
+        for _ in range(repeat):
+            fetch()
+        per_fetch = (time.perf_counter() - start) / repeat
+
+        self.stdout.write(f"{label:<14} | {per_fetch * 1000:8.2f} ms per fetch")
@@ -1,3 +1,4 @@
+import itertools
 import traceback
 
 from django.core.management.base import BaseCommand
@@ -6,6 +7,10 @@ from temba.flows.models import Flow
 from temba.utils import chunk_list
 
 
+def _group_by_org(flows):  # pragma: no cover
+    return [list(g) for _, g in itertools.groupby(flows, key=lambda f: f.org_id)]
+
+
 def migrate_flows():  # pragma: no cover
     flows_to_migrate = (
         Flow.objects.filter(is_active=True)
@@ -26,16 +31,30 @@ def migrate_flows():  # pragma: no cover
     num_errored = 0
 
     for id_batch in chunk_list(flow_ids, 5000):
-        for flow in Flow.objects.filter(id__in=id_batch):
-            try:
-                flow.ensure_current_version()
-                num_updated += 1
-            except Exception:
-                print(
-                    f"Unable to migrate flow[uuid={str(flow.uuid)} name={flow.name} created_on={flow.created_on.isoformat()}]':"
-                )
-                print(traceback.format_exc())
-                num_errored += 1
+        flows = list(Flow.objects.filter(id__in=id_batch).select_related("org"))
+
+        # migrate flows from the same org together in small batches, falling back to one at a time if a batch fails
+        flows.sort(key=lambda f: f.org_id)
+        for flow_batch in chunk_list(flows, 50):
+            for org_batch in _group_by_org(flow_batch):
+                try:
+                    Flow.ensure_current_versions(org_batch)
+                    num_updated += len(org_batch)
+                    continue
+                except Exception:
+                    pass
+
+                for flow in org_batch:
+                    try:
+                        flow.refresh_from_db()
+                        flow.ensure_current_version()
+                        num_updated += 1
+                    except Exception:
+                        print(
+                            f"Unable to migrate flow[uuid={str(flow.uuid)} name={flow.name} created_on={flow.created_on.isoformat()}]':"
+                        )
+                        print(traceback.format_exc())
+                        num_errored += 1
 
         print(f" > Flows migrated: {num_updated} of {total} ({num_errored} errored)")
 
@@ -5,7 +5,7 @@ from django.db import connection
 from django.utils import timezone
 
 from temba.contacts.models import Contact
-from temba.flows.models import FlowNodeCount, FlowStart
+from temba.flows.models import Flow, FlowNodeCount, FlowStart
 from temba.tests import TembaTest
 from temba.tests.engine import MockSessionWriter
 
@@ -63,6 +63,7 @@ class InspectFlowsTest(TembaTest):
         # create an invalid flow
         flow3 = self.create_flow("Invalid", nodes=[])
         flow3.revisions.all().update(definition={"foo": "bar"})
+        Flow.clear_definition_cache(flow3.id)
 
         call_command("inspect_flows")
 
@@ -0,0 +1,18 @@
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    # recent runs are inserted constantly by mailroom so the index is built without blocking writes
+    atomic = False
+
+    dependencies = [
+        ("flows", "0264_alter_flowstart_contacts_sequence"),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name="flowpathrecentrun",
+            index=models.Index(fields=["visited_on"], name="flows_recentrun_visited_on"),
+        ),
+    ]
@@ -2,6 +2,7 @@ import logging
 import time
 from array import array
 from collections import OrderedDict, defaultdict
+from contextlib import ExitStack
 from datetime import datetime, timedelta
 from types import SimpleNamespace
 
@@ -20,7 +21,10 @@ from django.contrib.postgres.fields import ArrayField
 from django.core.files.temp import NamedTemporaryFile
 from django.db import connection, models, transaction
 from django.db.models import Max, Q, Sum
+from django.db.models.expressions import RawSQL
 from django.db.models.functions import TruncDate
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
 from django.utils import timezone
 from django.utils.translation import ugettext_lazy as _
 
@@ -35,6 +39,7 @@ from temba.orgs.models import Org
 from temba.templates.models import Template
 from temba.tickets.models import Ticketer, Topic
 from temba.utils import analytics, chunk_list, json, on_transaction_commit, s3
+from temba.utils.cache import LRUCache
 from temba.utils.export import BaseExportAssetStore, BaseExportTask
 from temba.utils.models import (
     JSONAsTextField,
@@ -69,6 +74,18 @@ class FlowVersionConflictException(FlowException):
 FLOW_LOCK_TTL = 60  # 1 minute
 FLOW_LOCK_KEY = "org:%d:lock:flow:%d:definition"
 
+# definitions are cached by flow id and a version made of the revision number and a nonce, with the current version of
+# each flow kept under its own key
+FLOW_DEFINITION_VERSION_KEY = "flow:%d:definition_version"
+FLOW_DEFINITION_KEY = "flow:%d:definition:%s"
+FLOW_DEFINITION_CACHE_TTL = 60 * 60  # 1 hour
+
+_definition_lru = LRUCache(settings.FLOW_DEFINITION_LRU_SIZE)
+
+# snapshots of flow results, and the set of flows whose counts have been squashed since their snapshot was taken
+FLOW_RESULTS_SUMMARY_KEY = "flow:%d:results_summary"
+FLOW_RESULTS_SUMMARY_DIRTY_KEY = "flow_results_summary_dirty"
+
 
 class Flow(TembaModel):
     CONTACT_CREATION = "contact_creation"
@@ -378,9 +395,8 @@ class Flow(TembaModel):
             flow.father_uuid = flow_uuid
             created_flows.append((flow, flow_def))
 
-        # import each definition (includes re-mapping dependency references)
-        for flow, definition in created_flows:
-            flow.import_definition(user, definition, dependency_mapping)
+        # import all the definitions (includes re-mapping dependency references)
+        Flow.import_definitions(user, created_flows, dependency_mapping)
 
         # remap flow UUIDs in any campaign events
         for campaign in export_json.get("campaigns", []):
@@ -551,6 +567,73 @@ class Flow(TembaModel):
         """
         return self.get_node_counts(), self.get_segment_counts()
 
+    def get_results_summary(self) -> dict:
+        """
+        Gets the category counts, node and segment counts and run stats for this flow together. These come from a cached
+        snapshot which is refreshed by the squash tasks, and otherwise recalculated when it expires.
+        """
+        cached = get_redis_connection().get(FLOW_RESULTS_SUMMARY_KEY % self.id)
+        if cached is not None:
+            return json.loads(cached)
+
+        return Flow.refresh_results_summaries([self])[0]
+
+    @classmethod
+    def refresh_results_summaries(cls, flows) -> list:
+        """
+        Recalculates and caches the results summaries of the given flows
+        """
+        summaries = [
+            {
+                "categories": flow.get_category_counts()["counts"],
+                "nodes": flow.get_node_counts(),
+                "segments": flow.get_segment_counts(),
+                "runs": flow.get_run_stats(),
+            }
+            for flow in flows
+        ]
+
+        r = get_redis_connection()
+        with r.pipeline() as pipe:
+            for flow, summary in zip(flows, summaries):
+                pipe.set(FLOW_RESULTS_SUMMARY_KEY % flow.id, json.dumps(summary), ex=settings.FLOW_RESULTS_SUMMARY_TTL)
+            pipe.execute()
+
+        return summaries
+
+    @classmethod
+    def mark_results_summaries_dirty(cls, flow_ids):
+        """
+        Records that the counts of the given flows have changed, so that their summaries can be refreshed in one go
+        """
+        if flow_ids:
+            get_redis_connection().sadd(FLOW_RESULTS_SUMMARY_DIRTY_KEY, *flow_ids)
+
+    @classmethod
+    def refresh_dirty_results_summaries(cls):
+        """
+        Refreshes the summaries of flows whose counts have changed. Only summaries which are currently cached, i.e. of
+        flows someone is looking at, are refreshed - others will be calculated when they're next requested.
+        """
+        r = get_redis_connection()
+        with r.pipeline() as pipe:
+            pipe.smembers(FLOW_RESULTS_SUMMARY_DIRTY_KEY)
+            pipe.delete(FLOW_RESULTS_SUMMARY_DIRTY_KEY)
+            flow_ids = [int(i) for i in pipe.execute()[0]]
+
+        if not flow_ids:
+            return
+
+        cached = r.mget([FLOW_RESULTS_SUMMARY_KEY % i for i in flow_ids])
+        cached_ids = [i for i, c in zip(flow_ids, cached) if c is not None]
+
+        Flow.refresh_results_summaries(list(Flow.objects.filter(id__in=cached_ids, is_active=True)))
+
+    @classmethod
+    def clear_results_summaries(cls, flow_ids):
+        if flow_ids:
+            get_redis_connection().delete(*[FLOW_RESULTS_SUMMARY_KEY % i for i in flow_ids])
+
     def is_starting(self):
         """
         Returns whether this flow is already being started by a user
@@ -565,11 +648,43 @@ class Flow(TembaModel):
         """
         Allows setting the definition for a flow from another definition. All UUID's will be remapped.
         """
+        Flow.import_definitions(user, [(self, definition)], dependency_mapping)
 
-        definition = Flow.migrate_definition(definition, flow=None)
+    @classmethod
+    def import_definitions(cls, user, flow_defs: list, dependency_mapping):
+        """
+        Sets the definitions of many flows from other definitions, remapping all UUIDs. Requests to mailroom are made
+        concurrently and the new revisions are saved in bulk.
+        """
+        if not flow_defs:
+            return
 
-        flow_info = mailroom.get_client().flow_inspect(self.org.id, definition)
-        dependencies = flow_info[Flow.INSPECT_DEPENDENCIES]
+        client = mailroom.get_client()
+        flows = [f for f, _ in flow_defs]
+        definitions = Flow.migrate_definitions([d for _, d in flow_defs])
+
+        flow_infos = mailroom.map_concurrently(
+            lambda fd: client.flow_inspect(fd[0].org_id, fd[1]), list(zip(flows, definitions))
+        )
+
+        # dependencies are created one flow at a time since later flows can depend on the same objects
+        for flow, flow_info in zip(flows, flow_infos):
+            flow._import_dependencies(user, flow_info[Flow.INSPECT_DEPENDENCIES], dependency_mapping)
+
+        # clone definitions so that all flow elements get new random UUIDs
+        cloned_definitions = mailroom.map_concurrently(lambda d: client.flow_clone(d, dependency_mapping), definitions)
+        for cloned_definition in cloned_definitions:
+            if "revision" in cloned_definition:
+                del cloned_definition["revision"]
+
+        # save new revisions but we can't validate them just yet because we're in a transaction and mailroom
+        # won't see any new database objects
+        Flow.save_revisions(user, list(zip(flows, cloned_definitions)))
+
+    def _import_dependencies(self, user, dependencies: list, dependency_mapping):
+        """
+        Ensures the dependencies of an imported definition exist in this flow's org, recording how their UUIDs map
+        """
 
         def deps_of_type(type_name):
             return [d for d in dependencies if d["type"] == type_name]
@@ -620,15 +735,6 @@ class Flow(TembaModel):
 
                 dependency_mapping[ref["uuid"]] = str(obj.uuid) if obj else ref["uuid"]
 
-        # clone definition so that all flow elements get new random UUIDs
-        cloned_definition = mailroom.get_client().flow_clone(definition, dependency_mapping)
-        if "revision" in cloned_definition:
-            del cloned_definition["revision"]
-
-        # save a new revision but we can't validate it just yet because we're in a transaction and mailroom
-        # won't see any new database objects
-        self.save_revision(user, cloned_definition)
-
     def archive(self, user):
         from weni.activities.recent_activities import create_recent_activity
 
@@ -802,31 +908,101 @@ class Flow(TembaModel):
             self.save_revision(user=None, definition=flow_def)
             self.refresh_from_db()
 
+    @classmethod
+    def ensure_current_versions(cls, flows):
+        """
+        Makes sure the given flows are at the latest spec version, migrating any which aren't as a single batch
+        """
+        outdated = [f for f in flows if Version(f.version_number) < Version(Flow.CURRENT_SPEC_VERSION)]
+        if not outdated:
+            return
+
+        with ExitStack() as stack:
+            for flow in outdated:
+                stack.enter_context(flow.lock())
+
+            revisions = []
+            for flow in outdated:
+                revision = flow.get_current_revision()
+                revision.flow = flow
+                revisions.append(revision)
+
+            flow_defs = FlowRevision.get_migrated_definitions(revisions)
+
+            Flow.save_revisions(None, list(zip(outdated, flow_defs)))
+
     def get_definition(self) -> dict:
         """
         Returns the current definition of this flow
         """
-        rev = self.get_current_revision()
+        revision, definition = self._get_cached_definition()
 
-        assert rev, "can't get definition of flow with no revisions"
+        if definition is None:
+            rev = self.get_current_revision()
 
-        # update metadata in definition from database object as it may be out of date
-        definition = rev.definition
+            assert rev, "can't get definition of flow with no revisions"
+
+            revision, definition = rev.revision, rev.definition
+            Flow.cache_definition(self.id, revision, definition, replace=False)
 
+        # update metadata in definition from database object as it may be out of date
         if self.is_legacy():
             if "metadata" not in definition:
                 definition["metadata"] = {}
             definition["metadata"]["uuid"] = self.uuid
             definition["metadata"]["name"] = self.name
-            definition["metadata"]["revision"] = rev.revision
+            definition["metadata"]["revision"] = revision
             definition["metadata"]["expires"] = self.expires_after_minutes
         else:
             definition[Flow.DEFINITION_UUID] = self.uuid
             definition[Flow.DEFINITION_NAME] = self.name
-            definition[Flow.DEFINITION_REVISION] = rev.revision
+            definition[Flow.DEFINITION_REVISION] = revision
             definition[Flow.DEFINITION_EXPIRE_AFTER_MINUTES] = self.expires_after_minutes
         return definition
 
+    def _get_cached_definition(self) -> tuple:
+        """
+        Gets the current revision number and definition of this flow from the local or Redis cache, returning a
+        definition of None if it isn't cached
+        """
+        r = get_redis_connection()
+        version = r.get(FLOW_DEFINITION_VERSION_KEY % self.id)
+        if version is None:
+            return None, None
+
+        version = version.decode()
+        serialized = _definition_lru.get((self.id, version))
+
+        if serialized is None:
+            serialized = r.get(FLOW_DEFINITION_KEY % (self.id, version))
+            if serialized is None:
+                return None, None
+
+            _definition_lru.set((self.id, version), serialized)
+
+        return int(version.split(".")[0]), json.loads(serialized)
+
+    @classmethod
+    def cache_definition(cls, flow_id: int, revision: int, definition: dict, *, replace: bool = True):
+        """
+        Caches the definition of the given revision as the current definition of a flow. When populating the cache from
+        the database we don't replace an existing version, as it may have been set by a newer revision being saved.
+        """
+        version = f"{revision}.{time.time_ns()}"
+        serialized = json.dumps(definition)
+
+        r = get_redis_connection()
+        with r.pipeline() as pipe:
+            pipe.set(FLOW_DEFINITION_KEY % (flow_id, version), serialized, ex=FLOW_DEFINITION_CACHE_TTL)
+            pipe.set(FLOW_DEFINITION_VERSION_KEY % flow_id, version, ex=FLOW_DEFINITION_CACHE_TTL, nx=not replace)
+            pipe.execute()
+
+        _definition_lru.set((flow_id, version), serialized)
+
+    @classmethod
+    def clear_definition_cache(cls, flow_id: int):
+        get_redis_connection().delete(FLOW_DEFINITION_VERSION_KEY % flow_id)
+
     def get_current_revision(self):
         """
         Returns the last saved revision for this flow if any
@@ -837,6 +1013,88 @@ class Flow(TembaModel):
         """
         Saves a new revision for this flow, validation will be done on the definition first
         """
+        return Flow.save_revisions(user, [(self, definition)])[0]
+
+    @classmethod
+    def save_revisions(cls, user, flow_defs: list) -> list:
+        """
+        Saves new revisions for many distinct flows in the same org, inspecting the definitions concurrently and then
+        saving the flows, revisions and dependencies in bulk. Returns a (revision, issues) tuple for each flow.
+        """
+        if not flow_defs:
+            return []
+
+        flows = [f for f, _ in flow_defs]
+        definitions = [d for _, d in flow_defs]
+        revision_numbers = [flow._prepare_revision(definition) for flow, definition in flow_defs]
+
+        # inspect the flows (with optional validation)
+        client = mailroom.get_client()
+        flow_infos = mailroom.map_concurrently(lambda fd: client.flow_inspect(fd[0].org_id, fd[1]), flow_defs)
+
+        is_system_rev = user is None
+        fields = ["base_language", "version_number", "has_issues", "metadata", "modified_by", "modified_on"]
+        if not is_system_rev:
+            fields += ["saved_by", "saved_on"]
+
+        with transaction.atomic():
+            now = timezone.now()
+            revisions, issues, dependencies = [], [], []
+
+            for flow, definition, revision_number, flow_info in zip(flows, definitions, revision_numbers, flow_infos):
+                flow_user = user or get_flow_user(flow.org)
+                flow_issues = flow_info[Flow.INSPECT_ISSUES]
+                new_metadata = Flow.get_metadata(flow_info)
+
+                # IVR retry is the only value in metadata that doesn't come from flow inspection
+                if flow.metadata and Flow.METADATA_IVR_RETRY in flow.metadata:
+                    new_metadata[Flow.METADATA_IVR_RETRY] = flow.metadata[Flow.METADATA_IVR_RETRY]
+
+                # update our flow fields
+                flow.base_language = definition.get(Flow.DEFINITION_LANGUAGE, None)
+                flow.version_number = Flow.CURRENT_SPEC_VERSION
+                flow.has_issues = len(flow_issues) > 0
+                flow.metadata = new_metadata
+                flow.modified_by = flow_user
+                flow.modified_on = now
+
+                if not is_system_rev:
+                    flow.saved_by = flow_user
+                    flow.saved_on = now
+
+                revisions.append(
+                    FlowRevision(
+                        flow=flow,
+                        definition=definition,
+                        created_by=flow_user,
+                        modified_by=flow_user,
+                        spec_version=Flow.CURRENT_SPEC_VERSION,
+                        revision=revision_number,
+                    )
+                )
+                issues.append(flow_issues)
+                dependencies.append(flow_info[Flow.INSPECT_DEPENDENCIES])
+
+            Flow.objects.bulk_update(flows, fields)
+            FlowRevision.objects.bulk_create(revisions)
+
+            Flow.bulk_update_dependencies(list(zip(flows, dependencies)))
+
+            # once committed, the new revisions are the current definitions, and results summaries may have new keys
+            def update_caches():
+                for rev in revisions:
+                    Flow.cache_definition(rev.flow_id, rev.revision, rev.definition)
+
+                Flow.clear_results_summaries([f.id for f in flows])
+
+            on_transaction_commit(update_caches)
+
+        return list(zip(revisions, issues))
+
+    def _prepare_revision(self, definition) -> int:
+        """
+        Checks that a definition can be saved as the next revision of this flow, returning the new revision number
+        """
         if Version(definition.get(Flow.DEFINITION_SPEC_VERSION)) < Version(Flow.INITIAL_GOFLOW_VERSION):
             raise FlowVersionConflictException(definition.get(Flow.DEFINITION_SPEC_VERSION))
 
@@ -858,58 +1116,33 @@ class Flow(TembaModel):
         definition[Flow.DEFINITION_REVISION] = revision
         definition[Flow.DEFINITION_EXPIRE_AFTER_MINUTES] = self.expires_after_minutes
 
-        # inspect the flow (with optional validation)
-        flow_info = mailroom.get_client().flow_inspect(self.org.id, definition)
-        dependencies = flow_info[Flow.INSPECT_DEPENDENCIES]
-        issues = flow_info[Flow.INSPECT_ISSUES]
-
-        if user is None:
-            is_system_rev = True
-            user = get_flow_user(self.org)
-        else:
-            is_system_rev = False
-
-        with transaction.atomic():
-            new_metadata = Flow.get_metadata(flow_info)
-
-            # IVR retry is the only value in metadata that doesn't come from flow inspection
-            if self.metadata and Flow.METADATA_IVR_RETRY in self.metadata:
-                new_metadata[Flow.METADATA_IVR_RETRY] = self.metadata[Flow.METADATA_IVR_RETRY]
-
-            # update our flow fields
-            self.base_language = definition.get(Flow.DEFINITION_LANGUAGE, None)
-            self.version_number = Flow.CURRENT_SPEC_VERSION
-            self.has_issues = len(issues) > 0
-            self.metadata = new_metadata
-            self.modified_by = user
-            self.modified_on = timezone.now()
-            fields = ["base_language", "version_number", "has_issues", "metadata", "modified_by", "modified_on"]
-
-            if not is_system_rev:
-                self.saved_by = user
-                self.saved_on = timezone.now()
-                fields += ["saved_by", "saved_on"]
-
-            self.save(update_fields=fields)
-
-            # create our new revision
-            revision = self.revisions.create(
-                definition=definition,
-                created_by=user,
-                modified_by=user,
-                spec_version=Flow.CURRENT_SPEC_VERSION,
-                revision=revision,
-            )
-
-            self.update_dependencies(dependencies)
-
-        return revision, issues
+        return revision
 
     @classmethod
     def migrate_definition(cls, flow_def, flow, to_version=None):
+        return cls.migrate_definitions([flow_def], to_version, flows=[flow])[0]
+
+    @classmethod
+    def migrate_definitions(cls, flow_defs: list, to_version=None, *, flows=None) -> list:
+        """
+        Migrates many definitions to the given spec version. Legacy migrations are done locally and goflow migrations
+        are requested from mailroom concurrently.
+        """
         if not to_version:
             to_version = cls.CURRENT_SPEC_VERSION
 
+        flows = flows or [None] * len(flow_defs)
+        flow_defs = [cls._migrate_legacy_definition(flow_def, flow) for flow_def, flow in zip(flow_defs, flows)]
+
+        # migrate using goflow for anything newer
+        if Version(to_version) >= Version(Flow.INITIAL_GOFLOW_VERSION):
+            client = mailroom.get_client()
+            flow_defs = mailroom.map_concurrently(lambda d: client.flow_migrate(d, to_version), flow_defs)
+
+        return flow_defs
+
+    @classmethod
+    def _migrate_legacy_definition(cls, flow_def, flow):
         if "version" in flow_def:
             flow_def = legacy.migrate_definition(flow_def, flow=flow)
 
@@ -921,10 +1154,6 @@ class Flow(TembaModel):
         if expires <= 0 or expires > (30 * 24 * 60):
             flow_def["metadata"]["expires"] = Flow.DEFAULT_EXPIRES_AFTER
 
-        # migrate using goflow for anything newer
-        if Version(to_version) >= Version(Flow.INITIAL_GOFLOW_VERSION):
-            flow_def = mailroom.get_client().flow_migrate(flow_def, to_version)
-
         return flow_def
 
     @classmethod
@@ -935,50 +1164,85 @@ class Flow(TembaModel):
 
             exported_json = exports.migrate(org, exported_json, same_site, version)
 
-        migrated_flows = []
-        for flow_def in exported_json["flows"]:
-            migrated_def = Flow.migrate_definition(flow_def, flow=None)
-            migrated_flows.append(migrated_def)
-
-        exported_json["flows"] = migrated_flows
+        exported_json["flows"] = Flow.migrate_definitions(exported_json["flows"])
 
         return exported_json
 
     def update_dependencies(self, dependencies):
-        # build a lookup of types to identifier lists
-        identifiers = defaultdict(list)
-        for dep in dependencies:
-            identifier = dep.get("uuid", dep.get("key"))
-            identifiers[dep["type"]].append(identifier)
+        Flow.bulk_update_dependencies([(self, dependencies)])
+
+    @classmethod
+    def bulk_update_dependencies(cls, flow_deps: list):
+        """
+        Resets the dependencies of many flows from the same org, using the same number of queries for any number of flows
+        """
+        if not flow_deps:
+            return
+
+        flows = [f for f, _ in flow_deps]
+        org = flows[0].org
+
+        # build a lookup of types to identifier lists, for all flows and for each flow
+        identifiers = defaultdict(set)
+        flow_identifiers = []
+        for flow, dependencies in flow_deps:
+            ids = defaultdict(set)
+            for dep in dependencies:
+                identifier = dep.get("uuid", dep.get("key"))
+                ids[dep["type"]].add(identifier)
+                identifiers[dep["type"]].add(identifier)
+            flow_identifiers.append(ids)
 
         # globals aren't included in exports so they're created here too if they don't exist, with blank values
         if identifiers["global"]:
-            org_globals = set(self.org.globals.filter(is_active=True).values_list("key", flat=True))
+            org_globals = set(org.globals.filter(is_active=True).values_list("key", flat=True))
 
-            globals_to_create = set(identifiers["global"]).difference(org_globals)
+            globals_to_create = identifiers["global"].difference(org_globals)
             for g in globals_to_create:
-                Global.get_or_create(self.org, self.modified_by, g, name="", value="")
+                Global.get_or_create(org, flows[0].modified_by, g, name="", value="")
 
-        # find all the dependencies in the database
+        # find all the dependencies in the database, and the attribute which identifies each type
         dep_objs = {
-            "channel": self.org.channels.filter(is_active=True, uuid__in=identifiers["channel"]),
-            "classifier": self.org.classifiers.filter(is_active=True, uuid__in=identifiers["classifier"]),
-            "field": ContactField.user_fields.filter(org=self.org, is_active=True, key__in=identifiers["field"]),
-            "flow": self.org.flows.filter(is_active=True, uuid__in=identifiers["flow"]),
-            "global": self.org.globals.filter(is_active=True, key__in=identifiers["global"]),
-            "group": ContactGroup.user_groups.filter(org=self.org, is_active=True, uuid__in=identifiers["group"]),
-            "label": Label.label_objects.filter(org=self.org, uuid__in=identifiers["label"]),
-            "template": self.org.templates.filter(uuid__in=identifiers["template"]),
-            "ticketer": self.org.ticketers.filter(is_active=True, uuid__in=identifiers["ticketer"]),
-            "topic": self.org.ticketers.filter(is_active=True, uuid__in=identifiers["topic"]),
-            "user": self.org.get_users().filter(is_active=True, email__in=identifiers["user"]),
+            "channel": (org.channels.filter(is_active=True, uuid__in=identifiers["channel"]), "uuid"),
+            "classifier": (org.classifiers.filter(is_active=True, uuid__in=identifiers["classifier"]), "uuid"),
+            "field": (
+                ContactField.user_fields.filter(org=org, is_active=True, key__in=identifiers["field"]),
+                "key",
+            ),
+            "flow": (org.flows.filter(is_active=True, uuid__in=identifiers["flow"]), "uuid"),
+            "global": (org.globals.filter(is_active=True, key__in=identifiers["global"]), "key"),
+            "group": (
+                ContactGroup.user_groups.filter(org=org, is_active=True, uuid__in=identifiers["group"]),
+                "uuid",
+            ),
+            "label": (Label.label_objects.filter(org=org, uuid__in=identifiers["label"]), "uuid"),
+            "template": (org.templates.filter(uuid__in=identifiers["template"]), "uuid"),
+            "ticketer": (org.ticketers.filter(is_active=True, uuid__in=identifiers["ticketer"]), "uuid"),
+            "topic": (org.topics.filter(is_active=True, uuid__in=identifiers["topic"]), "uuid"),
+            "user": (org.get_users().filter(is_active=True, email__in=identifiers["user"]), "email"),
         }
 
-        # reset the m2m for each type
-        for type_name, objects in dep_objs.items():
-            m2m = getattr(self, f"{type_name}_dependencies")
-            m2m.clear()
-            m2m.add(*objects)
+        flow_ids = [f.id for f in flows]
+
+        # reset the m2m for each type by replacing the rows of its through model
+        for type_name, (objects, id_attr) in dep_objs.items():
+            m2m = cls._meta.get_field(f"{type_name}_dependencies")
+            through = m2m.remote_field.through
+            from_attr, to_attr = f"{m2m.m2m_field_name()}_id", f"{m2m.m2m_reverse_field_name()}_id"
+
+            obj_ids = {}
+            if identifiers[type_name]:
+                obj_ids = {str(getattr(o, id_attr)): o.id for o in objects}
+
+            through.objects.filter(**{f"{from_attr}__in": flow_ids}).delete()
+            through.objects.bulk_create(
+                [
+                    through(**{from_attr: flow.id, to_attr: obj_ids[str(i)]})
+                    for flow, ids in zip(flows, flow_identifiers)
+                    for i in ids[type_name]
+                    if str(i) in obj_ids
+                ]
+            )
 
     def release(self, user, *, interrupt_sessions: bool = True):
         """
@@ -1462,6 +1726,34 @@ class FlowRevision(SmartModel):
                 validate_localization(rule["category"])
 
     def get_migrated_definition(self, to_version: str = Flow.CURRENT_SPEC_VERSION) -> dict:
+        return FlowRevision.get_migrated_definitions([self], to_version)[0]
+
+    @classmethod
+    def get_migrated_definitions(cls, revisions, to_version: str = Flow.CURRENT_SPEC_VERSION) -> list:
+        """
+        Gets the migrated definitions of many revisions, migrating those which need it as a single batch
+        """
+        definitions = [rev._get_definition_to_migrate() for rev in revisions]
+        to_migrate = [i for i, rev in enumerate(revisions) if rev.spec_version != to_version]
+
+        if to_migrate:
+            migrated = Flow.migrate_definitions(
+                [definitions[i] for i in to_migrate], to_version, flows=[revisions[i].flow for i in to_migrate]
+            )
+            for i, definition in zip(to_migrate, migrated):
+                definitions[i] = definition
+
+        # update variables from our db into our revision
+        for rev, definition in zip(revisions, definitions):
+            flow = rev.flow
+            definition[Flow.DEFINITION_NAME] = flow.name
+            definition[Flow.DEFINITION_UUID] = flow.uuid
+            definition[Flow.DEFINITION_REVISION] = rev.revision
+            definition[Flow.DEFINITION_EXPIRE_AFTER_MINUTES] = flow.expires_after_minutes
+
+        return definitions
+
+    def _get_definition_to_migrate(self) -> dict:
         definition = self.definition
 
         # if it's previous to version 6, wrap the definition to
@@ -1484,17 +1776,6 @@ class FlowRevision(SmartModel):
                 definition["metadata"] = {}
             definition["metadata"]["revision"] = self.revision
 
-        # migrate our definition if necessary
-        if self.spec_version != to_version:
-            definition = Flow.migrate_definition(definition, self.flow, to_version)
-
-        # update variables from our db into our revision
-        flow = self.flow
-        definition[Flow.DEFINITION_NAME] = flow.name
-        definition[Flow.DEFINITION_UUID] = flow.uuid
-        definition[Flow.DEFINITION_REVISION] = self.revision
-        definition[Flow.DEFINITION_EXPIRE_AFTER_MINUTES] = flow.expires_after_minutes
-
         return definition
 
     def as_json(self):
@@ -1511,6 +1792,18 @@ class FlowRevision(SmartModel):
         self.delete()
 
 
+@receiver(post_save, sender=FlowRevision)
+@receiver(post_delete, sender=FlowRevision)
+def invalidate_definition_cache(sender, instance, **kwargs):
+    """
+    Revisions which are saved or deleted individually may change the current definition of their flow
+    """
+    if kwargs.get("raw"):  # pragma: no cover
+        return
+
+    on_transaction_commit(lambda: Flow.clear_definition_cache(instance.flow_id))
+
+
 class FlowCategoryCount(SquashableModel):
     """
     Maintains counts for categories across all possible results in a flow
@@ -1535,6 +1828,10 @@ class FlowCategoryCount(SquashableModel):
 
     squash_batch_size = settings.FLOW_CATEGORY_COUNT_SQUASH_BATCH_SIZE
 
+    @classmethod
+    def post_squash(cls, distinct_sets):
+        Flow.mark_results_summaries_dirty({s.flow_id for s in distinct_sets})
+
     @classmethod
     def get_squash_query(cls, distinct_set):
         delete_limit = int(getattr(settings, "FLOW_CATEGORY_COUNT_DELETE_BATCH_LIMIT", 10000))
@@ -1628,6 +1925,10 @@ class FlowPathCount(SquashableModel):
     # the number of runs that tooks this path segment in that period
     count = models.IntegerField(default=0)
 
+    @classmethod
+    def post_squash(cls, distinct_sets):
+        Flow.mark_results_summaries_dirty({s.flow_id for s in distinct_sets})
+
     @classmethod
     def get_squash_query(cls, distinct_set):
         delete_limit = int(getattr(settings, "FLOW_PATH_COUNT_DELETE_BATCH_LIMIT", 10000))
@@ -1711,6 +2012,25 @@ class FlowPathRecentRun(models.Model):
     PRUNE_TO = 5
     LAST_PRUNED_KEY = "last_recentrun_pruned"
 
+    # the text of the last message event at or before the step where a run left its segment, found by walking the run's
+    # path and events in the database so that they never have to be loaded
+    MSG_TEXT_SQL = """
+    SELECT e.value->'msg'->>'text'
+    FROM flows_flowrun r,
+        jsonb_array_elements(r.path::jsonb) WITH ORDINALITY AS s(value, idx),
+        jsonb_array_elements(r.events) WITH ORDINALITY AS e(value, idx)
+    WHERE r.id = flows_flowpathrecentrun.run_id
+        AND e.value->>'step_uuid' = s.value->>'uuid'
+        AND e.value->>'type' IN ('msg_created', 'msg_received')
+        AND s.idx <= (
+            SELECT f.idx FROM jsonb_array_elements(r.path::jsonb) WITH ORDINALITY AS f(value, idx)
+            WHERE f.value->>'uuid' = flows_flowpathrecentrun.from_step_uuid::text
+            LIMIT 1
+        )
+    ORDER BY s.idx DESC, e.idx DESC
+    LIMIT 1
+    """
+
     id = models.BigAutoField(primary_key=True)
 
     # the node and step UUIDs of the start of the path segment
@@ -1732,69 +2052,109 @@ class FlowPathRecentRun(models.Model):
     @classmethod
     def get_recent(cls, exit_uuids, to_uuid, limit=PRUNE_TO):
         """
-        Gets the recent runs for the given flow segments
+        Gets the recent runs for the given flow segments, with the text of the last message before each left the segment
         """
         recent = (
-            cls.objects.filter(from_uuid__in=exit_uuids, to_uuid=to_uuid).select_related("run").order_by("-visited_on")
+            cls.objects.filter(from_uuid__in=exit_uuids, to_uuid=to_uuid)
+            .annotate(text=RawSQL(f"({cls.MSG_TEXT_SQL})", ()))
+            .order_by("-visited_on")
+            .values("run_id", "text", "visited_on")
         )
         if limit:
             recent = recent[:limit]
 
-        results = []
-        for r in recent:
-            msg_events_by_step = r.run.get_events_by_step(msg_only=True)
-            msg_event = None
+        return [r for r in recent if r["text"] is not None]
+
+    # deletes the oldest batch of rows visited before a given time, walking the visited_on index
+    PRUNE_EXPIRED_SQL = """
+    DELETE FROM flows_flowpathrecentrun WHERE id IN (
+        SELECT id FROM flows_flowpathrecentrun WHERE visited_on < %s ORDER BY visited_on LIMIT %s
+    )
+    """
+
+    # deletes all but the newest rows of each of the given segments, walking the segment index
+    PRUNE_SEGMENTS_SQL = """
+    DELETE FROM flows_flowpathrecentrun WHERE id IN (
+        SELECT id FROM (
+            SELECT r.id, ROW_NUMBER() OVER (
+                PARTITION BY r.from_uuid, r.to_uuid ORDER BY r.visited_on DESC, r.id DESC
+            ) AS pos
+            FROM flows_flowpathrecentrun r
+            INNER JOIN unnest(%s::uuid[], %s::uuid[]) AS s(from_uuid, to_uuid)
+                ON r.from_uuid = s.from_uuid AND r.to_uuid = s.to_uuid
+        ) ranked WHERE ranked.pos > %s
+    )
+    """
 
-            # find the last message event in the run before this step
-            before_step = False
-            for step in reversed(r.run.path):
-                step_uuid = step[FlowRun.PATH_STEP_UUID]
-                if step_uuid == str(r.from_step_uuid):
-                    before_step = True
+    @classmethod
+    def prune(cls) -> int:
+        """
+        Prunes rows older than the retention period, and all but the newest PRUNE_TO rows of each segment visited since
+        the last prune
+        """
+        batch_size = int(settings.FLOW_PATH_RECENT_RUN_BATCH_SIZE)
+        start = timezone.now()
 
-                if before_step:
-                    msg_events = msg_events_by_step[step_uuid]
-                    if msg_events:
-                        msg_event = msg_events[-1]
-                        break
+        r = get_redis_connection()
+        last_pruned = r.get(cls.LAST_PRUNED_KEY)
+        last_pruned = datetime.utcfromtimestamp(float(last_pruned)).replace(tzinfo=pytz.utc) if last_pruned else None
 
-            if msg_event:
-                results.append({"run": r.run, "text": msg_event["msg"]["text"], "visited_on": r.visited_on})
+        num_expired = cls._prune_expired(start - settings.RETENTION_PERIODS["flowpathrecentrun"], batch_size)
+        num_trimmed = cls._prune_segments(last_pruned, batch_size)
 
-        return results
+        r.set(cls.LAST_PRUNED_KEY, start.timestamp())
 
-    @classmethod
-    def prune(cls):
-        BATCH_SIZE = int(settings.FLOW_PATH_RECENT_RUN_BATCH_SIZE)
-        deleted_counter = 0
+        num_deleted = num_expired + num_trimmed
+        time_taken = (timezone.now() - start).total_seconds()
+        rate = num_deleted / time_taken if time_taken else num_deleted
 
-        while True:
-            recent_runs = list(FlowPathRecentRun.objects.values("id", "visited_on")[:BATCH_SIZE])
+        analytics.gauge("temba.flow_path_recent_run_pruned", num_deleted)
+        analytics.gauge("temba.flow_path_recent_run_prune_rate", rate)
 
-            if not recent_runs:
-                break
+        logger.info(
+            f"Pruned {num_deleted} recent runs ({num_expired} expired, {num_trimmed} over limit) "
+            f"in {time_taken:.3f}s ({rate:.0f} rows/s)"
+        )
+        return num_deleted
 
-            recent_runs.sort(key=lambda x: x["visited_on"], reverse=True)
+    @classmethod
+    def _prune_expired(cls, before, batch_size: int) -> int:
+        num_deleted = 0
 
-            most_recent_visited = recent_runs[0]["visited_on"]
+        while True:
+            with connection.cursor() as cursor:
+                cursor.execute(cls.PRUNE_EXPIRED_SQL, (before, batch_size))
+                num_deleted += cursor.rowcount
 
-            if timezone.now() - most_recent_visited < timedelta(days=30):
-                break
+            if cursor.rowcount < batch_size:
+                return num_deleted
 
-            ids_to_delete = [run["id"] for run in recent_runs]
+    @classmethod
+    def _prune_segments(cls, since, batch_size: int) -> int:
+        segments = cls.objects.all()
+        if since:
+            segments = segments.filter(visited_on__gte=since)
+
+        segments = segments.order_by("from_uuid", "to_uuid").values_list("from_uuid", "to_uuid").distinct()
+        num_deleted = 0
 
-            FlowPathRecentRun.objects.filter(id__in=ids_to_delete).delete()
+        for batch in chunk_list(segments.iterator(), batch_size):
+            from_uuids, to_uuids = zip(*batch)
 
-            deleted_counter += len(ids_to_delete)
-            logger.info(f"Deleted {deleted_counter} from flowpathrecentrun")
+            with connection.cursor() as cursor:
+                cursor.execute(cls.PRUNE_SEGMENTS_SQL, (list(from_uuids), list(to_uuids), cls.PRUNE_TO))
+                num_deleted += cursor.rowcount
 
-        logger.info(f"Total deleted: {deleted_counter}")
+        return num_deleted
 
     def __str__(self):  # pragma: no cover
         return f"run={self.run.uuid} flow={self.run.flow.uuid} segment={self.to_uuid}→{self.from_uuid}"
 
     class Meta:
-        indexes = [models.Index(fields=["from_uuid", "to_uuid", "-visited_on"])]
+        indexes = [
+            models.Index(fields=["from_uuid", "to_uuid", "-visited_on"]),
+            models.Index(name="flows_recentrun_visited_on", fields=["visited_on"]),
+        ]
 
 
 class FlowNodeCount(SquashableModel):
@@ -1826,6 +2186,10 @@ class FlowNodeCount(SquashableModel):
 
         return sql, (distinct_set.node_uuid, distinct_set.flow_id, distinct_set.node_uuid)
 
+    @classmethod
+    def post_squash(cls, distinct_sets):
+        Flow.mark_results_summaries_dirty({s.flow_id for s in distinct_sets})
+
     @classmethod
     def get_totals(cls, flow):
         totals = list(cls.objects.filter(flow=flow).values_list("node_uuid").annotate(replies=Sum("count")))
@@ -1877,6 +2241,10 @@ class FlowRunCount(SquashableModel):
 
         return sql, params
 
+    @classmethod
+    def post_squash(cls, distinct_sets):
+        Flow.mark_results_summaries_dirty({s.flow_id for s in distinct_sets})
+
     @classmethod
     def get_totals(cls, flow):
         totals = list(cls.objects.filter(flow=flow).values_list("exit_type").annotate(replies=Sum("count")))
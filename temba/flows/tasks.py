@@ -18,6 +18,7 @@ from temba.utils.celery import nonoverlapping_task
 
 from .models import (
     ExportFlowResultsTask,
+    Flow,
     FlowCategoryCount,
     FlowNodeCount,
     FlowPathCount,
@@ -61,11 +62,15 @@ def squash_flowcounts():
     FlowStartCount.squash()
     FlowPathCount.squash()
 
+    Flow.refresh_dirty_results_summaries()
+
 
 @nonoverlapping_task(track_started=True, name="squash_flow_category_counts", lock_timeout=7200)
 def squash_flow_category_counts():
     FlowCategoryCount.squash()
 
+    Flow.refresh_dirty_results_summaries()
+
 
 @nonoverlapping_task(track_started=True, name="trim_flow_revisions")
 def trim_flow_revisions():
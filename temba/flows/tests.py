@@ -153,6 +153,40 @@ class FlowTest(TembaTest):
         favorites.revisions.all().delete()
         self.assertRaises(AssertionError, favorites.get_definition)
 
+    def test_get_definition_cached(self):
+        flow = self.get_flow("favorites_v13")
+        flow.get_definition()
+
+        # once cached, the definition is served without loading the revision
+        with self.assertNumQueries(0):
+            definition = flow.get_definition()
+
+        self.assertEqual("Favorites", definition["name"])
+        self.assertEqual(1, definition["revision"])
+
+        # callers get their own copy
+        definition["nodes"] = []
+        self.assertNotEqual([], flow.get_definition()["nodes"])
+
+        # saving a new revision replaces the cached definition
+        flow.save_revision(self.admin, flow.get_definition())
+
+        with self.assertNumQueries(0):
+            self.assertEqual(2, flow.get_definition()["revision"])
+
+        # as does changing the current revision directly
+        rev = flow.get_current_revision()
+        rev.definition["language"] = "spa"
+        rev.save(update_fields=("definition",))
+
+        self.assertEqual("spa", flow.get_definition()["language"])
+
+        # changes to the flow itself are applied to cached definitions
+        flow.name = "Favs"
+        flow.save(update_fields=("name",))
+
+        self.assertEqual("Favs", flow.get_definition()["name"])
+
     def test_ensure_current_version(self):
         # importing migrates to latest spec version
         flow = self.get_flow("favorites_v13")
@@ -490,6 +524,37 @@ class FlowTest(TembaTest):
         with self.assertRaises(FlowUserConflictException):
             flow.save_revision(self.admin, definition)
 
+    def test_bulk_update_dependencies(self):
+        flow1 = self.create_flow("Flow 1")
+        flow2 = self.create_flow("Flow 2")
+        age = self.create_field("age", "Age")
+        testers = self.create_group("Testers", contacts=[])
+
+        age_dep = {"type": "field", "key": "age", "name": "Age"}
+
+        # a select, delete and insert for each type that has dependencies, and a delete for each type that doesn't
+        with self.assertNumQueries(17):
+            Flow.bulk_update_dependencies(
+                [
+                    (flow1, [age_dep, {"type": "group", "uuid": str(testers.uuid), "name": "Testers"}]),
+                    (flow2, [age_dep, {"type": "flow", "uuid": str(flow1.uuid), "name": "Flow 1"}]),
+                ]
+            )
+
+        self.assertEqual({age}, set(flow1.field_dependencies.all()))
+        self.assertEqual({testers}, set(flow1.group_dependencies.all()))
+        self.assertEqual(set(), set(flow1.flow_dependencies.all()))
+        self.assertEqual({age}, set(flow2.field_dependencies.all()))
+        self.assertEqual(set(), set(flow2.group_dependencies.all()))
+        self.assertEqual({flow1}, set(flow2.flow_dependencies.all()))
+
+        # existing dependencies are replaced, and dependencies which don't exist are ignored
+        Flow.bulk_update_dependencies([(flow1, [{"type": "group", "uuid": "e2a6b8a3-9a7f-4f4c-9b2b-2f5f5f2f5f5f"}])])
+
+        self.assertEqual(set(), set(flow1.field_dependencies.all()))
+        self.assertEqual(set(), set(flow1.group_dependencies.all()))
+        self.assertEqual({flow1}, set(flow2.flow_dependencies.all()))
+
     def test_copy(self):
         flow = self.get_flow("color")
 
@@ -629,9 +694,12 @@ class FlowTest(TembaTest):
             visited,
         )
 
-        # check recent runs
-        recent = FlowPathRecentRun.get_recent([color_prompt["exits"][0]["uuid"]], color_split["uuid"])
+        # check recent runs, which are fetched with their message text in a single query
+        with self.assertNumQueries(1):
+            recent = FlowPathRecentRun.get_recent([color_prompt["exits"][0]["uuid"]], color_split["uuid"])
+
         self.assertEqual(["What is your favorite color?"], [r["text"] for r in recent])
+        self.assertEqual(session1.session.runs.get().id, recent[0]["run_id"])
 
         recent = FlowPathRecentRun.get_recent([color_split["exits"][-1]["uuid"]], color_other["uuid"])
         self.assertEqual(["mauve", "chartreuse"], [r["text"] for r in recent])
@@ -1041,6 +1109,50 @@ class FlowTest(TembaTest):
         squash_flow_category_counts()
         self.assertEqual(max_id, FlowCategoryCount.objects.all().order_by("-id").first().id)
 
+    def test_results_summary(self):
+        flow = self.get_flow("favorites")
+        flow2 = self.get_flow("pick_a_number")
+
+        FlowRunCount.objects.create(flow=flow, count=2, exit_type=None)
+        FlowRunCount.objects.create(flow=flow, count=1, exit_type="C")
+        FlowRunCount.objects.create(flow=flow2, count=4, exit_type=None)
+
+        summary = flow.get_results_summary()
+        self.assertEqual({"categories", "nodes", "segments", "runs"}, set(summary.keys()))
+        self.assertEqual(flow.get_category_counts()["counts"], summary["categories"])
+        self.assertEqual(
+            {"total": 3, "active": 2, "completed": 1},
+            {k: summary["runs"][k] for k in ("total", "active", "completed")},
+        )
+
+        # summary is served from the cache until it's refreshed
+        FlowRunCount.objects.create(flow=flow, count=1, exit_type="C")
+
+        with self.assertNumQueries(0):
+            self.assertEqual(3, flow.get_results_summary()["runs"]["total"])
+
+        # squashing refreshes the cached summary of the flow but doesn't cache summaries for other flows
+        squash_flowcounts()
+
+        self.assertEqual(4, flow.get_results_summary()["runs"]["total"])
+        self.assertIsNone(get_redis_connection().get(f"flow:{flow2.id}:results_summary"))
+
+        # and saving a new revision clears it
+        flow.save_revision(self.admin, flow.get_definition())
+        self.assertIsNone(get_redis_connection().get(f"flow:{flow.id}:results_summary"))
+
+        results_url = reverse("flows.flow_results_summary", args=[flow.uuid])
+
+        self.assertLoginRedirect(self.client.get(results_url))
+
+        self.login(self.admin)
+        response = self.client.get(results_url)
+        self.assertEqual(4, response.json()["runs"]["total"])
+        self.assertEqual(flow.get_node_counts(), response.json()["nodes"])
+
+        response = self.client.get(reverse("flows.flow_activity", args=[flow.uuid]))
+        self.assertEqual(summary["segments"], response.json()["segments"])
+
     def test_category_counts(self):
         def assertCount(counts, result_key, category_name, truth):
             found = False
@@ -1346,32 +1458,41 @@ class FlowTest(TembaTest):
         self.assertEqual(0, FlowPathCount.objects.filter(flow=flow, is_squashed=False).count())
 
     def test_prune_recent_runs(self):
-        """
-        Test that prune() correctly handles cases where records older than 30 days
-        """
         now = timezone.now()
 
-        FlowPathRecentRun.objects.create(
-            from_uuid=uuid4(),
-            from_step_uuid=uuid4(),
-            to_uuid=uuid4(),
-            to_step_uuid=uuid4(),
-            run_id=1,
-            visited_on=now - timedelta(days=31),
-        )
+        def create_recent_run(from_uuid, to_uuid, run_id, visited_on):
+            return FlowPathRecentRun.objects.create(
+                from_uuid=from_uuid,
+                from_step_uuid=uuid4(),
+                to_uuid=to_uuid,
+                to_step_uuid=uuid4(),
+                run_id=run_id,
+                visited_on=visited_on,
+            )
+
+        # two expired rows on their own segments
+        create_recent_run(uuid4(), uuid4(), 1, now - timedelta(days=31))
+        create_recent_run(uuid4(), uuid4(), 2, now - timedelta(days=31))
 
-        FlowPathRecentRun.objects.create(
-            from_uuid=uuid4(),
-            from_step_uuid=uuid4(),
-            to_uuid=uuid4(),
-            to_step_uuid=uuid4(),
-            run_id=2,
-            visited_on=now - timedelta(days=31),
+        # a busy segment with more recent rows than we keep, and a quiet one
+        busy_from, busy_to = uuid4(), uuid4()
+        busy = [create_recent_run(busy_from, busy_to, i, now - timedelta(minutes=i)) for i in range(3, 10)]
+        quiet = create_recent_run(uuid4(), uuid4(), 10, now - timedelta(days=2))
+
+        with override_settings(FLOW_PATH_RECENT_RUN_BATCH_SIZE=1):
+            self.assertEqual(4, FlowPathRecentRun.prune())
+
+        self.assertEqual(
+            {r.id for r in busy[:5]} | {quiet.id}, set(FlowPathRecentRun.objects.values_list("id", flat=True))
         )
 
-        FlowPathRecentRun.prune()
+        # only segments visited since the last prune are trimmed
+        stale = [create_recent_run(busy_from, busy_to, 11, now - timedelta(hours=1)) for _ in range(2)]
+        self.assertEqual(0, FlowPathRecentRun.prune())
 
-        self.assertEqual(FlowPathRecentRun.objects.count(), 0)
+        create_recent_run(busy_from, busy_to, 12, timezone.now())
+        self.assertEqual(3, FlowPathRecentRun.prune())
+        self.assertFalse(FlowPathRecentRun.objects.filter(id__in=[r.id for r in stale]).exists())
 
     def test_flow_keyword_update(self):
         self.login(self.admin)
@@ -5872,7 +5993,7 @@ class SimulationTest(TembaTest):
         url = reverse("flows.flow_simulate", args=[flow.id])
 
         with override_settings(MAILROOM_AUTH_TOKEN="sesame", MAILROOM_URL="https://mailroom.temba.io"):
-            with patch("requests.post") as mock_post:
+            with patch("requests.Session.post") as mock_post:
                 mock_post.return_value = MockResponse(200, '{"session": {}}')
                 response = self.client.post(url, payload, content_type="application/json")
 
@@ -5910,13 +6031,13 @@ class SimulationTest(TembaTest):
         url = reverse("flows.flow_simulate", args=[flow.pk])
 
         with override_settings(MAILROOM_AUTH_TOKEN="sesame", MAILROOM_URL="https://mailroom.temba.io"):
-            with patch("requests.post") as mock_post:
+            with patch("requests.Session.post") as mock_post:
                 mock_post.return_value = MockResponse(400, '{"session": {}}')
                 response = self.client.post(url, json.dumps(payload), content_type="application/json")
                 self.assertEqual(500, response.status_code)
 
             # start a flow
-            with patch("requests.post") as mock_post:
+            with patch("requests.Session.post") as mock_post:
                 mock_post.return_value = MockResponse(200, '{"session": {}}')
                 response = self.client.post(url, json.dumps(payload), content_type="application/json")
                 self.assertEqual(200, response.status_code)
@@ -5942,12 +6063,12 @@ class SimulationTest(TembaTest):
                 "flow": {},
             }
 
-            with patch("requests.post") as mock_post:
+            with patch("requests.Session.post") as mock_post:
                 mock_post.return_value = MockResponse(400, '{"session": {}}')
                 response = self.client.post(url, json.dumps(payload), content_type="application/json")
                 self.assertEqual(500, response.status_code)
 
-            with patch("requests.post") as mock_post:
+            with patch("requests.Session.post") as mock_post:
                 mock_post.return_value = MockResponse(200, '{"session": {}}')
                 response = self.client.post(url, json.dumps(payload), content_type="application/json")
                 self.assertEqual(200, response.status_code)
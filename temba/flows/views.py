@@ -204,6 +204,7 @@ class FlowCRUDL(SmartCRUDL):
         "results",
         "run_table",
         "category_counts",
+        "results_summary",
         "broadcast",
         "activity",
         "activity_chart",
@@ -1744,6 +1745,12 @@ class FlowCRUDL(SmartCRUDL):
         def render_to_response(self, context, **response_kwargs):
             return JsonResponse(self.get_object().get_category_counts())
 
+    class ResultsSummary(AllowOnlyActiveFlowMixin, OrgObjPermsMixin, SmartReadView):
+        slug_url_kwarg = "uuid"
+
+        def render_to_response(self, context, **response_kwargs):
+            return JsonResponse(self.get_object().get_results_summary())
+
     class Results(SpaMixin, AllowOnlyActiveFlowMixin, OrgObjPermsMixin, SmartReadView):
         slug_url_kwarg = "uuid"
 
@@ -1792,9 +1799,11 @@ class FlowCRUDL(SmartCRUDL):
 
         def get(self, request, *args, **kwargs):
             flow = self.get_object(self.get_queryset())
-            (active, visited) = flow.get_activity()
+            summary = flow.get_results_summary()
 
-            return JsonResponse(dict(nodes=active, segments=visited, is_starting=flow.is_starting()))
+            return JsonResponse(
+                dict(nodes=summary["nodes"], segments=summary["segments"], is_starting=flow.is_starting())
+            )
 
     class Simulate(OrgObjPermsMixin, SmartReadView):
         @csrf_exempt
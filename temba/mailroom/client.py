@@ -1,11 +1,15 @@
 import logging
-from typing import NamedTuple
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, NamedTuple
 
 import requests
+from requests.adapters import HTTPAdapter
 
 from django.conf import settings
 
-from temba.utils import json
+from temba.utils import analytics, json
 
 from .modifiers import Modifier
 
@@ -52,19 +56,60 @@ class ContactSpec(NamedTuple):
     groups: list[str]
 
 
+class TimeoutHTTPAdapter(HTTPAdapter):
+    """
+    Transport adapter which applies a default timeout to every request
+    """
+
+    def __init__(self, timeout, **kwargs):
+        self.timeout = timeout
+
+        super().__init__(**kwargs)
+
+    def send(self, request, **kwargs):
+        if kwargs.get("timeout") is None:
+            kwargs["timeout"] = self.timeout
+
+        return super().send(request, **kwargs)
+
+
 class MailroomClient:
     """
-    Basic web client for mailroom
+    Basic web client for mailroom which reuses pooled keep-alive connections
     """
 
     default_headers = {"User-Agent": "Temba"}
 
+    # endpoints which don't change any state in mailroom and so are safe to retry
+    idempotent_endpoints = {
+        "",
+        "expression/migrate",
+        "flow/migrate",
+        "flow/inspect",
+        "flow/change_language",
+        "flow/clone",
+        "po/export",
+        "contact/search",
+        "contact/parse_query",
+    }
+
     def __init__(self, base_url, auth_token):
         self.base_url = base_url
         self.headers = self.default_headers.copy()
         if auth_token:
             self.headers["Authorization"] = "Token " + auth_token
 
+        self.max_retries = settings.MAILROOM_MAX_RETRIES
+
+        adapter = TimeoutHTTPAdapter(
+            timeout=(settings.MAILROOM_CONNECT_TIMEOUT, settings.MAILROOM_READ_TIMEOUT),
+            pool_connections=1,
+            pool_maxsize=settings.MAILROOM_POOL_SIZE,
+        )
+        self.session = requests.Session()
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
     def version(self):
         return self._request("", post=False).get("version")
 
@@ -250,8 +295,7 @@ class MailroomClient:
         else:
             kwargs = dict(json=payload)
 
-        req_fn = requests.post if post else requests.get
-        response = req_fn("%s/mr/%s" % (self.base_url, endpoint), headers=headers, **kwargs)
+        response = self._send(endpoint, post, headers, kwargs)
 
         return_val = response.json() if returns_json else response.content
 
@@ -269,6 +313,56 @@ class MailroomClient:
 
         return return_val
 
+    def _send(self, endpoint, post, headers, kwargs):
+        req_fn = self.session.post if post else self.session.get
+        retries = self.max_retries if endpoint in self.idempotent_endpoints else 0
+        attempt = 0
+
+        while True:
+            start = time.perf_counter()
+            try:
+                response = req_fn("%s/mr/%s" % (self.base_url, endpoint), headers=headers, **kwargs)
+                if response.status_code not in (502, 503, 504) or attempt >= retries:
+                    return response
+            except (requests.ConnectionError, requests.Timeout):
+                if attempt >= retries:
+                    raise
+            finally:
+                metric = endpoint.replace("/", "_") or "version"
+                analytics.gauge(f"temba.mailroom_latency.{metric}", time.perf_counter() - start)
+
+            attempt += 1
+            time.sleep(0.1 * (2 ** (attempt - 1)))
+
+
+_client = None
+_client_key = None
+
 
 def get_client() -> MailroomClient:
-    return MailroomClient(settings.MAILROOM_URL, settings.MAILROOM_AUTH_TOKEN)
+    """
+    Gets the process-wide mailroom client, creating it if necessary
+    """
+    global _client, _client_key
+
+    key = (os.getpid(), settings.MAILROOM_URL, settings.MAILROOM_AUTH_TOKEN)
+    if _client is None or _client_key != key:
+        _client = MailroomClient(settings.MAILROOM_URL, settings.MAILROOM_AUTH_TOKEN)
+        _client_key = key
+
+    return _client
+
+
+def map_concurrently(func: Callable, items: list) -> list:
+    """
+    Calls func for each item using a bounded pool of threads, returning the results in the same order as the items. This
+    is intended for making many independent requests with the shared client, so the pool is never bigger than the
+    client's connection pool. The first exception raised by any call is re-raised.
+    """
+    max_workers = min(settings.MAILROOM_BATCH_WORKERS, settings.MAILROOM_POOL_SIZE, len(items))
+
+    if max_workers <= 1:
+        return [func(item) for item in items]
+
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="mailroom") as executor:
+        return list(executor.map(func, items))
@@ -34,6 +34,7 @@ class BatchTask(Enum):
     INTERRUPT_SESSIONS = "interrupt_sessions"
     POPULATE_DYNAMIC_GROUP = "populate_dynamic_group"
     SCHEDULE_CAMPAIGN_EVENT = "schedule_campaign_event"
+    SCHEDULE_CAMPAIGN = "schedule_campaign"
     IMPORT_CONTACT_BATCH = "import_contact_batch"
     SEND_WHATSAPP_BROADCAST = "send_whatsapp_broadcast"
 
@@ -101,25 +102,38 @@ def queue_broadcast(broadcast):
         _queue_batch_task(broadcast.org_id, BatchTask.SEND_BROADCAST, task, HIGH_PRIORITY)
 
     if broadcast.broadcast_type == "W":
-        # ensure metadata is at least an empty dict before we try to access it
-        if not broadcast.metadata:
-            broadcast.metadata = {}
+        queue_whatsapp_broadcast(
+            broadcast,
+            contact_ids=list(broadcast.contacts.values_list("id", flat=True)),
+            group_ids=list(broadcast.groups.values_list("id", flat=True)),
+        )
 
-        # pop the queue from the metadata
-        queue = broadcast.metadata.pop("queue", None)
 
-        task = {
-            "urns": broadcast.raw_urns or [],
-            "contact_ids": list(broadcast.contacts.values_list("id", flat=True)),
-            "group_ids": list(broadcast.groups.values_list("id", flat=True)),
-            "broadcast_id": broadcast.id,
-            "org_id": broadcast.org_id,
-            "msg": broadcast.metadata,
-            "channel_id": broadcast.channel_id,
-            "queue": queue,
-        }
+def queue_whatsapp_broadcast(broadcast, *, contact_ids, group_ids):
+    """
+    Queues the passed in WhatsApp broadcast for sending by mailroom, to the given recipients which callers that just
+    created the broadcast already have
+    """
+
+    # ensure metadata is at least an empty dict before we try to access it
+    if not broadcast.metadata:
+        broadcast.metadata = {}
 
-        _queue_batch_task(broadcast.org_id, BatchTask.SEND_WHATSAPP_BROADCAST, task, HIGH_PRIORITY)
+    # pop the queue from the metadata
+    queue = broadcast.metadata.pop("queue", None)
+
+    task = {
+        "urns": broadcast.raw_urns or [],
+        "contact_ids": contact_ids,
+        "group_ids": group_ids,
+        "broadcast_id": broadcast.id,
+        "org_id": broadcast.org_id,
+        "msg": broadcast.metadata,
+        "channel_id": broadcast.channel_id,
+        "queue": queue,
+    }
+
+    _queue_batch_task(broadcast.org_id, BatchTask.SEND_WHATSAPP_BROADCAST, task, HIGH_PRIORITY)
 
 
 def queue_populate_dynamic_group(group):
@@ -142,6 +156,17 @@ def queue_schedule_campaign_event(event):
     _queue_batch_task(org_id, BatchTask.SCHEDULE_CAMPAIGN_EVENT, task, HIGH_PRIORITY)
 
 
+def queue_schedule_campaign(campaign, event_ids):
+    """
+    Queues a single task to schedule the given events of a campaign for all contacts in the campaign
+    """
+
+    org_id = campaign.org_id
+    task = {"org_id": org_id, "campaign_id": campaign.id, "campaign_event_ids": event_ids}
+
+    _queue_batch_task(org_id, BatchTask.SCHEDULE_CAMPAIGN, task, HIGH_PRIORITY)
+
+
 def queue_flow_start(start):
     """
     Queues the passed in flow start for starting by mailroom
@@ -1,6 +1,7 @@
 from decimal import Decimal
 from unittest.mock import patch
 
+import requests
 from django_redis import get_redis_connection
 from requests import HTTPError
 
@@ -12,7 +13,7 @@ from temba.campaigns.models import Campaign, CampaignEvent, EventFire
 from temba.channels.models import ChannelEvent, ChannelLog
 from temba.flows.models import FlowRun, FlowStart
 from temba.ivr.models import IVRCall
-from temba.mailroom.client import ContactSpec, MailroomException, get_client
+from temba.mailroom.client import ContactSpec, MailroomException, get_client, map_concurrently
 from temba.msgs.models import Broadcast, Msg
 from temba.request_logs.models import HTTPLog
 from temba.tests import MockResponse, TembaTest, matchers, mock_mailroom
@@ -26,14 +27,14 @@ from .events import Event
 
 class MailroomClientTest(TembaTest):
     def test_version(self):
-        with patch("requests.get") as mock_get:
+        with patch("requests.Session.get") as mock_get:
             mock_get.return_value = MockResponse(200, '{"version": "5.3.4"}')
             version = get_client().version()
 
         self.assertEqual("5.3.4", version)
 
     def test_expression_migrate(self):
-        with patch("requests.post") as mock_post:
+        with patch("requests.Session.post") as mock_post:
             mock_post.return_value = MockResponse(200, '{"migrated": "@fields.age"}')
             migrated = get_client().expression_migrate("@contact.age")
 
@@ -54,7 +55,7 @@ class MailroomClientTest(TembaTest):
     def test_flow_migrate(self):
         flow_def = {"nodes": [{"val": Decimal("1.23")}]}
 
-        with patch("requests.post") as mock_post:
+        with patch("requests.Session.post") as mock_post:
             mock_post.return_value = MockResponse(200, '{"name": "Migrated!"}')
             migrated = get_client().flow_migrate(flow_def, to_version="13.1.0")
 
@@ -70,7 +71,7 @@ class MailroomClientTest(TembaTest):
     def test_flow_inspect(self):
         flow_def = {"nodes": [{"val": Decimal("1.23")}]}
 
-        with patch("requests.post") as mock_post:
+        with patch("requests.Session.post") as mock_post:
             mock_post.return_value = MockResponse(200, '{"dependencies":[]}')
             info = get_client().flow_inspect(self.org.id, flow_def)
 
@@ -85,7 +86,7 @@ class MailroomClientTest(TembaTest):
     def test_flow_change_language(self):
         flow_def = {"nodes": [{"val": Decimal("1.23")}]}
 
-        with patch("requests.post") as mock_post:
+        with patch("requests.Session.post") as mock_post:
             mock_post.return_value = MockResponse(200, '{"language": "spa"}')
             migrated = get_client().flow_change_language(flow_def, language="spa")
 
@@ -98,7 +99,7 @@ class MailroomClientTest(TembaTest):
         self.assertEqual({"flow": flow_def, "language": "spa"}, json.loads(call[1]["data"]))
 
     def test_contact_modify(self):
-        with patch("requests.post") as mock_post:
+        with patch("requests.Session.post") as mock_post:
             mock_post.return_value = MockResponse(
                 200,
                 """{
@@ -166,7 +167,7 @@ class MailroomClientTest(TembaTest):
                 },
             )
 
-    @patch("requests.post")
+    @patch("requests.Session.post")
     def test_msg_resend(self, mock_post):
         mock_post.return_value = MockResponse(200, '{"msg_ids": [12345]}')
         response = get_client().msg_resend(org_id=self.org.id, msg_ids=[12345, 67890])
@@ -180,7 +181,7 @@ class MailroomClientTest(TembaTest):
         )
 
     def test_po_export(self):
-        with patch("requests.post") as mock_post:
+        with patch("requests.Session.post") as mock_post:
             mock_post.return_value = MockResponse(200, 'msgid "Red"\nmsgstr "Rojo"\n\n')
             response = get_client().po_export(self.org.id, [123, 234], "spa")
 
@@ -193,7 +194,7 @@ class MailroomClientTest(TembaTest):
         )
 
     def test_po_import(self):
-        with patch("requests.post") as mock_post:
+        with patch("requests.Session.post") as mock_post:
             mock_post.return_value = MockResponse(200, '{"flows": []}')
             response = get_client().po_import(self.org.id, [123, 234], "spa", b'msgid "Red"\nmsgstr "Rojo"\n\n')
 
@@ -206,7 +207,7 @@ class MailroomClientTest(TembaTest):
             files={"po": b'msgid "Red"\nmsgstr "Rojo"\n\n'},
         )
 
-    @patch("requests.post")
+    @patch("requests.Session.post")
     def test_parse_query(self, mock_post):
         mock_post.return_value = MockResponse(200, '{"query":"name ~ \\"frank\\"","fields":["name"]}')
         response = get_client().parse_query(self.org.id, "frank")
@@ -223,7 +224,7 @@ class MailroomClientTest(TembaTest):
         with self.assertRaises(MailroomException):
             get_client().parse_query(1, "age > 10")
 
-    @patch("requests.post")
+    @patch("requests.Session.post")
     def test_contact_create(self, mock_post):
         mock_post.return_value = MockResponse(200, '{"contact": {"id": 1234, "name": "", "language": ""}}')
 
@@ -275,7 +276,7 @@ class MailroomClientTest(TembaTest):
             },
         )
 
-    @patch("requests.post")
+    @patch("requests.Session.post")
     def test_contact_resolve(self, mock_post):
         mock_post.return_value = MockResponse(200, '{"contact": {"id": 1234}, "urn": {"id": 2345}}')
 
@@ -289,7 +290,7 @@ class MailroomClientTest(TembaTest):
             json={"org_id": self.org.id, "channel_id": 345, "urn": "tel:+1234567890"},
         )
 
-    @patch("requests.post")
+    @patch("requests.Session.post")
     def test_contact_search(self, mock_post):
         mock_post.return_value = MockResponse(
             200,
@@ -325,7 +326,7 @@ class MailroomClientTest(TembaTest):
             get_client().contact_search(1, "2752dbbc-723f-4007-8bc5-b3720835d3a9", "age > 10", "-created_on")
 
     def test_ticket_assign(self):
-        with patch("requests.post") as mock_post:
+        with patch("requests.Session.post") as mock_post:
             mock_post.return_value = MockResponse(200, '{"changed_ids": [123]}')
             response = get_client().ticket_assign(1, 12, [123, 345], 4, "please handle")
 
@@ -337,7 +338,7 @@ class MailroomClientTest(TembaTest):
             )
 
     def test_ticket_add_note(self):
-        with patch("requests.post") as mock_post:
+        with patch("requests.Session.post") as mock_post:
             mock_post.return_value = MockResponse(200, '{"changed_ids": [123]}')
             response = get_client().ticket_add_note(1, 12, [123, 345], "please handle")
 
@@ -349,7 +350,7 @@ class MailroomClientTest(TembaTest):
             )
 
     def test_ticket_change_topic(self):
-        with patch("requests.post") as mock_post:
+        with patch("requests.Session.post") as mock_post:
             mock_post.return_value = MockResponse(200, '{"changed_ids": [123]}')
             response = get_client().ticket_change_topic(1, 12, [123, 345], 67)
 
@@ -361,7 +362,7 @@ class MailroomClientTest(TembaTest):
             )
 
     def test_ticket_change_ticketer(self):
-        with patch("requests.post") as mock_post:
+        with patch("requests.Session.post") as mock_post:
             mock_post.return_value = MockResponse(200, '{"changed_ids": [123]}')
             response = get_client().ticket_change_ticketer(1, 12, [123, 345], 89)
 
@@ -373,7 +374,7 @@ class MailroomClientTest(TembaTest):
             )
 
         # external_id is forwarded when supplied
-        with patch("requests.post") as mock_post:
+        with patch("requests.Session.post") as mock_post:
             mock_post.return_value = MockResponse(200, '{"changed_ids": [123]}')
             response = get_client().ticket_change_ticketer(1, 12, [123, 345], 89, external_id="room-uuid")
 
@@ -391,7 +392,7 @@ class MailroomClientTest(TembaTest):
             )
 
         # explicit empty string is forwarded (caller asked to clear)
-        with patch("requests.post") as mock_post:
+        with patch("requests.Session.post") as mock_post:
             mock_post.return_value = MockResponse(200, '{"changed_ids": [123]}')
             get_client().ticket_change_ticketer(1, 12, [123, 345], 89, external_id="")
 
@@ -408,7 +409,7 @@ class MailroomClientTest(TembaTest):
             )
 
     def test_ticket_close(self):
-        with patch("requests.post") as mock_post:
+        with patch("requests.Session.post") as mock_post:
             mock_post.return_value = MockResponse(200, '{"changed_ids": [123]}')
             response = get_client().ticket_close(1, 12, [123, 345], force=True)
 
@@ -420,7 +421,7 @@ class MailroomClientTest(TembaTest):
             )
 
     def test_ticket_open(self):
-        with patch("requests.post") as mock_post:
+        with patch("requests.Session.post") as mock_post:
             response = """{
                 "assignee": {
                     "email": "admin1@nyaruka.com",
@@ -457,7 +458,7 @@ class MailroomClientTest(TembaTest):
             )
 
     def test_ticket_open_fail(self):
-        with patch("requests.post") as mock_post:
+        with patch("requests.Session.post") as mock_post:
             mock_post.return_value = MockResponse(500, '{"error": "some error ocurred"}')
 
             with self.assertRaises(HTTPError):
@@ -477,7 +478,7 @@ class MailroomClientTest(TembaTest):
             )
 
     def test_ticket_reopen(self):
-        with patch("requests.post") as mock_post:
+        with patch("requests.Session.post") as mock_post:
             mock_post.return_value = MockResponse(200, '{"changed_ids": [123]}')
             response = get_client().ticket_reopen(1, 12, [123, 345])
 
@@ -491,7 +492,7 @@ class MailroomClientTest(TembaTest):
     def test_request_failure(self):
         flow = self.get_flow("color")
 
-        with patch("requests.post") as mock_post:
+        with patch("requests.Session.post") as mock_post:
             mock_post.return_value = MockResponse(400, '{"errors":["Bad request", "Doh!"]}')
 
             with self.assertRaises(MailroomException) as e:
@@ -506,6 +507,68 @@ class MailroomClientTest(TembaTest):
         # empty is as empty does
         self.assertEqual("", get_client().expression_migrate(""))
 
+    def test_pooled_client(self):
+        # client and its session are reused across calls
+        self.assertIs(get_client(), get_client())
+
+        with override_settings(MAILROOM_URL="https://mailroom.temba.io"):
+            self.assertEqual("https://mailroom.temba.io", get_client().base_url)
+
+        # and timeouts are applied to all requests
+        adapter = get_client().session.get_adapter("http://localhost:8090/mr/")
+        self.assertEqual((5, 60), adapter.timeout)
+
+    @patch("time.sleep")
+    def test_retries(self, mock_sleep):
+        with patch("requests.Session.post") as mock_post:
+            mock_post.side_effect = [
+                requests.ConnectionError("connection reset"),
+                MockResponse(503, '{"error": "busy"}'),
+                MockResponse(200, '{"query": "name ~ \\"frank\\""}'),
+            ]
+
+            # idempotent endpoints are retried
+            response = get_client().parse_query(1, "frank")
+
+            self.assertEqual({"query": 'name ~ "frank"'}, response)
+            self.assertEqual(3, mock_post.call_count)
+
+            # until we run out of retries
+            mock_post.reset_mock()
+            mock_post.side_effect = requests.Timeout("too slow")
+
+            with self.assertRaises(requests.Timeout):
+                get_client().contact_search(1, "", "frank", "")
+
+            self.assertEqual(3, mock_post.call_count)
+
+            # other endpoints aren't retried
+            mock_post.reset_mock()
+            mock_post.side_effect = requests.ConnectionError("connection reset")
+
+            with self.assertRaises(requests.ConnectionError):
+                get_client().ticket_close(1, 12, [123], force=False)
+
+            self.assertEqual(1, mock_post.call_count)
+
+    def test_map_concurrently(self):
+        def double(n):
+            if n < 0:
+                raise ValueError("negative")
+            return n * 2
+
+        # results are returned in the same order as the items
+        self.assertEqual([2 * n for n in range(20)], map_concurrently(double, list(range(20))))
+        self.assertEqual([4], map_concurrently(double, [2]))
+        self.assertEqual([], map_concurrently(double, []))
+
+        with override_settings(MAILROOM_BATCH_WORKERS=1):
+            self.assertEqual([2, 4], map_concurrently(double, [1, 2]))
+
+        # errors are re-raised
+        with self.assertRaises(ValueError):
+            map_concurrently(double, [1, -1, 2])
+
 
 class MailroomQueueTest(TembaTest):
     def setUp(self):
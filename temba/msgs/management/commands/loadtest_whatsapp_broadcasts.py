@@ -0,0 +1,87 @@
+import asyncio
+import statistics
+import time
+from collections import Counter
+
+from django.core.management.base import BaseCommand, CommandError
+
+DEFAULT_URL = "http://localhost:8000/fastapi/internal/whatsapp_broadcasts"
+
+
+class Command(BaseCommand):  # pragma: no cover
+    help = (
+        "Load tests a WhatsApp broadcasts endpoint with concurrent submissions. Every accepted submission creates a "
+        "real broadcast and queues it to mailroom, so only run this against a workspace whose channel can't send."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--url", type=str, default=DEFAULT_URL, help="URL of the endpoint to test")
+        parser.add_argument("--token", type=str, required=True, help="Bearer JWT accepted by the endpoint")
+        parser.add_argument("--project", type=str, required=True, help="UUID of the project to broadcast in")
+        parser.add_argument("--email", type=str, default="loadtest@example.com", help="Email of the submitting user")
+        parser.add_argument("--urn", type=str, action="append", required=True, help="URN to broadcast to")
+        parser.add_argument("--channel", type=str, help="UUID of a WhatsApp channel to send with")
+        parser.add_argument("--requests", type=int, default=5000, help="Total number of submissions")
+        parser.add_argument("--concurrency", type=int, default=200, help="Number of submissions in flight at once")
+
+    def handle(self, *args, url: str, token: str, requests: int, concurrency: int, **options):
+        # httpx is only a dev dependency so it isn't available on production installs
+        try:
+            import httpx
+        except ImportError:
+            raise CommandError("httpx is required to run this command, install it with the dev dependencies")
+
+        body = {
+            "project": options["project"],
+            "user_email": options["email"],
+            "urns": options["urn"],
+            "msg": {"text": "Load test"},
+        }
+        if options["channel"]:
+            body["channel"] = options["channel"]
+
+        self.stdout.write(f"sending {requests} submissions to {url} with {concurrency} in flight...")
+
+        statuses, latencies, time_taken = asyncio.run(self._run(httpx, url, token, body, requests, concurrency))
+
+        latencies.sort()
+
+        def percentile(p: int) -> float:
+            return latencies[min(len(latencies) - 1, int(len(latencies) * p / 100))] * 1000
+
+        self.stdout.write("")
+        self.stdout.write(f"Throughput  | {requests / time_taken:10.1f} req/s")
+        self.stdout.write(f"Mean        | {statistics.mean(latencies) * 1000:10.1f} ms")
+        self.stdout.write(f"p50         | {percentile(50):10.1f} ms")
+        self.stdout.write(f"p95         | {percentile(95):10.1f} ms")
+        self.stdout.write(f"p99         | {percentile(99):10.1f} ms")
+        self.stdout.write(f"Max         | {latencies[-1] * 1000:10.1f} ms")
+        self.stdout.write("")
+        for status, count in sorted(statuses.items(), key=lambda s: str(s[0])):
+            self.stdout.write(f"{str(status):<11} | {count:10}")
+
+    async def _run(self, httpx, url: str, token: str, body: dict, num_requests: int, concurrency: int):
+        statuses = Counter()
+        latencies = []
+        remaining = iter(range(num_requests))
+        limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+
+        async with httpx.AsyncClient(
+            headers={"Authorization": f"Bearer {token}"}, limits=limits, timeout=30
+        ) as client:
+
+            async def worker():
+                for _ in remaining:
+                    start = time.perf_counter()
+                    try:
+                        response = await client.post(url, json=body)
+                        statuses[response.status_code] += 1
+                    except httpx.HTTPError as e:
+                        statuses[type(e).__name__] += 1
+                    latencies.append(time.perf_counter() - start)
+
+            start = time.perf_counter()
+            await asyncio.gather(*[worker() for _ in range(concurrency)])
+            time_taken = time.perf_counter() - start
+
+        return statuses, latencies, time_taken
@@ -3,6 +3,7 @@ import itertools
 import logging
 import operator
 import os
+import time
 from abc import ABCMeta
 from collections import defaultdict
 from datetime import timedelta
@@ -39,7 +40,7 @@ from temba import mailroom
 from temba.archives.models import Archive
 from temba.bundles import get_brand_bundles, get_bundle_map
 from temba.locations.models import AdminBoundary
-from temba.utils import chunk_list, json, languages
+from temba.utils import analytics, chunk_list, json, languages
 from temba.utils.cache import get_cacheable_result
 from temba.utils.dates import datetime_to_str
 from temba.utils.email import send_template_email
@@ -569,10 +570,15 @@ class Org(SmartModel):
         if not (Version(Org.EARLIEST_IMPORT_VERSION) <= export_version <= Version(Org.CURRENT_EXPORT_VERSION)):
             raise ValueError(f"Unsupported export version {export_version}")
 
+        timings = {}
+        started_on = time.perf_counter()
+
         # do we need to migrate the export forward?
         if export_version < Version(Flow.CURRENT_SPEC_VERSION):
             export_json = Flow.migrate_export(self, export_json, same_site, export_version)
 
+        timings["migrate"] = time.perf_counter() - started_on
+
         self.validate_import(export_json)
 
         export_fields = export_json.get("fields", [])
@@ -592,18 +598,35 @@ class Org(SmartModel):
             new_campaigns = Campaign.import_campaigns(self, user, export_campaigns, same_site)
             Trigger.import_triggers(self, user, export_triggers, same_site)
 
+        timings["import"] = time.perf_counter() - started_on - timings["migrate"]
+
         # queue mailroom tasks to schedule campaign events
         for campaign in new_campaigns:
             campaign.schedule_events_async()
 
         # with all the flows and dependencies committed, we can now have mailroom do full validation
-        for flow in new_flows:
-            flow_info = mailroom.get_client().flow_inspect(self.id, flow.get_definition())
+        client = mailroom.get_client()
+        definitions = [flow.get_definition() for flow in new_flows]
+        flow_infos = mailroom.map_concurrently(lambda d: client.flow_inspect(self.id, d), definitions)
+
+        for flow, flow_info in zip(new_flows, flow_infos):
             flow.has_issues = len(flow_info[Flow.INSPECT_ISSUES]) > 0
-            flow.save(update_fields=("has_issues",))
+        Flow.objects.bulk_update(new_flows, ("has_issues",))
+
+        timings["validate"] = time.perf_counter() - started_on - timings["migrate"] - timings["import"]
+        timings["total"] = time.perf_counter() - started_on
+
+        self._report_import_timings(len(new_flows), timings)
 
         return new_flows
 
+    def _report_import_timings(self, num_flows: int, timings: dict):
+        for phase, seconds in timings.items():
+            analytics.gauge(f"temba.app_import.{phase}", seconds)
+
+        phases = ", ".join(f"{phase}={seconds:.3f}s" for phase, seconds in timings.items() if phase != "total")
+        logger.info(f"Imported {num_flows} flows into org #{self.id} in {timings['total']:.3f}s ({phases})")
+
     def validate_import(self, import_def):
         from temba.triggers.models import Trigger
 
@@ -689,9 +712,11 @@ class Org(SmartModel):
         fields = set()
         groups = set()
 
+        # only export current versions
+        Flow.ensure_current_versions([c for c in components if isinstance(c, Flow)])
+
         for component in components:
             if isinstance(component, Flow):
-                component.ensure_current_version()  # only export current versions
                 exported_flows.append(component.get_definition())
 
                 if include_groups:
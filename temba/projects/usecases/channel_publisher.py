@@ -5,7 +5,7 @@ from temba.event_driven.publisher.rabbitmq_publisher import RabbitmqPublisher
 def publish_channel_event(channel: Channel, action: str):
     rabbitmq_publisher = RabbitmqPublisher()
 
-    rabbitmq_publisher.send_message(
+    rabbitmq_publisher.send_message_async(
         body=dict(
             action=action,
             uuid=str(channel.uuid),
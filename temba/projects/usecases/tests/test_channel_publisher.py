@@ -11,7 +11,7 @@ class ChannelPublisherTestCase(TembaTest):
 
         publish_channel_event(channel, "create")
 
-        mock_rabbitmq_publisher.return_value.send_message.assert_called_once_with(
+        mock_rabbitmq_publisher.return_value.send_message_async.assert_called_once_with(
             body={
                 "action": "create",
                 "uuid": str(channel.uuid),
@@ -1,8 +1,8 @@
 import calendar
 import logging
-from datetime import time, timedelta
+from datetime import datetime, time, timedelta
+from itertools import count, islice
 
-from dateutil.relativedelta import relativedelta
 from smartmin.models import SmartModel
 
 from django.contrib.humanize.templatetags.humanize import ordinal
@@ -152,44 +152,99 @@ class Schedule(SmartModel):
         Get the next point in the future when our schedule should fire again. Note this should only be called to find
         the next scheduled event as it will force the next date to meet the criteria in day_of_month, days_of_week etc..
         """
+        fires = self.get_next_fires(now, 1)
+        return fires[0] if fires else None
+
+    def get_next_fires(self, now, num: int) -> list:
+        """
+        Gets the next num times after now that this schedule will fire
+        """
         if self.repeat_period == Schedule.REPEAT_NEVER:
-            return None
+            return []
 
-        tz = self.org.timezone
-        hour = self.repeat_hour_of_day
-        minute = self.repeat_minute_of_hour
+        return list(islice(self._iter_fires(self.org.timezone, now), num))
+
+    @classmethod
+    def get_next_fires_bulk(cls, schedules, now, num: int) -> dict:
+        """
+        Gets the next num fires of each of the given schedules as a dict of schedule id to list of fires, loading the
+        timezones of their orgs in a single query
+        """
+        Org = cls._meta.get_field("org").related_model
+        timezones = dict(Org.objects.filter(id__in={s.org_id for s in schedules}).values_list("id", "timezone"))
+
+        fires = {}
+        for schedule in schedules:
+            if schedule.repeat_period == Schedule.REPEAT_NEVER:
+                fires[schedule.id] = []
+            else:
+                fires[schedule.id] = list(islice(schedule._iter_fires(timezones[schedule.org_id], now), num))
+        return fires
 
-        # start from the trigger date
-        next_fire = now.astimezone(tz)
-        next_fire = tz.normalize(next_fire.replace(hour=hour, minute=minute, second=0, microsecond=0))
+    def _iter_fires(self, tz, now):
+        """
+        Generates the fires of this schedule after now, by computing each date directly from the repeat period and then
+        localizing the time of day on that date
+        """
+        hour, minute = self.repeat_hour_of_day, self.repeat_minute_of_hour
+        local_now = now.astimezone(tz)
 
-        # if monthly, set to the day of the month scheduled and move forward until we are in the future
-        if self.repeat_period == Schedule.REPEAT_MONTHLY:
-            while True:
-                (weekday, days) = calendar.monthrange(next_fire.year, next_fire.month)
-                day_of_month = min(days, self.repeat_day_of_month)
-                next_fire = tz.normalize(next_fire.replace(day=day_of_month, hour=hour, minute=minute))
-                if next_fire > now:
-                    break
+        for date in self._iter_fire_dates(local_now.date()):
+            fires = self._localize(tz, date, hour, minute)
 
-                next_fire = tz.normalize(next_fire + relativedelta(months=1))
+            # if the time is ambiguous today, use the occurrence on the same side of the clock change as now
+            if date == local_now.date():
+                fires = [f for f in fires if f.utcoffset() == local_now.utcoffset()] or fires
 
-            return next_fire
+            if fires[0] > now:
+                yield fires[0]
+
+    def _iter_fire_dates(self, start):
+        """
+        Generates the dates on or after start that this schedule repeats on
+        """
+        if self.repeat_period == Schedule.REPEAT_DAILY:
+            for d in count():
+                yield start + timedelta(days=d)
 
-        # if weekly, move forward until we're in the future and on an appropriate day of the week
         elif self.repeat_period == Schedule.REPEAT_WEEKLY:
             assert self.repeat_days_of_week != "" and self.repeat_days_of_week is not None
 
-            while next_fire <= now or self._day_of_week(next_fire) not in self.repeat_days_of_week:
-                next_fire = tz.normalize(tz.normalize(next_fire + timedelta(days=1)).replace(hour=hour, minute=minute))
+            weekdays = sorted(Schedule.DAYS_OF_WEEK_OFFSET.index(d) for d in set(self.repeat_days_of_week))
+            week_start = start - timedelta(days=start.weekday())
+
+            for w in count():
+                for weekday in weekdays:
+                    date = week_start + timedelta(days=w * 7 + weekday)
+                    if date >= start:
+                        yield date
+
+        elif self.repeat_period == Schedule.REPEAT_MONTHLY:
+            for m in count():
+                year, month = divmod(start.month - 1 + m, 12)
+                year, month = start.year + year, month + 1
+                date = start.replace(
+                    year=year, month=month, day=min(self.repeat_day_of_month, calendar.monthrange(year, month)[1])
+                )
+                if date >= start:
+                    yield date
 
-            return next_fire
+    @staticmethod
+    def _localize(tz, date, hour: int, minute: int) -> list:
+        """
+        Localizes a time of day on the given date. When clocks go back the time is ambiguous and we return both
+        occurrences in order. When clocks go forward and the time doesn't exist, it's shifted back by the DST offset, the
+        same as replacing the time on a datetime from the day before and normalizing.
+        """
+        naive = datetime.combine(date, time(hour, minute))
+        first = tz.normalize(tz.localize(naive, is_dst=True))
+        second = tz.normalize(tz.localize(naive, is_dst=False))
 
-        elif self.repeat_period == Schedule.REPEAT_DAILY:
-            while next_fire <= now:
-                next_fire = tz.normalize(tz.normalize(next_fire + timedelta(days=1)).replace(hour=hour, minute=minute))
+        if first != second and first.replace(tzinfo=None) == second.replace(tzinfo=None):
+            return sorted([first, second])
 
-            return next_fire
+        # unless that would move it back to the day before, e.g. if clocks go forward at midnight
+        return [first if first.date() == date else second]
 
     def get_repeat_days_display(self):
         return [Schedule.DAYS_OF_WEEK_DISPLAY[d] for d in self.repeat_days_of_week] if self.repeat_days_of_week else []
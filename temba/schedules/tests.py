@@ -1,6 +1,9 @@
-from datetime import datetime, timedelta
+import calendar
+import random
+from datetime import datetime, time, timedelta
 
 import pytz
+from dateutil.relativedelta import relativedelta
 
 from django.urls import reverse
 from django.utils import timezone
@@ -329,6 +332,167 @@ class ScheduleTest(TembaTest):
         self.assertIn("04:45:00+00:00", str(sched.next_fire))
 
 
+def step_to_next_fire(schedule, tz, now):
+    """
+    The previous implementation of Schedule.calculate_next_fire which steps forward a day or month at a time
+    """
+    hour = schedule.repeat_hour_of_day
+    minute = schedule.repeat_minute_of_hour
+
+    next_fire = now.astimezone(tz)
+    next_fire = tz.normalize(next_fire.replace(hour=hour, minute=minute, second=0, microsecond=0))
+
+    if schedule.repeat_period == Schedule.REPEAT_MONTHLY:
+        while True:
+            (weekday, days) = calendar.monthrange(next_fire.year, next_fire.month)
+            day_of_month = min(days, schedule.repeat_day_of_month)
+            next_fire = tz.normalize(next_fire.replace(day=day_of_month, hour=hour, minute=minute))
+            if next_fire > now:
+                return next_fire
+
+            next_fire = tz.normalize(next_fire + relativedelta(months=1))
+
+    while next_fire <= now or (
+        schedule.repeat_period == Schedule.REPEAT_WEEKLY
+        and Schedule._day_of_week(next_fire) not in schedule.repeat_days_of_week
+    ):
+        next_fire = tz.normalize(tz.normalize(next_fire + timedelta(days=1)).replace(hour=hour, minute=minute))
+
+    return next_fire
+
+
+class ScheduleFiresTest(TembaTest):
+    TIMEZONES = (
+        "Africa/Kigali",
+        "America/Los_Angeles",
+        "America/New_York",
+        "America/Sao_Paulo",
+        "Asia/Kolkata",
+        "Australia/Sydney",
+        "Europe/London",
+        "Pacific/Chatham",
+    )
+
+    def test_next_fires_match_stepping(self):
+        rand = random.Random(1234)
+        num_compared = 0
+
+        for _ in range(300):
+            tz = pytz.timezone(rand.choice(self.TIMEZONES))
+            self.org.timezone = tz
+
+            schedule = Schedule(
+                org=self.org,
+                repeat_period=rand.choice([Schedule.REPEAT_DAILY, Schedule.REPEAT_WEEKLY, Schedule.REPEAT_MONTHLY]),
+                repeat_hour_of_day=rand.choice([0, 1, 2, 3, 23, rand.randrange(24)]),  # favor hours near clock changes
+                repeat_minute_of_hour=rand.choice([0, 30, rand.randrange(60)]),
+                repeat_day_of_month=rand.randint(1, 31),
+                repeat_days_of_week="".join(rand.sample(Schedule.DAYS_OF_WEEK_OFFSET, rand.randint(1, 7))),
+            )
+            now = datetime(2015, 1, 1, tzinfo=pytz.UTC) + timedelta(seconds=rand.randrange(10 * 365 * 86400))
+            label = f"{tz} {schedule.repeat_period} {schedule.repeat_hour_of_day}:{schedule.repeat_minute_of_hour}"
+
+            fires = schedule.get_next_fires(now, 10)
+            self.assertEqual(10, len(fires))
+            self.assertEqual(fires[0], schedule.calculate_next_fire(now))
+
+            prev = now
+            dates = set()
+            for fire in fires:
+                local = fire.astimezone(tz)
+
+                # fires are in order, no more than one per day, and on the right days of the week or month
+                self.assertGreater(fire, prev, label)
+                self.assertNotIn(local.date(), dates, label)
+                dates.add(local.date())
+
+                if schedule.repeat_period == Schedule.REPEAT_WEEKLY:
+                    self.assertIn(Schedule._day_of_week(local), schedule.repeat_days_of_week, label)
+                elif schedule.repeat_period == Schedule.REPEAT_MONTHLY:
+                    days_in_month = calendar.monthrange(local.year, local.month)[1]
+                    self.assertEqual(min(schedule.repeat_day_of_month, days_in_month), local.day, label)
+
+                # at the scheduled time of day, unless that time doesn't exist on that day
+                scheduled = datetime.combine(
+                    local.date(), time(schedule.repeat_hour_of_day, schedule.repeat_minute_of_hour)
+                )
+                if tz.normalize(tz.localize(scheduled, is_dst=True)).replace(tzinfo=None) == scheduled:
+                    self.assertEqual(scheduled, local.replace(tzinfo=None), label)
+
+                # stepping misses, repeats or shifts fires when clocks change between its steps, so where they don't
+                # we should agree with it exactly
+                stepped = step_to_next_fire(schedule, tz, prev)
+                local_prev = prev.astimezone(tz)
+                offsets = {
+                    local_prev.utcoffset(),
+                    tz.localize(datetime.combine(local_prev.date(), scheduled.time())).utcoffset(),
+                    fire.utcoffset(),
+                    stepped.utcoffset(),
+                }
+                if len(offsets) == 1:
+                    self.assertEqual(stepped, fire, label)
+                    num_compared += 1
+
+                prev = fire
+
+        self.assertGreater(num_compared, 2700)
+
+    def test_next_fires_across_clock_changes(self):
+        self.org.timezone = pytz.timezone("America/New_York")
+        tz = self.org.timezone
+
+        def assert_fires(schedule, now, expected):
+            fires = schedule.get_next_fires(tz.localize(now), len(expected))
+            self.assertEqual(expected, [f.astimezone(tz).replace(tzinfo=None) for f in fires])
+
+        # clocks go back at 2am on Nov 1st 2020 so 1:30am happens twice, but we only fire once
+        daily = Schedule(org=self.org, repeat_period="D", repeat_hour_of_day=1, repeat_minute_of_hour=30)
+        assert_fires(
+            daily,
+            datetime(2020, 10, 31, 12, 0),
+            [datetime(2020, 11, 1, 1, 30), datetime(2020, 11, 2, 1, 30), datetime(2020, 11, 3, 1, 30)],
+        )
+        fires = daily.get_next_fires(tz.localize(datetime(2020, 10, 31, 12, 0)), 1)
+        self.assertEqual(-4 * 3600, fires[0].utcoffset().total_seconds())  # the first occurrence
+
+        # unless we're already past the first occurrence
+        second = tz.localize(datetime(2020, 11, 1, 1, 10), is_dst=False)
+        self.assertEqual(tz.localize(datetime(2020, 11, 1, 1, 30), is_dst=False), daily.get_next_fires(second, 1)[0])
+
+        # clocks go forward at 2am on Mar 8th 2020 so 2:30am doesn't exist that day and we fire at 1:30am instead
+        daily.repeat_hour_of_day = 2
+        assert_fires(
+            daily,
+            datetime(2020, 3, 7, 12, 0),
+            [datetime(2020, 3, 8, 1, 30), datetime(2020, 3, 9, 2, 30), datetime(2020, 3, 10, 2, 30)],
+        )
+
+        # stepping would fire twice on Mar 31st here, as adding a day to 11pm on Mar 30th lands on Apr 1st
+        self.org.timezone = tz = pytz.timezone("Europe/London")
+        weekly = Schedule(
+            org=self.org, repeat_period="W", repeat_hour_of_day=23, repeat_minute_of_hour=0, repeat_days_of_week="SU"
+        )
+        assert_fires(
+            weekly, datetime(2024, 3, 30, 12, 0), [datetime(2024, 3, 30, 23, 0), datetime(2024, 3, 31, 23, 0)]
+        )
+
+    def test_get_next_fires_bulk(self):
+        now = timezone.now()
+        org2_sched = Schedule.create_schedule(self.org2, self.admin, now + timedelta(hours=1), Schedule.REPEAT_DAILY)
+        sched1 = Schedule.create_schedule(self.org, self.admin, now + timedelta(hours=2), Schedule.REPEAT_WEEKLY, "MR")
+        sched2 = Schedule.create_schedule(self.org, self.admin, now + timedelta(hours=3), Schedule.REPEAT_NEVER)
+
+        schedules = list(Schedule.objects.filter(id__in=[org2_sched.id, sched1.id, sched2.id]))
+
+        with self.assertNumQueries(1):
+            fires = Schedule.get_next_fires_bulk(schedules, now, 3)
+
+        self.assertEqual({org2_sched.id, sched1.id, sched2.id}, set(fires.keys()))
+        self.assertEqual(org2_sched.get_next_fires(now, 3), fires[org2_sched.id])
+        self.assertEqual(sched1.get_next_fires(now, 3), fires[sched1.id])
+        self.assertEqual([], fires[sched2.id])
+
+
 class ScheduleCRUDLTest(TembaTest, CRUDLTestMixin):
     def test_update(self):
         # create a scheduled broadcast
@@ -537,6 +537,7 @@ PERMISSIONS = {
         "recent_messages",
         "recent_contacts",
         "results",
+        "results_summary",
         "revisions",
         "run_table",
         "simulate",
@@ -994,6 +995,7 @@ GROUP_PERMISSIONS = {
         "flows.flow_recent_messages",
         "flows.flow_recent_contacts",
         "flows.flow_results",
+        "flows.flow_results_summary",
         "flows.flow_revisions",
         "flows.flow_run_table",
         "flows.flow_simulate",
@@ -1173,6 +1175,7 @@ REST_FRAMEWORK = {
         "temba.api.support.APITokenAuthentication",
         "temba.api.support.APIBasicAuthentication",
     ),
+    # rates are per user in an org and can be overridden for an org with its api_throttles config key
     "DEFAULT_THROTTLE_CLASSES": ("temba.api.support.OrgUserRateThrottle",),
     "DEFAULT_THROTTLE_RATES": {
         "v2": "2500/hour",
@@ -1192,6 +1195,20 @@ REST_FRAMEWORK = {
 }
 REST_HANDLE_EXCEPTIONS = not TESTING
 
+# the fraction of each throttle rate which can be spent at once when an org doesn't override the burst of a scope
+API_THROTTLE_DEFAULT_BURST_RATIO = 0.1
+API_THROTTLE_BURST_RATIOS = {}
+
+# streaming of list endpoints with stream=true
+API_STREAM_BATCH_SIZE = 1000  # rows fetched by each keyset query and serialized at a time
+API_STREAM_MAX_RESULTS = 1_000_000  # results per stream after which clients resume with the trailer cursor
+API_STREAM_THROTTLE_COST = 100  # number of requests a stream counts as against the endpoint's rate limit
+
+# how long the versions of API resources used for conditional GETs last before they are renewed, which bounds how long
+# changes that aren't model saves (e.g. run, member and message counts, channel activity) can go unnoticed
+API_RESOURCE_DEFAULT_MAX_AGE = 3600
+API_RESOURCE_MAX_AGES = {"channels": 60, "flows": 60, "groups": 60, "labels": 60}
+
 # -----------------------------------------------------------------------------------
 # Django Compressor configuration
 # -----------------------------------------------------------------------------------
@@ -1433,12 +1450,19 @@ SQUASH_BATCH_SIZE = int(os.environ.get("SQUASH_BATCH_SIZE", 5000))
 FLOW_CATEGORY_COUNT_SQUASH_BATCH_SIZE = int(os.environ.get("FLOW_CATEGORY_COUNT_SQUASH_BATCH_SIZE", 100))
 FLOW_PATH_COUNT_SQUASH_BATCH_SIZE = int(os.environ.get("FLOW_PATH_COUNT_SQUASH_BATCH_SIZE", 5000))
 
+# number of flow definitions each process keeps in memory
+FLOW_DEFINITION_LRU_SIZE = int(os.environ.get("FLOW_DEFINITION_LRU_SIZE", 200))
+
+# how long a flow's results summary is cached for if it isn't refreshed by squashing
+FLOW_RESULTS_SUMMARY_TTL = int(os.environ.get("FLOW_RESULTS_SUMMARY_TTL", 60))
+
 # -----------------------------------------------------------------------------------
 # Data retention periods - tasks trim away data older than these settings
 # -----------------------------------------------------------------------------------
 RETENTION_PERIODS = {
     "channellog": timedelta(days=3),
     "eventfire": timedelta(days=90),  # matches default rp-archiver behavior
+    "flowpathrecentrun": timedelta(days=30),
     "flowsession": timedelta(days=7),
     "flowstart": timedelta(days=7),
     "httplog": timedelta(days=3),
@@ -1447,11 +1471,37 @@ RETENTION_PERIODS = {
     "all_flowstart": timedelta(days=60),
 }
 
+# event fires are trimmed in batches sized to hold locks for about the target time (seconds), until the time budget
+# (seconds) is used up - which should be less than the interval the trim task is scheduled at
+EVENT_FIRE_TRIM_TIME_BUDGET = int(os.environ.get("EVENT_FIRE_TRIM_TIME_BUDGET", 600))
+EVENT_FIRE_TRIM_BATCH_SIZE = int(os.environ.get("EVENT_FIRE_TRIM_BATCH_SIZE", 5000))
+EVENT_FIRE_TRIM_MIN_BATCH_SIZE = int(os.environ.get("EVENT_FIRE_TRIM_MIN_BATCH_SIZE", 500))
+EVENT_FIRE_TRIM_MAX_BATCH_SIZE = int(os.environ.get("EVENT_FIRE_TRIM_MAX_BATCH_SIZE", 50000))
+EVENT_FIRE_TRIM_TARGET_LOCK_TIME = float(os.environ.get("EVENT_FIRE_TRIM_TARGET_LOCK_TIME", 1.0))
+
 # -----------------------------------------------------------------------------------
 # Mailroom
 # -----------------------------------------------------------------------------------
 MAILROOM_URL = None
 MAILROOM_AUTH_TOKEN = None
+MAILROOM_CONNECT_TIMEOUT = float(os.environ.get("MAILROOM_CONNECT_TIMEOUT", 5))
+MAILROOM_READ_TIMEOUT = float(os.environ.get("MAILROOM_READ_TIMEOUT", 60))
+MAILROOM_MAX_RETRIES = int(os.environ.get("MAILROOM_MAX_RETRIES", 2))
+MAILROOM_POOL_SIZE = int(os.environ.get("MAILROOM_POOL_SIZE", 10))
+MAILROOM_BATCH_WORKERS = int(os.environ.get("MAILROOM_BATCH_WORKERS", 8))  # max concurrent batch requests
+
+# bulk contact upserts on the internal API
+CONTACT_BULK_UPSERT_MAX_CONTACTS = 10_000  # contacts per request
+CONTACT_BULK_UPSERT_MODIFY_BATCH_SIZE = 1000  # contacts per mailroom modify call
+
+# whether mailroom supports scheduling all the events of a campaign in one task, rather than one task per event
+MAILROOM_SCHEDULE_CAMPAIGNS = os.environ.get("MAILROOM_SCHEDULE_CAMPAIGNS", "false").lower() in ("true", "1", "yes")
+
+# caching of contact query parsing and search results from mailroom, which orgs can override with the
+# contact_search_cache config key
+CONTACT_SEARCH_CACHE = not TESTING
+CONTACT_SEARCH_CACHE_PARSED_TTL = 60 * 60
+CONTACT_SEARCH_CACHE_RESULTS_TTL = 15
 
 # To allow manage fields to support up to 1000 fields
 DATA_UPLOAD_MAX_NUMBER_FIELDS = 4000
@@ -1464,6 +1514,13 @@ MACHINE_HOSTNAME = socket.gethostname().split(".")[0]
 ELASTICSEARCH_URL = os.environ.get("ELASTICSEARCH_URL", "http://localhost:9200")
 ELASTICSEARCH_TIMEOUT_REQUEST = os.environ.get("ELASTICSEARCH_TIMEOUT_REQUEST", default=10)
 
+# how long point in time contexts used for search_after paging are kept open between pages
+ELASTICSEARCH_PIT_KEEP_ALIVE = "1m"
+# number of hits fetched per request when paging through every result of a query
+ELASTICSEARCH_SCAN_PAGE_SIZE = 10_000
+# searches paged by number link to pages starting past this offset with a search_after cursor instead
+ELASTICSEARCH_MAX_PAGE_FROM = 1_000
+
 # Contact number search (Brazilian 9th digit) configuration.
 # CONTACT_SEARCH_MIN_VARIANT_LEN: minimum digits the no-9 variant must keep to be searched,
 # avoiding overly broad short fragments (e.g. "9676" -> "676").
@@ -1497,7 +1554,7 @@ KONG_SERVICE = os.environ.get("KONG_SERVICE", default="flows-service")
 KONG_SERVICE_URL = os.environ.get("KONG_SERVICE_URL", default="https://flows.cloud.weni.ai")
 
 
-FLOW_PATH_RECENT_RUN_BATCH_SIZE = os.environ.get("FLOW_PATH_RECENT_RUN_BATCH_SIZE", default=50)
+FLOW_PATH_RECENT_RUN_BATCH_SIZE = int(os.environ.get("FLOW_PATH_RECENT_RUN_BATCH_SIZE", default=1000))
 
 LAMBDA_VALIDATION_URL = os.environ.get("LAMBDA_VALIDATION_URL", default="")
 
@@ -1508,6 +1565,13 @@ REDSHIFT_QUERY_BASE_URL = os.environ.get("REDSHIFT_QUERY_BASE_URL", default="")
 REDSHIFT_SECRET = os.environ.get("REDSHIFT_SECRET", default="")
 REDSHIFT_ROLE_ARN = os.environ.get("REDSHIFT_ROLE_ARN", default="")
 
+# how long datalake event query results are cached, as (age of the end of the queried range, TTL in seconds) pairs,
+# since ranges which ended a while ago won't get new events but recent ones will
+DATALAKE_EVENTS_CACHE_TTLS = ((timedelta(minutes=15), 15), (timedelta(hours=6), 120), (timedelta(days=2), 900))
+DATALAKE_EVENTS_CACHE_DEFAULT_TTL = 3600
+DATALAKE_EVENTS_QUERY_TIMEOUT = 60  # how long identical queries wait on one already in flight before running their own
+DATALAKE_EVENTS_HEALTH_CHECK_TTL = 30  # how long a health check result is shared by other probes
+
 # Path to the JWT public key
 BASE_DIR = Path(__file__).resolve().parent.parent
 
@@ -1520,6 +1584,11 @@ try:
 except FileNotFoundError:
     JWT_PUBLIC_KEY = None
 
+# number of threads (and so database connections) each FastAPI process uses for ORM work, or zero to run it on the
+# single thread sensitive executor, and how long (seconds) it caches orgs, users, channels and templates for
+FASTAPI_DB_WORKERS = int(os.environ.get("FASTAPI_DB_WORKERS", 16))
+FASTAPI_CACHE_TTL = int(os.environ.get("FASTAPI_CACHE_TTL", 60))
+
 WENI_VOICE_TOKEN = os.environ.get("WENI_VOICE_TOKEN", default="")
 
 WENI_ELEVENLABS_VOICE_ID = os.environ.get("WENI_ELEVENLABS_VOICE_ID", default="")
@@ -1539,9 +1608,12 @@ SOCKET_BASE_URL = os.environ.get("SOCKET_BASE_URL", default="")
 USE_EDA = os.environ.get("USE_EDA", "false").lower() in ("true", "1", "yes")
 
 if USE_EDA:
-    _eda_connection_backend = os.environ.get("EDA_CONNECTION_BACKEND")
-    if _eda_connection_backend:
-        EDA_CONNECTION_BACKEND = _eda_connection_backend
+    # batch consumers rely on a backend which flushes them periodically
+    EDA_CONNECTION_BACKEND = os.environ.get(
+        "EDA_CONNECTION_BACKEND", "weni.eda.backends.pyamqp_flush_backend.PyAMQPFlushConnectionBackend"
+    )
+    EDA_CONSUMER_BATCH_SIZE = int(os.environ.get("EDA_CONSUMER_BATCH_SIZE", 200))
+    EDA_CONSUMER_FLUSH_INTERVAL_MS = int(os.environ.get("EDA_CONSUMER_FLUSH_INTERVAL_MS", 500))
 
     EDA_CONSUMERS_HANDLE = os.environ.get("EDA_CONSUMERS_HANDLE", "temba.event_driven.handle.handle_consumers")
 
@@ -1551,6 +1623,10 @@ if USE_EDA:
     EDA_BROKER_USER = os.environ.get("EDA_BROKER_USER", "guest")
     EDA_BROKER_PASSWORD = os.environ.get("EDA_BROKER_PASSWORD", "guest")
     EDA_WAIT_TIME_RETRY = int(os.environ.get("EDA_WAIT_TIME_RETRY", 5))
+    EDA_PUBLISH_POOL_SIZE = int(os.environ.get("EDA_PUBLISH_POOL_SIZE", 4))
+    EDA_PUBLISH_MAX_RETRIES = int(os.environ.get("EDA_PUBLISH_MAX_RETRIES", 3))
+    EDA_PUBLISH_BUFFER_SIZE = int(os.environ.get("EDA_PUBLISH_BUFFER_SIZE", 10_000))
+    EDA_PUBLISH_BATCH_SIZE = int(os.environ.get("EDA_PUBLISH_BATCH_SIZE", 100))
 
     PIKA_EDA_BROKER_HOST = os.environ.get("PIKA_EDA_BROKER_HOST", EDA_BROKER_HOST)
     PIKA_EDA_BROKER_PORT = int(os.environ.get("PIKA_EDA_BROKER_PORT", 5671))
@@ -2,11 +2,11 @@ import logging
 from dataclasses import asdict, dataclass
 
 from sentry_sdk import capture_exception
-from weni.eda.django.consumers import EDAConsumer
-from weni.eda.messages import Message
 from weni_datalake_sdk.clients.client import send_message_template_data_async
 from weni_datalake_sdk.paths.message_template_path import MessageTemplatePath
 
+from temba.event_driven.consumers import BatchEDAConsumer, wait_for_results
+
 logger = logging.getLogger(__name__)
 
 
@@ -25,39 +25,40 @@ class MessageTemplateDTO:  # pragma: no cover
     data: dict
 
 
-class MessageTemplateConsumer(EDAConsumer):  # pragma: no cover
-    def consume(self, message: Message):
-        try:
-            logger.info("[MessageTemplateConsumer] Received message")
-            body = message.json()
-            logger.info(
-                "[MessageTemplateConsumer] Processing message_id=%s template_uuid=%s channel=%s",
-                body.get("message_id"),
-                body.get("template_uuid"),
-                body.get("channel_uuid"),
-            )
-            message_template_dto = MessageTemplateDTO(
-                contact_urn=body.get("contact_urn"),
-                channel=body.get("channel_uuid"),
-                template_language=body.get("template_language"),
-                template_name=body.get("template_name"),
-                template_uuid=body.get("template_uuid"),
-                message_id=body.get("message_id"),
-                message_date=body.get("message_date"),
-                direction=body.get("direction"),
-                template_variables=body.get("template_variables"),
-                text=body.get("text"),
-                data=body,
-            )
-
-            send_message_template_data_async(MessageTemplatePath, asdict(message_template_dto))
-
-            self.ack()
-            logger.info(
-                "[MessageTemplateConsumer] Message processed successfully message_id=%s",
-                body.get("message_id"),
-            )
-        except Exception as exception:
-            logger.exception("[MessageTemplateConsumer] Failed to process message")
+class MessageTemplateConsumer(BatchEDAConsumer):  # pragma: no cover
+    def consume_batch(self, messages: list) -> dict:
+        logger.info("[MessageTemplateConsumer] Received batch of %d messages", len(messages))
+
+        futures, failures = {}, {}
+        for message in messages:
+            try:
+                body = message.json()
+                message_template_dto = MessageTemplateDTO(
+                    contact_urn=body.get("contact_urn"),
+                    channel=body.get("channel_uuid"),
+                    template_language=body.get("template_language"),
+                    template_name=body.get("template_name"),
+                    template_uuid=body.get("template_uuid"),
+                    message_id=body.get("message_id"),
+                    message_date=body.get("message_date"),
+                    direction=body.get("direction"),
+                    template_variables=body.get("template_variables"),
+                    text=body.get("text"),
+                    data=body,
+                )
+
+                futures[message] = send_message_template_data_async(MessageTemplatePath, asdict(message_template_dto))
+            except Exception as exception:
+                failures[message] = exception
+
+        failures.update(wait_for_results(futures))
+
+        for exception in failures.values():
             capture_exception(exception)
-            raise
+
+        logger.info(
+            "[MessageTemplateConsumer] Batch processed, %d succeeded, %d failed",
+            len(messages) - len(failures),
+            len(failures),
+        )
+        return failures
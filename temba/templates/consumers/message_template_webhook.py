@@ -2,11 +2,11 @@ import logging
 from dataclasses import asdict, dataclass
 
 from sentry_sdk import capture_exception
-from weni.eda.django.consumers import EDAConsumer
-from weni.eda.messages import Message
 from weni_datalake_sdk.clients.client import send_message_template_status_data_async
 from weni_datalake_sdk.paths.message_template_status_path import MessageTemplateStatusPath
 
+from temba.event_driven.consumers import BatchEDAConsumer, wait_for_results
+
 logger = logging.getLogger(__name__)
 
 
@@ -20,34 +20,37 @@ class MessageTemplateWebhookDTO:  # pragma: no cover
     data: dict
 
 
-class MessageTemplateWebhookConsumer(EDAConsumer):
-    def consume(self, message: Message):  # pragma: no cover
-        try:
-            logger.info("[MessageTemplateWebhookConsumer] Received message")
-            body = message.json()
-            logger.info(
-                "[MessageTemplateWebhookConsumer] Processing message_id=%s status=%s channel=%s",
-                body.get("message_id"),
-                body.get("status"),
-                body.get("channel_uuid"),
-            )
-            message_template_webhook_dto = MessageTemplateWebhookDTO(
-                contact_urn=body.get("contact_urn"),
-                status=body.get("status"),
-                template_type=body.get("template_type"),
-                channel=body.get("channel_uuid"),
-                message_id=body.get("message_id"),
-                data=body,
-            )
-
-            send_message_template_status_data_async(MessageTemplateStatusPath, asdict(message_template_webhook_dto))
-
-            self.ack()
-            logger.info(
-                "[MessageTemplateWebhookConsumer] Message processed successfully message_id=%s",
-                body.get("message_id"),
-            )
-        except Exception as exception:
-            logger.exception("[MessageTemplateWebhookConsumer] Failed to process message")
+class MessageTemplateWebhookConsumer(BatchEDAConsumer):
+    def consume_batch(self, messages: list) -> dict:  # pragma: no cover
+        logger.info("[MessageTemplateWebhookConsumer] Received batch of %d messages", len(messages))
+
+        futures, failures = {}, {}
+        for message in messages:
+            try:
+                body = message.json()
+                message_template_webhook_dto = MessageTemplateWebhookDTO(
+                    contact_urn=body.get("contact_urn"),
+                    status=body.get("status"),
+                    template_type=body.get("template_type"),
+                    channel=body.get("channel_uuid"),
+                    message_id=body.get("message_id"),
+                    data=body,
+                )
+
+                futures[message] = send_message_template_status_data_async(
+                    MessageTemplateStatusPath, asdict(message_template_webhook_dto)
+                )
+            except Exception as exception:
+                failures[message] = exception
+
+        failures.update(wait_for_results(futures))
+
+        for exception in failures.values():
             capture_exception(exception)
-            raise
+
+        logger.info(
+            "[MessageTemplateWebhookConsumer] Batch processed, %d succeeded, %d failed",
+            len(messages) - len(failures),
+            len(failures),
+        )
+        return failures
@@ -1,11 +1,15 @@
 from weni.eda.channels import Channel
 
+from temba.event_driven.consumers import register_batch_consumers
 from temba.templates.consumers.message_template_consumer import MessageTemplateConsumer
 from temba.templates.consumers.message_template_webhook import MessageTemplateWebhookConsumer
 
 
-def handle_consumers(channel: Channel):
-    channel.basic_consume("flows.message-template", callback=MessageTemplateConsumer().handle)  # pragma: no cover
-    channel.basic_consume(
-        "flows.message-template-webhook", callback=MessageTemplateWebhookConsumer().handle
+def handle_consumers(channel: Channel) -> list:
+    return register_batch_consumers(
+        channel,
+        {
+            "flows.message-template": MessageTemplateConsumer(),
+            "flows.message-template-webhook": MessageTemplateWebhookConsumer(),
+        },
     )  # pragma: no cover
@@ -6,8 +6,10 @@ from django.db import models
 from django.db.models import Count, Q
 from django.utils import timezone
 
+from temba.api.versions import ResourceVersions
 from temba.channels.models import Channel
 from temba.orgs.models import Org
+from temba.utils import on_transaction_commit
 
 
 class Template(models.Model):
@@ -68,9 +70,11 @@ class Template(models.Model):
             active_translation_count=Count("translations", filter=Q(translations__is_active=True))
         )
 
-        templates_to_inactive = templates_with_active_translations.filter(active_translation_count=0)
+        templates_to_inactive = templates_with_active_translations.filter(active_translation_count=0, is_active=True)
 
-        templates_to_inactive.update(is_active=False)
+        # updates don't send post_save, so bump the API version of templates ourselves
+        if templates_to_inactive.update(is_active=False):
+            on_transaction_commit(lambda: ResourceVersions.bump(org.id, "templates"))
 
     def is_approved(self):
         """
@@ -164,10 +168,20 @@ class TemplateTranslation(models.Model):
         """
         ids = [tc.id for tc in existing]
 
-        TemplateTranslation.objects.filter(channel=channel).exclude(id__in=ids).update(is_active=False)
+        num_changed = (
+            TemplateTranslation.objects.filter(channel=channel, is_active=True)
+            .exclude(id__in=ids)
+            .update(is_active=False)
+        )
 
         # Make sure the seen one are active
-        TemplateTranslation.objects.filter(channel=channel, id__in=ids, is_active=False).update(is_active=True)
+        num_changed += TemplateTranslation.objects.filter(channel=channel, id__in=ids, is_active=False).update(
+            is_active=True
+        )
+
+        # updates don't send post_save, so bump the API version of templates ourselves
+        if num_changed and channel.org_id:
+            on_transaction_commit(lambda: ResourceVersions.bump(channel.org_id, "templates"))
 
     @classmethod
     def get_or_create(
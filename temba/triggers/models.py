@@ -5,10 +5,12 @@ from django.db.models import Q
 from django.utils import timezone
 from django.utils.translation import ugettext_lazy as _
 
+from temba.api.versions import ResourceVersions
 from temba.channels.models import Channel
 from temba.contacts.models import Contact, ContactGroup
 from temba.flows.models import Flow
 from temba.orgs.models import Org
+from temba.utils import on_transaction_commit
 
 
 class TriggerType:
@@ -215,7 +217,9 @@ class Trigger(SmartModel):
             self.org, self.trigger_type, self.channel, self.groups.all(), self.keyword, self.referrer_id
         ).exclude(id=self.id)
 
-        conflicts.update(is_archived=True, modified_on=timezone.now(), modified_by=user)
+        # updates don't send post_save, so bump the API version of triggers ourselves
+        if conflicts.update(is_archived=True, modified_on=timezone.now(), modified_by=user):
+            on_transaction_commit(lambda: ResourceVersions.bump(self.org_id, "triggers"))
 
     @classmethod
     def get_conflicts(
@@ -309,56 +309,121 @@ def track(user, event_name, properties=None, context=None):
         return
 
     email = user.email
-
-    if properties is None:
-        properties = {}
-    properties = {k: v for k, v in properties.items() if v is not None}
+    properties = _clean_properties(properties)
 
     # post to segment if configured
     if _segment:  # pragma: no cover
-        # create a context if none was passed in
-        if context is None:
-            context = dict()
+        _track_segment(email, event_name, properties, context)
 
-        # set our source according to our hostname (name of the platform instance, and not machine hostname)
-        context["source"] = settings.HOSTNAME
+    # post to intercom if configured
+    if _intercom:
+        try:
+            _intercom.events.create(**_intercom_event(email, event_name, properties))
+        except Exception:
+            logger.error("error posting to intercom", exc_info=True)
 
-        # populate value=1 in our properties if it isn't present
-        if "value" not in properties:
-            properties["value"] = 1
+    if _crisp:
+        _track_crisp(email, event_name, properties)
 
-        # call through to the real segment.io analytics
-        segment_analytics.track(email, event_name, properties, context)
 
-    # post to intercom if configured
+def track_many(events):
+    """
+    Tracks a batch of (user, event_name, properties) events in all configured analytics backends, using bulk APIs
+    where the backend supports them.
+    """
+
+    events = [(user.email, name, _clean_properties(props)) for user, name, props in events if user.is_authenticated]
+    if not events:
+        return
+
+    # segment's client already queues and batches events in the background
+    if _segment:  # pragma: no cover
+        for email, event_name, properties in events:
+            _track_segment(email, event_name, properties, None)
+
     if _intercom:
         try:
-            _intercom.events.create(
-                event_name=event_name,
-                created_at=int(time.mktime(time.localtime())),
-                email=email,
-                metadata=properties,
-            )
+            _intercom.events.submit_bulk_job(create_items=[_intercom_event(*e) for e in events])
         except Exception:
             logger.error("error posting to intercom", exc_info=True)
 
     if _crisp:
-        color = "grey"
+        for email, event_name, properties in events:
+            _track_crisp(email, event_name, properties)
+
 
-        if "signup" in event_name:
-            color = "green"
+class TrackBuffer:
+    """
+    Buffers tracked events and sends them to our analytics backends in batches, e.g.
 
-        if "created" in event_name:
-            color = "blue"
+        with TrackBuffer() as buffer:
+            for org in orgs:
+                buffer.track(org.created_by, "temba.org_active")
+    """
 
-        if "export" in event_name or "import" in event_name:
-            color = "purple"
+    def __init__(self, batch_size: int = 100):
+        self.batch_size = batch_size
+        self.events = []
 
-        try:
-            _crisp.website.add_people_event(
-                _crisp.website_id,
-                email,
-                {"color": color, "text": event_name, "data": properties},
-            )
-        except Exception:  # pragma: no cover
-            logger.error("error posting to crisp", exc_info=True)
+    def track(self, user, event_name, properties=None):
+        self.events.append((user, event_name, properties))
+
+        if len(self.events) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        if self.events:
+            track_many(self.events)
+            self.events = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.flush()
+
+
+def _clean_properties(properties) -> dict:
+    return {k: v for k, v in (properties or {}).items() if v is not None}
+
+
+def _intercom_event(email, event_name, properties) -> dict:
+    return dict(event_name=event_name, created_at=int(time.mktime(time.localtime())), email=email, metadata=properties)
+
+
+def _track_segment(email, event_name, properties, context):  # pragma: no cover
+    # create a context if none was passed in
+    if context is None:
+        context = dict()
+
+    # set our source according to our hostname (name of the platform instance, and not machine hostname)
+    context["source"] = settings.HOSTNAME
+
+    # populate value=1 in our properties if it isn't present
+    if "value" not in properties:
+        properties["value"] = 1
+
+    # call through to the real segment.io analytics
+    segment_analytics.track(email, event_name, properties, context)
+
+
+def _track_crisp(email, event_name, properties):
+    color = "grey"
+
+    if "signup" in event_name:
+        color = "green"
+
+    if "created" in event_name:
+        color = "blue"
+
+    if "export" in event_name or "import" in event_name:
+        color = "purple"
+
+    try:
+        _crisp.website.add_people_event(
+            _crisp.website_id,
+            email,
+            {"color": color, "text": event_name, "data": properties},
+        )
+    except Exception:  # pragma: no cover
+        logger.error("error posting to crisp", exc_info=True)
@@ -1,3 +1,6 @@
+import threading
+from collections import OrderedDict
+
 from django_redis import get_redis_connection
 
 from django.utils.encoding import force_text
@@ -64,3 +67,41 @@ def incrby_existing(key, delta, r=None):
         "end"
     )
     r.eval(lua, 1, key, delta)
+
+
+class LRUCache:
+    """
+    A thread-safe, per-process cache of a fixed number of items, which evicts the least recently used item when full
+    """
+
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            if key not in self._items:
+                return default
+
+            self._items.move_to_end(key)
+            return self._items[key]
+
+    def set(self, key, value):
+        with self._lock:
+            self._items[key] = value
+            self._items.move_to_end(key)
+
+            while len(self._items) > self.max_size:
+                self._items.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._items.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()
+
+    def __len__(self):
+        return len(self._items)
@@ -310,7 +310,7 @@ class SquashableModel(models.Model):
     @classmethod
     def squash(cls):
         start = time.time()
-        num_sets = 0
+        squashed = []
 
         # Get batch size from class attribute or settings (which may come from env var)
         batch_size = cls.squash_batch_size or settings.SQUASH_BATCH_SIZE
@@ -321,8 +321,11 @@ class SquashableModel(models.Model):
                 cursor.execute("SET application_name = 'flows_nokill';")
                 cursor.execute(sql, params)
 
-            num_sets += 1
+            squashed.append(distinct_set)
 
+        cls.post_squash(squashed)
+
+        num_sets = len(squashed)
         time_taken = time.time() - start
 
         logger.info("Squashed %d distinct sets of %s in %0.3fs" % (num_sets, cls.__name__, time_taken))
@@ -332,6 +335,13 @@ class SquashableModel(models.Model):
     def get_squash_query(cls, distinct_set) -> tuple:  # pragma: no cover
         pass
 
+    @classmethod
+    def post_squash(cls, distinct_sets):
+        """
+        Can be overridden to act on the distinct sets which were just squashed, e.g. to invalidate cached totals
+        """
+        pass
+
     @classmethod
     def sum(cls, instances) -> int:
         count_sum = instances.aggregate(count_sum=Sum("count"))["count_sum"]
@@ -35,7 +35,7 @@ from temba.utils import json, uuid
 from temba.utils.templatetags.temba import format_datetime
 
 from . import chunk_list, countries, format_number, languages, percentage, redact, sizeof_fmt, str_to_bool
-from .cache import get_cacheable_attr, get_cacheable_result, incrby_existing
+from .cache import LRUCache, get_cacheable_attr, get_cacheable_result, incrby_existing
 from .celery import nonoverlapping_task
 from .dates import datetime_to_str, datetime_to_timestamp, timestamp_to_datetime
 from .email import is_valid_address, send_simple_email
@@ -536,6 +536,31 @@ class CacheTest(TembaTest):
         incrby_existing("xxx", -2, r)  # non-existent key
         self.assertIsNone(r.get("xxx"))
 
+    def test_lru_cache(self):
+        cache = LRUCache(2)
+        cache.set("a", 1)
+        cache.set("b", 2)
+
+        self.assertEqual(1, cache.get("a"))
+        self.assertIsNone(cache.get("c"))
+        self.assertEqual(0, cache.get("c", 0))
+
+        # adding a third item evicts the least recently used
+        cache.set("c", 3)
+
+        self.assertEqual(2, len(cache))
+        self.assertEqual(1, cache.get("a"))
+        self.assertIsNone(cache.get("b"))
+
+        cache.delete("a")
+        cache.delete("b")
+
+        self.assertEqual(1, len(cache))
+
+        cache.clear()
+
+        self.assertEqual(0, len(cache))
+
 
 class EmailTest(TembaTest):
     @override_settings(SEND_EMAILS=True)
@@ -1356,6 +1381,34 @@ class AnalyticsTest(SmartminTest):
 
         mocked_logging.error.assert_called_with("error posting to intercom", exc_info=True)
 
+    def test_track_buffer(self):
+        with temba.utils.analytics.TrackBuffer(batch_size=2) as buffer:
+            buffer.track(self.admin, "temba.msg_incoming", dict(count=3))
+            buffer.track(AnonymousUser(), "temba.msg_incoming", dict(count=4))
+
+            # batch is full so it's sent in a single bulk job, without the anonymous user
+            self.intercom_mock.events.submit_bulk_job.assert_called_once_with(
+                create_items=[
+                    dict(
+                        event_name="temba.msg_incoming",
+                        created_at=mock.ANY,
+                        email=self.admin.username,
+                        metadata={"count": 3},
+                    )
+                ]
+            )
+
+            buffer.track(self.admin, "temba.msg_outgoing", dict(count=5, query=None))
+
+        # remaining events sent when buffer exits
+        self.assertEqual(2, self.intercom_mock.events.submit_bulk_job.call_count)
+        self.crisp_mock.website.add_people_event.assert_called_with(
+            self.crisp_mock.website_id,
+            self.admin.username,
+            {"color": "grey", "text": "temba.msg_outgoing", "data": {"count": 5}},
+        )
+        self.intercom_mock.events.create.assert_not_called()
+
     def test_consent_missing_user(self):
         self.intercom_mock.users.find.return_value = None
         temba.utils.analytics.change_consent(self.admin.email, consent=True)